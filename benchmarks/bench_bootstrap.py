@@ -0,0 +1,81 @@
+"""
+Benchmark for serving the bootstrap of a menu tree to many remotes joining at once, such as after a network blip.
+
+Each join is served either by building and encoding a boot command for every item, or from BootstrapFrameCache, and
+the cost per join is reported.
+
+Run from the repository root with:
+    python -m benchmarks.bench_bootstrap [--items 1000] [--joins 200]
+"""
+
+import argparse
+import io
+import time
+
+from tcmenu.domain.menu_items import AnalogMenuItem, BooleanMenuItem, EnumMenuItem, FloatMenuItem, SubMenuItem
+from tcmenu.domain.state.menu_tree import MenuTree
+from tcmenu.domain.util.menu_item_helper import MenuItemHelper
+from tcmenu.remote.commands.command_factory import CommandFactory
+from tcmenu.remote.commands.menu_bootstrap_command import MenuBootstrapCommand
+from tcmenu.remote.protocol.configurable_protocol_converter import ConfigurableProtocolConverter
+from tcmenu.server.bootstrap_frame_cache import BootstrapFrameCache
+
+
+def build_tree(items: int) -> MenuTree:
+    """A tree of submenus each holding twenty items of several types, with a state for every item."""
+    tree = MenuTree()
+    sub_menu = MenuTree.ROOT
+    for i in range(1, items + 1):
+        if i % 20 == 1:
+            sub_menu = SubMenuItem(id=i, name=f"Sub {i}")
+            tree.add_menu_item(sub_menu)
+            continue
+        kind = i % 4
+        if kind == 0:
+            item = AnalogMenuItem(id=i, name=f"Analog {i}", max_value=255, divisor=2, unit_name="dB")
+        elif kind == 1:
+            item = EnumMenuItem(id=i, name=f"Enum {i}", enum_entries=("Low", "Medium", "High"))
+        elif kind == 2:
+            item = BooleanMenuItem(id=i, name=f"Bool {i}")
+        else:
+            item = FloatMenuItem(id=i, name=f"Float {i}")
+        tree.add_menu_item(item, sub_menu)
+    tree.initialize_state_for_each_item()
+    return tree
+
+
+def encode_bootstrap(tree: MenuTree, protocol: ConfigurableProtocolConverter, buffer: io.BytesIO):
+    protocol.to_channel(buffer, CommandFactory.new_bootstrap_command(MenuBootstrapCommand.BootType.START))
+    for sub_menu in (MenuTree.ROOT, *(item for item in tree.get_menu_items(MenuTree.ROOT) if item.has_children())):
+        for item in tree.get_menu_items(sub_menu) or ():
+            protocol.to_channel(buffer, MenuItemHelper.get_boot_msg_for_item(item, sub_menu, tree))
+    protocol.to_channel(buffer, CommandFactory.new_bootstrap_command(MenuBootstrapCommand.BootType.END))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=1_000, help="number of items in the tree")
+    parser.add_argument("--joins", type=int, default=200, help="number of remotes joining")
+    args = parser.parse_args()
+
+    tree = build_tree(args.items)
+    protocol = ConfigurableProtocolConverter(include_default_processors=True)
+    cache = BootstrapFrameCache(tree, protocol)
+
+    start = time.perf_counter()
+    for _ in range(args.joins):
+        encode_bootstrap(tree, protocol, io.BytesIO())
+    encoded = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(args.joins):
+        cache.write_bootstrap(io.BytesIO())
+    cached = time.perf_counter() - start
+
+    print(f"{args.joins} joins of {args.items} items")
+    print(f"  encoded: {encoded:.3f}s ({encoded / args.joins * 1000:.2f}ms/join)")
+    print(f"   cached: {cached:.3f}s ({cached / args.joins * 1000:.2f}ms/join), {encoded / cached:.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark for CachedBootstrapUpdater, the time until the tree of a known device can be shown.
+
+The bootstrap of a device is encoded once to find how long it takes to send over a serial link at the given baud rate,
+with ten bits per byte. Without a cache the tree is ready once every boot frame has been received and applied. With a
+cache it is ready as soon as the join has been applied, which loads the cached tree from disk.
+
+Run from the repository root with:
+    python -m benchmarks.bench_cached_bootstrap [--items 200] [--baud 115200] [--repeat 20]
+"""
+
+import argparse
+import io
+import tempfile
+import time
+
+from benchmarks.bench_interning import encode_bootstrap
+from tcmenu.domain.state.menu_tree import MenuTree
+from tcmenu.remote.cached_bootstrap import BootstrapCache, CachedBootstrapUpdater
+from tcmenu.remote.commands.command_factory import CommandFactory
+from tcmenu.remote.commands.menu_bootstrap_command import MenuBootstrapCommand
+from tcmenu.remote.protocol.configurable_protocol_converter import ConfigurableProtocolConverter
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=200, help="number of items on the device")
+    parser.add_argument("--baud", type=int, default=115200, help="baud rate of the serial link")
+    parser.add_argument("--repeat", type=int, default=20, help="number of times each join is timed")
+    args = parser.parse_args()
+
+    protocol = ConfigurableProtocolConverter(include_default_processors=True)
+    frames = encode_bootstrap(protocol, args.items)
+    frame_bytes = sum(len(frame) + 1 for frame in frames)
+    link_seconds = frame_bytes * 10 / args.baud
+
+    join = CommandFactory.new_join_command("device", serial_number="1")
+    commands = (
+        [join, CommandFactory.new_bootstrap_command(MenuBootstrapCommand.BootType.START)]
+        + [protocol.from_channel(io.BytesIO(frame)) for frame in frames]
+        + [CommandFactory.new_bootstrap_command(MenuBootstrapCommand.BootType.END)]
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = BootstrapCache(directory)
+
+        start = time.perf_counter()
+        updater = CachedBootstrapUpdater(MenuTree(), cache)
+        for command in commands:
+            updater.apply(command)
+        apply_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            updater = CachedBootstrapUpdater(MenuTree(), cache)
+            updater.apply(join)
+            assert updater.ready
+        cached_seconds = (time.perf_counter() - start) / args.repeat
+
+    print(f"{args.items} items, {frame_bytes} bytes of boot frames at {args.baud} baud")
+    print(f"  not cached: ready after {(link_seconds + apply_seconds) * 1000:.0f} ms")
+    print(f"      cached: ready after {cached_seconds * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark for decoding a capture with CaptureAnalyser on an increasing number of worker processes.
+
+A capture of boot items followed by value changes is written to a temporary file, then analysed with one worker (in
+process) and with each worker count up to the number of cores, reporting throughput and speed up.
+
+Run from the repository root with:
+    python -m benchmarks.bench_capture_analysis [--frames 200000] [--workers 8]
+"""
+
+import argparse
+import io
+import os
+import tempfile
+import time
+
+from tcmenu.domain.menu_items import AnalogMenuItem
+from tcmenu.remote.capture_analysis import CaptureAnalyser
+from tcmenu.remote.commands.command_factory import CommandFactory
+from tcmenu.remote.protocol.configurable_protocol_converter import ConfigurableProtocolConverter
+from tcmenu.remote.protocol.correlation_id import CorrelationId
+from tcmenu.remote.session_capture import SessionRecorder
+
+
+def write_capture(path: str, frames: int, items: int = 100):
+    protocol = ConfigurableProtocolConverter(include_default_processors=True)
+    correlation = CorrelationId.from_string("12345678")
+
+    def encode(command) -> bytes:
+        buffer = io.BytesIO()
+        protocol.to_channel(buffer, command)
+        return buffer.getvalue()
+
+    with SessionRecorder.open(path) as recorder:
+        for i in range(1, items + 1):
+            item = AnalogMenuItem(id=i, name=f"Analog {i}", max_value=1000)
+            recorder.record(encode(CommandFactory.new_analog_boot_command(0, item, 0)), timestamp=0.0)
+        for i in range(frames - items):
+            command = CommandFactory.new_absolute_menu_change_command(correlation, i % items + 1, i % 1000)
+            recorder.record(encode(command), timestamp=1.0 + i / 1000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=200_000, help="number of frames in the capture")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="the most worker processes to try")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.tcc")
+        write_capture(path, args.frames)
+        print(f"{args.frames} frames, {os.path.getsize(path):,} bytes, {os.cpu_count()} cores")
+
+        counts = sorted({1, *(n for n in (2, 4, 8, 16, 32) if n < args.workers), args.workers})
+        baseline = None
+        for workers in counts:
+            start = time.perf_counter()
+            result = CaptureAnalyser(workers=workers, chunk_bytes=1024 * 1024).analyse(path)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(
+                f"{workers:>3} workers: {elapsed:.3f}s, {result.frames / elapsed:,.0f} frames/s, "
+                f"{baseline / elapsed:.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
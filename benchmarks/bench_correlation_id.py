@@ -0,0 +1,80 @@
+"""
+Throughput and collision benchmark for CorrelationId generation.
+
+Run from the repository root with:
+    python -m benchmarks.bench_correlation_id [--ids N] [--threads T]
+"""
+
+import argparse
+import threading
+import time
+
+from tcmenu.remote.protocol.correlation_id import CorrelationId, CorrelationIdGenerator
+
+
+def legacy_new_correlation(counter: list[int]) -> int:
+    """The previous algorithm: time in milliseconds plus an unsynchronised counter."""
+    counter[0] += 1
+    return int(time.time() * 1000) + counter[0] % 1000000
+
+
+def measure_throughput(ids: int) -> float:
+    start = time.perf_counter()
+    for _ in range(ids):
+        CorrelationId.new_correlation()
+    return ids / (time.perf_counter() - start)
+
+
+def measure_legacy_throughput(ids: int) -> float:
+    counter = [0]
+    start = time.perf_counter()
+    for _ in range(ids):
+        CorrelationId(legacy_new_correlation(counter))
+    return ids / (time.perf_counter() - start)
+
+
+def count_collisions(allocate, ids_per_thread: int, threads: int) -> tuple[int, float]:
+    results: list[list[int]] = [[] for _ in range(threads)]
+
+    def run(target: list[int]):
+        append = target.append
+        for _ in range(ids_per_thread):
+            append(allocate())
+
+    workers = [threading.Thread(target=run, args=(result,)) for result in results]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+
+    all_values = [value for result in results for value in result]
+    return len(all_values) - len(set(all_values)), len(all_values) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ids", type=int, default=1_000_000, help="IDs to allocate per measurement")
+    parser.add_argument("--threads", type=int, default=8, help="threads used for the collision test")
+    args = parser.parse_args()
+
+    print(f"new_correlation single thread: {measure_throughput(args.ids):,.0f} ids/s")
+    print(f"legacy algorithm single thread: {measure_legacy_throughput(args.ids):,.0f} ids/s")
+
+    per_thread = args.ids // args.threads
+    generator = CorrelationIdGenerator()
+    collisions, rate = count_collisions(generator.next_id, per_thread, args.threads)
+    print(
+        f"generator, {args.threads} threads: {collisions} collisions in {per_thread * args.threads:,} ids, {rate:,.0f} ids/s"
+    )
+
+    legacy_counter = [0]
+    collisions, rate = count_collisions(lambda: legacy_new_correlation(legacy_counter), per_thread, args.threads)
+    print(
+        f"legacy, {args.threads} threads: {collisions} collisions in {per_thread * args.threads:,} ids, {rate:,.0f} ids/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
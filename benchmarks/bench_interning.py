@@ -0,0 +1,97 @@
+"""
+Memory benchmark for MenuItemInterner, with many identical devices bootstrapped into their own trees.
+
+The bootstrap of one device is encoded once, then decoded into a separate MenuTree for each device, as a client
+connected to a fleet of the same model would. Trees are built with add_items_in_order, so that the time reported is
+mostly decoding. Memory held by the trees is measured with tracemalloc, with interning enabled and disabled, timings
+include the tracemalloc overhead.
+
+Run from the repository root with:
+    python -m benchmarks.bench_interning [--trees 500] [--items 200]
+"""
+
+import argparse
+import gc
+import io
+import time
+import tracemalloc
+
+from tcmenu.domain.menu_items import AnalogMenuItem, EnumMenuItem, FloatMenuItem, SubMenuItem
+from tcmenu.domain.state.menu_tree import MenuTree
+from tcmenu.domain.util.menu_item_interner import MenuItemInterner
+from tcmenu.remote.commands.command_factory import CommandFactory
+from tcmenu.remote.protocol.configurable_protocol_converter import ConfigurableProtocolConverter
+
+
+def encode_bootstrap(protocol: ConfigurableProtocolConverter, items: int) -> list[bytes]:
+    """The boot frames of a device with a submenu for every twenty items."""
+    commands = []
+    sub_menu_id = 0
+    for i in range(1, items + 1):
+        if i % 20 == 1:
+            commands.append(CommandFactory.new_sub_menu_boot_command(0, SubMenuItem(id=i, name=f"Settings {i}")))
+            sub_menu_id = i
+        elif i % 3 == 0:
+            item = AnalogMenuItem(id=i, name=f"Channel {i} level", max_value=255, divisor=2, unit_name="dB")
+            commands.append(CommandFactory.new_analog_boot_command(sub_menu_id, item, 10))
+        elif i % 3 == 1:
+            item = EnumMenuItem(id=i, name=f"Channel {i} source", enum_entries=("Line", "Phono", "Digital", "Tuner"))
+            commands.append(CommandFactory.new_menu_enum_boot_command(sub_menu_id, item, 1))
+        else:
+            item = FloatMenuItem(id=i, name=f"Channel {i} temperature", num_decimal_places=1)
+            commands.append(CommandFactory.new_menu_float_boot_command(sub_menu_id, item, 21.5))
+
+    frames = []
+    for command in commands:
+        buffer = io.BytesIO()
+        protocol.to_channel(buffer, command)
+        frames.append(buffer.getvalue()[1:])
+    return frames
+
+
+def measure(protocol: ConfigurableProtocolConverter, frames: list[bytes], trees: int) -> tuple[int, float]:
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    held = []
+    for _ in range(trees):
+        commands = [protocol.from_channel(io.BytesIO(frame)) for frame in frames]
+        tree = MenuTree()
+        tree.add_items_in_order(
+            (command.menu_item, command.sub_menu_id, command.new_menu_state(None)) for command in commands
+        )
+        held.append(tree)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del held
+    return current, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trees", type=int, default=500, help="number of identical devices")
+    parser.add_argument("--items", type=int, default=200, help="number of items on each device")
+    args = parser.parse_args()
+
+    protocol = ConfigurableProtocolConverter(include_default_processors=True)
+    frames = encode_bootstrap(protocol, args.items)
+    interner = MenuItemInterner.shared()
+
+    results = {}
+    for enabled in (False, True):
+        interner.enabled = enabled
+        interner.clear()
+        results[enabled] = measure(protocol, frames, args.trees)
+    interner.enabled = True
+
+    print(f"{args.trees} trees of {args.items} items")
+    for enabled, label in ((False, "not interned"), (True, "    interned")):
+        memory, elapsed = results[enabled]
+        print(f"  {label}: {memory / 1024 / 1024:.1f} MiB ({memory / args.trees / 1024:.1f} KiB/tree), {elapsed:.2f}s")
+    print(f"  saved {(results[False][0] - results[True][0]) / 1024 / 1024:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark for loading large menu definitions with JsonMenuItemSerializer.from_json.
+
+Run from the repository root with:
+    python -m benchmarks.bench_json_serializer [--items N] [--repeat R]
+"""
+
+import argparse
+import json
+import time
+
+import humps
+
+from tcmenu.domain.menu_items import AnalogMenuItem, BooleanMenuItem, EnumMenuItem, SubMenuItem
+from tcmenu.persist import json_menu_item_serializer
+from tcmenu.persist.json_menu_item_serializer import JsonMenuItemSerializer
+from tcmenu.persist.persisted_menu import PersistedMenu
+
+
+def build_document(items: int) -> str:
+    """Builds a document of submenus each holding a mix of analog, enum and boolean items."""
+    menus: list[PersistedMenu] = []
+    next_id = 1
+    while len(menus) < items:
+        sub_id = next_id
+        menus.append(PersistedMenu(SubMenuItem(name=f"Sub{sub_id}", id=sub_id, eeprom_address=-1)))
+        next_id += 1
+        for _ in range(min(99, items - len(menus))):
+            kind = next_id % 3
+            if kind == 0:
+                item = AnalogMenuItem(name=f"A{next_id}", id=next_id, max_value=255, divisor=2, unit_name="dB")
+            elif kind == 1:
+                item = EnumMenuItem(name=f"E{next_id}", id=next_id, enum_entries=("One", "Two", "Three"))
+            else:
+                item = BooleanMenuItem(name=f"B{next_id}", id=next_id, naming=BooleanMenuItem.BooleanNaming.ON_OFF)
+            menus.append(PersistedMenu(item, sub_id, default_value="1"))
+            next_id += 1
+    return JsonMenuItemSerializer.to_json(tuple(menus))
+
+
+def legacy_from_json(json_str: str) -> tuple[PersistedMenu]:
+    """The previous approach, converting every parsed object with humps."""
+    data = json.loads(json_str, object_hook=lambda val: humps.decamelize(val))
+    return tuple(map(JsonMenuItemSerializer.deserialize, data))
+
+
+def measure(load, document: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        load(document)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=50_000, help="items in the generated document")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement, the best is reported")
+    args = parser.parse_args()
+
+    document = build_document(args.items)
+    print(f"document: {args.items:,} items, {len(document) / 1_000_000:.1f} MB")
+
+    print(f"legacy humps object_hook: {measure(legacy_from_json, document, args.repeat):.3f}s")
+
+    orjson = json_menu_item_serializer.orjson
+    json_menu_item_serializer.orjson = None
+    try:
+        print(f"from_json, json module: {measure(JsonMenuItemSerializer.from_json, document, args.repeat):.3f}s")
+    finally:
+        json_menu_item_serializer.orjson = orjson
+
+    if orjson is not None:
+        print(f"from_json, orjson: {measure(JsonMenuItemSerializer.from_json, document, args.repeat):.3f}s")
+    else:
+        print("from_json, orjson: not installed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Scaling benchmark for importing a menu with JsonMenuItemSerializer.new_menu_tree_with_items.
+
+Run from the repository root with:
+    python -m benchmarks.bench_json_tree_import [--sizes 1000 10000 100000] [--legacy-max N]
+"""
+
+import argparse
+import time
+
+from benchmarks.bench_json_serializer import build_document
+from tcmenu.domain.state.menu_tree import MenuTree
+from tcmenu.domain.util.menu_item_helper import MenuItemHelper
+from tcmenu.persist.json_menu_item_serializer import JsonMenuItemSerializer
+from tcmenu.persist.persisted_menu import PersistedMenu
+
+
+def legacy_new_menu_tree_with_items(tc_menu_copy: str) -> MenuTree:
+    """The previous loader, looking up the parent and setting the state through the tree for every item."""
+    tree: MenuTree = MenuTree()
+    for item in JsonMenuItemSerializer.copy_text_to_items(tc_menu_copy):
+        tree.add_menu_item(parent=tree.get_sub_menu_by_id(item.parent_id), item=item.item)
+        if item.default_value is not None:
+            MenuItemHelper.set_menu_state(item.item, item.default_value, tree)
+    return tree
+
+
+def measure(load, copy_text: str) -> float:
+    start = time.perf_counter()
+    load(copy_text)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000], help="item counts")
+    parser.add_argument(
+        "--legacy-max", type=int, default=10_000, help="largest size to run the quadratic legacy loader for"
+    )
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        copy_text = PersistedMenu.ItemTypes.TCMENU_COPY_PREFIX + build_document(size)
+        elapsed = measure(JsonMenuItemSerializer.new_menu_tree_with_items, copy_text)
+        line = f"{size:>8,} items: {elapsed:.3f}s ({elapsed / size * 1_000_000:.1f}us/item)"
+        if size <= args.legacy_max:
+            line += f", legacy {measure(legacy_new_menu_tree_with_items, copy_text):.3f}s"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Benchmark for encoding and decoding TagVal messages with ConfigurableProtocolConverter.
+
+A bootstrap of every boot item type is encoded and decoded, along with value changes, reporting the cost per message.
+
+Run from the repository root with:
+    python -m benchmarks.bench_protocol [--items 10000] [--repeat 5]
+"""
+
+import argparse
+import io
+import time
+
+from tcmenu.domain.edit_item_type import EditItemType
+from tcmenu.domain.menu_items import (
+    ActionMenuItem,
+    AnalogMenuItem,
+    BooleanMenuItem,
+    EditableLargeNumberMenuItem,
+    EditableTextMenuItem,
+    EnumMenuItem,
+    FloatMenuItem,
+    Rgb32MenuItem,
+    RuntimeListMenuItem,
+    ScrollChoiceMenuItem,
+    SubMenuItem,
+)
+from tcmenu.domain.state.current_scroll_position import CurrentScrollPosition
+from tcmenu.domain.state.portable_color import PortableColor
+from tcmenu.remote.commands.command_factory import CommandFactory
+from tcmenu.remote.commands.menu_command import MenuCommand
+from tcmenu.remote.protocol.configurable_protocol_converter import ConfigurableProtocolConverter
+from tcmenu.remote.protocol.correlation_id import CorrelationId
+
+
+def build_boot_commands(items: int) -> list[MenuCommand]:
+    """Boot commands for a menu of the given size, cycling through every boot item type."""
+    factories = (
+        lambda i: CommandFactory.new_analog_boot_command(
+            0, AnalogMenuItem(id=i, name=f"Analog {i}", max_value=255, offset=-128, divisor=2, unit_name="dB"), 10
+        ),
+        lambda i: CommandFactory.new_sub_menu_boot_command(0, SubMenuItem(id=i, name=f"Sub {i}")),
+        lambda i: CommandFactory.new_menu_enum_boot_command(
+            0, EnumMenuItem(id=i, name=f"Enum {i}", enum_entries=("Low", "Medium", "High")), 1
+        ),
+        lambda i: CommandFactory.new_menu_boolean_boot_command(0, BooleanMenuItem(id=i, name=f"Bool {i}"), True),
+        lambda i: CommandFactory.new_menu_float_boot_command(0, FloatMenuItem(id=i, name=f"Float {i}"), 1.5),
+        lambda i: CommandFactory.new_menu_action_boot_command(0, ActionMenuItem(id=i, name=f"Action {i}")),
+        lambda i: CommandFactory.new_menu_text_boot_command(
+            0, EditableTextMenuItem(id=i, name=f"Text {i}", text_length=10, item_type=EditItemType.PLAIN_TEXT), "a=b"
+        ),
+        lambda i: CommandFactory.new_menu_large_item_boot_command(
+            0, EditableLargeNumberMenuItem(id=i, name=f"Large {i}", decimal_places=3, digits_allowed=12), 1234.5
+        ),
+        lambda i: CommandFactory.new_runtime_list_boot_command(
+            0, RuntimeListMenuItem(id=i, name=f"List {i}", initial_rows=3), ("one", "two", "three")
+        ),
+        lambda i: CommandFactory.new_menu_scroll_choice_boot_command(
+            0,
+            ScrollChoiceMenuItem(id=i, name=f"Scroll {i}", item_width=10, num_entries=20),
+            CurrentScrollPosition(2, "b"),
+        ),
+        lambda i: CommandFactory.new_menu_rgb32_boot_command(
+            0, Rgb32MenuItem(id=i, name=f"Color {i}", include_alpha_channel=True), PortableColor(1, 2, 3, 4)
+        ),
+    )
+    return [factories[i % len(factories)](i + 1) for i in range(items)]
+
+
+def build_change_commands(items: int) -> list[MenuCommand]:
+    correlation = CorrelationId.from_string("12345678")
+    return [CommandFactory.new_absolute_menu_change_command(correlation, i + 1, i) for i in range(items)]
+
+
+def measure_encode(protocol: ConfigurableProtocolConverter, commands: list[MenuCommand], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        buffer = io.BytesIO()
+        start = time.perf_counter()
+        for command in commands:
+            protocol.to_channel(buffer, command)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure_decode(protocol: ConfigurableProtocolConverter, commands: list[MenuCommand], repeat: int) -> float:
+    frames = []
+    for command in commands:
+        buffer = io.BytesIO()
+        protocol.to_channel(buffer, command)
+        frames.append(buffer.getvalue()[1:])
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for frame in frames:
+            protocol.from_channel(io.BytesIO(frame))
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=10_000, help="number of messages of each kind")
+    parser.add_argument("--repeat", type=int, default=5, help="runs of each measurement, the best is reported")
+    args = parser.parse_args()
+
+    protocol = ConfigurableProtocolConverter(include_default_processors=True)
+    for name, commands in (
+        ("boot", build_boot_commands(args.items)),
+        ("change", build_change_commands(args.items)),
+    ):
+        encode = measure_encode(protocol, commands, args.repeat)
+        decode = measure_decode(protocol, commands, args.repeat)
+        print(
+            f"{name:>6}: encode {encode:.3f}s ({encode / len(commands) * 1_000_000:.2f}us/msg), "
+            f"decode {decode:.3f}s ({decode / len(commands) * 1_000_000:.2f}us/msg)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Measures the cost of the protocol instrumentation, by encoding and decoding the same commands through a converter
+without stats, with stats and with stats plus the command factory timing, and then prints the per stage report that
+was collected.
+
+Run from the repository root with:
+    python -m benchmarks.bench_protocol_stats [--number 20000]
+"""
+
+import argparse
+import io
+import timeit
+
+from tcmenu.domain.menu_items import AnalogMenuItem
+from tcmenu.remote.commands.command_factory import CommandFactory
+from tcmenu.remote.commands.menu_heartbeat_command import MenuHeartbeatCommand
+from tcmenu.remote.protocol.configurable_protocol_converter import ConfigurableProtocolConverter
+from tcmenu.remote.protocol.correlation_id import CorrelationId
+from tcmenu.remote.protocol_stats import ProtocolStats
+
+COMMANDS = (
+    CommandFactory.new_analog_boot_command(
+        0, AnalogMenuItem(id=1, name="Volume", max_value=255, divisor=2, unit_name="dB"), 10
+    ),
+    CommandFactory.new_absolute_menu_change_command(CorrelationId.from_string("1234"), 1, 20),
+    CommandFactory.new_heartbeat_command(1500, MenuHeartbeatCommand.HeartbeatMode.NORMAL),
+)
+
+
+def round_trip(protocol: ConfigurableProtocolConverter) -> None:
+    for command in COMMANDS:
+        buffer = io.BytesIO()
+        protocol.to_channel(buffer, command)
+        buffer.seek(1)
+        protocol.from_channel(buffer)
+
+
+def time_round_trip(protocol: ConfigurableProtocolConverter, number: int) -> float:
+    return min(timeit.repeat(lambda: round_trip(protocol), number=number, repeat=3)) / (number * len(COMMANDS))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=20_000, help="round trips of all the commands timed")
+    args = parser.parse_args()
+
+    protocol = ConfigurableProtocolConverter(include_default_processors=True)
+    plain = time_round_trip(protocol, args.number)
+
+    stats = ProtocolStats()
+    protocol.set_stats(stats)
+    measured = time_round_trip(protocol, args.number)
+
+    stats.reset()
+    stats.instrument_command_factory()
+    try:
+        factory = time_round_trip(protocol, args.number)
+    finally:
+        stats.close()
+
+    print(f"{'configuration':<28}{'round trip':>14}{'overhead':>10}")
+    for name, seconds in (("no stats", plain), ("stats", measured), ("stats and command factory", factory)):
+        print(f"{name:<28}{seconds * 1e9:>11.0f} ns{seconds / plain:>9.2f}x")
+    print()
+    print(stats.report())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Memory benchmark for MenuTreeTemplate, with many identical devices that share one menu structure.
+
+Each device either gets its own MenuTree, built with add_items_in_order from the same items, or an overlay of a
+template built once from the first tree. Items are shared in both cases, as they would be after interning, so the
+difference is the structure that each tree holds. Memory is measured with tracemalloc, first with the structure alone
+and then with a state set for every item, which is slow for the trees with their own structure as change_item looks
+for each item in the tree the first time it is set.
+
+Run from the repository root with:
+    python -m benchmarks.bench_tree_template [--trees 1000] [--items 200]
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+from typing import Callable
+
+from tcmenu.domain.menu_items import AnalogMenuItem, SubMenuItem
+from tcmenu.domain.state.menu_tree import MenuTree
+from tcmenu.domain.state.menu_tree_template import MenuTreeTemplate
+from tcmenu.domain.util.menu_item_helper import MenuItemHelper
+
+
+def build_entries(items: int) -> list[tuple]:
+    """The items of a device with a submenu for every twenty items."""
+    entries = []
+    sub_menu_id = 0
+    for i in range(1, items + 1):
+        if i % 20 == 1:
+            entries.append((SubMenuItem(id=i, name=f"Settings {i}"), 0, None))
+            sub_menu_id = i
+        else:
+            entries.append((AnalogMenuItem(id=i, name=f"Channel {i}", max_value=255), sub_menu_id, None))
+    return entries
+
+
+def measure(new_tree: Callable[[], MenuTree], values: list[tuple], trees: int) -> tuple[int, float]:
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    held = []
+    for _ in range(trees):
+        tree = new_tree()
+        for item, value in values:
+            MenuItemHelper.set_menu_state(item, value, tree)
+        held.append(tree)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del held
+    return current, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trees", type=int, default=1000, help="number of identical devices")
+    parser.add_argument("--items", type=int, default=200, help="number of items on each device")
+    args = parser.parse_args()
+
+    entries = build_entries(args.items)
+    values = [(item, 10) for item, _, _ in entries if isinstance(item, AnalogMenuItem)]
+
+    def own_tree() -> MenuTree:
+        tree = MenuTree()
+        tree.add_items_in_order(entries)
+        return tree
+
+    template = MenuTreeTemplate(own_tree())
+    for title, states in (("structure only", []), ("with a state for every item", values)):
+        print(f"{args.trees} trees of {args.items} items, {title}")
+        for label, new_tree in (("own structure", own_tree), ("     template", template.new_tree)):
+            memory, elapsed = measure(new_tree, states, args.trees)
+            print(
+                f"  {label}: {memory / 1024 / 1024:.1f} MiB ({memory / args.trees / 1024:.1f} KiB/tree), {elapsed:.2f}s"
+            )
+
+
+if __name__ == "__main__":
+    main()
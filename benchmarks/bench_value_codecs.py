@@ -0,0 +1,105 @@
+"""
+Micro-benchmarks for the value codecs, the text form of list responses, scroll positions, colors and list row changes.
+
+Each codec is timed against the parsing and formatting that the value classes used before, which are kept here for
+comparison, on both well formed and invalid input.
+
+Run from the repository root with:
+    python -m benchmarks.bench_value_codecs [--number 200000]
+"""
+
+import argparse
+import re
+import timeit
+from typing import Callable
+
+from tcmenu.domain.state import value_codecs
+
+
+def legacy_parse_list_response(value: str):
+    matcher = re.match("^(\\d+):(\\d)$", value)
+    if matcher:
+        return int(matcher.group(1)), int(matcher.group(2)) == 1
+    return None
+
+
+def legacy_format_list_response(row: int, invoked: bool) -> str:
+    return f"{row}:{1 if invoked else 0}"
+
+
+def legacy_parse_scroll_position(text: str):
+    position = None
+    value = None
+    try:
+        split_point = text.index("-")
+        value = text[split_point + 1 :]
+        position = int(text[:split_point])
+    except ValueError:
+        if position is None:
+            position = 0
+        if value is None:
+            value = "Unknown"
+    return position, value
+
+
+def legacy_parse_html_color(html_code: str):
+    if html_code[0] == "#" and len(html_code) == 4:
+        return int(html_code[1], 16) << 4, int(html_code[2], 16) << 4, int(html_code[3], 16) << 4, 255
+    elif html_code[0] == "#" and len(html_code) >= 7:
+        red = int(html_code[1:3], 16)
+        green = int(html_code[3:5], 16)
+        blue = int(html_code[5:7], 16)
+        alpha = 255
+        if len(html_code) == 9:
+            alpha = int(html_code[7:9], 16)
+        return red, green, blue, alpha
+    return 0, 0, 0, 255
+
+
+def legacy_format_html_color(red: int, green: int, blue: int, alpha: int) -> str:
+    return f"#{red:02X}{green:02X}{blue:02X}{alpha:02X}"
+
+
+def legacy_parse_list_row_change(value: str):
+    if len(value) < 2 or value[0] not in "IUD":
+        return None
+    row, _, text = value[1:].partition(":")
+    if not row.isdigit():
+        return None
+    return value[0], int(row), text
+
+
+"""Each case is a name, the previous function, the codec and the arguments."""
+CASES: tuple[tuple[str, Callable, Callable, tuple], ...] = (
+    ("parse list response", legacy_parse_list_response, value_codecs.parse_list_response, ("202:1",)),
+    ("parse invalid list response", legacy_parse_list_response, value_codecs.parse_list_response, ("abc:2",)),
+    ("format list response", legacy_format_list_response, value_codecs.format_list_response, (202, True)),
+    ("parse scroll position", legacy_parse_scroll_position, value_codecs.parse_scroll_position, ("20-Pizza",)),
+    ("parse invalid scroll position", legacy_parse_scroll_position, value_codecs.parse_scroll_position, ("Pizza",)),
+    ("parse #RRGGBBAA", legacy_parse_html_color, value_codecs.parse_html_color, ("#365498aa",)),
+    ("parse #RRGGBB", legacy_parse_html_color, value_codecs.parse_html_color, ("#365498",)),
+    ("parse #RGB", legacy_parse_html_color, value_codecs.parse_html_color, ("#f3b",)),
+    ("format color", legacy_format_html_color, value_codecs.format_html_color, (128, 255, 127, 32)),
+    ("parse list row change", legacy_parse_list_row_change, value_codecs.parse_list_row_change, ("U12:Row text",)),
+)
+
+
+def time_call(function: Callable, args: tuple, number: int) -> float:
+    return min(timeit.repeat(lambda: function(*args), number=number, repeat=3)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=200_000, help="calls timed for each case")
+    args = parser.parse_args()
+
+    print(f"{'case':<32}{'previous':>12}{'codec':>12}{'speedup':>10}")
+    for name, legacy, codec, call_args in CASES:
+        assert legacy(*call_args) == codec(*call_args), name
+        before = time_call(legacy, call_args, args.number)
+        after = time_call(codec, call_args, args.number)
+        print(f"{name:<32}{before * 1e9:>9.0f} ns{after * 1e9:>9.0f} ns{before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -38,5 +38,5 @@ setup(
     long_description=open("README.md").read(),
     install_requires=install_requirements,
     tests_require=test_requirements,
-    extras_require={"test": test_requirements},
+    extras_require={"test": test_requirements, "orjson": ["orjson>=3.8.0"], "numpy": ["numpy>=1.21"]},
 )
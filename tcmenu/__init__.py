@@ -1,9 +1,16 @@
 """
 TcMenu Python library.
+
+Subpackages and modules are imported on first use, so that `import tcmenu` and imports of a single module only load
+what they need.
 """
 
+from tcmenu._lazy import lazy_submodules
+
 __all__ = [
     "__version__",
 ]
 
 __version__ = "4.1.2"
+
+__getattr__, __dir__ = lazy_submodules(__name__, ("client", "constants", "domain", "persist", "remote", "server"))
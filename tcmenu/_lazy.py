@@ -0,0 +1,29 @@
+import importlib
+
+
+# Annotated with built-in types only, importing typing here would add its cost to every import of the package.
+def lazy_submodules(package_name: str, submodules: tuple[str, ...]) -> tuple:
+    """
+    Creates the module level __getattr__ and __dir__ functions (PEP 562) for a package, so that its submodules are
+    imported the first time they are accessed as attributes rather than when the package is imported.
+
+    <pre>
+        __getattr__, __dir__ = lazy_submodules(__name__, ("menu_tree", "menu_state"))
+    </pre>
+
+    :param package_name: the name of the package, __name__ in its __init__ module.
+    :param submodules: the names of the submodules and subpackages that are loaded on demand.
+    :return: the __getattr__ and __dir__ functions for the package.
+    """
+    names = frozenset(submodules)
+
+    def __getattr__(name: str) -> object:
+        if name in names:
+            # import_module also stores the module as an attribute of the package, so this runs once per name.
+            return importlib.import_module(f"{package_name}.{name}")
+        raise AttributeError(f"module {package_name!r} has no attribute {name!r}")
+
+    def __dir__() -> list:
+        return sorted(set(vars(importlib.import_module(package_name))) | names)
+
+    return __getattr__, __dir__
@@ -0,0 +1,9 @@
+from tcmenu._lazy import lazy_submodules
+
+__getattr__, __dir__ = lazy_submodules(
+    __name__,
+    (
+        "serial",
+        "tcp",
+    ),
+)
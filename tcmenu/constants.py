@@ -23,9 +23,14 @@ class Defaults:  # pylint: disable=too-few-public-methods
     .. attribute:: HEARTBEAT_FREQUENCY
 
        The default TagVal heartbeat frequency in seconds.
+
+    .. attribute:: ACKNOWLEDGEMENT_TIMEOUT
+
+       The default time in seconds to wait for a command to be acknowledged.
     """
 
     CLIENT_NAME = "PythonClient"
     HOST = "127.0.0.1"
     TCP_PORT = 3333
     HEARTBEAT_FREQUENCY = 30
+    ACKNOWLEDGEMENT_TIMEOUT = 5
@@ -0,0 +1,11 @@
+from tcmenu._lazy import lazy_submodules
+
+__getattr__, __dir__ = lazy_submodules(
+    __name__,
+    (
+        "edit_item_type",
+        "menu_items",
+        "state",
+        "util",
+    ),
+)
@@ -0,0 +1,17 @@
+from tcmenu._lazy import lazy_submodules
+
+__getattr__, __dir__ = lazy_submodules(
+    __name__,
+    (
+        "current_scroll_position",
+        "list_response",
+        "list_row_change",
+        "menu_state",
+        "menu_tree",
+        "menu_tree_template",
+        "paged_string_list",
+        "portable_color",
+        "value_codecs",
+        "value_history",
+    ),
+)
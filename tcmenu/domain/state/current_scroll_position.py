@@ -1,6 +1,8 @@
 from __future__ import annotations
 from dataclasses import dataclass
 
+from tcmenu.domain.state.value_codecs import format_scroll_position, parse_scroll_position
+
 
 @dataclass
 class CurrentScrollPosition:
@@ -17,21 +19,7 @@ class CurrentScrollPosition:
         Create from a textual representation in the form, position-value, EG 1-Pizza.
         :param text: the text form of the object to parse.
         """
-        position = None
-        value = None
-
-        try:
-            split_point = text.index("-")
-            value = text[split_point + 1 :]
-            position = int(text[:split_point])
-        except ValueError:
-            if position is None:
-                position = 0
-
-            if value is None:
-                value = "Unknown"
-
-        return CurrentScrollPosition(position, value)
+        return CurrentScrollPosition(*parse_scroll_position(text))
 
     def __str__(self) -> str:
-        return f"{self.position}-{self.value}"
+        return format_scroll_position(self.position, self.value)
@@ -2,7 +2,8 @@ from __future__ import annotations
 from dataclasses import dataclass
 from enum import Enum, auto
 from typing import Optional
-import re
+
+from tcmenu.domain.state.value_codecs import format_list_response, parse_list_response
 
 
 @dataclass(frozen=True)
@@ -24,7 +25,7 @@ class ListResponse:
     response_type: ResponseType
 
     def __str__(self):
-        return f"{self.row}:{1 if self.response_type == ListResponse.ResponseType.INVOKE_ITEM else 0}"
+        return format_list_response(self.row, self.response_type == ListResponse.ResponseType.INVOKE_ITEM)
 
     @staticmethod
     def from_string(value) -> Optional[ListResponse]:
@@ -33,20 +34,14 @@ class ListResponse:
         :param value: the string to decode
         :return: either a ListResponse or empty.
         """
-        list_response_pattern = "^(\\d+):(\\d)$"
-
-        matcher = re.match(list_response_pattern, value)
-        if matcher:
-            row = int(matcher.group(1))
-            response_type = (
-                ListResponse.ResponseType.INVOKE_ITEM
-                if int(matcher.group(2)) == 1
-                else ListResponse.ResponseType.SELECT_ITEM
-            )
-
-            return ListResponse(row, response_type)
-
-        return None
+        parsed = parse_list_response(value)
+        if parsed is None:
+            return None
+
+        row, invoked = parsed
+        return ListResponse(
+            row, ListResponse.ResponseType.INVOKE_ITEM if invoked else ListResponse.ResponseType.SELECT_ITEM
+        )
 
 
 ListResponse.EMPTY = ListResponse(0, ListResponse.ResponseType.SELECT_ITEM)
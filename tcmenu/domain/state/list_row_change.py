@@ -0,0 +1,51 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from enum import Enum
+from typing import Optional
+
+from tcmenu.domain.state.value_codecs import format_list_row_change, parse_list_row_change
+
+
+@dataclass(frozen=True)
+class ListRowChange:
+    """
+    One incremental change to the rows of a runtime list, so that a list can be kept up to date by sending only the
+    rows that changed. Changes are applied in order and each row index refers to the list as it is after the changes
+    before it.
+    """
+
+    class Operation(Enum):
+        """The kind of change, the value is the character used on the wire."""
+
+        INSERT = "I"
+        UPDATE = "U"
+        DELETE = "D"
+
+    """The kind of change."""
+    operation: Operation
+
+    """The row that is inserted, updated or deleted."""
+    row: int
+
+    """The text of the row for inserts and updates, empty for deletes."""
+    text: str = ""
+
+    def __str__(self):
+        return format_list_row_change(self.operation.value, self.row, self.text)
+
+    @staticmethod
+    def from_string(value: str) -> Optional[ListRowChange]:
+        """
+        Deserialize a change from the string form created by __str__ if possible or return empty.
+        :param value: the string to decode.
+        :return: either a ListRowChange or empty.
+        """
+        parsed = parse_list_row_change(value)
+        if parsed is None:
+            return None
+
+        operation, row, text = parsed
+        return ListRowChange(_OPERATIONS[operation], row, text)
+
+
+_OPERATIONS: dict[str, ListRowChange.Operation] = {operation.value: operation for operation in ListRowChange.Operation}
@@ -1,5 +1,7 @@
+import dataclasses
+import hashlib
 from enum import Enum, auto
-from typing import Optional
+from typing import Callable, Iterable, Optional
 
 from tcmenu.domain.menu_items import SubMenuItem, MenuItem
 from tcmenu.domain.state.menu_state import MenuState
@@ -48,6 +50,15 @@ class MenuTree:
         """Create a basic tree that is initially empty."""
         self._sub_menu_items[MenuTree.ROOT] = []
 
+        """Listeners that are notified with the item and its new state whenever change_item stores a state."""
+        self._state_listeners: list[Callable[[MenuItem, MenuState], None]] = []
+
+        """Listeners that are notified with the item whenever an item is added, replaced, moved or removed."""
+        self._structure_listeners: list[Callable[[MenuItem], None]] = []
+
+        """The structure fingerprint, calculated when first needed after each change to the structure."""
+        self._structure_fingerprint: Optional[str] = None
+
     def add_menu_item(self, item: MenuItem, parent: SubMenuItem = ROOT):
         """
         Add a new menu item to a sub menu, for the top level menu use ROOT.
@@ -61,6 +72,31 @@ class MenuTree:
         if item.has_children():
             self._sub_menu_items[item] = []
 
+        self._notify_structure_changed(item)
+
+    def add_items_in_order(self, entries: Iterable[tuple[MenuItem, int, Optional[MenuState]]]):
+        """
+        Adds many items at once in linear time, for example when loading a persisted tree. Each entry is the item, the
+        ID of the submenu it belongs to, and optionally its state. Submenus must be added before their children, or be
+        in the tree already.
+        :param entries: the items to add, in order.
+        :raises ValueError: if the parent of an item is not a submenu in the tree.
+        """
+        sub_menus: dict[int, MenuItem] = {sub_menu.id: sub_menu for sub_menu in self._sub_menu_items}
+
+        for item, parent_id, state in entries:
+            parent = sub_menus.get(parent_id)
+            if parent is None:
+                raise ValueError(f"Parent {parent_id} of item {item.id} is not a submenu in the tree")
+
+            self._sub_menu_items[parent].append(item)
+            if item.has_children():
+                self._sub_menu_items[item] = []
+                sub_menus[item.id] = item
+            if state is not None:
+                self._menu_states[item.id] = state
+            self._notify_structure_changed(item)
+
     def add_or_update_item(self, item: MenuItem, parent_id: int):
         """
         This will either add or update an existing item, depending on the ID is already present.
@@ -69,7 +105,7 @@ class MenuTree:
         """
         sub_menu = self.get_sub_menu_by_id(parent_id)
         if sub_menu is not None:
-            if next(filter(lambda menu: menu.id == item.id, self.get_menu_items(sub_menu)), None):
+            if next(filter(lambda menu: menu.id == item.id, self.get_menu_items(sub_menu) or ()), None):
                 self.replace_menu_by_id(sub_menu=MenuItemHelper.as_sub_menu(sub_menu), to_replace=item)
             else:
                 self.add_menu_item(parent=MenuItemHelper.as_sub_menu(sub_menu), item=item)
@@ -118,7 +154,7 @@ class MenuTree:
 
         if idx is not None:
             # We found the original, so we now change that index to the new entry
-            old_item: MenuItem = self._sub_menu_items[sub_menu][idx].id
+            old_item: MenuItem = self._sub_menu_items[sub_menu][idx]
             self._sub_menu_items[sub_menu][idx] = to_replace
 
             # Now we update the "state" which also acts like a cache of menu items for lookup
@@ -133,6 +169,8 @@ class MenuTree:
                 items = self._sub_menu_items.pop(old_item)
                 self._sub_menu_items[to_replace] = items
 
+            self._notify_structure_changed(to_replace)
+
     def move_item(self, parent: SubMenuItem, new_item: MenuItem, move_type: MoveType):
         """
         Moves the item either up or down in the list for that submenu.
@@ -162,6 +200,8 @@ class MenuTree:
         else:
             items.insert(idx, new_item)
 
+        self._notify_structure_changed(new_item)
+
     def find_parent(self, to_find: MenuItem) -> Optional[SubMenuItem]:
         """
         Finds the submenu that the provided object belongs to.
@@ -193,9 +233,16 @@ class MenuTree:
                 break
 
         if item.has_children():
-            self._sub_menu_items.pop(item)
+            # Nothing below a removed submenu is in the tree any more, so neither its submenus nor the states of its
+            # items are kept, states are only ever stored for items in the tree.
+            for descendant in self.get_all_menu_items_from(MenuItemHelper.as_sub_menu(item)):
+                self._menu_states.pop(descendant.id, None)
+                if descendant.has_children():
+                    self._sub_menu_items.pop(descendant, None)
+        else:
+            self._menu_states.pop(item.id, None)
 
-        self._menu_states.pop(item.id, None)
+        self._notify_structure_changed(item)
 
     def get_all_sub_menus(self) -> set[MenuItem]:
         """
@@ -266,12 +313,77 @@ class MenuTree:
 
         # Add/update state only for items in the menu tree.
         # Note: Out of tree item with the same ID as an item inside tree
-        # is considered to be the same item.
-        if item.id not in set(map(lambda tree_item: tree_item.id, self.get_all_menu_items())):
+        # is considered to be the same item. State is only ever stored for items
+        # in the tree, so an existing state avoids walking the whole tree.
+        if item.id not in self._menu_states and not self._contains_item_id(item.id):
             return
 
         self._menu_states[item.id] = menu_state
 
+        for listener in self._state_listeners:
+            listener(item, menu_state)
+
+    def _contains_item_id(self, item_id: int) -> bool:
+        return item_id in set(map(lambda tree_item: tree_item.id, self.get_all_menu_items()))
+
+    def add_state_listener(self, listener: Callable[[MenuItem, MenuState], None]):
+        """
+        Registers a listener that is called with the item and its new state every time change_item stores a state.
+        States added in bulk by add_items_in_order are not reported.
+        :param listener: the listener to add.
+        """
+        self._state_listeners.append(listener)
+
+    def remove_state_listener(self, listener: Callable[[MenuItem, MenuState], None]):
+        """
+        Removes a listener registered with add_state_listener, does nothing if it is not registered.
+        :param listener: the listener to remove.
+        """
+        if listener in self._state_listeners:
+            self._state_listeners.remove(listener)
+
+    def add_structure_listener(self, listener: Callable[[MenuItem], None]):
+        """
+        Registers a listener that is called with the item every time an item is added, replaced, moved or removed, for
+        example to drop anything derived from the structure of the tree. Changes of state are not reported here.
+        :param listener: the listener to add.
+        """
+        self._structure_listeners.append(listener)
+
+    def remove_structure_listener(self, listener: Callable[[MenuItem], None]):
+        """
+        Removes a listener registered with add_structure_listener, does nothing if it is not registered.
+        :param listener: the listener to remove.
+        """
+        if listener in self._structure_listeners:
+            self._structure_listeners.remove(listener)
+
+    def structure_fingerprint(self) -> str:
+        """
+        Gets a hash of the structure of the tree: every item with all of its fields, the order of the items and the
+        submenu each is in. Values are not included, so two trees built from the same menu have the same fingerprint
+        whatever their state. The fingerprint is stable between runs, so it can be stored with a cached copy of the
+        tree to check later that the cache still matches.
+        :return: the fingerprint as 32 hex digits.
+        """
+        if self._structure_fingerprint is None:
+            digest = hashlib.blake2b(digest_size=16)
+            pending = [MenuTree.ROOT]
+            while pending:
+                parent = pending.pop()
+                children = self.get_menu_items(parent) or ()
+                for item in children:
+                    fields = tuple(_fingerprint_value(getattr(item, field.name)) for field in dataclasses.fields(item))
+                    digest.update(repr((parent.id, type(item).__name__, fields)).encode("utf-8"))
+                pending.extend(item for item in reversed(children) if item.has_children())
+            self._structure_fingerprint = digest.hexdigest()
+        return self._structure_fingerprint
+
+    def _notify_structure_changed(self, item: MenuItem):
+        self._structure_fingerprint = None
+        for listener in self._structure_listeners:
+            listener(item)
+
     def get_menu_state(self, item: MenuItem) -> Optional[MenuState]:
         """
         Gets the menu state that's associated with a given menu item. This is the
@@ -290,3 +402,12 @@ class MenuTree:
         for item in items:
             if self.get_menu_state(item) is None:
                 self.change_item(item, MenuItemHelper.state_for_menu_item(item, None, False, False))
+
+
+def _fingerprint_value(value):
+    # Enums are hashed by name as their repr holds the value, which for auto() depends on the order of the members.
+    if isinstance(value, Enum):
+        return f"{type(value).__name__}.{value.name}"
+    if isinstance(value, (tuple, list)):
+        return tuple(_fingerprint_value(entry) for entry in value)
+    return value
@@ -0,0 +1,143 @@
+from types import MappingProxyType
+from typing import Iterable, Mapping, Optional
+
+from tcmenu.domain.menu_items import MenuItem, SubMenuItem
+from tcmenu.domain.state.menu_state import MenuState
+from tcmenu.domain.state.menu_tree import MenuTree
+from tcmenu.domain.util.menu_item_helper import MenuItemHelper
+
+
+class MenuTreeTemplate:
+    """
+    An immutable copy of the structure of a menu tree, the items and submenus without any state, that many trees can
+    share. This suits a fleet of devices that run the same menu, where each device needs its own values but the
+    structure is the same. The template is built once along with indexes by ID and parent, and each device gets a
+    MenuTreeOverlay from `new_tree`, which holds only its own states until its structure differs from the template.
+
+    <pre>
+        template = MenuTreeTemplate(first_device_tree)
+        tree = template.new_tree()
+    </pre>
+
+    :param tree: the tree whose structure is copied, items that can not be reached from ROOT are left out.
+    """
+
+    def __init__(self, tree: MenuTree):
+        sub_menu_items: dict[MenuItem, tuple[MenuItem, ...]] = {}
+        parents: dict[int, SubMenuItem] = {}
+        all_items = tree.get_all_menu_items_from(MenuTree.ROOT)
+        for item in all_items:
+            if item.has_children():
+                children = tree.get_menu_items(item) or ()
+                sub_menu_items[item] = children
+                for child in children:
+                    parents[child.id] = MenuItemHelper.as_sub_menu(item)
+
+        """The children of each submenu, read only so that the trees sharing the template can not change it."""
+        self._sub_menu_items: Mapping[MenuItem, tuple[MenuItem, ...]] = MappingProxyType(sub_menu_items)
+
+        self._all_items: tuple[MenuItem, ...] = all_items
+        self._by_id: dict[int, MenuItem] = {item.id: item for item in all_items}
+        self._sub_menus_by_id: dict[int, SubMenuItem] = {item.id: item for item in sub_menu_items}
+        self._parents: dict[int, SubMenuItem] = parents
+
+    def __len__(self) -> int:
+        """The number of items in the template, including ROOT."""
+        return len(self._all_items)
+
+    def new_tree(self) -> "MenuTreeOverlay":
+        """
+        Creates a tree with the structure of the template and no state.
+        :return: a tree that shares the template.
+        """
+        return MenuTreeOverlay(self)
+
+    def get_menu_by_id(self, menu_id: int) -> Optional[MenuItem]:
+        return self._by_id.get(menu_id)
+
+    def find_parent(self, item: MenuItem) -> Optional[SubMenuItem]:
+        return self._parents.get(item.id)
+
+
+class MenuTreeOverlay(MenuTree):
+    """
+    A menu tree that takes its structure from a MenuTreeTemplate and holds only its own states, so that each tree costs
+    about the size of its values. Lookups of items, submenus and parents are served from the indexes of the template.
+    The first change to the structure, such as adding, moving or removing an item, gives the tree its own copy of the
+    structure, after which it behaves like any other MenuTree. Boot items that match the template exactly, as sent by
+    a device running the same menu, are not a change to the structure.
+
+    :param template: the template that the structure is taken from.
+    """
+
+    def __init__(self, template: MenuTreeTemplate):
+        super().__init__()
+        self._template = template
+        self._sub_menu_items = template._sub_menu_items
+        self._shares_template = True
+
+    @property
+    def template(self) -> MenuTreeTemplate:
+        return self._template
+
+    @property
+    def shares_template(self) -> bool:
+        """True until the structure of this tree differs from the template."""
+        return self._shares_template
+
+    def _own_structure(self):
+        if self._shares_template:
+            self._sub_menu_items = {sub_menu: list(items) for sub_menu, items in self._template._sub_menu_items.items()}
+            self._shares_template = False
+
+    def add_menu_item(self, item: MenuItem, parent: SubMenuItem = MenuTree.ROOT):
+        self._own_structure()
+        super().add_menu_item(item, parent)
+
+    def add_items_in_order(self, entries: Iterable[tuple[MenuItem, int, Optional[MenuState]]]):
+        self._own_structure()
+        super().add_items_in_order(entries)
+
+    def add_or_update_item(self, item: MenuItem, parent_id: int):
+        if self._shares_template:
+            parent = self._template._parents.get(item.id)
+            if parent is not None and parent.id == parent_id and self._template._by_id.get(item.id) == item:
+                return
+        super().add_or_update_item(item, parent_id)
+
+    def replace_menu_by_id(self, to_replace: MenuItem, sub_menu: SubMenuItem = None):
+        self._own_structure()
+        super().replace_menu_by_id(to_replace, sub_menu)
+
+    def move_item(self, parent: SubMenuItem, new_item: MenuItem, move_type: MenuTree.MoveType):
+        self._own_structure()
+        super().move_item(parent, new_item, move_type)
+
+    def remove_menu_item(self, item: MenuItem, parent: Optional[SubMenuItem] = None):
+        self._own_structure()
+        super().remove_menu_item(item, parent)
+
+    def get_sub_menu_by_id(self, parent_id: int) -> Optional[SubMenuItem]:
+        if self._shares_template:
+            return self._template._sub_menus_by_id.get(parent_id)
+        return super().get_sub_menu_by_id(parent_id)
+
+    def get_menu_by_id(self, menu_id: int) -> Optional[MenuItem]:
+        if self._shares_template:
+            return self._template._by_id.get(menu_id)
+        return super().get_menu_by_id(menu_id)
+
+    def find_parent(self, to_find: MenuItem) -> Optional[SubMenuItem]:
+        if self._shares_template:
+            return self._template._parents.get(to_find.id)
+        return super().find_parent(to_find)
+
+    def get_all_menu_items(self) -> set[MenuItem]:
+        if self._shares_template:
+            return set(self._template._all_items)
+        return super().get_all_menu_items()
+
+    def _contains_item_id(self, item_id: int) -> bool:
+        if self._shares_template:
+            return item_id in self._template._by_id
+        return super()._contains_item_id(item_id)
@@ -0,0 +1,191 @@
+from collections import deque
+from collections.abc import Sequence
+from typing import Any, Iterable, Optional, Union
+
+from tcmenu.domain.state.list_row_change import ListRowChange
+
+
+class PagedStringList(Sequence):
+    """
+    A client side cache of the rows of a large runtime list, used as the value of a StringListMenuState when the list
+    is transferred in pages. The total number of rows is always known, but only the rows that have been fetched are
+    held, other rows read as None. A view asks for the rows it is about to show with `rows_to_fetch`, and only requests
+    the ranges that are neither cached nor already requested.
+
+    <pre>
+        for start, count in cache.rows_to_fetch(first_visible, visible_rows):
+            connector.send(CommandFactory.new_list_fetch_command(correlation, item, start, count))
+    </pre>
+
+    Every insert, delete or invalidation moves the rows, so it starts a new generation. Each range returned by
+    `rows_to_fetch` is remembered with the generation it was requested in, and a page that answers a range from an
+    earlier generation is dropped rather than written at row indices that are no longer valid. Its rows are then
+    fetched again when next needed.
+
+    :param total_rows: (optional) The number of rows in the list, none of them fetched yet.
+    """
+
+    """The most requests that are remembered while waiting for their page, older ones are forgotten."""
+    MAX_OUTSTANDING_REQUESTS = 256
+
+    def __init__(self, total_rows: int = 0):
+        self._rows: list[Optional[str]] = [None] * total_rows
+        self._pending: set[int] = set()
+        self._generation = 0
+        self._requests: deque[tuple[int, int, int]] = deque(maxlen=PagedStringList.MAX_OUTSTANDING_REQUESTS)
+
+    @staticmethod
+    def from_rows(rows: Iterable[str]) -> "PagedStringList":
+        """
+        Creates a cache holding every row of a list, for example the rows sent with the boot item.
+        :param rows: all the rows of the list.
+        :return: a fully loaded cache.
+        """
+        cache = PagedStringList()
+        cache._rows = list(rows)
+        return cache
+
+    @staticmethod
+    def loaded_values_of(value: Any) -> Any:
+        """
+        Gives a list value in a form that can be written out, a cache becomes a plain list of the rows that are
+        loaded, in order, and any other value is returned unchanged. Used wherever the value of a list is saved or
+        sent on, so that rows not yet fetched are never written as None.
+        :param value: the value of a menu state.
+        :return: the value to write.
+        """
+        if isinstance(value, PagedStringList):
+            return [row for row in value._rows if row is not None]
+        return value
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Optional[str], list[Optional[str]]]:
+        return self._rows[index]
+
+    def __repr__(self) -> str:
+        return f"PagedStringList(total_rows={len(self._rows)}, loaded={self.loaded_rows})"
+
+    @property
+    def loaded_rows(self) -> int:
+        """The number of rows that are held in the cache."""
+        return len(self._rows) - self._rows.count(None)
+
+    @property
+    def generation(self) -> int:
+        """Incremented each time rows are inserted, deleted or invalidated."""
+        return self._generation
+
+    def is_loaded(self, row: int) -> bool:
+        return 0 <= row < len(self._rows) and self._rows[row] is not None
+
+    def rows_to_fetch(self, start: int, count: int, max_rows: Optional[int] = None) -> list[tuple[int, int]]:
+        """
+        Works out which rows of a window need fetching, and marks them as requested so that asking again before they
+        arrive does not request them twice.
+        :param start: the first row of the window, for example the first visible row.
+        :param count: the number of rows in the window, it is limited to the end of the list.
+        :param max_rows: (optional) The largest range to request at once, longer ranges are split.
+        :return: a list of (start, count) ranges to fetch, empty when the whole window is cached.
+        """
+        ranges: list[tuple[int, int]] = []
+        end = min(start + count, len(self._rows))
+        row = max(start, 0)
+        while row < end:
+            if self._rows[row] is not None or row in self._pending:
+                row += 1
+                continue
+            range_start = row
+            while (
+                row < end
+                and self._rows[row] is None
+                and row not in self._pending
+                and (max_rows is None or row - range_start < max_rows)
+            ):
+                self._pending.add(row)
+                row += 1
+            ranges.append((range_start, row - range_start))
+            self._requests.append((range_start, row, self._generation))
+        return ranges
+
+    def apply_rows(self, start: int, rows: Sequence[str], total_rows: int) -> bool:
+        """
+        Stores a page of rows received from the remote, resizing the cache if the list has grown or shrunk. A page that
+        answers a request made before the last insert, delete or invalidation is dropped, as its rows may have moved.
+        Pages arrive in the order they were requested, so the page answers the oldest request that covers its start.
+        :param start: the index of the first row in the page.
+        :param rows: the rows of the page.
+        :param total_rows: the number of rows in the list when the page was sent.
+        :return: True if the rows were stored, False if the page was out of date and dropped.
+        """
+        for request in self._requests:
+            if request[0] <= start < request[1]:
+                self._requests.remove(request)
+                if request[2] != self._generation:
+                    return False
+                break
+
+        self._resize(total_rows)
+        for index, text in enumerate(rows, start):
+            if index >= total_rows:
+                break
+            self._rows[index] = text
+            self._pending.discard(index)
+        return True
+
+    def apply_changes(self, changes: Iterable[ListRowChange], total_rows: Optional[int] = None) -> bool:
+        """
+        Applies incremental changes in order. Inserted and updated rows become cached, other rows keep their cached
+        value and move with any inserts and deletes before them. If a change does not fit the cached list, or the
+        size afterwards does not match total_rows, the cache no longer matches the remote and is cleared so that the
+        visible rows are fetched again.
+        :param changes: the changes in the order they were made.
+        :param total_rows: (optional) The number of rows in the list after the changes, used as a consistency check.
+        :return: True if the changes were applied, False if the cache was cleared instead.
+        """
+        rows = self._rows
+        try:
+            for change in changes:
+                if change.operation == ListRowChange.Operation.UPDATE:
+                    if not 0 <= change.row < len(rows):
+                        raise IndexError(change.row)
+                    rows[change.row] = change.text
+                elif change.operation == ListRowChange.Operation.INSERT:
+                    if not 0 <= change.row <= len(rows):
+                        raise IndexError(change.row)
+                    rows.insert(change.row, change.text)
+                    self._moved()
+                else:
+                    if not 0 <= change.row < len(rows):
+                        raise IndexError(change.row)
+                    del rows[change.row]
+                    self._moved()
+        except IndexError:
+            self.invalidate(total_rows)
+            return False
+
+        if total_rows is not None and total_rows != len(rows):
+            self.invalidate(total_rows)
+            return False
+        return True
+
+    def invalidate(self, total_rows: Optional[int] = None) -> None:
+        """
+        Drops every cached row, so that rows are fetched again when next needed.
+        :param total_rows: (optional) The new number of rows, by default the size is kept.
+        """
+        self._rows = [None] * (len(self._rows) if total_rows is None else total_rows)
+        self._moved()
+
+    def _moved(self) -> None:
+        self._pending.clear()
+        self._generation += 1
+
+    def _resize(self, total_rows: int) -> None:
+        rows = self._rows
+        if total_rows < len(rows):
+            del rows[total_rows:]
+            self._pending = {row for row in self._pending if row < total_rows}
+        elif total_rows > len(rows):
+            rows.extend([None] * (total_rows - len(rows)))
@@ -0,0 +1,132 @@
+"""
+Parsers and formatters for the text form of composite menu values, as sent in change and boot messages: list
+responses, scroll positions, colors and list row changes. They work on plain values so that the value classes can use
+them without an import cycle, for example `PortableColor.from_html` is `PortableColor(*parse_html_color(text))`.
+
+The common, well formed cases are handled with precompiled patterns and lookup tables. Anything else falls back to
+the original parsing, so the results for unusual input, and the fallback values for invalid input, are unchanged.
+"""
+
+import re
+from typing import Optional
+
+_LIST_RESPONSE = re.compile(r"^(\d+):(\d)$")
+
+"""The value of every two digit hex string in upper, lower and mixed case."""
+_HEX_PAIRS: dict[str, int] = {
+    high + low: value
+    for value in range(256)
+    for high in {f"{value >> 4:X}", f"{value >> 4:x}"}
+    for low in {f"{value & 15:X}", f"{value & 15:x}"}
+}
+
+"""The value of every hex digit in upper and lower case."""
+_HEX_DIGITS: dict[str, int] = {digit: int(digit, 16) for digit in "0123456789abcdefABCDEF"}
+
+"""The two digit upper case hex form of every byte value."""
+_HEX_BYTES: dict[int, str] = {value: f"{value:02X}" for value in range(256)}
+
+_ROW_CHANGE_OPERATIONS = frozenset("IUD")
+
+
+def parse_list_response(text: str) -> Optional[tuple[int, bool]]:
+    """
+    Parses a list response in the form row:type, where a type of 1 is an invoke and anything else a select.
+    :param text: the text to parse.
+    :return: the row and True if the row was invoked, or None if the text is not a list response.
+    """
+    matcher = _LIST_RESPONSE.match(text)
+    if matcher is None:
+        return None
+    row, response_type = matcher.groups()
+    return int(row), response_type == "1" or (not response_type.isascii() and int(response_type) == 1)
+
+
+def format_list_response(row: int, invoked: bool) -> str:
+    return f"{row}:{1 if invoked else 0}"
+
+
+def parse_scroll_position(text: str) -> tuple[int, str]:
+    """
+    Parses a scroll position in the form position-value, EG 1-Pizza. Without a separator the position is 0 and the
+    value "Unknown", and a position that is not a number is 0.
+    :param text: the text to parse.
+    :return: the position and value.
+    """
+    position, separator, value = text.partition("-")
+    if not separator:
+        return 0, "Unknown"
+    try:
+        return int(position), value
+    except ValueError:
+        return 0, value
+
+
+def format_scroll_position(position: int, value: str) -> str:
+    return f"{position}-{value}"
+
+
+def parse_html_color(text: str) -> tuple[int, int, int, int]:
+    """
+    Parses a web color code, #RGB, #RRGGBB or #RRGGBBAA, where the alpha is 255 unless given. Anything that is not a
+    color code is black.
+    :param text: the color code.
+    :return: the red, green, blue and alpha values.
+    """
+    length = len(text)
+    if length and text[0] == "#":
+        try:
+            if length == 9:
+                pairs = _HEX_PAIRS
+                return pairs[text[1:3]], pairs[text[3:5]], pairs[text[5:7]], pairs[text[7:9]]
+            elif length == 7:
+                pairs = _HEX_PAIRS
+                return pairs[text[1:3]], pairs[text[3:5]], pairs[text[5:7]], 255
+            elif length == 4:
+                digits = _HEX_DIGITS
+                return digits[text[1]] << 4, digits[text[2]] << 4, digits[text[3]] << 4, 255
+        except KeyError:
+            pass
+    return _parse_html_color_slowly(text)
+
+
+def _parse_html_color_slowly(text: str) -> tuple[int, int, int, int]:
+    if text[0] == "#" and len(text) == 4:
+        return int(text[1], 16) << 4, int(text[2], 16) << 4, int(text[3], 16) << 4, 255
+    elif text[0] == "#" and len(text) >= 7:
+        alpha = int(text[7:9], 16) if len(text) == 9 else 255
+        return int(text[1:3], 16), int(text[3:5], 16), int(text[5:7], 16), alpha
+    return 0, 0, 0, 255
+
+
+def format_html_color(red: int, green: int, blue: int, alpha: int) -> str:
+    """
+    Formats a color as #RRGGBBAA in upper case.
+    :return: the color code.
+    """
+    hex_bytes = _HEX_BYTES
+    try:
+        return "#" + hex_bytes[red] + hex_bytes[green] + hex_bytes[blue] + hex_bytes[alpha]
+    except KeyError:
+        return f"#{red:02X}{green:02X}{blue:02X}{alpha:02X}"
+
+
+def parse_list_row_change(text: str) -> Optional[tuple[str, int, str]]:
+    """
+    Parses a list row change in the form Orow:text, where O is the operation character, deletes have no text.
+    :param text: the text to parse.
+    :return: the operation character, row and text, or None if the text is not a row change.
+    """
+    if len(text) < 2 or text[0] not in _ROW_CHANGE_OPERATIONS:
+        return None
+
+    row, _, row_text = text[1:].partition(":")
+    if not row.isdigit():
+        return None
+    return text[0], int(row), row_text
+
+
+def format_list_row_change(operation: str, row: int, text: str) -> str:
+    if operation == "D":
+        return f"{operation}{row}"
+    return f"{operation}{row}:{text}"
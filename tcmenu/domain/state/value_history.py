@@ -0,0 +1,318 @@
+import bisect
+import csv
+import logging
+import math
+import time
+from array import array
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional, TextIO, Union
+
+from tcmenu.domain.menu_items import MenuItem
+from tcmenu.domain.state.menu_state import MenuState
+from tcmenu.domain.state.menu_tree import MenuTree
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is an optional dependency
+    np = None
+
+StorageType = MenuState.StateStorageType
+
+"""
+The array type code used to hold the values of each numeric storage type, other storage types are not recorded. Large
+numbers are held as doubles, so very large or precise values lose precision in the history.
+"""
+VALUE_TYPE_CODES: dict[StorageType, str] = {
+    StorageType.INTEGER: "q",
+    StorageType.FLOAT: "d",
+    StorageType.BIG_DECIMAL: "d",
+    StorageType.BOOLEAN: "B",
+}
+
+Number = Union[int, float]
+
+
+@dataclass(frozen=True)
+class HistoryBucket:
+    """The values of one item that fall within a bucket of time, as reported by `ValueRingBuffer.downsample`."""
+
+    """The time the bucket starts, a whole number of bucket widths since the epoch."""
+    start: float
+
+    count: int
+    minimum: Number
+    maximum: Number
+    mean: float
+
+
+class ValueRingBuffer:
+    """
+    A fixed size history of the values of one item, held as two typed arrays of timestamps and values that are
+    allocated up front. Once full, each new value replaces the oldest one, so memory never grows. Timestamps are
+    expected to be in order, which allows range queries to bisect rather than scan.
+
+    :param capacity: the number of values kept.
+    :param type_code: the array type code of the values, see VALUE_TYPE_CODES.
+    """
+
+    def __init__(self, capacity: int, type_code: str):
+        if capacity < 1:
+            raise ValueError("Capacity must be at least one")
+        self._capacity = capacity
+        self._timestamps = array("d", bytes(8 * capacity))
+        self._values = array(type_code, bytes(array(type_code).itemsize * capacity))
+
+        """The index the next value is written to, and the number of values held."""
+        self._next = 0
+        self._size = 0
+
+        """The number of values that were replaced once the buffer was full."""
+        self.overwritten = 0
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def type_code(self) -> str:
+        return self._values.typecode
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, timestamp: float, value: Number) -> None:
+        """
+        Adds a value, replacing the oldest one when the buffer is full.
+        :param timestamp: the time of the value in seconds.
+        :param value: the value.
+        """
+        index = self._next
+        self._timestamps[index] = timestamp
+        self._values[index] = value
+        self._next = (index + 1) % self._capacity
+        if self._size < self._capacity:
+            self._size += 1
+        else:
+            self.overwritten += 1
+
+    def between(self, start: Optional[float] = None, end: Optional[float] = None) -> tuple[array, array]:
+        """
+        Gets the values within a range of time, oldest first.
+        :param start: (optional) The earliest timestamp included, by default the oldest value.
+        :param end: (optional) The timestamp that ends the range, it is not included, by default the newest value.
+        :return: the timestamps and values as arrays of equal length.
+        """
+        first, last = self._bounds(start, end)
+        return self._slice(self._timestamps, first, last), self._slice(self._values, first, last)
+
+    def latest(self) -> Optional[tuple[float, Number]]:
+        """The newest timestamp and value, or None when the buffer is empty."""
+        if self._size == 0:
+            return None
+        index = (self._next - 1) % self._capacity
+        return self._timestamps[index], self._values[index]
+
+    def downsample(
+        self, bucket_seconds: float, start: Optional[float] = None, end: Optional[float] = None
+    ) -> list[HistoryBucket]:
+        """
+        Reduces the values within a range of time to the minimum, maximum and mean of each bucket of time, for example
+        to draw a long trend. Buckets without values are left out.
+        :param bucket_seconds: the width of each bucket.
+        :param start: (optional) The earliest timestamp included.
+        :param end: (optional) The timestamp that ends the range, it is not included.
+        :return: the buckets in time order.
+        """
+        if bucket_seconds <= 0:
+            raise ValueError("Buckets must be longer than zero seconds")
+
+        timestamps, values = self.between(start, end)
+        buckets: list[HistoryBucket] = []
+        bucket = None
+        count = total = 0
+        minimum = maximum = 0
+        for timestamp, value in zip(timestamps, values):
+            this_bucket = math.floor(timestamp / bucket_seconds)
+            if this_bucket != bucket:
+                if count:
+                    buckets.append(HistoryBucket(bucket * bucket_seconds, count, minimum, maximum, total / count))
+                bucket = this_bucket
+                count = total = 0
+                minimum = maximum = value
+            count += 1
+            total += value
+            if value < minimum:
+                minimum = value
+            elif value > maximum:
+                maximum = value
+
+        if count:
+            buckets.append(HistoryBucket(bucket * bucket_seconds, count, minimum, maximum, total / count))
+        return buckets
+
+    def to_numpy(self, start: Optional[float] = None, end: Optional[float] = None) -> tuple["np.ndarray", "np.ndarray"]:
+        """
+        Gets the values within a range of time as NumPy arrays, NumPy is an optional dependency, available as the
+        numpy extra.
+        :param start: (optional) The earliest timestamp included.
+        :param end: (optional) The timestamp that ends the range, it is not included.
+        :return: the timestamps as float64 and the values in the type they are held.
+        :raises ImportError: if NumPy is not installed.
+        """
+        if np is None:
+            raise ImportError("NumPy is required for to_numpy, install tcmenu-python[numpy]")
+        timestamps, values = self.between(start, end)
+        return np.frombuffer(timestamps, dtype=np.float64), np.frombuffer(values, dtype=values.typecode)
+
+    def _bounds(self, start: Optional[float], end: Optional[float]) -> tuple[int, int]:
+        # Logical positions, where 0 is the oldest value held.
+        view = _ChronologicalView(self._timestamps, (self._next - self._size) % self._capacity, self._size)
+        first = 0 if start is None else bisect.bisect_left(view, start)
+        last = self._size if end is None else bisect.bisect_left(view, end)
+        return first, max(first, last)
+
+    def _slice(self, source: array, first: int, last: int) -> array:
+        oldest = (self._next - self._size) % self._capacity
+        begin = oldest + first
+        finish = oldest + last
+        if finish <= self._capacity:
+            return source[begin:finish]
+        if begin >= self._capacity:
+            return source[begin - self._capacity : finish - self._capacity]
+        return source[begin:] + source[: finish - self._capacity]
+
+
+class _ChronologicalView:
+    """The timestamps of a ring buffer oldest first, without copying them, so that they can be bisected."""
+
+    def __init__(self, timestamps: array, oldest: int, size: int):
+        self._timestamps = timestamps
+        self._oldest = oldest
+        self._capacity = len(timestamps)
+        self._size = size
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index: int) -> float:
+        return self._timestamps[(self._oldest + index) % self._capacity]
+
+
+class ValueHistoryRecorder:
+    """
+    Records the history of numeric values in a menu tree, such as analog, float, enum and boolean items, so that they
+    can be trended. Once attached to a tree, every state stored by `MenuTree.change_item` is appended to a
+    ValueRingBuffer for its item, which is created on the first value. The memory held for each item is fixed by the
+    capacity. Items with other kinds of value, such as text or lists, are not recorded.
+
+    <pre>
+        recorder = ValueHistoryRecorder(capacity=3600)
+        recorder.attach(tree)
+        buckets = recorder.history(volume.id).downsample(60)
+    </pre>
+
+    :param capacity: (optional) The number of values kept for each item.
+    :param item_ids: (optional) Only these items are recorded, by default every numeric item.
+    :param clock: (optional) The time of each value in seconds since the epoch, mainly for testing.
+    """
+
+    logger = logging.getLogger("ValueHistoryRecorder")
+
+    def __init__(
+        self,
+        capacity: int = 1024,
+        item_ids: Optional[Iterable[int]] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        if capacity < 1:
+            raise ValueError("Capacity must be at least one")
+        self._capacity = capacity
+        self._item_ids: Optional[frozenset[int]] = frozenset(item_ids) if item_ids is not None else None
+        self._clock = clock
+        self._tree: Optional[MenuTree] = None
+        self._histories: dict[int, ValueRingBuffer] = {}
+
+    @property
+    def tree(self) -> Optional[MenuTree]:
+        return self._tree
+
+    @property
+    def item_ids(self) -> tuple[int, ...]:
+        """The IDs of the items that have a history, in the order they were first recorded."""
+        return tuple(self._histories)
+
+    def attach(self, tree: MenuTree) -> None:
+        """
+        Starts recording the state changes of the tree, any history already held is kept.
+        :param tree: the tree to record.
+        """
+        self.detach()
+        self._tree = tree
+        tree.add_state_listener(self.record)
+
+    def detach(self) -> None:
+        """Stops recording, the history held is kept."""
+        if self._tree is not None:
+            self._tree.remove_state_listener(self.record)
+            self._tree = None
+
+    close = detach
+
+    def record(self, item: MenuItem, state: MenuState, timestamp: Optional[float] = None) -> None:
+        """
+        Appends a value to the history of the item, this is the listener registered on the attached tree.
+        :param item: the item that changed.
+        :param state: its new state.
+        :param timestamp: (optional) The time of the value, by default now.
+        """
+        history = self._histories.get(item.id)
+        if history is None:
+            type_code = VALUE_TYPE_CODES.get(state.storage_type)
+            if type_code is None or (self._item_ids is not None and item.id not in self._item_ids):
+                return
+            history = self._histories[item.id] = ValueRingBuffer(self._capacity, type_code)
+
+        try:
+            history.append(self._clock() if timestamp is None else timestamp, state.value)
+        except (TypeError, OverflowError) as e:
+            self.logger.debug(f"Value {state.value!r} of item {item.id} can not be recorded: {e}")
+
+    def history(self, item_id: int) -> Optional[ValueRingBuffer]:
+        """
+        Gets the history of an item.
+        :param item_id: the item ID.
+        :return: the history, or None if no value of the item has been recorded.
+        """
+        return self._histories.get(item_id)
+
+    def clear(self) -> None:
+        """Drops all history."""
+        self._histories.clear()
+
+    def to_csv(
+        self,
+        file: TextIO,
+        item_ids: Optional[Iterable[int]] = None,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+    ) -> int:
+        """
+        Writes the history as CSV rows of timestamp, item ID and value, with a header row. The rows of each item are
+        written oldest first, one item after another.
+        :param file: a text file opened with newline="".
+        :param item_ids: (optional) The items to export, by default every item with a history.
+        :param start: (optional) The earliest timestamp included.
+        :param end: (optional) The timestamp that ends the range, it is not included.
+        :return: the number of values written.
+        """
+        writer = csv.writer(file)
+        writer.writerow(("timestamp", "item_id", "value"))
+        rows = 0
+        for item_id in self.item_ids if item_ids is None else item_ids:
+            history = self._histories.get(item_id)
+            if history is None:
+                continue
+            timestamps, values = history.between(start, end)
+            writer.writerows((timestamp, item_id, value) for timestamp, value in zip(timestamps, values))
+            rows += len(timestamps)
+        return rows
@@ -0,0 +1,11 @@
+from tcmenu._lazy import lazy_submodules
+
+__getattr__, __dir__ = lazy_submodules(
+    __name__,
+    (
+        "analog_batch",
+        "menu_item_formatter",
+        "menu_item_helper",
+        "menu_item_interner",
+    ),
+)
@@ -0,0 +1,120 @@
+from typing import Sequence, Union
+
+from tcmenu.domain.menu_items import AnalogMenuItem
+from tcmenu.domain.util.menu_item_formatter import MenuItemFormatter
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is an optional dependency
+    np = None
+
+
+class AnalogBatchScaler:
+    """
+    Converts large batches of raw analog values to and from display values using NumPy, for data export and trend
+    plotting where converting value by value with MenuItemFormatter is too slow. NumPy is an optional dependency,
+    available as the numpy extra.
+
+    The item metadata is converted to arrays once. Raw values are arrays whose last axis matches the items, so a
+    scaler for one item accepts any shape of samples, and a scaler for many items accepts a (samples, items) table
+    with one column per item.
+
+    <pre>
+        scaler = AnalogBatchScaler([volume, balance])
+        display = scaler.to_display(raw_table)
+        text = scaler.format(raw_table)
+    </pre>
+
+    :param items: one analog item or a sequence of them.
+    :raises ImportError: if NumPy is not installed.
+    """
+
+    def __init__(self, items: Union[AnalogMenuItem, Sequence[AnalogMenuItem]]):
+        if np is None:
+            raise ImportError("NumPy is required for AnalogBatchScaler, install tcmenu-python[numpy]")
+
+        self._single = isinstance(items, AnalogMenuItem)
+        self._items: tuple[AnalogMenuItem, ...] = (items,) if self._single else tuple(items)
+        if not all(isinstance(item, AnalogMenuItem) for item in self._items):
+            raise ValueError("Only analog items can be scaled")
+
+        divisors = [item.divisor for item in self._items]
+        self._offsets = np.array([item.offset for item in self._items], dtype=np.int64)
+        self._max_values = np.array([item.max_value for item in self._items], dtype=np.int64)
+        # The formatter does not divide at all below a divisor of 2.
+        self._divisors = np.array([divisor if divisor >= 2 else 1 for divisor in divisors], dtype=np.int64)
+        self._fraction_scales = np.array(
+            [
+                MenuItemFormatter.get_actual_decimal_divisor(divisor) / divisor if divisor >= 2 else 0.0
+                for divisor in divisors
+            ]
+        )
+        self._fraction_digits = [
+            MenuItemFormatter.calculate_required_digits(divisor) if divisor >= 2 else 0 for divisor in divisors
+        ]
+
+    @property
+    def items(self) -> tuple[AnalogMenuItem, ...]:
+        return self._items
+
+    def to_display(self, raw_values) -> "np.ndarray":
+        """
+        Scales raw values to display values, (raw + offset) / divisor.
+        :param raw_values: an array like of raw integer values, the last axis matching the items.
+        :return: a float64 array of the same shape.
+        """
+        raw = self._as_raw(raw_values)
+        return (raw + self._metadata(self._offsets)) / self._metadata(self._divisors)
+
+    def to_raw(self, display_values, clamp: bool = True) -> "np.ndarray":
+        """
+        Converts display values back to raw wire values, the reverse of to_display, for bulk absolute changes.
+        :param display_values: an array like of display values, the last axis matching the items.
+        :param clamp: optional; when True the raw values are limited to the range 0..max_value of each item.
+        :return: an int64 array of the same shape.
+        """
+        display = np.asarray(display_values, dtype=np.float64)
+        raw = np.rint(display * self._metadata(self._divisors)).astype(np.int64) - self._metadata(self._offsets)
+        if clamp:
+            raw = np.clip(raw, 0, self._metadata(self._max_values))
+        return raw
+
+    def format(self, raw_values, include_unit: bool = True) -> "np.ndarray":
+        """
+        Formats raw values for display, giving the same text as MenuItemFormatter.format_for_display.
+        :param raw_values: an array like of raw integer values, the last axis matching the items.
+        :param include_unit: optional; when False the unit name is left off.
+        :return: an array of strings of the same shape.
+        """
+        raw = self._as_raw(raw_values)
+        if self._single:
+            return self._format_column(0, raw, include_unit)
+
+        result = np.empty(raw.shape, dtype=object)
+        for index in range(len(self._items)):
+            result[..., index] = self._format_column(index, raw[..., index], include_unit)
+        return result.astype(str)
+
+    def _format_column(self, index: int, raw: "np.ndarray", include_unit: bool) -> "np.ndarray":
+        calc_val = raw + self._offsets[index]
+        unit = self._items[index].unit_name if include_unit else ""
+        divisor = self._divisors[index]
+        if divisor < 2:
+            return np.char.add(calc_val.astype(str), unit)
+
+        # Matches the formatter: the whole part truncates towards zero, the fraction uses a floored modulus.
+        whole = np.trunc(calc_val / divisor).astype(np.int64)
+        fraction = np.floor(np.abs(np.mod(calc_val, divisor)) * self._fraction_scales[index]).astype(np.int64)
+        text = np.char.add(
+            np.char.add(whole.astype(str), "."), np.char.zfill(fraction.astype(str), self._fraction_digits[index])
+        )
+        return np.char.add(text, unit)
+
+    def _as_raw(self, raw_values) -> "np.ndarray":
+        raw = np.asarray(raw_values, dtype=np.int64)
+        if not self._single and (raw.ndim == 0 or raw.shape[-1] != len(self._items)):
+            raise ValueError(f"The last axis must have one entry per item, expected {len(self._items)}")
+        return raw
+
+    def _metadata(self, values: "np.ndarray"):
+        return values[0] if self._single else values
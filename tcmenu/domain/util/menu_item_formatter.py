@@ -1,4 +1,6 @@
-from typing import Any, Optional
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Sequence
 import re
 
 from tcmenu.domain.edit_item_type import EditItemType
@@ -96,7 +98,12 @@ class MenuItemFormatter:
         return text
 
     @staticmethod
-    def _get_actual_decimal_divisor(divisor: int) -> int:
+    def get_actual_decimal_divisor(divisor: int) -> int:
+        """
+        Gets the power of ten that the fraction of an analog value is shown in, EG a divisor of 4 shows tenths.
+        :param divisor: the divisor of the analog item.
+        :return: 1 when the divisor is below 2 and no fraction is shown, otherwise 10, 100, 1000 or 10000.
+        """
         if divisor < 2:
             return 1
         elif divisor > 1000:
@@ -108,81 +115,112 @@ class MenuItemFormatter:
         else:
             return 10
 
+    """Maximum number of compiled display formatters held by the LRU cache."""
+    DISPLAY_CACHE_SIZE: int = 4096
+
     @staticmethod
     def format_for_display(item: Optional[MenuItem] = None, data: Optional[Any] = None) -> str:
         if item is None or data is None:
             return ""
-        elif isinstance(item, FloatMenuItem):
-            return MenuItemFormatter._format_float_for_display(item, data)
-        elif isinstance(item, AnalogMenuItem):
-            return MenuItemFormatter._format_analog_for_display(item, data)
-        elif isinstance(item, BooleanMenuItem):
-            return MenuItemFormatter._format_bool_for_display(item, data)
-        elif isinstance(item, EnumMenuItem):
-            return MenuItemFormatter._format_enum_for_display(item, data)
-        elif isinstance(item, EditableLargeNumberMenuItem):
-            return MenuItemFormatter._format_large_num_for_display(data)
-        elif isinstance(item, EditableTextMenuItem):
-            return MenuItemFormatter._format_text_for_display(data)
-        elif isinstance(item, Rgb32MenuItem):
-            return MenuItemFormatter._format_rgb_item_for_display(data)
-        elif isinstance(item, ScrollChoiceMenuItem):
-            return MenuItemFormatter._format_scroll_item_for_display(data)
-        else:
-            return ""
+        return _display_formatter_for(item)(data)
 
     @staticmethod
-    def _format_scroll_item_for_display(data: CurrentScrollPosition) -> str:
-        return data.value
+    def format_many(items: Sequence[MenuItem], values: Sequence[Any]) -> list[str]:
+        """
+        Formats many values for display at once, for example every item in a submenu.
+        :param items: the items.
+        :param values: the value for each item, in the same order.
+        :return: the display text for each item.
+        """
+        if len(items) != len(values):
+            raise ValueError("There must be exactly one value for each item")
 
-    @staticmethod
-    def _format_rgb_item_for_display(data: PortableColor) -> str:
-        return str(data)
+        return [
+            "" if item is None or value is None else _display_formatter_for(item)(value)
+            for item, value in zip(items, values)
+        ]
 
     @staticmethod
-    def _format_text_for_display(data: str) -> str:
-        return data
+    def display_formatter(item: MenuItem) -> Callable[[Any], str]:
+        """
+        Gets the compiled display formatter for an item, useful when the same item is formatted repeatedly. Formatters
+        are built once from the immutable item fields and kept in a bounded LRU cache.
+        :param item: the item.
+        :return: a function that formats a value of the item for display.
+        """
+        return _display_formatter_for(item)
 
     @staticmethod
-    def _format_large_num_for_display(data: int) -> str:
-        return str(data)
+    def clear_display_cache():
+        """
+        Discards every cached display formatter.
+        """
+        with _display_formatters_lock:
+            _display_formatters.clear()
 
     @staticmethod
-    def _format_enum_for_display(item: EnumMenuItem, data: int) -> str:
-        if len(item.enum_entries) > data:
-            return item.enum_entries[data]
-
-        return ""
+    def _compile_display_formatter(item: MenuItem) -> Callable[[Any], str]:
+        if isinstance(item, FloatMenuItem):
+            spec = f".{item.num_decimal_places}f"
+            return lambda data: format(data, spec)
+        elif isinstance(item, AnalogMenuItem):
+            return MenuItemFormatter._compile_analog_formatter(item)
+        elif isinstance(item, BooleanMenuItem):
+            return MenuItemFormatter._compile_bool_formatter(item)
+        elif isinstance(item, EnumMenuItem):
+            entries = item.enum_entries
+            return lambda data: entries[data] if len(entries) > data else ""
+        elif isinstance(item, EditableLargeNumberMenuItem):
+            return str
+        elif isinstance(item, EditableTextMenuItem):
+            return lambda data: data
+        elif isinstance(item, Rgb32MenuItem):
+            return str
+        elif isinstance(item, ScrollChoiceMenuItem):
+            return lambda data: data.value
+        else:
+            return lambda data: ""
 
     @staticmethod
-    def _format_bool_for_display(item: BooleanMenuItem, data: bool) -> str:
+    def _compile_bool_formatter(item: BooleanMenuItem) -> Callable[[bool], Optional[str]]:
         if item.naming == BooleanMenuItem.BooleanNaming.ON_OFF:
-            return "On" if data else "Off"
+            false_text, true_text = "Off", "On"
         elif item.naming == BooleanMenuItem.BooleanNaming.YES_NO:
-            return "Yes" if data else "No"
+            false_text, true_text = "No", "Yes"
         elif item.naming == BooleanMenuItem.BooleanNaming.TRUE_FALSE:
-            return "True" if data else "False"
+            false_text, true_text = "False", "True"
+        else:
+            return lambda data: None
+
+        return lambda data: true_text if data else false_text
 
     @staticmethod
-    def _format_analog_for_display(item: AnalogMenuItem, data: int) -> str:
-        calc_val: int = data + item.offset
+    def _compile_analog_formatter(item: AnalogMenuItem) -> Callable[[int], str]:
+        offset: int = item.offset
         divisor: int = item.divisor
+        unit_name: str = item.unit_name
 
         if divisor < 2:
-            return f"{calc_val}{item.unit_name}"
-        else:
-            whole: int = int(calc_val / divisor)
-            fract_max: int = MenuItemFormatter._get_actual_decimal_divisor(item.divisor)
-            fraction: int = int(abs(calc_val % divisor) * (fract_max / divisor))
+            return lambda data: f"{data + offset}{unit_name}"
 
-            return f"{whole}.{fraction:0{MenuItemFormatter._calculate_required_digits(divisor)}}{item.unit_name}"
+        fraction_scale: float = MenuItemFormatter.get_actual_decimal_divisor(divisor) / divisor
+        fraction_spec: str = f"0{MenuItemFormatter.calculate_required_digits(divisor)}"
 
-    @staticmethod
-    def _format_float_for_display(item: FloatMenuItem, data: float) -> str:
-        return f"{data:.{item.num_decimal_places}f}"
+        def format_analog(data: int) -> str:
+            calc_val: int = data + offset
+            whole: int = int(calc_val / divisor)
+            fraction: int = int(abs(calc_val % divisor) * fraction_scale)
+            return f"{whole}.{format(fraction, fraction_spec)}{unit_name}"
+
+        return format_analog
 
     @staticmethod
-    def _calculate_required_digits(divisor: int) -> int:
+    def calculate_required_digits(divisor: int) -> int:
+        """
+        Gets the number of fraction digits shown for an analog value, matching get_actual_decimal_divisor.
+        :param divisor: the divisor of the analog item, at least 2.
+        :return: the number of digits, from 1 to 4.
+        """
         if divisor <= 10:
             return 1
         elif divisor <= 100:
@@ -191,3 +229,28 @@ class MenuItemFormatter:
             return 3
         else:
             return 4
+
+
+# A bounded LRU cache of compiled display formatters. Entries are keyed on the identity of the item rather than its
+# value, as hashing a menu item dataclass hashes every field and costs as much as the formatting it saves. The item is
+# held by the entry, so its identity can not be reused while it is cached.
+_display_formatters: OrderedDict[int, tuple[MenuItem, Callable[[Any], str]]] = OrderedDict()
+_display_formatters_lock = threading.Lock()
+
+
+def _display_formatter_for(item: MenuItem) -> Callable[[Any], str]:
+    key = id(item)
+    entry = _display_formatters.get(key)
+    if entry is not None and entry[0] is item:
+        try:
+            _display_formatters.move_to_end(key)
+        except KeyError:
+            pass  # evicted by another thread, the formatter is still valid
+        return entry[1]
+
+    formatter = MenuItemFormatter._compile_display_formatter(item)
+    with _display_formatters_lock:
+        _display_formatters[key] = (item, formatter)
+        if len(_display_formatters) > MenuItemFormatter.DISPLAY_CACHE_SIZE:
+            _display_formatters.popitem(last=False)
+    return formatter
@@ -1,5 +1,8 @@
 import dataclasses
-from typing import Optional, Any
+import functools
+import importlib
+from dataclasses import dataclass
+from typing import Optional, Any, Callable, ClassVar
 
 from tcmenu.domain.edit_item_type import EditItemType
 from tcmenu.domain.menu_items import (
@@ -28,16 +31,257 @@ from tcmenu.domain.state.menu_state import (
     CurrentScrollPositionMenuState,
     PortableColorMenuState,
 )
+from tcmenu.domain.state.paged_string_list import PagedStringList
 from tcmenu.domain.state.portable_color import PortableColor
 
 
+@dataclass(frozen=True)
+class MenuItemTypeHandler:
+    """
+    Describes how MenuItemHelper treats one type of menu item. The built-in item types each have a handler, custom
+    MenuItem subclasses can provide their own with `MenuItemHelper.register_item_type`. Subclasses of a registered
+    type that are not registered themselves use the handler of their closest registered base class.
+    """
+
+    """Creates the default value for the item, a new object is returned on each call."""
+    default_value: Callable[[], Any] = lambda: False
+
+    """
+    Converts a value into a new state, called as create_state(item, value, changed, active). The value is never None.
+    Returning None means that the item type has no state.
+    """
+    create_state: Callable[[MenuItem, Any, bool, bool], Optional[MenuState]] = (
+        lambda item, value, changed, active: BooleanMenuState(
+            item=MenuItem(), changed=changed, active=active, value=False
+        )
+    )
+
+    """Returns the eeprom storage needed for the item."""
+    eeprom_size: Callable[[MenuItem], int] = lambda item: 0
+
+    """True if the item is based on a runtime structure."""
+    runtime_structure_needed: bool = False
+
+    """
+    Creates the boot command for the item, called as boot_command(parent_id, item, tree), or None if the item can not
+    be sent during bootstrap.
+    """
+    boot_command: Optional[Callable[[int, MenuItem, "MenuTree"], Optional["BootItemMenuCommand"]]] = None
+
+
+@functools.cache
+def _boot_command_module():
+    # Boot commands depend on this module, so they are imported on first use rather than at import time.
+    return importlib.import_module("tcmenu.remote.commands.menu_boot_commands")
+
+
+def _boot_with_value(command_name: str) -> Callable[[int, MenuItem, "MenuTree"], "BootItemMenuCommand"]:
+    def create(parent_id: int, item: MenuItem, tree: "MenuTree") -> "BootItemMenuCommand":
+        current_value = PagedStringList.loaded_values_of(
+            MenuItemHelper.get_value_for(item, tree, MenuItemHelper.get_default_for(item))
+        )
+        return getattr(_boot_command_module(), command_name)(
+            sub_menu_id=parent_id, menu_item=item, current_value=current_value
+        )
+
+    return create
+
+
+def _boot_without_value(command_name: str) -> Callable[[int, MenuItem, "MenuTree"], "BootItemMenuCommand"]:
+    def create(parent_id: int, item: MenuItem, tree: "MenuTree") -> "BootItemMenuCommand":
+        return getattr(_boot_command_module(), command_name)(sub_menu_id=parent_id, menu_item=item, current_value=False)
+
+    return create
+
+
+def _analog_state(item: AnalogMenuItem, value: Any, changed: bool, active: bool) -> MenuState:
+    res = int(value)
+    if res < 0:
+        res = 0
+    if res > item.max_value:
+        res = item.max_value
+    return IntegerMenuState(item=item, changed=changed, active=active, value=res)
+
+
+def _boolean_state(item: MenuItem, value: Any, changed: bool, active: bool) -> MenuState:
+    if type(value) == str:
+        res = value.lower() in ("true", "1", "y")
+    else:
+        res = bool(value)
+    return BooleanMenuState(item=item, changed=changed, active=active, value=res)
+
+
+def _enum_state(item: EnumMenuItem, value: Any, changed: bool, active: bool) -> MenuState:
+    res = int(value)
+    if res < 0:
+        res = 0
+    if res > len(item.enum_entries):
+        res = len(item.enum_entries) - 1
+    return IntegerMenuState(item=item, changed=changed, active=active, value=res)
+
+
+def _scroll_state(item: ScrollChoiceMenuItem, value: Any, changed: bool, active: bool) -> MenuState:
+    pos: CurrentScrollPosition
+
+    if type(value) == int:
+        pos = CurrentScrollPosition(position=value, value="")
+    elif isinstance(value, CurrentScrollPosition):
+        pos = value
+    else:
+        pos = CurrentScrollPosition.from_text(str(value))
+
+    if 0 <= pos.position < item.num_entries:
+        return CurrentScrollPositionMenuState(item=item, changed=changed, active=active, value=pos)
+    else:
+        return CurrentScrollPositionMenuState(
+            item=item, changed=changed, active=active, value=CurrentScrollPosition(0, "No entries")
+        )
+
+
+def _rgb32_state(item: Rgb32MenuItem, value: Any, changed: bool, active: bool) -> MenuState:
+    color: PortableColor
+
+    if type(value) == str:
+        color = PortableColor.from_html(value)
+    elif isinstance(value, PortableColor):
+        color = value
+    else:
+        raise ValueError("Invalid value for Rgb32MenuItem.")
+    return PortableColorMenuState(item=item, changed=changed, active=active, value=color)
+
+
+def _text_eeprom_size(item: EditableTextMenuItem) -> int:
+    if item.item_type == EditItemType.IP_ADDRESS:
+        return 4
+    elif item.item_type == EditItemType.PLAIN_TEXT:
+        return item.text_length
+    else:
+        # all date and time types are 4 bytes long
+        return 4
+
+
+_BUILT_IN_HANDLERS: dict[type[MenuItem], MenuItemTypeHandler] = {
+    MenuItem: MenuItemTypeHandler(),
+    AnalogMenuItem: MenuItemTypeHandler(
+        default_value=lambda: 0,
+        create_state=_analog_state,
+        eeprom_size=lambda item: 2,
+        boot_command=_boot_with_value("MenuAnalogBootCommand"),
+    ),
+    BooleanMenuItem: MenuItemTypeHandler(
+        default_value=lambda: False,
+        create_state=_boolean_state,
+        eeprom_size=lambda item: 1,
+        boot_command=_boot_with_value("MenuBooleanBootCommand"),
+    ),
+    EnumMenuItem: MenuItemTypeHandler(
+        default_value=lambda: 0,
+        create_state=_enum_state,
+        eeprom_size=lambda item: 2,
+        boot_command=_boot_with_value("MenuEnumBootCommand"),
+    ),
+    SubMenuItem: MenuItemTypeHandler(
+        default_value=lambda: False,
+        create_state=lambda item, value, changed, active: BooleanMenuState(
+            item=item, changed=changed, active=active, value=False
+        ),
+        # needed for the back menu item
+        runtime_structure_needed=True,
+        boot_command=_boot_without_value("MenuSubBootCommand"),
+    ),
+    EditableTextMenuItem: MenuItemTypeHandler(
+        default_value=lambda: "",
+        create_state=lambda item, value, changed, active: StringMenuState(
+            item=item, changed=changed, active=active, value=str(value)
+        ),
+        eeprom_size=_text_eeprom_size,
+        runtime_structure_needed=True,
+        boot_command=_boot_with_value("MenuTextBootCommand"),
+    ),
+    ActionMenuItem: MenuItemTypeHandler(
+        create_state=lambda item, value, changed, active: None,
+        boot_command=_boot_without_value("MenuActionBootCommand"),
+    ),
+    FloatMenuItem: MenuItemTypeHandler(
+        default_value=lambda: float(0),
+        create_state=lambda item, value, changed, active: FloatMenuState(
+            item=item, changed=changed, active=active, value=float(value)
+        ),
+        boot_command=_boot_with_value("MenuFloatBootCommand"),
+    ),
+    RuntimeListMenuItem: MenuItemTypeHandler(
+        default_value=lambda: [],
+        create_state=lambda item, value, changed, active: StringListMenuState(
+            item=item, changed=changed, active=active, value=[str(x) for x in PagedStringList.loaded_values_of(value)]
+        ),
+        runtime_structure_needed=True,
+        boot_command=_boot_with_value("MenuRuntimeListBootCommand"),
+    ),
+    EditableLargeNumberMenuItem: MenuItemTypeHandler(
+        default_value=lambda: 0,
+        create_state=lambda item, value, changed, active: BigDecimalMenuState(
+            item=item, changed=changed, active=active, value=float(value)
+        ),
+        eeprom_size=lambda item: 8,
+        runtime_structure_needed=True,
+        boot_command=_boot_with_value("MenuLargeNumBootCommand"),
+    ),
+    ScrollChoiceMenuItem: MenuItemTypeHandler(
+        default_value=lambda: CurrentScrollPosition(position=0, value=""),
+        create_state=_scroll_state,
+        eeprom_size=lambda item: 2,
+        runtime_structure_needed=True,
+        boot_command=_boot_with_value("MenuScrollChoiceBootCommand"),
+    ),
+    Rgb32MenuItem: MenuItemTypeHandler(
+        default_value=lambda: PortableColor(red=0, green=0, blue=0),
+        create_state=_rgb32_state,
+        eeprom_size=lambda item: 4,
+        runtime_structure_needed=True,
+        boot_command=_boot_with_value("MenuRgb32BootCommand"),
+    ),
+}
+
+
 # noinspection PyUnresolvedReferences
 class MenuItemHelper:
     """
     A helper class for dealing with MenuItem objects. This class provides helpers for visiting
     menu items and returning a result. It also provides other helpers for dealing with items.
+
+    Per item type behaviour is looked up in a table of MenuItemTypeHandler keyed on the concrete item type, custom
+    item types can be added with `register_item_type`.
     """
 
+    _registered_handlers: ClassVar[dict[type[MenuItem], MenuItemTypeHandler]] = dict(_BUILT_IN_HANDLERS)
+    _resolved_handlers: ClassVar[dict[type, MenuItemTypeHandler]] = dict(_BUILT_IN_HANDLERS)
+
+    @staticmethod
+    def register_item_type(item_type: type[MenuItem], handler: MenuItemTypeHandler):
+        """
+        Registers how a custom menu item type is handled, replacing any existing handler for the type.
+        :param item_type: the MenuItem subclass.
+        :param handler: the handler for the type.
+        """
+        MenuItemHelper._registered_handlers[item_type] = handler
+        MenuItemHelper._resolved_handlers = dict(MenuItemHelper._registered_handlers)
+
+    @staticmethod
+    def handler_for(item: MenuItem) -> MenuItemTypeHandler:
+        """
+        Gets the handler for an item, resolving it through the base classes for unregistered subclasses.
+        :param item: the item.
+        :return: the handler for the item type.
+        """
+        item_type = type(item)
+        handler = MenuItemHelper._resolved_handlers.get(item_type)
+        if handler is None:
+            registered = MenuItemHelper._registered_handlers
+            base = next((base for base in item_type.__mro__ if base in registered), None)
+            handler = registered[base] if base is not None else MenuItemTypeHandler()
+            MenuItemHelper._resolved_handlers[item_type] = handler
+        return handler
+
     @staticmethod
     def as_sub_menu(item: MenuItem) -> Optional[SubMenuItem]:
         """
@@ -56,23 +300,7 @@ class MenuItemHelper:
         :param item: the item to check
         :return: true if runtime based, otherwise false.
         """
-        if isinstance(item, RuntimeListMenuItem):
-            return True
-        elif isinstance(item, EditableTextMenuItem):
-            return True
-        elif isinstance(item, EditableLargeNumberMenuItem):
-            return True
-        elif isinstance(item, ScrollChoiceMenuItem):
-            return True
-        elif isinstance(item, Rgb32MenuItem):
-            return True
-        elif isinstance(item, SubMenuItem):
-            # needed for the back menu item
-            return True
-        elif isinstance(item, MenuItem):
-            return False
-        else:
-            return False
+        return MenuItemHelper.handler_for(item).runtime_structure_needed
 
     @staticmethod
     def create_from_existing_with_id(selected: MenuItem, new_id: int) -> MenuItem:
@@ -103,30 +331,7 @@ class MenuItemHelper:
         """
         if item is None:
             return 0
-        elif isinstance(item, AnalogMenuItem):
-            return 2
-        elif isinstance(item, BooleanMenuItem):
-            return 1
-        elif isinstance(item, EnumMenuItem):
-            return 2
-        elif isinstance(item, EditableLargeNumberMenuItem):
-            return 8
-        elif isinstance(item, Rgb32MenuItem):
-            return 4
-        elif isinstance(item, ScrollChoiceMenuItem):
-            return 2
-        elif isinstance(item, EditableTextMenuItem):
-            if item.item_type == EditItemType.IP_ADDRESS:
-                return 4
-            elif item.item_type == EditItemType.PLAIN_TEXT:
-                return item.text_length
-            else:
-                # all date and time types are 4 bytes long
-                return 4
-        elif isinstance(item, MenuItem):
-            return 0
-        else:
-            return 0
+        return MenuItemHelper.handler_for(item).eeprom_size(item)
 
     @staticmethod
     def modify_existing_state_for_menu_item(
@@ -167,72 +372,11 @@ class MenuItemHelper:
         if item is None:
             return BooleanMenuState(item=MenuItem(), changed=False, active=False, value=False)
 
+        handler = MenuItemHelper.handler_for(item)
         if value is None:
-            value = MenuItemHelper.get_default_for(item)
-
-        if isinstance(item, AnalogMenuItem):
-            res = int(value)
-            if res < 0:
-                res = 0
-            if res > item.max_value:
-                res = item.max_value
-            return IntegerMenuState(item=item, changed=changed, active=active, value=res)
-        elif isinstance(item, BooleanMenuItem):
-            if type(value) == str:
-                res = value.lower() in ("true", "1", "y")
-            else:
-                res = bool(value)
-            return BooleanMenuState(item=item, changed=changed, active=active, value=res)
-        elif isinstance(item, EnumMenuItem):
-            res = int(value)
-            if res < 0:
-                res = 0
-            if res > len(item.enum_entries):
-                res = len(item.enum_entries) - 1
-            return IntegerMenuState(item=item, changed=changed, active=active, value=res)
-        elif isinstance(item, SubMenuItem):
-            return BooleanMenuState(item=item, changed=changed, active=active, value=False)
-        elif isinstance(item, EditableTextMenuItem):
-            return StringMenuState(item=item, changed=changed, active=active, value=str(value))
-        elif isinstance(item, ActionMenuItem):
-            pass
-        elif isinstance(item, FloatMenuItem):
-            res = float(value)
-            return FloatMenuState(item=item, changed=changed, active=active, value=res)
-        elif isinstance(item, RuntimeListMenuItem):
-            res = [str(x) for x in value]
-            return StringListMenuState(item=item, changed=changed, active=active, value=res)
-        elif isinstance(item, EditableLargeNumberMenuItem):
-            res = float(value)
-            return BigDecimalMenuState(item=item, changed=changed, active=active, value=res)
-        elif isinstance(item, ScrollChoiceMenuItem):
-            pos: CurrentScrollPosition
-
-            if type(value) == int:
-                pos = CurrentScrollPosition(position=value, value="")
-            elif isinstance(value, CurrentScrollPosition):
-                pos = value
-            else:
-                pos = CurrentScrollPosition.from_text(str(value))
-
-            if 0 <= pos.position < item.num_entries:
-                return CurrentScrollPositionMenuState(item=item, changed=changed, active=active, value=pos)
-            else:
-                return CurrentScrollPositionMenuState(
-                    item=item, changed=changed, active=active, value=CurrentScrollPosition(0, "No entries")
-                )
-        elif isinstance(item, Rgb32MenuItem):
-            color: PortableColor
-
-            if type(value) == str:
-                color = PortableColor.from_html(value)
-            elif isinstance(value, PortableColor):
-                color = value
-            else:
-                raise ValueError("Invalid value for Rgb32MenuItem.")
-            return PortableColorMenuState(item=item, changed=changed, active=active, value=color)
-        elif isinstance(item, MenuItem):
-            return BooleanMenuState(item=MenuItem(), changed=changed, active=active, value=False)
+            value = handler.default_value()
+
+        return handler.create_state(item, value, changed, active)
 
     @staticmethod
     def apply_incremental_value_change(item: MenuItem, delta: int, tree: "MenuTree") -> Optional[MenuState]:
@@ -323,24 +467,7 @@ class MenuItemHelper:
         :param item: the item
         :return: the default value
         """
-        if isinstance(item, AnalogMenuItem) or isinstance(item, EnumMenuItem):
-            return 0
-        elif isinstance(item, FloatMenuItem):
-            return float(0)
-        elif isinstance(item, BooleanMenuItem) or isinstance(item, SubMenuItem):
-            return False
-        elif isinstance(item, EditableLargeNumberMenuItem):
-            return 0
-        elif isinstance(item, EditableTextMenuItem):
-            return ""
-        elif isinstance(item, Rgb32MenuItem):
-            return PortableColor(red=0, green=0, blue=0)
-        elif isinstance(item, RuntimeListMenuItem):
-            return []
-        elif isinstance(item, ScrollChoiceMenuItem):
-            return CurrentScrollPosition(position=0, value="")
-        else:
-            return False
+        return MenuItemHelper.handler_for(item).default_value()
 
     @staticmethod
     def get_boot_msg_for_item(item: MenuItem, parent: SubMenuItem, tree: "MenuTree") -> Optional["BootItemMenuCommand"]:
@@ -351,64 +478,7 @@ class MenuItemHelper:
         :param tree: the tree it belongs to
         :return: either a boot item or empty
         """
-
-        from tcmenu.remote.commands.menu_boot_commands import (
-            MenuAnalogBootCommand,
-            MenuEnumBootCommand,
-            MenuFloatBootCommand,
-            MenuBooleanBootCommand,
-            MenuSubBootCommand,
-            MenuActionBootCommand,
-            MenuLargeNumBootCommand,
-            MenuTextBootCommand,
-            MenuRgb32BootCommand,
-            MenuRuntimeListBootCommand,
-            MenuScrollChoiceBootCommand,
-        )
-
-        if isinstance(item, AnalogMenuItem):
-            return MenuAnalogBootCommand(
-                sub_menu_id=parent.id, menu_item=item, current_value=MenuItemHelper.get_value_for(item, tree, 0)
-            )
-        elif isinstance(item, EnumMenuItem):
-            return MenuEnumBootCommand(
-                sub_menu_id=parent.id, menu_item=item, current_value=MenuItemHelper.get_value_for(item, tree, 0)
-            )
-        elif isinstance(item, FloatMenuItem):
-            return MenuFloatBootCommand(
-                sub_menu_id=parent.id, menu_item=item, current_value=MenuItemHelper.get_value_for(item, tree, 0.0)
-            )
-        elif isinstance(item, BooleanMenuItem):
-            return MenuBooleanBootCommand(
-                sub_menu_id=parent.id, menu_item=item, current_value=MenuItemHelper.get_value_for(item, tree, False)
-            )
-        elif isinstance(item, SubMenuItem):
-            return MenuSubBootCommand(sub_menu_id=parent.id, menu_item=item, current_value=False)
-        elif isinstance(item, ActionMenuItem):
-            return MenuActionBootCommand(sub_menu_id=parent.id, menu_item=item, current_value=False)
-        elif isinstance(item, EditableLargeNumberMenuItem):
-            return MenuLargeNumBootCommand(
-                sub_menu_id=parent.id, menu_item=item, current_value=MenuItemHelper.get_value_for(item, tree, 0)
-            )
-        elif isinstance(item, EditableTextMenuItem):
-            return MenuTextBootCommand(
-                sub_menu_id=parent.id, menu_item=item, current_value=MenuItemHelper.get_value_for(item, tree, "")
-            )
-        elif isinstance(item, Rgb32MenuItem):
-            return MenuRgb32BootCommand(
-                sub_menu_id=parent.id,
-                menu_item=item,
-                current_value=MenuItemHelper.get_value_for(item, tree, PortableColor(0, 0, 0)),
-            )
-        elif isinstance(item, RuntimeListMenuItem):
-            return MenuRuntimeListBootCommand(
-                sub_menu_id=parent.id, menu_item=item, current_value=MenuItemHelper.get_value_for(item, tree, [])
-            )
-        elif isinstance(item, ScrollChoiceMenuItem):
-            return MenuScrollChoiceBootCommand(
-                sub_menu_id=parent.id,
-                menu_item=item,
-                current_value=MenuItemHelper.get_value_for(item, tree, CurrentScrollPosition(0, "")),
-            )
-        else:
+        boot_command = MenuItemHelper.handler_for(item).boot_command
+        if boot_command is None:
             return None
+        return boot_command(parent.id, item, tree)
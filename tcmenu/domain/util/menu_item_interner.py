@@ -0,0 +1,99 @@
+import dataclasses
+import functools
+import sys
+import threading
+import weakref
+from operator import attrgetter
+from typing import Any, Callable, Hashable, TypeVar
+
+from tcmenu.domain.menu_items import MenuItem
+
+T = TypeVar("T", bound=MenuItem)
+
+
+@functools.cache
+def _fields_of(item_class: type) -> tuple[Callable[[Any], tuple], tuple[str, ...]]:
+    names = tuple(field.name for field in dataclasses.fields(item_class))
+    getter = attrgetter(*names)
+    return (getter if len(names) > 1 else lambda item: (getter(item),)), names
+
+
+def _intern_value(value: Any) -> Any:
+    if type(value) is str:
+        return sys.intern(value)
+    if type(value) is tuple and all(type(entry) is str for entry in value):
+        return tuple(sys.intern(entry) for entry in value)
+    return value
+
+
+class MenuItemInterner:
+    """
+    Shares one instance between menu items that are defined identically, for example the items of many devices of the
+    same model, each of which sends its own copy of every item during bootstrap. Menu items are immutable, so an equal
+    item can be used in place of another in any tree. Items are held weakly, keyed on their class and fields, so an
+    item is dropped once no tree uses it. When an item is first seen, its names, units and choices are interned as well,
+    so that items which differ only in some fields still share their strings.
+
+    The boot item processors of the TagVal protocol intern every item they decode with the shared interner.
+
+    <pre>
+        item = MenuItemInterner.shared().intern(item)
+    </pre>
+    """
+
+    def __init__(self):
+        self._items: weakref.WeakValueDictionary[Hashable, MenuItem] = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+
+        """Set to False to return every item unchanged, for example to compare memory use."""
+        self.enabled = True
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def shared() -> "MenuItemInterner":
+        """The interner shared by everything in the process, including the protocol processors."""
+        return _SHARED
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def intern(self, item: T) -> T:
+        """
+        Gets the shared instance of an item, the item itself when it is the first of its definition.
+        :param item: a menu item.
+        :return: an item that is equal to the one given.
+        """
+        if not self.enabled:
+            return item
+
+        getter, names = _fields_of(item.__class__)
+        values = getter(item)
+        try:
+            shared = self._items.get((item.__class__, values))
+        except TypeError:
+            # A field that can not be hashed, such as a list of choices, the item can not be shared.
+            return item
+
+        if shared is not None:
+            self.hits += 1
+            return shared
+
+        # The key holds the interned strings too, so that it does not keep the decoded copies alive.
+        interned = tuple(_intern_value(value) for value in values)
+        if any(new is not old for new, old in zip(interned, values)):
+            item = dataclasses.replace(item, **dict(zip(names, interned)))
+
+        with self._lock:
+            shared = self._items.setdefault((item.__class__, interned), item)
+        self.misses += 1
+        return shared
+
+    def clear(self) -> None:
+        """Forgets every item, items already shared stay shared."""
+        with self._lock:
+            self._items.clear()
+
+
+_SHARED = MenuItemInterner()
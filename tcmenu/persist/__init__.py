@@ -0,0 +1,12 @@
+from tcmenu._lazy import lazy_submodules
+
+__getattr__, __dir__ = lazy_submodules(
+    __name__,
+    (
+        "json_menu_item_serializer",
+        "menu_snapshot",
+        "persisted_menu",
+        "state_journal",
+        "version_info",
+    ),
+)
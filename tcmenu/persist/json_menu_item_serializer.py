@@ -1,8 +1,14 @@
+import codecs
+import dataclasses
+import functools
 import logging
 import json
-from typing import Any
+from typing import Any, BinaryIO, Callable, Iterable, Iterator, Optional, TextIO, Union
 
-import humps
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional speed up
+    orjson = None
 
 from tcmenu.domain.edit_item_type import EditItemType
 from tcmenu.domain.menu_items import (
@@ -20,10 +26,17 @@ from tcmenu.domain.menu_items import (
     Rgb32MenuItem,
     FloatMenuItem,
 )
+from tcmenu.domain.state.menu_state import MenuState
 from tcmenu.domain.state.menu_tree import MenuTree
+from tcmenu.domain.state.paged_string_list import PagedStringList
 from tcmenu.domain.util.menu_item_helper import MenuItemHelper
 from tcmenu.persist.persisted_menu import PersistedMenu
 
+_STREAM_CHUNK_SIZE = 64 * 1024
+
+"""How near the end of the buffer a decode error must be to be taken as a token cut off by the chunk."""
+_INCOMPLETE_TOKEN_LENGTH = 8
+
 
 class JsonMenuItemSerializer:
     """
@@ -42,23 +55,85 @@ class JsonMenuItemSerializer:
     DEF_VALUE_ID: str = "default_value"
     ITEM_ID: str = "item"
 
+    """Menu item class for each persisted type."""
+    ITEM_TYPES: dict[str, type[MenuItem]] = {
+        PersistedMenu.ItemTypes.ENUM_PERSIST_TYPE: EnumMenuItem,
+        PersistedMenu.ItemTypes.ANALOG_PERSIST_TYPE: AnalogMenuItem,
+        PersistedMenu.ItemTypes.BOOLEAN_PERSIST_TYPE: BooleanMenuItem,
+        PersistedMenu.ItemTypes.ACTION_PERSIST_TYPE: ActionMenuItem,
+        PersistedMenu.ItemTypes.TEXT_PERSIST_TYPE: EditableTextMenuItem,
+        PersistedMenu.ItemTypes.SUB_PERSIST_TYPE: SubMenuItem,
+        PersistedMenu.ItemTypes.RUNTIME_LIST_PERSIST_TYPE: RuntimeListMenuItem,
+        PersistedMenu.ItemTypes.RUNTIME_LARGE_NUM_PERSIST_TYPE: EditableLargeNumberMenuItem,
+        PersistedMenu.ItemTypes.CUSTOM_ITEM_PERSIST_TYPE: CustomBuilderMenuItem,
+        PersistedMenu.ItemTypes.SCROLL_CHOICE_PERSIST_TYPE: ScrollChoiceMenuItem,
+        PersistedMenu.ItemTypes.RGB32_COLOR_PERSIST_TYPE: Rgb32MenuItem,
+        PersistedMenu.ItemTypes.FLOAT_PERSIST_TYPE: FloatMenuItem,
+    }
+
+    """Fields that need converting from their JSON representation, for each persisted type."""
+    _FIELD_CONVERTERS: dict[str, tuple[tuple[str, Callable[[Any], Any]], ...]] = {
+        PersistedMenu.ItemTypes.BOOLEAN_PERSIST_TYPE: (("naming", lambda value: BooleanMenuItem.BooleanNaming[value]),),
+        PersistedMenu.ItemTypes.CUSTOM_ITEM_PERSIST_TYPE: (
+            ("menu_type", lambda value: CustomBuilderMenuItem.CustomMenuType[value]),
+        ),
+        PersistedMenu.ItemTypes.TEXT_PERSIST_TYPE: (("item_type", lambda value: EditItemType[value]),),
+        PersistedMenu.ItemTypes.ENUM_PERSIST_TYPE: (("enum_entries", tuple),),
+        PersistedMenu.ItemTypes.SCROLL_CHOICE_PERSIST_TYPE: (
+            ("choice_mode", lambda value: ScrollChoiceMenuItem.ScrollChoiceMode[value]),
+        ),
+    }
+
     logger = logging.getLogger("JsonMenuItemSerializer")
 
+    @staticmethod
+    @functools.cache
+    def _key_map() -> dict[str, str]:
+        """
+        JSON key to field name for every known field, so that keys are converted with a dictionary lookup. Unknown
+        keys are converted by _decamelize instead. Built on first use, so humps is only imported when JSON is loaded.
+        """
+        import humps
+
+        return {
+            humps.camelize(name): name
+            for name in {
+                JsonMenuItemSerializer.PARENT_ID,
+                JsonMenuItemSerializer.TYPE_ID,
+                JsonMenuItemSerializer.DEF_VALUE_ID,
+                JsonMenuItemSerializer.ITEM_ID,
+            }
+            | {
+                field.name
+                for item_class in JsonMenuItemSerializer.ITEM_TYPES.values()
+                for field in dataclasses.fields(item_class)
+            }
+        }
+
     @staticmethod
     def populate_list_in_order(node: SubMenuItem, menu_tree: MenuTree) -> tuple[PersistedMenu]:
-        data: list[PersistedMenu] = []
-        items: tuple[MenuItem] = menu_tree.get_menu_items(node)
-        for item in items:
+        return tuple(JsonMenuItemSerializer.iterate_in_order(node, menu_tree))
+
+    @staticmethod
+    def iterate_in_order(node: SubMenuItem, menu_tree: MenuTree) -> Iterator[PersistedMenu]:
+        """
+        Walks the tree below the node depth first, yielding each item as it is reached, in the same order as
+        populate_list_in_order.
+        :param node: the submenu to start from.
+        :param menu_tree: the tree to walk.
+        :return: an iterator of persisted items.
+        """
+        for item in menu_tree.get_menu_items(node) or ():
             persisted_menu = PersistedMenu(item, node.id)
             if menu_tree.get_menu_state(item) is not None:
                 persisted_menu.default_value = str(
-                    MenuItemHelper.get_value_for(item, menu_tree, MenuItemHelper.get_default_for(item))
+                    PagedStringList.loaded_values_of(
+                        MenuItemHelper.get_value_for(item, menu_tree, MenuItemHelper.get_default_for(item))
+                    )
                 )
-            data.append(persisted_menu)
+            yield persisted_menu
             if item.has_children():
-                data.extend(JsonMenuItemSerializer.populate_list_in_order(MenuItemHelper.as_sub_menu(item), menu_tree))
-
-        return tuple(data)
+                yield from JsonMenuItemSerializer.iterate_in_order(MenuItemHelper.as_sub_menu(item), menu_tree)
 
     @staticmethod
     def items_to_copy_text(starting_point: MenuItem, tree: MenuTree) -> str:
@@ -70,7 +145,7 @@ class JsonMenuItemSerializer:
             menu: PersistedMenu = PersistedMenu(
                 starting_point,
                 tree.find_parent(starting_point).id,
-                default_value=str(MenuItemHelper.get_value_for(starting_point, tree)),
+                default_value=str(PagedStringList.loaded_values_of(MenuItemHelper.get_value_for(starting_point, tree))),
             )
             items = (menu,)
 
@@ -88,14 +163,159 @@ class JsonMenuItemSerializer:
     def new_menu_tree_with_items(tc_menu_copy: str) -> MenuTree:
         tree: MenuTree = MenuTree()
         items: tuple[PersistedMenu] = JsonMenuItemSerializer.copy_text_to_items(tc_menu_copy)
+        tree.add_items_in_order(JsonMenuItemSerializer._tree_entries(items))
+        return tree
+
+    @staticmethod
+    def new_menu_tree_from_stream(stream: Union[TextIO, BinaryIO]) -> MenuTree:
+        """
+        Builds a tree from a JSON document read incrementally from a stream, so the document itself is never held in
+        memory. The document may optionally start with the copy prefix.
+        :param stream: a text or binary file like object, such as an open file or socket.makefile("rb").
+        :return: the tree.
+        """
+        tree: MenuTree = MenuTree()
+        tree.add_items_in_order(JsonMenuItemSerializer._tree_entries(JsonMenuItemSerializer.read_json_stream(stream)))
+        return tree
+
+    @staticmethod
+    def _tree_entries(items: Iterable[PersistedMenu]) -> Iterator[tuple[MenuItem, int, Optional[MenuState]]]:
+        """
+        Converts persisted items into entries for MenuTree.add_items_in_order in a single pass. Items whose parent is
+        not a submenu seen earlier, such as the top level of a copied submenu, are placed at the root.
+        """
+        sub_menu_ids: set[int] = {MenuTree.ROOT.id}
+
+        for persisted in items:
+            item = persisted.item
+            parent_id = persisted.parent_id
+            if parent_id not in sub_menu_ids:
+                JsonMenuItemSerializer.logger.warning(f"Parent {parent_id} of item {item.id} not found, added to root")
+                parent_id = MenuTree.ROOT.id
+            if item.has_children():
+                sub_menu_ids.add(item.id)
 
+            state = None
+            if persisted.default_value is not None:
+                state = MenuItemHelper.state_for_menu_item(item, persisted.default_value, changed=False, active=False)
+            yield item, parent_id, state
+
+    @staticmethod
+    def write_json_stream(items: Iterable[PersistedMenu], stream: TextIO) -> int:
+        """
+        Writes PersistedMenu items to a text stream one at a time as they are produced, for example by
+        iterate_in_order. The output is identical to to_json.
+        :param items: the items to write, any iterable.
+        :param stream: the text stream to write to.
+        :return: the number of items written.
+        """
+        count = 0
+        stream.write("[")
         for item in items:
-            tree.add_menu_item(parent=tree.get_sub_menu_by_id(item.parent_id), item=item.item)
+            text = json.dumps(item, indent=4, cls=PersistedMenuEncoder)
+            stream.write(",\n    " if count else "\n    ")
+            stream.write(text.replace("\n", "\n    "))
+            count += 1
+        stream.write("\n]" if count else "]")
+        return count
 
-            if item.default_value is not None:
-                MenuItemHelper.set_menu_state(item.item, item.default_value, tree)
+    @staticmethod
+    def read_json_stream(
+        stream: Union[TextIO, BinaryIO], chunk_size: int = _STREAM_CHUNK_SIZE
+    ) -> Iterator[PersistedMenu]:
+        """
+        Reads PersistedMenu items from a stream containing a JSON array, yielding each item as soon as it has been
+        read, so only one item needs to be held in memory at a time. The array may optionally start with the copy
+        prefix.
+        :param stream: a text or binary (UTF-8) file like object, such as an open file or socket.makefile("rb").
+        :param chunk_size: optional; the number of characters or bytes read at a time.
+        :return: an iterator of persisted items.
+        :raises ValueError: if the stream does not contain a JSON array of items.
+        """
+        decoder = json.JSONDecoder()
+        utf8 = codecs.getincrementaldecoder("utf-8")()
+        buffer = ""
+        pos = 0
+        eof = False
+        started = False
 
-        return tree
+        def read_more() -> bool:
+            nonlocal buffer, pos, eof
+            if eof:
+                return False
+            chunk = stream.read(chunk_size)
+            if isinstance(chunk, (bytes, bytearray)):
+                chunk = utf8.decode(chunk, final=not chunk)
+            if not chunk:
+                eof = True
+                return False
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            return True
+
+        def next_token() -> Optional[str]:
+            nonlocal pos
+            while True:
+                while pos < len(buffer) and buffer[pos] in " \t\r\n":
+                    pos += 1
+                if pos < len(buffer):
+                    return buffer[pos]
+                if not read_more():
+                    return None
+
+        prefix = PersistedMenu.ItemTypes.TCMENU_COPY_PREFIX
+        while not started:
+            token = next_token()
+            if token == "[":
+                pos += 1
+                started = True
+            elif token is not None and prefix.startswith(buffer[pos : pos + len(prefix)]):
+                if buffer.startswith(prefix, pos):
+                    pos += len(prefix)
+                elif not read_more():
+                    raise ValueError("Stream does not contain a JSON array")
+            else:
+                raise ValueError("Stream does not contain a JSON array")
+
+        to_snake = JsonMenuItemSerializer._to_snake_case
+        first = True
+        while True:
+            token = next_token()
+            if token is None:
+                raise ValueError("Stream ended before the end of the JSON array")
+            if token == "]" and first:
+                return
+            if not first:
+                if token == "]":
+                    return
+                if token != ",":
+                    raise json.JSONDecodeError("Expecting ',' delimiter", buffer, pos)
+                pos += 1
+                token = next_token()
+                if token is None:
+                    raise ValueError("Stream ended before the end of the JSON array")
+                if token == "]":
+                    raise json.JSONDecodeError("Expecting value", buffer, pos)
+
+            while True:
+                try:
+                    data, end = decoder.raw_decode(buffer, pos)
+                    break
+                except json.JSONDecodeError as error:
+                    # Only an error at the end of what has been read can be an item that is not complete yet, such
+                    # as a cut off number, literal or string. Anything else is malformed and fails straight away,
+                    # rather than reading the rest of the stream into the buffer.
+                    incomplete = error.pos >= len(buffer) - _INCOMPLETE_TOKEN_LENGTH or error.msg.startswith(
+                        "Unterminated string"
+                    )
+                    if not incomplete:
+                        raise
+                    if not read_more():
+                        raise ValueError("Stream ended in the middle of an item")
+
+            pos = end
+            first = False
+            yield JsonMenuItemSerializer.deserialize(to_snake(data))
 
     @staticmethod
     def to_json(items: tuple[PersistedMenu]) -> str:
@@ -109,12 +329,44 @@ class JsonMenuItemSerializer:
     @staticmethod
     def from_json(json_str: str) -> tuple[PersistedMenu]:
         """
-        Convert json back to PersistedMenu items.
+        Convert json back to PersistedMenu items. Uses orjson for parsing when it is installed.
         :param json_str: JSON string containing PersistedMenu items.
         :return: tuple containing PersistedMenu items.
         """
-        data = json.loads(json_str, object_hook=lambda val: humps.decamelize(val))
-        return tuple(map(JsonMenuItemSerializer.deserialize, data))
+        data = orjson.loads(json_str) if orjson is not None else json.loads(json_str)
+        to_snake = JsonMenuItemSerializer._to_snake_case
+        return tuple(JsonMenuItemSerializer.deserialize(to_snake(entry)) for entry in data)
+
+    @staticmethod
+    def _to_snake_case(data: Any) -> Any:
+        """
+        Converts the keys of every dictionary in the data to snake case, including those nested in lists, in the same
+        way as decoding with `object_hook=humps.decamelize`.
+        """
+        if isinstance(data, list):
+            to_snake = JsonMenuItemSerializer._to_snake_case
+            return [to_snake(value) if isinstance(value, (dict, list)) else value for value in data]
+        if not isinstance(data, dict):
+            return data
+
+        key_map = JsonMenuItemSerializer._key_map()
+        result = {}
+        for key, value in data.items():
+            snake_key = key_map.get(key)
+            if snake_key is None:
+                snake_key = JsonMenuItemSerializer._decamelize(key)
+            if isinstance(value, (dict, list)):
+                value = JsonMenuItemSerializer._to_snake_case(value)
+            result[snake_key] = value
+        return result
+
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _decamelize(key: str) -> str:
+        """Converts a key that is not a known field, the cache is bounded so that arbitrary input cannot grow it."""
+        import humps
+
+        return humps.decamelize(key)
 
     @staticmethod
     def check_item_value_can_persist(persisted_menu: PersistedMenu) -> bool:
@@ -134,46 +386,26 @@ class JsonMenuItemSerializer:
 
     @staticmethod
     def deserialize(data: dict[str]) -> PersistedMenu:
-        map_of_types = {
-            PersistedMenu.ItemTypes.ENUM_PERSIST_TYPE: EnumMenuItem,
-            PersistedMenu.ItemTypes.ANALOG_PERSIST_TYPE: AnalogMenuItem,
-            PersistedMenu.ItemTypes.BOOLEAN_PERSIST_TYPE: BooleanMenuItem,
-            PersistedMenu.ItemTypes.ACTION_PERSIST_TYPE: ActionMenuItem,
-            PersistedMenu.ItemTypes.TEXT_PERSIST_TYPE: EditableTextMenuItem,
-            PersistedMenu.ItemTypes.SUB_PERSIST_TYPE: SubMenuItem,
-            PersistedMenu.ItemTypes.RUNTIME_LIST_PERSIST_TYPE: RuntimeListMenuItem,
-            PersistedMenu.ItemTypes.RUNTIME_LARGE_NUM_PERSIST_TYPE: EditableLargeNumberMenuItem,
-            PersistedMenu.ItemTypes.CUSTOM_ITEM_PERSIST_TYPE: CustomBuilderMenuItem,
-            PersistedMenu.ItemTypes.SCROLL_CHOICE_PERSIST_TYPE: ScrollChoiceMenuItem,
-            PersistedMenu.ItemTypes.RGB32_COLOR_PERSIST_TYPE: Rgb32MenuItem,
-            PersistedMenu.ItemTypes.FLOAT_PERSIST_TYPE: FloatMenuItem,
-        }
+        item_type = data[JsonMenuItemSerializer.TYPE_ID]
+        fields = data[JsonMenuItemSerializer.ITEM_ID]
 
         # Special handling for some items
-        if data["type"] == PersistedMenu.ItemTypes.BOOLEAN_PERSIST_TYPE:
-            data["item"]["naming"] = BooleanMenuItem.BooleanNaming[data["item"]["naming"]]
-        elif data["type"] == PersistedMenu.ItemTypes.CUSTOM_ITEM_PERSIST_TYPE:
-            data["item"]["menu_type"] = CustomBuilderMenuItem.CustomMenuType[data["item"]["menu_type"]]
-        elif data["type"] == PersistedMenu.ItemTypes.TEXT_PERSIST_TYPE:
-            data["item"]["item_type"] = EditItemType[data["item"]["item_type"]]
-        elif data["type"] == PersistedMenu.ItemTypes.ENUM_PERSIST_TYPE:
-            data["item"]["enum_entries"] = tuple(data["item"]["enum_entries"])
-        elif data["type"] == PersistedMenu.ItemTypes.SCROLL_CHOICE_PERSIST_TYPE:
-            data["item"]["choice_mode"] = ScrollChoiceMenuItem.ScrollChoiceMode[data["item"]["choice_mode"]]
+        for name, convert in JsonMenuItemSerializer._FIELD_CONVERTERS.get(item_type, ()):
+            fields[name] = convert(fields[name])
 
         # noinspection PyArgumentList
-        item: MenuItem = map_of_types[data[JsonMenuItemSerializer.TYPE_ID]](**data[JsonMenuItemSerializer.ITEM_ID])
+        item: MenuItem = JsonMenuItemSerializer.ITEM_TYPES[item_type](**fields)
         default_value: str = data.get(JsonMenuItemSerializer.DEF_VALUE_ID)
 
         try:
             return PersistedMenu(
                 item=item,
-                item_type=data[JsonMenuItemSerializer.TYPE_ID],
+                item_type=item_type,
                 parent_id=data[JsonMenuItemSerializer.PARENT_ID],
                 default_value=default_value,
             )
         except KeyError:
-            JsonMenuItemSerializer.logger.error(f"Item of type {data['type']} was not reloaded - skipping")
+            JsonMenuItemSerializer.logger.error(f"Item of type {item_type} was not reloaded - skipping")
 
 
 class PersistedMenuEncoder(json.JSONEncoder):
@@ -198,6 +430,8 @@ class PersistedMenuEncoder(json.JSONEncoder):
                 "item": obj.item.__dict__,
                 "default_value": obj.default_value,
             }
+            import humps
+
             return PersistedMenuEncoder.clean_nones(humps.camelize(data))
         elif isinstance(obj, BooleanMenuItem.BooleanNaming):
             return str(obj.name)
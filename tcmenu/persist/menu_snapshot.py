@@ -0,0 +1,507 @@
+import mmap
+import struct
+from enum import Enum
+from typing import BinaryIO, Iterator, Optional, Union
+
+from tcmenu.domain.edit_item_type import EditItemType
+from tcmenu.domain.menu_items import (
+    ActionMenuItem,
+    AnalogMenuItem,
+    BooleanMenuItem,
+    CustomBuilderMenuItem,
+    EditableLargeNumberMenuItem,
+    EditableTextMenuItem,
+    EnumMenuItem,
+    FloatMenuItem,
+    MenuItem,
+    Rgb32MenuItem,
+    RuntimeListMenuItem,
+    ScrollChoiceMenuItem,
+    SubMenuItem,
+)
+from tcmenu.domain.state.current_scroll_position import CurrentScrollPosition
+from tcmenu.domain.state.menu_state import (
+    BigDecimalMenuState,
+    BooleanMenuState,
+    CurrentScrollPositionMenuState,
+    FloatMenuState,
+    IntegerMenuState,
+    MenuState,
+    PortableColorMenuState,
+    StringListMenuState,
+    StringMenuState,
+)
+from tcmenu.domain.state.menu_tree import MenuTree
+from tcmenu.domain.state.paged_string_list import PagedStringList
+from tcmenu.domain.state.portable_color import PortableColor
+from tcmenu.persist.persisted_menu import PersistedMenu
+
+StorageType = MenuState.StateStorageType
+
+_MAGIC = b"TCMSNAP\x00"
+_VERSION = 1
+_NO_STRING = 0xFFFFFFFF
+
+# magic, version, reserved, item count, index offset, string table offset
+_HEADER = struct.Struct("<8sHHIII")
+# item id, parent id, record offset
+_INDEX_ENTRY = struct.Struct("<iiI")
+# type tag, eeprom address, name, variable name, function name, flags
+_COMMON = struct.Struct("<BiIIIB")
+_COUNT = struct.Struct("<I")
+
+_READ_ONLY = 0x01
+_LOCAL_ONLY = 0x02
+_VISIBLE = 0x04
+_STATE_CHANGED = 0x08
+_STATE_ACTIVE = 0x10
+
+# Field kinds: "i" is a 32-bit integer, "b" a boolean, "s" a string and "l" a list of strings. Enum fields are stored
+# as the index of the member. Enum entries are the only list field and are always written last.
+_ITEM_LAYOUTS: tuple[tuple[type[MenuItem], tuple[tuple[str, Union[str, type[Enum]]], ...]], ...] = (
+    (AnalogMenuItem, (("max_value", "i"), ("offset", "i"), ("divisor", "i"), ("unit_name", "s"), ("step", "i"))),
+    (BooleanMenuItem, (("naming", BooleanMenuItem.BooleanNaming),)),
+    (EnumMenuItem, (("enum_entries", "l"),)),
+    (SubMenuItem, (("secured", "b"),)),
+    (ActionMenuItem, ()),
+    (RuntimeListMenuItem, (("initial_rows", "i"),)),
+    (CustomBuilderMenuItem, (("menu_type", CustomBuilderMenuItem.CustomMenuType),)),
+    (EditableTextMenuItem, (("text_length", "i"), ("item_type", EditItemType))),
+    (FloatMenuItem, (("num_decimal_places", "i"),)),
+    (EditableLargeNumberMenuItem, (("digits_allowed", "i"), ("decimal_places", "i"), ("negative_allowed", "b"))),
+    (
+        ScrollChoiceMenuItem,
+        (
+            ("item_width", "i"),
+            ("eeprom_offset", "i"),
+            ("num_entries", "i"),
+            ("choice_mode", ScrollChoiceMenuItem.ScrollChoiceMode),
+            ("variable", "s"),
+        ),
+    ),
+    (Rgb32MenuItem, (("include_alpha_channel", "b"),)),
+)
+
+"""The MenuState class used for each storage type."""
+STATE_CLASSES: dict[StorageType, type[MenuState]] = {
+    StorageType.INTEGER: IntegerMenuState,
+    StorageType.BOOLEAN: BooleanMenuState,
+    StorageType.FLOAT: FloatMenuState,
+    StorageType.STRING: StringMenuState,
+    StorageType.STRING_LIST: StringListMenuState,
+    StorageType.SCROLL_POSITION: CurrentScrollPositionMenuState,
+    StorageType.PORTABLE_COLOR: PortableColorMenuState,
+    StorageType.BIG_DECIMAL: BigDecimalMenuState,
+}
+_STORAGE_TYPES: tuple[StorageType, ...] = tuple(StorageType)
+_STATE_VALUE: dict[StorageType, struct.Struct] = {
+    StorageType.INTEGER: struct.Struct("<q"),
+    StorageType.BOOLEAN: struct.Struct("<B"),
+    StorageType.FLOAT: struct.Struct("<d"),
+    StorageType.STRING: struct.Struct("<I"),
+    StorageType.STRING_LIST: _COUNT,
+    StorageType.SCROLL_POSITION: struct.Struct("<qI"),
+    StorageType.PORTABLE_COLOR: struct.Struct("<BBBB"),
+    StorageType.BIG_DECIMAL: struct.Struct("<d"),
+}
+
+
+class _ItemLayout:
+    __slots__ = ("tag", "item_class", "fields", "fixed", "has_list")
+
+    _CODES = {"i": "i", "b": "B", "s": "I"}
+
+    def __init__(self, tag: int, item_class: type[MenuItem], fields: tuple[tuple[str, Union[str, type[Enum]]], ...]):
+        self.tag = tag
+        self.item_class = item_class
+        self.fields = tuple((name, tuple(kind) if isinstance(kind, type) else kind) for name, kind in fields)
+        self.has_list = any(kind == "l" for _, kind in fields)
+        self.fixed = struct.Struct(
+            "<"
+            + "".join("B" if isinstance(kind, tuple) else self._CODES[kind] for _, kind in self.fields if kind != "l")
+        )
+
+
+_LAYOUTS_BY_TAG: dict[int, _ItemLayout] = {
+    tag: _ItemLayout(tag, item_class, fields) for tag, (item_class, fields) in enumerate(_ITEM_LAYOUTS, start=1)
+}
+_LAYOUTS_BY_CLASS: dict[type[MenuItem], _ItemLayout] = {
+    layout.item_class: layout for layout in _LAYOUTS_BY_TAG.values()
+}
+
+
+class _SnapshotWriter:
+    def __init__(self):
+        self._strings: dict[str, int] = {}
+        self._records = bytearray()
+        self._index = bytearray()
+        self.count = 0
+
+    def string(self, value: Optional[str]) -> int:
+        if value is None:
+            return _NO_STRING
+        index = self._strings.get(value)
+        if index is None:
+            index = self._strings[value] = len(self._strings)
+        return index
+
+    def add(self, item: MenuItem, parent_id: int, state: Optional[MenuState]) -> None:
+        layout = _LAYOUTS_BY_CLASS.get(type(item))
+        if layout is None:
+            raise ValueError(f"Menu item type {type(item).__name__} can not be written to a snapshot")
+
+        flags = (
+            (_READ_ONLY if item.read_only else 0)
+            | (_LOCAL_ONLY if item.local_only else 0)
+            | (_VISIBLE if item.visible else 0)
+            | (_STATE_CHANGED if state is not None and state.changed else 0)
+            | (_STATE_ACTIVE if state is not None and state.active else 0)
+        )
+
+        self._index += _INDEX_ENTRY.pack(item.id, parent_id, _HEADER.size + len(self._records))
+        records = self._records
+        records += _COMMON.pack(
+            layout.tag,
+            item.eeprom_address,
+            self.string(item.name),
+            self.string(item.variable_name),
+            self.string(item.function_name),
+            flags,
+        )
+
+        fixed = []
+        entries = ()
+        for name, kind in layout.fields:
+            value = getattr(item, name)
+            if kind == "l":
+                entries = value
+            elif kind == "s":
+                fixed.append(self.string(value))
+            elif isinstance(kind, tuple):
+                fixed.append(kind.index(value))
+            else:
+                fixed.append(int(value))
+        records += layout.fixed.pack(*fixed)
+        if layout.has_list:
+            self._write_strings(entries)
+
+        self._write_state(state)
+        self.count += 1
+
+    def _write_strings(self, values) -> None:
+        self._records += _COUNT.pack(len(values))
+        self._records += struct.pack(f"<{len(values)}I", *(self.string(str(value)) for value in values))
+
+    def _write_state(self, state: Optional[MenuState]) -> None:
+        records = self._records
+        if state is None:
+            records.append(0)
+            return
+
+        storage = state.storage_type
+        records.append(_STORAGE_TYPES.index(storage) + 1)
+        value = state.value
+        packer = _STATE_VALUE[storage]
+
+        if storage == StorageType.STRING_LIST:
+            self._write_strings(PagedStringList.loaded_values_of(value))
+        elif storage == StorageType.STRING:
+            records += packer.pack(self.string(str(value)))
+        elif storage == StorageType.SCROLL_POSITION:
+            records += packer.pack(value.position, self.string(value.value))
+        elif storage == StorageType.PORTABLE_COLOR:
+            records += packer.pack(value.red, value.green, value.blue, value.alpha)
+        elif storage in (StorageType.FLOAT, StorageType.BIG_DECIMAL):
+            records += packer.pack(float(value))
+        else:
+            records += packer.pack(int(value))
+
+    def write(self, stream: BinaryIO) -> int:
+        encoded = [value.encode("utf-8") for value in self._strings]
+        offsets = [0]
+        for value in encoded:
+            offsets.append(offsets[-1] + len(value))
+
+        index_offset = _HEADER.size + len(self._records)
+        strings_offset = index_offset + len(self._index)
+
+        stream.write(_HEADER.pack(_MAGIC, _VERSION, 0, self.count, index_offset, strings_offset))
+        stream.write(self._records)
+        stream.write(self._index)
+        stream.write(_COUNT.pack(len(encoded)))
+        stream.write(struct.pack(f"<{len(offsets)}I", *offsets))
+        for value in encoded:
+            stream.write(value)
+        return strings_offset + _COUNT.size + 4 * len(offsets) + offsets[-1]
+
+
+class MenuSnapshot:
+    """
+    A compact, versioned binary snapshot of a menu tree, holding the structure and the current state of each item.
+    It is intended for fast restarts, where the tree is persisted on shutdown and reloaded on start.
+
+    A snapshot consists of a header, the item records in tree order (submenus before their children), an index of
+    item ID, parent ID and record offset, and a table of all strings used. Records hold a type tag, packed numeric
+    fields and string table references.
+
+    Loading with `open` maps the file into memory and nothing is decoded up front. Items, states and strings are each
+    decoded on first access and cached, so looking up a few values from a large snapshot is cheap. Use `to_menu_tree`
+    to build a complete MenuTree.
+
+    <pre>
+        MenuSnapshot.save(tree, "menu.snapshot")
+        with MenuSnapshot.open("menu.snapshot") as snapshot:
+            tree = snapshot.to_menu_tree()
+    </pre>
+
+    :param buffer: the snapshot contents, bytes or a memory map.
+    :raises ValueError: if the buffer is not a snapshot or has an unsupported version.
+    """
+
+    VERSION: int = _VERSION
+
+    def __init__(self, buffer: Union[bytes, mmap.mmap]):
+        if len(buffer) < _HEADER.size:
+            raise ValueError("Buffer is too short to be a menu snapshot")
+        magic, version, _, count, index_offset, strings_offset = _HEADER.unpack_from(buffer, 0)
+        if magic != _MAGIC:
+            raise ValueError("Not a menu snapshot")
+        if version != _VERSION:
+            raise ValueError(f"Unsupported menu snapshot version {version}")
+
+        self._buffer = buffer
+        self._count = count
+        self._index_offset = index_offset
+        self._strings_offset = strings_offset
+        self._string_count = _COUNT.unpack_from(buffer, strings_offset)[0]
+        self._string_data = strings_offset + _COUNT.size + 4 * (self._string_count + 1)
+        self._string_cache: dict[int, str] = {}
+        self._positions: Optional[dict[int, int]] = None
+        self._decoded: dict[int, tuple[MenuItem, Optional[MenuState]]] = {}
+        self._file = None
+
+    @staticmethod
+    def open(path: str) -> "MenuSnapshot":
+        """
+        Maps a snapshot file into memory without decoding it, close the snapshot when done.
+        :param path: the snapshot file.
+        :return: the snapshot.
+        """
+        with open(path, "rb") as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        snapshot = MenuSnapshot(mapped)
+        snapshot._file = mapped
+        return snapshot
+
+    @staticmethod
+    def write(tree: MenuTree, stream: BinaryIO) -> int:
+        """
+        Writes a snapshot of the tree structure and the state of every item.
+        :param tree: the tree to write.
+        :param stream: a binary stream.
+        :return: the number of bytes written.
+        :raises ValueError: if the tree holds an item type that can not be written.
+        """
+        writer = _SnapshotWriter()
+        pending = [MenuTree.ROOT]
+        while pending:
+            parent = pending.pop()
+            children = tree.get_menu_items(parent) or ()
+            for item in children:
+                writer.add(item, parent.id, tree.get_menu_state(item))
+            # Children are visited in reverse so submenus are written in the order they appear.
+            pending.extend(item for item in reversed(children) if item.has_children())
+        return writer.write(stream)
+
+    @staticmethod
+    def save(tree: MenuTree, path: str) -> int:
+        """
+        Writes a snapshot of the tree to a file.
+        :param tree: the tree to write.
+        :param path: the snapshot file, replaced if it exists.
+        :return: the number of bytes written.
+        """
+        with open(path, "wb") as file:
+            return MenuSnapshot.write(tree, file)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "MenuSnapshot":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, item_id: int) -> bool:
+        return item_id in self._item_positions()
+
+    def item_ids(self) -> tuple[int, ...]:
+        """
+        :return: the ID of every item in tree order.
+        """
+        return tuple(self._item_positions())
+
+    def get_item(self, item_id: int) -> Optional[MenuItem]:
+        """
+        Decodes the item with the given ID, if it has not been decoded already.
+        :param item_id: the item ID.
+        :return: the item, or None if it is not in the snapshot.
+        """
+        decoded = self._decode(item_id)
+        return decoded[0] if decoded is not None else None
+
+    def get_state(self, item_id: int) -> Optional[MenuState]:
+        """
+        Decodes the state of the item with the given ID.
+        :param item_id: the item ID.
+        :return: the state, or None if the item had no state or is not in the snapshot.
+        """
+        decoded = self._decode(item_id)
+        return decoded[1] if decoded is not None else None
+
+    def get_parent_id(self, item_id: int) -> Optional[int]:
+        """
+        :param item_id: the item ID.
+        :return: the ID of the submenu that holds the item, or None if the item is not in the snapshot.
+        """
+        position = self._item_positions().get(item_id)
+        if position is None:
+            return None
+        return _INDEX_ENTRY.unpack_from(self._buffer, self._index_offset + position * _INDEX_ENTRY.size)[1]
+
+    def persisted_menus(self) -> Iterator[PersistedMenu]:
+        """
+        Yields every item as a PersistedMenu in tree order, with the current value as the default value, so a snapshot
+        can be converted to the JSON format.
+        :return: an iterator of persisted items.
+        """
+        for item, parent_id, state in self._entries():
+            default_value = str(state.value) if state is not None else None
+            yield PersistedMenu(item, parent_id, default_value=default_value)
+
+    def to_menu_tree(self, tree: Optional[MenuTree] = None) -> MenuTree:
+        """
+        Builds a tree holding every item and state in the snapshot.
+        :param tree: (optional) An empty tree to add the items to, by default a new tree.
+        :return: the tree.
+        """
+        if tree is None:
+            tree = MenuTree()
+        tree.add_items_in_order(self._entries())
+        return tree
+
+    def _entries(self) -> Iterator[tuple[MenuItem, int, Optional[MenuState]]]:
+        buffer = self._buffer
+        offset = self._index_offset
+        for position in range(self._count):
+            item_id, parent_id, record = _INDEX_ENTRY.unpack_from(buffer, offset + position * _INDEX_ENTRY.size)
+            decoded = self._decoded.get(item_id)
+            if decoded is None:
+                decoded = self._decoded[item_id] = self._decode_record(item_id, record)
+            yield decoded[0], parent_id, decoded[1]
+
+    def _item_positions(self) -> dict[int, int]:
+        if self._positions is None:
+            view = self._buffer[self._index_offset : self._index_offset + self._count * _INDEX_ENTRY.size]
+            self._positions = {
+                item_id: position for position, (item_id, _, _) in enumerate(_INDEX_ENTRY.iter_unpack(view))
+            }
+        return self._positions
+
+    def _decode(self, item_id: int) -> Optional[tuple[MenuItem, Optional[MenuState]]]:
+        decoded = self._decoded.get(item_id)
+        if decoded is None:
+            position = self._item_positions().get(item_id)
+            if position is None:
+                return None
+            entry_offset = self._index_offset + position * _INDEX_ENTRY.size
+            record = _INDEX_ENTRY.unpack_from(self._buffer, entry_offset)[2]
+            decoded = self._decoded[item_id] = self._decode_record(item_id, record)
+        return decoded
+
+    def _string(self, index: int) -> Optional[str]:
+        if index == _NO_STRING:
+            return None
+        value = self._string_cache.get(index)
+        if value is None:
+            start, end = struct.unpack_from("<II", self._buffer, self._strings_offset + _COUNT.size + 4 * index)
+            value = self._buffer[self._string_data + start : self._string_data + end].decode("utf-8")
+            self._string_cache[index] = value
+        return value
+
+    def _strings(self, offset: int) -> tuple[tuple[str, ...], int]:
+        count = _COUNT.unpack_from(self._buffer, offset)[0]
+        offset += _COUNT.size
+        indexes = struct.unpack_from(f"<{count}I", self._buffer, offset)
+        return tuple(self._string(index) for index in indexes), offset + 4 * count
+
+    def _decode_record(self, item_id: int, offset: int) -> tuple[MenuItem, Optional[MenuState]]:
+        buffer = self._buffer
+        tag, eeprom_address, name, variable_name, function_name, flags = _COMMON.unpack_from(buffer, offset)
+        offset += _COMMON.size
+        layout = _LAYOUTS_BY_TAG.get(tag)
+        if layout is None:
+            raise ValueError(f"Unknown item type {tag} for item {item_id} in snapshot")
+
+        fields = {
+            "id": item_id,
+            "eeprom_address": eeprom_address,
+            "name": self._string(name),
+            "variable_name": self._string(variable_name),
+            "function_name": self._string(function_name),
+            "read_only": bool(flags & _READ_ONLY),
+            "local_only": bool(flags & _LOCAL_ONLY),
+            "visible": bool(flags & _VISIBLE),
+        }
+
+        values = iter(layout.fixed.unpack_from(buffer, offset))
+        offset += layout.fixed.size
+        for field_name, kind in layout.fields:
+            if kind == "l":
+                fields[field_name], offset = self._strings(offset)
+                continue
+            value = next(values)
+            if kind == "s":
+                fields[field_name] = self._string(value)
+            elif kind == "b":
+                fields[field_name] = bool(value)
+            elif isinstance(kind, tuple):
+                fields[field_name] = kind[value]
+            else:
+                fields[field_name] = value
+
+        # noinspection PyArgumentList
+        item = layout.item_class(**fields)
+        return item, self._decode_state(item, flags, offset)
+
+    def _decode_state(self, item: MenuItem, flags: int, offset: int) -> Optional[MenuState]:
+        storage_tag = self._buffer[offset]
+        if storage_tag == 0:
+            return None
+
+        storage = _STORAGE_TYPES[storage_tag - 1]
+        offset += 1
+        if storage == StorageType.STRING_LIST:
+            value = list(self._strings(offset)[0])
+        else:
+            unpacked = _STATE_VALUE[storage].unpack_from(self._buffer, offset)
+            if storage == StorageType.STRING:
+                value = self._string(unpacked[0])
+            elif storage == StorageType.SCROLL_POSITION:
+                value = CurrentScrollPosition(unpacked[0], self._string(unpacked[1]))
+            elif storage == StorageType.PORTABLE_COLOR:
+                value = PortableColor(*unpacked)
+            elif storage == StorageType.BOOLEAN:
+                value = bool(unpacked[0])
+            else:
+                value = unpacked[0]
+
+        return STATE_CLASSES[storage](
+            item=item, changed=bool(flags & _STATE_CHANGED), active=bool(flags & _STATE_ACTIVE), value=value
+        )
@@ -0,0 +1,302 @@
+import json
+import logging
+import os
+import struct
+import zlib
+from dataclasses import dataclass
+from enum import Enum, auto
+from typing import Any, Iterator, Optional
+
+from tcmenu.domain.menu_items import MenuItem
+from tcmenu.domain.state.current_scroll_position import CurrentScrollPosition
+from tcmenu.domain.state.menu_state import MenuState
+from tcmenu.domain.state.menu_tree import MenuTree
+from tcmenu.domain.state.paged_string_list import PagedStringList
+from tcmenu.domain.state.portable_color import PortableColor
+from tcmenu.persist.json_menu_item_serializer import JsonMenuItemSerializer
+from tcmenu.persist.menu_snapshot import STATE_CLASSES, MenuSnapshot
+
+StorageType = MenuState.StateStorageType
+
+_MAGIC = b"TCMJRNL\x00"
+_VERSION = 1
+_HEADER = struct.Struct("<8sH")
+# A record is the crc32 of the rest of the record, then payload length, item id, storage type and flags, then the
+# value as JSON.
+_CRC = struct.Struct("<I")
+_RECORD = struct.Struct("<IiBB")
+_STORAGE_TYPES: tuple[StorageType, ...] = tuple(StorageType)
+
+_CHANGED = 0x01
+_ACTIVE = 0x02
+
+
+# noinspection PyArgumentList
+class SnapshotFormat(Enum):
+    """
+    The format used for the snapshot that the journal is compacted into.
+    """
+
+    """The copy text format of JsonMenuItemSerializer, the current values are stored as default values."""
+    JSON = auto()
+
+    """The binary format of MenuSnapshot, which keeps the complete state of each item."""
+    BINARY = auto()
+
+
+@dataclass(frozen=True)
+class JournalRecord:
+    """One state change read back from a journal."""
+
+    item_id: int
+    storage_type: MenuState.StateStorageType
+    value: Any
+    changed: bool
+    active: bool
+
+
+class StateJournal:
+    """
+    An append-only journal of menu state changes, so that saving the values of a tree costs in proportion to the
+    number of changes rather than the size of the tree. Once attached to a tree, every state stored by
+    `MenuTree.change_item` is appended to the journal as an item ID and value record.
+
+    The journal is periodically compacted: a snapshot of the whole tree is written (atomically replacing the previous
+    one) and the journal is truncated. Records hold absolute values, so replaying a journal over a newer snapshot, for
+    example after a crash during compaction, gives the same result. `recover` loads the snapshot and replays the
+    journal on top of it. Each record carries a CRC, a torn write at the end of the journal is ignored on recovery
+    and cut off when the journal is next attached.
+
+    <pre>
+        tree = StateJournal.recover("menu.journal", "menu.snapshot")
+        journal = StateJournal("menu.journal", "menu.snapshot")
+        journal.attach(tree)
+    </pre>
+
+    :param journal_path: the journal file.
+    :param snapshot_path: the snapshot file the journal is compacted into.
+    :param snapshot_format: (optional) The snapshot format.
+    :param compact_after: (optional) Journal size in bytes at which it is compacted automatically, None to only
+                          compact when `compact` is called.
+    :param sync: (optional) When True every record is flushed and synced to storage as it is written, otherwise
+                 records are buffered until `flush`.
+    """
+
+    logger = logging.getLogger("StateJournal")
+
+    def __init__(
+        self,
+        journal_path: str,
+        snapshot_path: str,
+        snapshot_format: SnapshotFormat = SnapshotFormat.BINARY,
+        compact_after: Optional[int] = 1024 * 1024,
+        sync: bool = False,
+    ):
+        self._journal_path = journal_path
+        self._snapshot_path = snapshot_path
+        self._snapshot_format = snapshot_format
+        self._compact_after = compact_after
+        self._sync = sync
+        self._tree: Optional[MenuTree] = None
+        self._file = None
+        self.records_written = 0
+        self.compactions = 0
+
+    @property
+    def tree(self) -> Optional[MenuTree]:
+        return self._tree
+
+    def attach(self, tree: MenuTree) -> None:
+        """
+        Starts journaling the state changes of the tree. The tree should be the one returned by `recover`, or a new
+        tree, in which case a snapshot is written first if there is none.
+        :param tree: the tree to journal.
+        """
+        self.detach()
+        self._tree = tree
+        if not os.path.exists(self._snapshot_path):
+            self.compact()
+        else:
+            self._open_journal(truncate=False)
+        tree.add_state_listener(self.record)
+
+    def detach(self) -> None:
+        """
+        Stops journaling and closes the journal file, buffered records are written.
+        """
+        if self._tree is not None:
+            self._tree.remove_state_listener(self.record)
+            self._tree = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    close = detach
+
+    def record(self, item: MenuItem, state: MenuState) -> None:
+        """
+        Appends a state change to the journal, this is the listener registered on the attached tree.
+        :param item: the item that changed.
+        :param state: its new state.
+        """
+        if self._file is None:
+            return
+
+        flags = (_CHANGED if state.changed else 0) | (_ACTIVE if state.active else 0)
+        payload = json.dumps(StateJournal._encode_value(state), separators=(",", ":")).encode("utf-8")
+        body = _RECORD.pack(len(payload), item.id, _STORAGE_TYPES.index(state.storage_type), flags) + payload
+        self._file.write(_CRC.pack(zlib.crc32(body)) + body)
+        self.records_written += 1
+
+        if self._sync:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        if self._compact_after is not None and self._file.tell() >= self._compact_after:
+            self.compact()
+
+    def flush(self) -> None:
+        if self._file is not None:
+            self._file.flush()
+
+    def compact(self) -> None:
+        """
+        Writes a snapshot of the attached tree and truncates the journal.
+        """
+        if self._tree is None:
+            raise ValueError("Journal is not attached to a tree")
+
+        temp_path = self._snapshot_path + ".tmp"
+        with open(temp_path, "wb") as file:
+            if self._snapshot_format == SnapshotFormat.BINARY:
+                MenuSnapshot.write(self._tree, file)
+            else:
+                file.write(JsonMenuItemSerializer.items_to_copy_text(MenuTree.ROOT, self._tree).encode("utf-8"))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, self._snapshot_path)
+
+        self._open_journal(truncate=True)
+        self.compactions += 1
+
+    @staticmethod
+    def recover(
+        journal_path: str, snapshot_path: str, snapshot_format: SnapshotFormat = SnapshotFormat.BINARY
+    ) -> MenuTree:
+        """
+        Rebuilds a tree from the snapshot and replays the journal on top of it, a missing journal is treated as empty.
+        :param journal_path: the journal file.
+        :param snapshot_path: the snapshot file.
+        :param snapshot_format: (optional) The snapshot format.
+        :return: the recovered tree.
+        """
+        if snapshot_format == SnapshotFormat.BINARY:
+            with MenuSnapshot.open(snapshot_path) as snapshot:
+                tree = snapshot.to_menu_tree()
+        else:
+            with open(snapshot_path, encoding="utf-8") as file:
+                tree = JsonMenuItemSerializer.new_menu_tree_with_items(file.read())
+
+        if not os.path.exists(journal_path):
+            return tree
+
+        latest: dict[int, JournalRecord] = {
+            record.item_id: record for record in StateJournal.read_records(journal_path)
+        }
+        items_by_id = {item.id: item for item in tree.get_all_menu_items()}
+        for item_id, record in latest.items():
+            item = items_by_id.get(item_id)
+            if item is None:
+                StateJournal.logger.warning(f"Journal holds a value for item {item_id} that is not in the snapshot")
+                continue
+            tree.change_item(
+                item,
+                STATE_CLASSES[record.storage_type](
+                    item=item, changed=record.changed, active=record.active, value=record.value
+                ),
+            )
+        return tree
+
+    @staticmethod
+    def read_records(journal_path: str) -> Iterator[JournalRecord]:
+        """
+        Reads the records of a journal in the order they were written, stopping at a torn or corrupt record.
+        :param journal_path: the journal file.
+        :return: an iterator of the records.
+        :raises ValueError: if the file is not a journal.
+        """
+        with open(journal_path, "rb") as file:
+            data = file.read()
+
+        if len(data) < _HEADER.size or _HEADER.unpack_from(data, 0) != (_MAGIC, _VERSION):
+            raise ValueError("Not a state journal, or unsupported version")
+
+        header_size = _CRC.size + _RECORD.size
+        for offset, end in StateJournal._record_spans(data):
+            _, item_id, storage, flags = _RECORD.unpack_from(data, offset + _CRC.size)
+            storage_type = _STORAGE_TYPES[storage]
+            value = StateJournal._decode_value(storage_type, json.loads(data[offset + header_size : end]))
+            yield JournalRecord(item_id, storage_type, value, bool(flags & _CHANGED), bool(flags & _ACTIVE))
+
+    @staticmethod
+    def _record_spans(data: bytes) -> Iterator[tuple[int, int]]:
+        """The start and end offset of each record whose CRC matches, up to the first torn or corrupt record."""
+        offset = _HEADER.size
+        header_size = _CRC.size + _RECORD.size
+        while offset + header_size <= len(data):
+            crc = _CRC.unpack_from(data, offset)[0]
+            length = _RECORD.unpack_from(data, offset + _CRC.size)[0]
+            end = offset + header_size + length
+            if end > len(data) or zlib.crc32(data[offset + _CRC.size : end]) != crc:
+                StateJournal.logger.warning(f"Journal record at {offset} is incomplete or corrupt, ignoring the rest")
+                return
+            yield offset, end
+            offset = end
+
+    def _open_journal(self, truncate: bool) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+        data = b""
+        if not truncate and os.path.exists(self._journal_path):
+            with open(self._journal_path, "rb") as file:
+                data = file.read()
+
+        if len(data) < _HEADER.size:
+            self._file = open(self._journal_path, "wb")
+            self._file.write(_HEADER.pack(_MAGIC, _VERSION))
+            self._file.flush()
+            return
+
+        if _HEADER.unpack_from(data, 0) != (_MAGIC, _VERSION):
+            raise ValueError("Not a state journal, or unsupported version")
+
+        # Records appended after a torn or corrupt record could never be read back, so the journal is cut back to the
+        # end of its last valid record before appending.
+        valid_end = _HEADER.size
+        for _, valid_end in StateJournal._record_spans(data):
+            pass
+        self._file = open(self._journal_path, "r+b")
+        self._file.truncate(valid_end)
+        self._file.seek(valid_end)
+
+    @staticmethod
+    def _encode_value(state: MenuState) -> Any:
+        value = state.value
+        if state.storage_type == StorageType.SCROLL_POSITION:
+            return [value.position, value.value]
+        elif state.storage_type == StorageType.PORTABLE_COLOR:
+            return [value.red, value.green, value.blue, value.alpha]
+        elif state.storage_type == StorageType.STRING_LIST:
+            return list(PagedStringList.loaded_values_of(value))
+        return value
+
+    @staticmethod
+    def _decode_value(storage_type: MenuState.StateStorageType, value: Any) -> Any:
+        if storage_type == StorageType.SCROLL_POSITION:
+            return CurrentScrollPosition(*value)
+        elif storage_type == StorageType.PORTABLE_COLOR:
+            return PortableColor(*value)
+        elif storage_type in (StorageType.FLOAT, StorageType.BIG_DECIMAL):
+            return float(value)
+        return value
@@ -0,0 +1,20 @@
+from tcmenu._lazy import lazy_submodules
+
+__getattr__, __dir__ = lazy_submodules(
+    __name__,
+    (
+        "bounded_output_queue",
+        "cached_bootstrap",
+        "capture_analysis",
+        "change_coalescing_queue",
+        "commands",
+        "heartbeat_scheduler",
+        "menu_command_protocol",
+        "menu_tree_updater",
+        "pending_request_table",
+        "protocol",
+        "protocol_stats",
+        "session_capture",
+        "timing_wheel",
+    ),
+)
@@ -0,0 +1,245 @@
+import io
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, replace
+from enum import Enum, auto
+from typing import Any, Callable, Optional
+
+from tcmenu.remote.change_coalescing_queue import ChangeCoalescingQueue
+from tcmenu.remote.commands.menu_command import MenuCommand
+from tcmenu.remote.menu_command_protocol import MenuCommandProtocol
+
+
+# noinspection PyArgumentList
+class OverflowPolicy(Enum):
+    """
+    What a BoundedOutputQueue does when a command is put while it is full.
+    """
+
+    """The producer waits until there is space, or until its timeout expires."""
+    BLOCK = auto()
+
+    """The oldest queued command is discarded to make space."""
+    DROP_OLDEST = auto()
+
+    """
+    Changes are coalesced with pending changes for the same item at all times, and if the queue is still full the
+    oldest queued command is discarded.
+    """
+    COALESCE = auto()
+
+
+@dataclass
+class OutputQueueMetrics:
+    """
+    Metrics for a BoundedOutputQueue, a snapshot is returned by `BoundedOutputQueue.metrics`.
+    """
+
+    """Commands currently queued."""
+    depth: int = 0
+
+    """The highest depth seen."""
+    max_depth: int = 0
+
+    """Commands accepted onto the queue."""
+    enqueued: int = 0
+
+    """Commands taken from the queue for writing."""
+    written: int = 0
+
+    """Commands discarded because the queue was full, or rejected after a BLOCK timeout."""
+    dropped: int = 0
+
+    """Changes merged into a pending change for the same item by the COALESCE policy."""
+    coalesced: int = 0
+
+    """Number of times the high watermark was reached."""
+    pauses: int = 0
+
+    """Total seconds spent between reaching the high watermark and falling back to the low watermark."""
+    stall_time: float = 0.0
+
+    """Total seconds producers spent blocked waiting for space."""
+    blocked_time: float = 0.0
+
+
+class BoundedOutputQueue:
+    """
+    A bounded, per connection queue of outgoing commands that protects the process from slow or stalled peers.
+    Producers `put` commands and the connection writer takes encoded frames with `next_frame`, the commands are only
+    converted with `to_channel` as they are taken, so nothing is encoded for commands that are later discarded.
+
+    When the depth reaches `high_watermark` the queue is paused and `on_pause` is called, producers should stop
+    generating traffic for the connection until `on_resume` is called, which happens once the depth falls to
+    `low_watermark`. The callbacks are made without any lock held. What happens when a command is put on a full
+    queue is decided by the overflow policy.
+
+    :param protocol: the protocol used to encode commands.
+    :param capacity: (optional) The maximum number of queued commands.
+    :param policy: (optional) The overflow policy.
+    :param high_watermark: (optional) Depth at which producers are paused, by default 80% of capacity.
+    :param low_watermark: (optional) Depth at which producers are resumed, by default 50% of capacity.
+    :param on_pause: (optional) Called when the high watermark is reached.
+    :param on_resume: (optional) Called when the depth falls back to the low watermark.
+    :param clock: (optional) Monotonic time source in seconds, mainly for testing.
+    """
+
+    def __init__(
+        self,
+        protocol: MenuCommandProtocol,
+        capacity: int = 1024,
+        policy: OverflowPolicy = OverflowPolicy.BLOCK,
+        high_watermark: Optional[int] = None,
+        low_watermark: Optional[int] = None,
+        on_pause: Optional[Callable[[], Any]] = None,
+        on_resume: Optional[Callable[[], Any]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if capacity < 1:
+            raise ValueError("Capacity must be at least 1")
+
+        self._protocol = protocol
+        self._capacity = capacity
+        self._policy = policy
+        self._high_watermark = high_watermark if high_watermark is not None else max(1, capacity * 8 // 10)
+        self._low_watermark = (
+            low_watermark if low_watermark is not None else min(capacity // 2, self._high_watermark - 1)
+        )
+        if not 0 <= self._low_watermark < self._high_watermark <= capacity:
+            raise ValueError("Watermarks must satisfy 0 <= low < high <= capacity")
+
+        self._on_pause = on_pause
+        self._on_resume = on_resume
+        self._clock = clock
+
+        self._queue = ChangeCoalescingQueue(flush_interval=0) if policy == OverflowPolicy.COALESCE else deque()
+        self._condition = threading.Condition()
+        self._paused = False
+        self._pause_started = 0.0
+        self._closed = False
+        self._metrics = OutputQueueMetrics()
+
+    @property
+    def policy(self) -> OverflowPolicy:
+        return self._policy
+
+    @property
+    def paused(self) -> bool:
+        """True while the queue is between the high and low watermarks, producers should hold back."""
+        return self._paused
+
+    @property
+    def metrics(self) -> OutputQueueMetrics:
+        """
+        :return: a snapshot of the queue metrics; stall time includes the current stall if paused.
+        """
+        with self._condition:
+            snapshot = replace(self._metrics, depth=len(self._queue))
+            if self._paused:
+                snapshot.stall_time += self._clock() - self._pause_started
+        return snapshot
+
+    def put(self, command: MenuCommand, timeout: Optional[float] = None) -> bool:
+        """
+        Queues a command for writing.
+        :param command: the command to queue.
+        :param timeout: optional; for the BLOCK policy, the maximum seconds to wait for space. None waits forever
+        and zero never waits.
+        :return: True if the command was queued, False if it was rejected because the queue was full or closed.
+        """
+        with self._condition:
+            if self._closed:
+                return False
+
+            if self._policy == OverflowPolicy.COALESCE:
+                depth_before = len(self._queue)
+                self._queue.put(command)
+                if len(self._queue) == depth_before:
+                    self._metrics.coalesced += 1
+                    self._metrics.enqueued += 1
+                    return True
+                if len(self._queue) > self._capacity:
+                    self._queue.pop()
+                    self._metrics.dropped += 1
+            elif len(self._queue) >= self._capacity:
+                if self._policy == OverflowPolicy.DROP_OLDEST:
+                    self._queue.popleft()
+                    self._metrics.dropped += 1
+                elif not self._wait_for_space(timeout):
+                    self._metrics.dropped += 1
+                    return False
+                self._queue.append(command)
+            else:
+                self._queue.append(command)
+
+            self._metrics.enqueued += 1
+            depth = len(self._queue)
+            self._metrics.max_depth = max(self._metrics.max_depth, depth)
+            self._condition.notify_all()
+
+            pause = not self._paused and depth >= self._high_watermark
+            if pause:
+                self._paused = True
+                self._pause_started = self._clock()
+                self._metrics.pauses += 1
+
+        if pause and self._on_pause is not None:
+            self._on_pause()
+        return True
+
+    def get(self, timeout: Optional[float] = None) -> Optional[MenuCommand]:
+        """
+        Takes the next command from the queue, waiting for one to arrive.
+        :param timeout: optional; the maximum seconds to wait, None waits forever and zero never waits.
+        :return: the command, or None if the wait timed out or the queue was closed.
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: len(self._queue) > 0 or self._closed, timeout):
+                return None
+            if len(self._queue) == 0:
+                return None
+
+            command = self._queue.pop() if self._policy == OverflowPolicy.COALESCE else self._queue.popleft()
+            self._metrics.written += 1
+            self._condition.notify_all()
+
+            resume = self._paused and len(self._queue) <= self._low_watermark
+            if resume:
+                self._paused = False
+                self._metrics.stall_time += self._clock() - self._pause_started
+
+        if resume and self._on_resume is not None:
+            self._on_resume()
+        return command
+
+    def next_frame(self, timeout: Optional[float] = None) -> Optional[bytes]:
+        """
+        Takes the next command and encodes it with the protocol.
+        :param timeout: optional; the maximum seconds to wait, None waits forever and zero never waits.
+        :return: the encoded frame, or None if the wait timed out or the queue was closed.
+        """
+        command = self.get(timeout)
+        if command is None:
+            return None
+
+        buffer = io.BytesIO()
+        self._protocol.to_channel(buffer, command)
+        return buffer.getvalue()
+
+    def close(self) -> None:
+        """
+        Closes the queue, waking any blocked producers and consumers. Commands still queued can be taken.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def _wait_for_space(self, timeout: Optional[float]) -> bool:
+        started = self._clock()
+        has_space = self._condition.wait_for(lambda: len(self._queue) < self._capacity or self._closed, timeout)
+        self._metrics.blocked_time += self._clock() - started
+        return has_space and not self._closed
@@ -0,0 +1,277 @@
+import logging
+import os
+import re
+import struct
+from typing import Any, Optional
+
+from tcmenu.domain.menu_items import MenuItem
+from tcmenu.domain.state.menu_tree import MenuTree
+from tcmenu.persist.menu_snapshot import MenuSnapshot
+from tcmenu.remote.commands.menu_boot_commands import BootItemMenuCommand
+from tcmenu.remote.commands.menu_bootstrap_command import MenuBootstrapCommand
+from tcmenu.remote.commands.menu_command import MenuCommand
+from tcmenu.remote.commands.menu_join_command import MenuJoinCommand
+from tcmenu.remote.menu_tree_updater import MenuTreeUpdater
+from tcmenu.remote.protocol_stats import ProtocolStats
+
+_MAGIC = b"TCMBOOT\x00"
+_VERSION = 1
+
+# magic, version, structure fingerprint
+_HEADER = struct.Struct("<8sH16s")
+
+
+class BootstrapCache:
+    """
+    Keeps a copy of the menu tree of each remote device on disk, so that when a device connects again its tree can be
+    shown straight away, rather than once the whole bootstrap has been received. Devices are told apart by the app UUID
+    and serial number in the join they send. Each file holds the structure fingerprint of the tree followed by a
+    MenuSnapshot of its items and their last known values.
+
+    :param directory: the directory that holds the cached trees, created when the first tree is saved.
+    """
+
+    logger = logging.getLogger("BootstrapCache")
+
+    def __init__(self, directory: str):
+        self._directory = directory
+
+    @property
+    def directory(self) -> str:
+        return self._directory
+
+    def path_for(self, join: MenuJoinCommand) -> str:
+        """
+        :param join: the join sent by the device.
+        :return: the file that holds the cached tree of the device.
+        """
+        serial_number = re.sub(r"[^A-Za-z0-9_.-]", "_", str(join.serial_number))
+        return os.path.join(self._directory, f"{join.app_uuid}-{serial_number}.tcmboot")
+
+    def fingerprint(self, join: MenuJoinCommand) -> Optional[str]:
+        """
+        Reads the structure fingerprint of the cached tree of a device without loading the tree.
+        :param join: the join sent by the device.
+        :return: the fingerprint, or None if the device is not cached.
+        """
+        try:
+            with open(self.path_for(join), "rb") as file:
+                return self._check_header(file.read(_HEADER.size))
+        except (OSError, ValueError):
+            return None
+
+    def load(self, join: MenuJoinCommand, tree: MenuTree) -> Optional[str]:
+        """
+        Adds the cached items and values of a device to a tree. A cache that can not be read is logged and ignored, in
+        which case the tree is not changed.
+        :param join: the join sent by the device.
+        :param tree: an empty tree.
+        :return: the structure fingerprint of the cached tree, or None if the device is not cached.
+        """
+        path = self.path_for(join)
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            self.logger.warning(f"Cached tree {path} could not be read: {e}")
+            return None
+
+        try:
+            fingerprint = self._check_header(data)
+            snapshot = MenuSnapshot(data[_HEADER.size :])
+            # Decoded in full before the tree is touched, the items and states are kept by the snapshot.
+            snapshot.to_menu_tree()
+        except (ValueError, IndexError, struct.error, UnicodeDecodeError) as e:
+            self.logger.warning(f"Cached tree {path} is not valid and was ignored: {e}")
+            return None
+
+        snapshot.to_menu_tree(tree)
+        return fingerprint
+
+    def save(self, join: MenuJoinCommand, tree: MenuTree) -> int:
+        """
+        Replaces the cached tree of a device with the items and values of the tree.
+        :param join: the join sent by the device.
+        :param tree: the tree to cache.
+        :return: the number of bytes written.
+        :raises ValueError: if the tree holds an item type that can not be written to a snapshot.
+        """
+        path = self.path_for(join)
+        os.makedirs(self._directory, exist_ok=True)
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as file:
+            file.write(_HEADER.pack(_MAGIC, _VERSION, bytes.fromhex(tree.structure_fingerprint())))
+            size = _HEADER.size + MenuSnapshot.write(tree, file)
+        os.replace(temp_path, path)
+        return size
+
+    def remove(self, join: MenuJoinCommand) -> None:
+        """Removes the cached tree of a device, if there is one."""
+        try:
+            os.remove(self.path_for(join))
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _check_header(data: bytes) -> str:
+        if len(data) < _HEADER.size:
+            raise ValueError("Too short to be a cached tree")
+        magic, version, fingerprint = _HEADER.unpack_from(data, 0)
+        if magic != _MAGIC:
+            raise ValueError("Not a cached tree")
+        if version != _VERSION:
+            raise ValueError(f"Unsupported cached tree version {version}")
+        return fingerprint.hex()
+
+
+class CachedBootstrapUpdater(MenuTreeUpdater):
+    """
+    A MenuTreeUpdater that uses a BootstrapCache so that the tree of a known device is ready as soon as it joins. When
+    the join is applied and the device is cached, the cached items and values are added to the tree, which must be
+    empty at that point, and `ready` becomes True. The bootstrap that follows then only updates values, as boot items
+    that are the same as the cached ones do not change the tree.
+
+    When the bootstrap ends, the items received are checked against the tree. If the device has added, removed, moved
+    or changed items since it was cached, the tree is rebuilt as the device sent it, keeping the values received. The
+    cache is replaced whenever the structure or any value differs from what was cached, so the values shown on the
+    next join are those at the end of the latest bootstrap. A device that was not cached is saved at the end of its
+    first bootstrap.
+
+    <pre>
+        updater = CachedBootstrapUpdater(tree, BootstrapCache(cache_directory))
+        for command in received_commands:
+            updater.apply(command)
+    </pre>
+
+    :param tree: the tree to keep up to date.
+    :param cache: the cache of device trees.
+    :param stats: (optional) Stats that the time taken to apply each command is recorded to, see MenuTreeUpdater.
+    """
+
+    logger = logging.getLogger("CachedBootstrapUpdater")
+
+    def __init__(self, tree: MenuTree, cache: BootstrapCache, stats: Optional[ProtocolStats] = None):
+        super().__init__(tree, stats)
+        self._cache = cache
+        self._join: Optional[MenuJoinCommand] = None
+        self._cached_fingerprint: Optional[str] = None
+        self._cached_values: Optional[dict[int, Any]] = None
+        self._booting = False
+        self._ready = False
+        self._loaded_from_cache = False
+
+        """The items received in the current bootstrap by ID, in the order they were first received."""
+        self._booted: dict[int, tuple[MenuItem, int]] = {}
+
+    @property
+    def ready(self) -> bool:
+        """True once the tree can be shown, either loaded from the cache or at the end of the bootstrap."""
+        return self._ready
+
+    @property
+    def loaded_from_cache(self) -> bool:
+        return self._loaded_from_cache
+
+    def _apply(self, command: MenuCommand) -> bool:
+        # Joins load the cached tree and the end of a bootstrap reconciles the tree.
+        if isinstance(command, MenuJoinCommand):
+            return self._apply_join(command)
+        elif isinstance(command, MenuBootstrapCommand):
+            return self._apply_bootstrap(command)
+        elif isinstance(command, BootItemMenuCommand) and self._booting:
+            self._booted[command.menu_item.id] = (command.menu_item, command.sub_menu_id)
+        return super()._apply(command)
+
+    def _apply_boot_item(self, command: BootItemMenuCommand) -> bool:
+        tree = self.tree
+        item = command.menu_item
+        # Items that are the same as those cached leave the structure alone, an item the device has moved to another
+        # submenu is found when the bootstrap ends.
+        if tree.get_menu_by_id(item.id) != item:
+            tree.add_or_update_item(item=item, parent_id=command.sub_menu_id)
+
+        state = command.new_menu_state(tree.get_menu_state(item))
+        if state is not None:
+            tree.change_item(item, state)
+        return True
+
+    def _apply_join(self, join: MenuJoinCommand) -> bool:
+        previous, self._join = self._join, join
+        if self.tree.get_menu_items(MenuTree.ROOT) is not None:
+            self.logger.debug(f"Tree is not empty, the cached tree of {join.my_name} was not loaded")
+            self._cached_fingerprint = self._cache.fingerprint(join)
+            # The cached values are only known when the same device joins again.
+            if previous is None or self._cache.path_for(previous) != self._cache.path_for(join):
+                self._cached_values = None
+            return False
+
+        self._cached_fingerprint = self._cache.load(join, self.tree)
+        self._loaded_from_cache = self._cached_fingerprint is not None
+        if self._loaded_from_cache:
+            self._cached_values = self._values()
+            self._ready = True
+        return self._loaded_from_cache
+
+    def _apply_bootstrap(self, command: MenuBootstrapCommand) -> bool:
+        if command.boot_type == MenuBootstrapCommand.BootType.START:
+            self._booting = True
+            self._booted = {}
+            return False
+
+        if not self._booting:
+            return False
+        self._booting = False
+        rebuilt = self._reconcile()
+        self._booted = {}
+        self._ready = True
+        return rebuilt
+
+    def _reconcile(self) -> bool:
+        tree = self.tree
+        booted = MenuTree()
+        try:
+            booted.add_items_in_order((item, parent_id, None) for item, parent_id in self._booted.values())
+        except ValueError as e:
+            # Items sent before their submenu, the tree is left as the boot items built it.
+            self.logger.warning(f"Bootstrap could not be checked against the tree: {e}")
+            booted = None
+
+        rebuilt = booted is not None and booted.structure_fingerprint() != tree.structure_fingerprint()
+        if rebuilt:
+            self._rebuild()
+
+        values = self._values()
+        if self._join is not None and (
+            tree.structure_fingerprint() != self._cached_fingerprint or values != self._cached_values
+        ):
+            try:
+                self._cache.save(self._join, tree)
+                self._cached_fingerprint = tree.structure_fingerprint()
+                self._cached_values = values
+            except (OSError, ValueError) as e:
+                self.logger.warning(f"Tree of {self._join.my_name} could not be cached: {e}")
+        return rebuilt
+
+    def _values(self) -> dict[int, Any]:
+        tree = self.tree
+        states = (tree.get_menu_state(item) for item in tree.get_all_menu_items())
+        return {state.item.id: state.value for state in states if state is not None}
+
+    def _rebuild(self):
+        tree = self.tree
+        entries: list[tuple[MenuItem, MenuItem]] = []
+        pending = [MenuTree.ROOT]
+        while pending:
+            parent = pending.pop()
+            children = tree.get_menu_items(parent) or ()
+            entries.extend((item, parent) for item in children)
+            pending.extend(item for item in reversed(children) if item.has_children())
+
+        states = {item.id: tree.get_menu_state(item) for item, _ in entries}
+        # Each submenu comes before its children, so removing in reverse removes children first.
+        for item, parent in reversed(entries):
+            tree.remove_menu_item(item, parent)
+
+        tree.add_items_in_order((item, parent_id, states.get(item.id)) for item, parent_id in self._booted.values())
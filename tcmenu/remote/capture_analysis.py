@@ -0,0 +1,290 @@
+"""
+Offline analysis of large capture files using several processes.
+
+Decoding frames is the slow part of analysing a capture, so the capture is memory mapped and split into chunks on
+record boundaries, where each frame starts with PROTO_START_OF_MSG, and the chunks are decoded by a pool of worker
+processes. The values each item took are merged back in capture order into a time series for every item. Splitting
+only reads the record headers, which is cheap next to decoding, so throughput grows with the number of cores:
+
+    python -m tcmenu.remote.capture_analysis capture.tcc --workers 8
+"""
+
+import argparse
+import functools
+import io
+import logging
+import mmap
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, Optional
+
+from tcmenu.domain.menu_items import MenuItem
+from tcmenu.domain.util.menu_item_helper import MenuItemHelper
+from tcmenu.remote.commands.menu_boot_commands import BootItemMenuCommand, MenuActionBootCommand, MenuSubBootCommand
+from tcmenu.remote.commands.menu_change_command import MenuChangeCommand
+from tcmenu.remote.menu_command_protocol import MenuCommandProtocol
+from tcmenu.remote.protocol.configurable_protocol_converter import ConfigurableProtocolConverter
+from tcmenu.remote.session_capture import CaptureDirection, check_capture_header, iterate_record_offsets
+
+"""The size of capture decoded by a worker in one go, large enough that process hand over costs little."""
+DEFAULT_CHUNK_BYTES: int = 4 * 1024 * 1024
+
+
+@dataclass
+class ItemTimeSeries:
+    """The values an item took during a capture, with the time of each, held as two columns of equal length."""
+
+    timestamps: list[float] = field(default_factory=list)
+
+    values: list[Any] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+
+@dataclass
+class CaptureTimeSeries:
+    """The result of analysing a capture, a time series of values for each item ID along with decode counts."""
+
+    series: dict[int, ItemTimeSeries] = field(default_factory=dict)
+
+    frames: int = 0
+    commands: int = 0
+    errors: int = 0
+
+    """Delta changes for an item whose value was not yet known, they can not be turned into a value."""
+    unresolved_deltas: int = 0
+
+    def values_for(self, item_id: int) -> ItemTimeSeries:
+        """
+        Gets the time series of an item.
+        :param item_id: the item ID.
+        :return: the series, empty if the item never had a value in the capture.
+        """
+        return self.series.get(item_id) or ItemTimeSeries()
+
+    def __str__(self) -> str:
+        return (
+            f"{self.frames} frames, {self.commands} commands, {self.errors} errors, "
+            f"{sum(len(series) for series in self.series.values())} values for {len(self.series)} items"
+        )
+
+
+@dataclass(frozen=True)
+class _ChunkResult:
+    frames: int
+    commands: int
+    errors: int
+
+    """(item ID, timestamp, value, kind) for each value seen in the chunk, in capture order."""
+    samples: list[tuple[int, float, Any, int]]
+
+
+# The kinds of sample, the value of a boot sample is the item along with its current value.
+_BOOT_SAMPLE = 0
+_ABSOLUTE_SAMPLE = 1
+_DELTA_SAMPLE = 2
+
+
+def _standard_protocol() -> MenuCommandProtocol:
+    return ConfigurableProtocolConverter(include_default_processors=True)
+
+
+@functools.cache
+def _worker_protocol(protocol_factory: Callable[[], MenuCommandProtocol]) -> MenuCommandProtocol:
+    # Built once in each worker process, the protocol itself is not sent between processes.
+    return protocol_factory()
+
+
+def _sample_from(command: Any) -> Optional[tuple[int, Any, int]]:
+    if isinstance(command, MenuChangeCommand):
+        if command.change_type == MenuChangeCommand.ChangeType.DELTA:
+            return command.menu_item_id, int(command.value), _DELTA_SAMPLE
+        elif command.change_type in (MenuChangeCommand.ChangeType.ABSOLUTE, MenuChangeCommand.ChangeType.ABSOLUTE_LIST):
+            return command.menu_item_id, command.value, _ABSOLUTE_SAMPLE
+    elif isinstance(command, BootItemMenuCommand) and not isinstance(
+        command, (MenuSubBootCommand, MenuActionBootCommand)
+    ):
+        return command.menu_item.id, (command.menu_item, command.current_value), _BOOT_SAMPLE
+    return None
+
+
+def _decode_chunk(
+    path: str, start: int, end: int, direction: int, protocol_factory: Callable[[], MenuCommandProtocol]
+) -> _ChunkResult:
+    protocol = _worker_protocol(protocol_factory)
+    frames = commands = errors = 0
+    samples: list[tuple[int, float, Any, int]] = []
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        for timestamp, record_direction, frame_start, frame_end in iterate_record_offsets(data, start, end):
+            if record_direction != direction:
+                continue
+
+            frames += 1
+            buffer = io.BytesIO(data[frame_start:frame_end])
+            try:
+                if buffer.read(1) != MenuCommandProtocol.PROTO_START_OF_MSG:
+                    raise ValueError("Frame does not start with the start of message marker")
+                command = protocol.from_channel(buffer)
+            except Exception as e:
+                errors += 1
+                logging.getLogger("CaptureAnalysis").debug(f"Frame at offset {frame_start} failed to decode: {e}")
+                continue
+
+            commands += 1
+            sample = _sample_from(command)
+            if sample is not None:
+                samples.append((sample[0], timestamp / 1_000_000, sample[1], sample[2]))
+
+    return _ChunkResult(frames, commands, errors, samples)
+
+
+def chunk_capture(data, chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> Iterator[tuple[int, int]]:
+    """
+    Splits a capture into chunks of whole records by reading only the record headers.
+    :param data: the capture contents, typically memory mapped.
+    :param chunk_bytes: the approximate size of each chunk, a chunk always holds at least one record.
+    :return: the start and end offset of each chunk, in order.
+    :raises ValueError: if the data is not a capture or uses an unsupported version.
+    """
+    chunk_start = offset = check_capture_header(data)
+    for _, _, _, offset in iterate_record_offsets(data, chunk_start):
+        if offset - chunk_start >= chunk_bytes:
+            yield chunk_start, offset
+            chunk_start = offset
+
+    if offset > chunk_start:
+        yield chunk_start, offset
+
+
+class CaptureAnalyser:
+    """
+    Decodes a capture file into a time series of values for each item, spreading the decoding over worker processes.
+    Values come from boot items and from absolute and delta changes. While the results are merged in capture order,
+    changes are converted to the value type of the item booted before them, in the same way as a menu tree stores
+    them, and deltas are added to the value before them.
+
+    <pre>
+        series = CaptureAnalyser(workers=8).analyse("capture.tcc")
+        volume = series.values_for(2)
+    </pre>
+
+    :param workers: (optional) The number of worker processes, by default one for each core. With one worker the
+                    capture is decoded in this process.
+    :param chunk_bytes: (optional) The approximate size of capture handed to a worker at a time.
+    :param direction: (optional) Only frames in this direction are decoded.
+    :param protocol_factory: (optional) A function that creates the protocol used to decode frames, it must be
+                             importable by the workers, by default the standard TagVal protocol.
+    """
+
+    logger = logging.getLogger("CaptureAnalyser")
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+        direction: CaptureDirection = CaptureDirection.RECEIVED,
+        protocol_factory: Callable[[], MenuCommandProtocol] = _standard_protocol,
+    ):
+        if workers is not None and workers < 1:
+            raise ValueError("There must be at least one worker")
+        if chunk_bytes < 1:
+            raise ValueError("Chunks must be at least one byte")
+        self._workers = workers or os.cpu_count() or 1
+        self._chunk_bytes = chunk_bytes
+        self._direction = direction
+        self._protocol_factory = protocol_factory
+
+    @property
+    def workers(self) -> int:
+        return self._workers
+
+    def analyse(self, path: str) -> CaptureTimeSeries:
+        """
+        Decodes every frame of the capture and builds the time series of each item.
+        :param path: the capture file.
+        :return: the time series and decode counts.
+        :raises ValueError: if the file is not a capture or uses an unsupported version.
+        """
+        result = CaptureTimeSeries()
+        latest: dict[int, tuple[Optional[MenuItem], Any]] = {}
+
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                raise ValueError("Capture is too short to contain a header")
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                spans = chunk_capture(data, self._chunk_bytes)
+                args = (self._direction.value, self._protocol_factory)
+
+                if self._workers == 1:
+                    for start, end in spans:
+                        self._merge(_decode_chunk(path, start, end, *args), result, latest)
+                    return result
+
+                with ProcessPoolExecutor(max_workers=self._workers) as pool:
+                    # Chunks are submitted while the capture is still being split, and merged strictly in order. The
+                    # number in flight is bounded so that results of a huge capture do not pile up in memory.
+                    pending: deque[Future] = deque()
+                    for start, end in spans:
+                        pending.append(pool.submit(_decode_chunk, path, start, end, *args))
+                        if len(pending) > self._workers * 4:
+                            self._merge(pending.popleft().result(), result, latest)
+                    while pending:
+                        self._merge(pending.popleft().result(), result, latest)
+
+        return result
+
+    @staticmethod
+    def _merge(chunk: _ChunkResult, result: CaptureTimeSeries, latest: dict[int, tuple[Optional[MenuItem], Any]]):
+        result.frames += chunk.frames
+        result.commands += chunk.commands
+        result.errors += chunk.errors
+
+        series = result.series
+        for item_id, timestamp, value, kind in chunk.samples:
+            item, previous = latest.get(item_id, (None, None))
+            if kind == _BOOT_SAMPLE:
+                item, value = value
+            elif kind == _DELTA_SAMPLE:
+                if not isinstance(previous, (int, float)) or isinstance(previous, bool):
+                    result.unresolved_deltas += 1
+                    continue
+                value = previous + value
+            elif item is not None:
+                value = MenuItemHelper.state_for_menu_item(item, value, False, False).value
+
+            latest[item_id] = (item, value)
+            item_series = series.get(item_id)
+            if item_series is None:
+                item_series = series[item_id] = ItemTimeSeries()
+            item_series.timestamps.append(timestamp)
+            item_series.values.append(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Decode a TcMenu capture file into a time series for each item.")
+    parser.add_argument("capture", help="the capture file")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes, by default one for each core")
+    parser.add_argument("--chunk", type=int, default=DEFAULT_CHUNK_BYTES, help="bytes of capture in each chunk")
+    parser.add_argument("--sent", action="store_true", help="decode the sent frames instead of the received ones")
+    args = parser.parse_args()
+
+    direction = CaptureDirection.SENT if args.sent else CaptureDirection.RECEIVED
+    analyser = CaptureAnalyser(workers=args.workers, chunk_bytes=args.chunk, direction=direction)
+
+    started = time.perf_counter()
+    result = analyser.analyse(args.capture)
+    elapsed = time.perf_counter() - started
+
+    print(f"{result} in {elapsed:.3f}s using {analyser.workers} workers ({result.frames / elapsed:,.0f} frames/s)")
+    for item_id in sorted(result.series):
+        series = result.series[item_id]
+        print(f"  item {item_id}: {len(series)} values, last {series.values[-1]!r}")
+
+
+if __name__ == "__main__":
+    main()
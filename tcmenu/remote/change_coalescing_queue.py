@@ -0,0 +1,168 @@
+import dataclasses
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional
+
+from tcmenu.remote.commands.menu_change_command import MenuChangeCommand
+from tcmenu.remote.commands.menu_command import MenuCommand
+
+
+@dataclass
+class CoalescingStats:
+    """
+    Instrumentation counters for a ChangeCoalescingQueue.
+    """
+
+    """Commands put onto the queue."""
+    enqueued: int = 0
+
+    """Commands returned for sending."""
+    sent: int = 0
+
+    """Absolute changes that were replaced by a later value for the same item before being sent."""
+    dropped: int = 0
+
+    """Delta changes that were summed into an earlier pending delta for the same item."""
+    merged: int = 0
+
+
+class _Entry:
+    __slots__ = ("command", "mergeable")
+
+    def __init__(self, command: MenuCommand, mergeable: bool):
+        self.command = command
+        self.mergeable = mergeable
+
+
+class ChangeCoalescingQueue:
+    """
+    An outbound queue that reduces bursts of changes for the same item, such as those generated while dragging a
+    slider. While a change for an item is still waiting to be sent:
+
+    * a newer absolute change replaces its value (last value wins), keeping its place in the queue.
+    * a newer delta change is summed into a pending delta change.
+
+    List changes, list responses, any command that is not a change, and every change for an item listed in
+    `ordered_item_ids` are always sent individually and in order. A change is never merged across one of these for
+    the same item, so the relative order of changes per item is preserved. Note that a superseded change is never
+    sent, so it will not be acknowledged; only the correlation of the latest change is sent.
+
+    Commands are released by `poll`, at most once per `flush_interval` and at most `max_per_flush` at a time.
+
+    :param flush_interval: (optional) Minimum time in seconds between flushes.
+    :param max_per_flush: (optional) Maximum commands returned per flush, no limit by default.
+    :param ordered_item_ids: (optional) IDs of items whose changes must never be coalesced.
+    :param clock: (optional) Monotonic time source in seconds, mainly for testing.
+    """
+
+    def __init__(
+        self,
+        flush_interval: float = 0.05,
+        max_per_flush: Optional[int] = None,
+        ordered_item_ids: Iterable[int] = (),
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._flush_interval = flush_interval
+        self._max_per_flush = max_per_flush
+        self._ordered_item_ids = frozenset(ordered_item_ids)
+        self._clock = clock
+        self._next_flush = clock()
+        self._queue: deque[_Entry] = deque()
+        self._latest_for_item: dict[int, _Entry] = {}
+        self._lock = threading.Lock()
+        self.stats = CoalescingStats()
+
+    def put(self, command: MenuCommand) -> None:
+        """
+        Adds a command to the queue, coalescing it with a pending change for the same item when possible.
+        :param command: the command to send.
+        """
+        with self._lock:
+            self.stats.enqueued += 1
+
+            if not isinstance(command, MenuChangeCommand):
+                self._queue.append(_Entry(command, False))
+                return
+
+            item_id = command.menu_item_id
+            mergeable = item_id not in self._ordered_item_ids and command.change_type in (
+                MenuChangeCommand.ChangeType.ABSOLUTE,
+                MenuChangeCommand.ChangeType.DELTA,
+            )
+
+            latest = self._latest_for_item.get(item_id)
+            if mergeable and latest is not None and latest.mergeable and self._try_merge(latest, command):
+                return
+
+            entry = _Entry(command, mergeable)
+            self._queue.append(entry)
+            self._latest_for_item[item_id] = entry
+
+    def poll(self, now: Optional[float] = None) -> list[MenuCommand]:
+        """
+        Returns the commands to send if a flush is due.
+        :param now: optional; the current time.
+        :return: the commands to send in order, empty when no flush is due or nothing is pending.
+        """
+        if now is None:
+            now = self._clock()
+
+        with self._lock:
+            if now < self._next_flush or not self._queue:
+                return []
+
+            self._next_flush = now + self._flush_interval
+            return self._take(self._max_per_flush)
+
+    def drain(self) -> list[MenuCommand]:
+        """
+        Returns every pending command regardless of the flush rate, for example before closing a connection.
+        :return: the commands to send in order.
+        """
+        with self._lock:
+            return self._take(None)
+
+    def pop(self) -> Optional[MenuCommand]:
+        """
+        Removes the oldest pending command regardless of the flush rate.
+        :return: the command, or None if the queue is empty.
+        """
+        with self._lock:
+            commands = self._take(1)
+        return commands[0] if commands else None
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def _try_merge(self, latest: _Entry, command: MenuChangeCommand) -> bool:
+        pending: MenuChangeCommand = latest.command
+
+        if command.change_type == MenuChangeCommand.ChangeType.ABSOLUTE:
+            # An absolute value makes any pending change for the item redundant.
+            latest.command = command
+            self.stats.dropped += 1
+            return True
+        elif pending.change_type == MenuChangeCommand.ChangeType.DELTA:
+            total = int(pending.value) + int(command.value)
+            latest.command = dataclasses.replace(command, value=str(total))
+            self.stats.merged += 1
+            return True
+
+        return False
+
+    def _take(self, limit: Optional[int]) -> list[MenuCommand]:
+        count = len(self._queue) if limit is None else min(limit, len(self._queue))
+        commands: list[MenuCommand] = []
+
+        for _ in range(count):
+            entry = self._queue.popleft()
+            commands.append(entry.command)
+            if isinstance(entry.command, MenuChangeCommand):
+                item_id = entry.command.menu_item_id
+                if self._latest_for_item.get(item_id) is entry:
+                    del self._latest_for_item[item_id]
+
+        self.stats.sent += count
+        return commands
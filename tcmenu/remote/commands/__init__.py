@@ -0,0 +1,22 @@
+from tcmenu._lazy import lazy_submodules
+
+__getattr__, __dir__ = lazy_submodules(
+    __name__,
+    (
+        "ack_status",
+        "command_factory",
+        "dialog_mode",
+        "menu_acknowledgement_command",
+        "menu_boot_commands",
+        "menu_bootstrap_command",
+        "menu_button_type",
+        "menu_change_command",
+        "menu_command",
+        "menu_command_type",
+        "menu_dialog_command",
+        "menu_heartbeat_command",
+        "menu_join_command",
+        "menu_list_commands",
+        "menu_pairing_command",
+    ),
+)
@@ -1,4 +1,4 @@
-from typing import Optional, Union
+from typing import Optional, Sequence, Union
 from uuid import UUID
 
 from tcmenu.domain.menu_items import (
@@ -17,6 +17,7 @@ from tcmenu.domain.menu_items import (
 )
 from tcmenu.domain.state.current_scroll_position import CurrentScrollPosition
 from tcmenu.domain.state.list_response import ListResponse
+from tcmenu.domain.state.list_row_change import ListRowChange
 from tcmenu.domain.state.portable_color import PortableColor
 from tcmenu.remote.commands.ack_status import AckStatus
 from tcmenu.remote.commands.dialog_mode import DialogMode
@@ -40,6 +41,12 @@ from tcmenu.remote.commands.menu_change_command import MenuChangeCommand
 from tcmenu.remote.commands.menu_dialog_command import MenuDialogCommand
 from tcmenu.remote.commands.menu_heartbeat_command import MenuHeartbeatCommand
 from tcmenu.remote.commands.menu_join_command import MenuJoinCommand
+from tcmenu.remote.commands.menu_list_commands import (
+    MAX_LIST_ROWS_PER_COMMAND,
+    MenuListDeltaCommand,
+    MenuListFetchCommand,
+    MenuListRowsCommand,
+)
 from tcmenu.remote.commands.menu_pairing_command import MenuPairingCommand
 from tcmenu.remote.protocol.api_platform import ApiPlatform
 from tcmenu.remote.protocol.correlation_id import CorrelationId
@@ -350,3 +357,80 @@ class CommandFactory:
             change_type=MenuChangeCommand.ChangeType.ABSOLUTE_LIST,
             value=values,
         )
+
+    @staticmethod
+    def new_list_fetch_command(
+        correlation_id: CorrelationId, item: Union[MenuItem, int], start_row: int, row_count: int
+    ) -> MenuListFetchCommand:
+        """
+        Creates a new request for a window of rows from a runtime list that is transferred in pages.
+        :param correlation_id: a correlation ID that will be returned with the rows.
+        :param item: the item (or its ID) for which to fetch.
+        :param start_row: the first row to fetch.
+        :param row_count: the number of rows to fetch.
+        :return: a new fetch command.
+        """
+        item_id = item.id if isinstance(item, MenuItem) else item
+        return MenuListFetchCommand(
+            menu_item_id=item_id, correlation_id=correlation_id, start_row=start_row, row_count=row_count
+        )
+
+    @staticmethod
+    def new_list_rows_command(
+        correlation_id: CorrelationId, item: Union[MenuItem, int], rows: Sequence[str], start_row: int, row_count: int
+    ) -> MenuListRowsCommand:
+        """
+        Creates the answer to a fetch from the complete rows of the list. Only the requested window is copied, and it
+        is limited to the end of the list and to MAX_LIST_ROWS_PER_COMMAND rows.
+        :param correlation_id: the correlation ID of the fetch.
+        :param item: the item (or its ID) for which to send.
+        :param rows: all the rows of the list.
+        :param start_row: the first row requested.
+        :param row_count: the number of rows requested.
+        :return: a new rows command.
+        """
+        item_id = item.id if isinstance(item, MenuItem) else item
+        start_row = max(0, min(start_row, len(rows)))
+        end_row = start_row + max(0, min(row_count, MAX_LIST_ROWS_PER_COMMAND))
+        return MenuListRowsCommand(
+            menu_item_id=item_id,
+            correlation_id=correlation_id,
+            start_row=start_row,
+            total_rows=len(rows),
+            rows=tuple(rows[start_row:end_row]),
+        )
+
+    @staticmethod
+    def new_list_delta_commands(
+        correlation_id: CorrelationId, item: Union[MenuItem, int], changes: Sequence[ListRowChange], total_rows: int
+    ) -> tuple[MenuListDeltaCommand, ...]:
+        """
+        Creates the commands that send incremental changes to a runtime list. The changes are split over as many
+        commands as needed, each one carrying the size of the list after its own changes, so they must be sent in
+        order.
+        :param correlation_id: a correlation ID that will be returned in the subsequent acknowledgement.
+        :param item: the item (or its ID) for which to send.
+        :param changes: the row changes in the order they were made.
+        :param total_rows: the number of rows in the list after all the changes.
+        :return: the delta commands in the order to send them.
+        """
+        item_id = item.id if isinstance(item, MenuItem) else item
+
+        def size_change(chunk: Sequence[ListRowChange]) -> int:
+            return sum(
+                1 if c.operation == ListRowChange.Operation.INSERT else -1
+                for c in chunk
+                if c.operation != ListRowChange.Operation.UPDATE
+            )
+
+        rows = total_rows - size_change(changes)
+        commands = []
+        for start in range(0, len(changes), MAX_LIST_ROWS_PER_COMMAND):
+            chunk = tuple(changes[start : start + MAX_LIST_ROWS_PER_COMMAND])
+            rows += size_change(chunk)
+            commands.append(
+                MenuListDeltaCommand(
+                    menu_item_id=item_id, correlation_id=correlation_id, total_rows=rows, changes=chunk
+                )
+            )
+        return tuple(commands)
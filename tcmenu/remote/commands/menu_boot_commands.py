@@ -115,4 +115,5 @@ class MenuSubBootCommand(BootItemMenuCommand):
 
     def new_menu_state(self, old_state: Optional[MenuState] = None) -> MenuState:
         # SubBootCommand can't be changed.
-        return MenuItemHelper.state_for_menu_item(self.menu_item, self.current_value, False, old_state.active)
+        active = old_state.active if old_state else False
+        return MenuItemHelper.state_for_menu_item(self.menu_item, self.current_value, False, active)
@@ -26,6 +26,9 @@ class MenuCommandType(Enum):
     ACKNOWLEDGEMENT = MessageField("A", "K")
     CHANGE_INT_FIELD = MessageField("V", "C")
     DIALOG_UPDATE = MessageField("D", "M")
+    LIST_FETCH = MessageField("L", "F")
+    LIST_ROWS = MessageField("L", "W")
+    LIST_DELTA = MessageField("L", "D")
 
     @property
     def message_field(self):
@@ -0,0 +1,110 @@
+from dataclasses import dataclass
+
+from tcmenu.domain.state.list_row_change import ListRowChange
+from tcmenu.remote.commands.menu_command import MenuCommand
+from tcmenu.remote.commands.menu_command_type import MenuCommandType
+from tcmenu.remote.protocol.correlation_id import CorrelationId
+from tcmenu.remote.protocol.message_field import MessageField
+
+"""
+The most rows, or row changes, that one list command carries. Each row has its own two letter field on the wire, so
+longer pages and deltas are split over several commands, see CommandFactory.
+"""
+MAX_LIST_ROWS_PER_COMMAND = 52
+
+
+@dataclass(frozen=True)
+class MenuListFetchCommand(MenuCommand):
+    """
+    Sent by a client to request a window of rows from a runtime list that is transferred in pages. The remote
+    answers with a MenuListRowsCommand.
+    """
+
+    menu_item_id: int
+
+    correlation_id: CorrelationId
+
+    """The first row requested."""
+    start_row: int
+
+    """The number of rows requested, the remote may send fewer."""
+    row_count: int
+
+    @property
+    def command_type(self) -> MessageField:
+        return MenuCommandType.LIST_FETCH.message_field
+
+    def __repr__(self):
+        return (
+            f"MenuListFetchCommand{{"
+            f" menu_item_id={self.menu_item_id},"
+            f" correlation={self.correlation_id},"
+            f" start_row={self.start_row},"
+            f" row_count={self.row_count}"
+            f" }}"
+        )
+
+
+@dataclass(frozen=True)
+class MenuListRowsCommand(MenuCommand):
+    """
+    A page of consecutive rows of a runtime list, along with the size of the whole list.
+    """
+
+    menu_item_id: int
+
+    correlation_id: CorrelationId
+
+    """The index of the first row in the page."""
+    start_row: int
+
+    """The number of rows in the whole list."""
+    total_rows: int
+
+    rows: tuple[str, ...]
+
+    @property
+    def command_type(self) -> MessageField:
+        return MenuCommandType.LIST_ROWS.message_field
+
+    def __repr__(self):
+        return (
+            f"MenuListRowsCommand{{"
+            f" menu_item_id={self.menu_item_id},"
+            f" correlation={self.correlation_id},"
+            f" start_row={self.start_row},"
+            f" total_rows={self.total_rows},"
+            f" rows={self.rows}"
+            f" }}"
+        )
+
+
+@dataclass(frozen=True)
+class MenuListDeltaCommand(MenuCommand):
+    """
+    Incremental row inserts, updates and deletes of a runtime list, so that a change costs in proportion to the rows
+    that changed rather than the size of the list.
+    """
+
+    menu_item_id: int
+
+    correlation_id: CorrelationId
+
+    """The number of rows in the list after the changes are applied."""
+    total_rows: int
+
+    changes: tuple[ListRowChange, ...]
+
+    @property
+    def command_type(self) -> MessageField:
+        return MenuCommandType.LIST_DELTA.message_field
+
+    def __repr__(self):
+        return (
+            f"MenuListDeltaCommand{{"
+            f" menu_item_id={self.menu_item_id},"
+            f" correlation={self.correlation_id},"
+            f" total_rows={self.total_rows},"
+            f" changes={tuple(str(change) for change in self.changes)}"
+            f" }}"
+        )
@@ -0,0 +1,176 @@
+import asyncio
+import logging
+import time
+from typing import Callable, Generic, Hashable, Optional, TypeVar
+
+from tcmenu.constants import Defaults
+from tcmenu.remote.commands.command_factory import CommandFactory
+from tcmenu.remote.commands.menu_heartbeat_command import MenuHeartbeatCommand
+from tcmenu.remote.timing_wheel import TimingWheel
+
+K = TypeVar("K", bound=Hashable)
+
+
+class _HeartbeatSession:
+    __slots__ = ("send", "on_dead", "last_sent", "last_received")
+
+    def __init__(
+        self, send: Callable[[MenuHeartbeatCommand], None], on_dead: Optional[Callable], last_sent: float, now: float
+    ):
+        self.send = send
+        self.on_dead = on_dead
+        self.last_sent = last_sent
+        self.last_received = now
+
+
+class HeartbeatScheduler(Generic[K]):
+    """
+    A single scheduler that handles heartbeats for any number of sessions. Each session has one entry on a shared
+    timing wheel, and recording traffic only updates a timestamp, so the work done per heartbeat interval does not
+    depend on how busy the links are. When the entry for a session fires, a heartbeat is only sent if nothing else was
+    sent within the interval, and the session is reported dead when nothing was received for `dead_after` seconds.
+
+    The scheduler is not thread safe; it should be driven from one thread or event loop, either by calling `tick`
+    periodically or by running the `run` coroutine.
+
+    :param interval: (optional) The heartbeat interval in seconds.
+    :param dead_after: (optional) Seconds without received traffic after which a peer is considered dead, by default
+                       three heartbeat intervals.
+    :param tick_duration: (optional) The timing wheel resolution in seconds.
+    :param wheel_size: (optional) The number of slots in the timing wheel.
+    :param clock: (optional) Monotonic time source in seconds, mainly for testing.
+    """
+
+    logger = logging.getLogger("HeartbeatScheduler")
+
+    def __init__(
+        self,
+        interval: float = Defaults.HEARTBEAT_FREQUENCY,
+        dead_after: Optional[float] = None,
+        tick_duration: float = 0.5,
+        wheel_size: int = 512,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._interval = interval
+        self._dead_after = dead_after if dead_after is not None else interval * 3
+        self._wheel: TimingWheel[K] = TimingWheel(tick_duration=tick_duration, wheel_size=wheel_size, clock=clock)
+        self._sessions: dict[K, _HeartbeatSession] = {}
+        self._heartbeat = CommandFactory.new_heartbeat_command(
+            int(interval * 1000), MenuHeartbeatCommand.HeartbeatMode.NORMAL
+        )
+        self.heartbeats_sent = 0
+        self.heartbeats_suppressed = 0
+
+    @property
+    def interval(self) -> float:
+        return self._interval
+
+    @property
+    def dead_after(self) -> float:
+        return self._dead_after
+
+    def add_session(
+        self,
+        key: K,
+        send: Callable[[MenuHeartbeatCommand], None],
+        on_dead: Optional[Callable[[K], None]] = None,
+        send_now: bool = False,
+    ) -> None:
+        """
+        Starts sending heartbeats for a session.
+        :param key: a unique key for the session, such as the connection object.
+        :param send: writes a heartbeat command to the connection.
+        :param on_dead: optional; called with the key when the peer has not sent anything for `dead_after` seconds.
+        The session is removed before the callback is made.
+        :param send_now: if True the first heartbeat is due immediately, otherwise after one interval.
+        """
+        now = self._wheel.now()
+        last_sent = now - self._interval if send_now else now
+        self._sessions[key] = _HeartbeatSession(send, on_dead, last_sent, now)
+        self._schedule(key, self._sessions[key], now)
+
+    def remove_session(self, key: K) -> None:
+        """
+        Stops tracking a session, for example when the connection is closed.
+        :param key: the session key.
+        """
+        if self._sessions.pop(key, None) is not None:
+            self._wheel.cancel(key)
+
+    def on_sent(self, key: K, now: Optional[float] = None) -> None:
+        """
+        Record that a message was sent on the session, this postpones the next heartbeat.
+        :param key: the session key.
+        :param now: optional; the current time.
+        """
+        session = self._sessions.get(key)
+        if session is not None:
+            session.last_sent = self._wheel.now() if now is None else now
+
+    def on_received(self, key: K, now: Optional[float] = None) -> None:
+        """
+        Record that a message was received on the session, this keeps the peer alive.
+        :param key: the session key.
+        :param now: optional; the current time.
+        """
+        session = self._sessions.get(key)
+        if session is not None:
+            session.last_received = self._wheel.now() if now is None else now
+
+    def tick(self, now: Optional[float] = None) -> int:
+        """
+        Processes every session whose heartbeat or dead peer check is due.
+        :param now: optional; the current time.
+        :return: the number of heartbeats sent.
+        """
+        if now is None:
+            now = self._wheel.now()
+
+        sent = 0
+        for key in self._wheel.advance(now):
+            session = self._sessions.get(key)
+            if session is None:
+                continue
+
+            if now - session.last_received >= self._dead_after:
+                self.logger.warning(f"No traffic from {key} for {now - session.last_received:.1f}s, peer is dead")
+                del self._sessions[key]
+                if session.on_dead is not None:
+                    try:
+                        session.on_dead(key)
+                    except Exception as e:
+                        self.logger.error(f"Dead peer callback for {key} failed: {e}")
+                continue
+
+            if now - session.last_sent >= self._interval:
+                try:
+                    session.send(self._heartbeat)
+                    session.last_sent = now
+                    sent += 1
+                except Exception as e:
+                    self.logger.error(f"Heartbeat to {key} failed: {e}")
+            else:
+                self.heartbeats_suppressed += 1
+
+            self._schedule(key, session, now)
+
+        self.heartbeats_sent += sent
+        return sent
+
+    async def run(self) -> None:
+        """
+        Drives the scheduler from the running event loop until cancelled.
+        """
+        while True:
+            self.tick()
+            await asyncio.sleep(self._wheel.tick_duration)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._sessions
+
+    def _schedule(self, key: K, session: _HeartbeatSession, now: float) -> None:
+        due = min(session.last_sent + self._interval, session.last_received + self._dead_after)
+        self._wheel.schedule(key, max(due - now, 0.0), now)
@@ -0,0 +1,123 @@
+import logging
+import time
+from typing import Optional, Union
+
+from tcmenu.domain.menu_items import RuntimeListMenuItem
+from tcmenu.domain.state.menu_state import StringListMenuState
+from tcmenu.domain.state.menu_tree import MenuTree
+from tcmenu.domain.state.paged_string_list import PagedStringList
+from tcmenu.domain.util.menu_item_helper import MenuItemHelper
+from tcmenu.remote.commands.menu_boot_commands import BootItemMenuCommand
+from tcmenu.remote.commands.menu_change_command import MenuChangeCommand
+from tcmenu.remote.commands.menu_command import MenuCommand
+from tcmenu.remote.commands.menu_list_commands import MenuListDeltaCommand, MenuListRowsCommand
+from tcmenu.remote.protocol_stats import ProtocolStats
+
+
+class MenuTreeUpdater:
+    """
+    Applies commands received from a remote device to a menu tree, in the same way a remote controller does. Boot
+    items add or update the item and its state, and change commands update the state of an existing item. Paged list
+    rows and deltas update the PagedStringList that is held as the value of the list. All other commands are ignored.
+
+    :param tree: the tree to keep up to date.
+    :param stats: (optional) Stats that the time taken to apply each command is recorded to as the TREE_UPDATE stage.
+    """
+
+    logger = logging.getLogger("MenuTreeUpdater")
+
+    def __init__(self, tree: MenuTree, stats: Optional[ProtocolStats] = None):
+        self._tree = tree
+        self._stats = stats
+
+    @property
+    def tree(self) -> MenuTree:
+        return self._tree
+
+    def apply(self, command: MenuCommand) -> bool:
+        """
+        Applies the command to the tree.
+        :param command: a command received from the remote.
+        :return: True if the tree was updated, otherwise False.
+        """
+        if self._stats is not None:
+            started = time.perf_counter_ns()
+            updated = self._apply(command)
+            self._stats.record_stage(
+                ProtocolStats.Direction.RECEIVED,
+                command.command_type.id,
+                ProtocolStats.Stage.TREE_UPDATE,
+                time.perf_counter_ns() - started,
+            )
+            return updated
+        return self._apply(command)
+
+    def _apply(self, command: MenuCommand) -> bool:
+        if isinstance(command, BootItemMenuCommand):
+            return self._apply_boot_item(command)
+        elif isinstance(command, MenuChangeCommand):
+            return self._apply_change(command)
+        elif isinstance(command, (MenuListRowsCommand, MenuListDeltaCommand)):
+            return self._apply_list_page(command)
+        return False
+
+    def _apply_boot_item(self, command: BootItemMenuCommand) -> bool:
+        tree = self._tree
+        item = command.menu_item
+        tree.add_or_update_item(item=item, parent_id=command.sub_menu_id)
+
+        state = command.new_menu_state(tree.get_menu_state(item))
+        if state is not None:
+            tree.change_item(item, state)
+        return True
+
+    def _apply_change(self, command: MenuChangeCommand) -> bool:
+        tree = self._tree
+        item = tree.get_menu_by_id(command.menu_item_id)
+        if item is None:
+            self.logger.debug(f"Change for unknown item {command.menu_item_id} ignored")
+            return False
+
+        if command.change_type == MenuChangeCommand.ChangeType.DELTA:
+            return MenuItemHelper.apply_incremental_value_change(item, int(command.value), tree) is not None
+        elif command.change_type == MenuChangeCommand.ChangeType.ABSOLUTE:
+            MenuItemHelper.set_menu_state(item, command.value, tree)
+            return True
+        elif command.change_type == MenuChangeCommand.ChangeType.ABSOLUTE_LIST:
+            MenuItemHelper.set_menu_state(item, list(command.value), tree)
+            return True
+
+        # List state changes report a user action on the list, they do not change its value.
+        return False
+
+    def _apply_list_page(self, command: Union[MenuListRowsCommand, MenuListDeltaCommand]) -> bool:
+        tree = self._tree
+        item = tree.get_menu_by_id(command.menu_item_id)
+        if not isinstance(item, RuntimeListMenuItem):
+            self.logger.debug(f"List rows for item {command.menu_item_id} that is not a known list ignored")
+            return False
+
+        state = tree.get_menu_state(item)
+        cache = state.value if state is not None else None
+        if not isinstance(cache, PagedStringList):
+            # The rows sent with the boot item are the whole list, they seed the cache unless a page shows that the
+            # list has changed size since.
+            if cache is None or (isinstance(command, MenuListRowsCommand) and len(cache) != command.total_rows):
+                cache = PagedStringList(command.total_rows)
+            else:
+                cache = PagedStringList.from_rows(cache)
+
+        if isinstance(command, MenuListRowsCommand):
+            if not cache.apply_rows(command.start_row, command.rows, command.total_rows):
+                self.logger.debug(f"Rows of list {item.id} requested before it changed ignored")
+                return False
+        elif not cache.apply_changes(command.changes, command.total_rows):
+            self.logger.warning(f"List {item.id} was out of step with the remote, its rows will be fetched again")
+
+        tree.change_item(
+            item,
+            StringListMenuState(
+                item=item, changed=True, active=state.active if state is not None else False, value=cache
+            ),
+        )
+        return True
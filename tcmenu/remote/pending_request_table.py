@@ -0,0 +1,320 @@
+import asyncio
+import concurrent.futures
+import logging
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Optional, Union
+
+from tcmenu.constants import Defaults
+from tcmenu.domain.menu_items import MenuItem
+from tcmenu.domain.state.list_response import ListResponse
+from tcmenu.remote.commands.ack_status import AckStatus
+from tcmenu.remote.commands.command_factory import CommandFactory
+from tcmenu.remote.commands.menu_acknowledgement_command import MenuAcknowledgementCommand
+from tcmenu.remote.commands.menu_change_command import MenuChangeCommand
+from tcmenu.remote.commands.menu_command import MenuCommand
+from tcmenu.remote.protocol.correlation_id import CorrelationId
+from tcmenu.remote.timing_wheel import TimingWheel
+
+
+class _PendingRequestTableBase(ABC):
+    """
+    Common part of the pending request tables. Outgoing commands are registered by their correlation, and the future
+    for each is completed when the matching acknowledgement arrives or when the timeout on the timing wheel fires.
+    """
+
+    logger = logging.getLogger("PendingRequestTable")
+
+    def __init__(
+        self,
+        sender: Callable[[MenuCommand], None],
+        timeout: float = Defaults.ACKNOWLEDGEMENT_TIMEOUT,
+        tick_duration: float = 0.1,
+        wheel_size: int = 512,
+    ):
+        self._sender = sender
+        self._timeout = timeout
+        self._pending: dict[int, Any] = {}
+        self._wheel: TimingWheel[int] = TimingWheel(tick_duration=tick_duration, wheel_size=wheel_size)
+
+    @property
+    def timeout(self) -> float:
+        return self._timeout
+
+    def send_change(
+        self,
+        item: Union[MenuItem, int],
+        value: Union[int, str, ListResponse, tuple[str, ...]],
+        change_type: MenuChangeCommand.ChangeType = MenuChangeCommand.ChangeType.ABSOLUTE,
+        timeout: Optional[float] = None,
+    ):
+        """
+        Creates a change command with a new correlation, sends it and returns a future that will be completed with
+        the AckStatus of the matching acknowledgement.
+        :param item: the item (or its ID) to change.
+        :param value: the new value, or the delta for DELTA changes.
+        :param change_type: the type of change to send.
+        :param timeout: optional; overrides the default timeout for this request.
+        :return: a future resolving to the AckStatus, or failing with TimeoutError if no acknowledgement arrives.
+        """
+        correlation = CorrelationId.new_correlation()
+
+        if change_type == MenuChangeCommand.ChangeType.DELTA:
+            command = CommandFactory.new_delta_menu_change_command(correlation, item, value)
+        elif change_type == MenuChangeCommand.ChangeType.ABSOLUTE_LIST:
+            command = CommandFactory.new_absolute_list_menu_change_command(correlation, item, value)
+        elif change_type == MenuChangeCommand.ChangeType.LIST_STATE_CHANGE:
+            command = CommandFactory.new_list_response_menu_change_command(correlation, item, value)
+        else:
+            command = CommandFactory.new_absolute_menu_change_command(correlation, item, value)
+
+        return self.send_command(command, correlation, timeout)
+
+    def send_command(self, command: MenuCommand, correlation_id: CorrelationId, timeout: Optional[float] = None):
+        """
+        Registers the correlation, then sends the command. Use this for commands other than item changes that are
+        acknowledged by correlation.
+        :param command: the command to send.
+        :param correlation_id: the correlation the remote will acknowledge.
+        :param timeout: optional; overrides the default timeout for this request.
+        :return: a future resolving to the AckStatus.
+        """
+        future = self.track(correlation_id, timeout)
+
+        try:
+            self._sender(command)
+        except Exception:
+            self._release(correlation_id.correlation)
+            raise
+
+        return future
+
+    def on_acknowledgement(self, command: MenuAcknowledgementCommand) -> bool:
+        """
+        Completes the request matching the acknowledgement correlation.
+        :param command: the received acknowledgement.
+        :return: True if a pending request was completed, otherwise False.
+        """
+        future = self._release(command.correlation_id.correlation)
+        if future is None:
+            return False
+
+        self._complete(future, command.ack_status)
+        return True
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def __contains__(self, correlation_id: CorrelationId) -> bool:
+        return correlation_id.correlation in self._pending
+
+    def _register(self, correlation: int, future: Any, timeout: Optional[float]) -> None:
+        if correlation in self._pending:
+            raise ValueError(f"Correlation {correlation:08x} is already pending")
+        self._pending[correlation] = future
+        self._wheel.schedule(correlation, self._timeout if timeout is None else timeout)
+
+    def _release(self, correlation: int) -> Optional[Any]:
+        future = self._pending.pop(correlation, None)
+        if future is not None:
+            self._wheel.cancel(correlation)
+        return future
+
+    def _take_expired(self, now: Optional[float] = None) -> list:
+        expired = []
+        for correlation in self._wheel.advance(now):
+            future = self._pending.pop(correlation, None)
+            if future is not None:
+                expired.append((correlation, future))
+        return expired
+
+    @abstractmethod
+    def _complete(self, future: Any, status: AckStatus) -> None:
+        pass
+
+    @abstractmethod
+    def track(self, correlation_id: CorrelationId, timeout: Optional[float] = None):
+        """
+        Registers a correlation without sending anything, raises RuntimeError once the table is closed.
+        :param correlation_id: the correlation to wait for.
+        :param timeout: optional; overrides the default timeout for this request.
+        :return: a future resolving to the AckStatus.
+        """
+        pass
+
+
+class PendingRequestTable(_PendingRequestTableBase):
+    """
+    A thread safe table of requests waiting for an acknowledgement, returning `concurrent.futures.Future` objects.
+    Timeouts for all requests are handled by a single timing wheel that is advanced by one background thread, which
+    only runs while there are requests pending.
+
+    :param sender: a function that writes the command to the connection.
+    :param timeout: (optional) The default time in seconds to wait for an acknowledgement.
+    :param tick_duration: (optional) The timing wheel resolution in seconds.
+    :param wheel_size: (optional) The number of slots in the timing wheel.
+    """
+
+    def __init__(
+        self,
+        sender: Callable[[MenuCommand], None],
+        timeout: float = Defaults.ACKNOWLEDGEMENT_TIMEOUT,
+        tick_duration: float = 0.1,
+        wheel_size: int = 512,
+    ):
+        super().__init__(sender, timeout, tick_duration, wheel_size)
+        self._lock = threading.Lock()
+        self._ticker: Optional[threading.Thread] = None
+        self._closed = threading.Event()
+
+    def track(self, correlation_id: CorrelationId, timeout: Optional[float] = None) -> concurrent.futures.Future:
+        """
+        Registers a correlation without sending anything, raises RuntimeError once the table is closed.
+        :param correlation_id: the correlation to wait for.
+        :param timeout: optional; overrides the default timeout for this request.
+        :return: a future resolving to the AckStatus.
+        """
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        with self._lock:
+            if self._closed.is_set():
+                raise RuntimeError("PendingRequestTable is closed")
+            self._register(correlation_id.correlation, future, timeout)
+            if self._ticker is None:
+                self._ticker = threading.Thread(target=self._run_ticker, name="PendingRequestTable", daemon=True)
+                self._ticker.start()
+        return future
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """
+        Fails every request whose timeout passed with a TimeoutError. Called by the background thread, but can also
+        be called directly.
+        :param now: optional; the current time.
+        :return: the number of requests that timed out.
+        """
+        with self._lock:
+            expired = self._take_expired(now)
+
+        for correlation, future in expired:
+            self.logger.debug(f"Request {correlation:08x} timed out")
+            if not future.done():
+                future.set_exception(concurrent.futures.TimeoutError(f"No acknowledgement for {correlation:08x}"))
+        return len(expired)
+
+    def close(self) -> None:
+        """
+        Stops the background thread and cancels all outstanding requests.
+        """
+        self._closed.set()
+        with self._lock:
+            futures = list(self._pending.values())
+            self._pending.clear()
+            self._wheel.clear()
+            ticker, self._ticker = self._ticker, None
+
+        for future in futures:
+            future.cancel()
+        if ticker is not None and ticker is not threading.current_thread():
+            ticker.join()
+
+    def _release(self, correlation: int) -> Optional[concurrent.futures.Future]:
+        with self._lock:
+            return super()._release(correlation)
+
+    def _complete(self, future: concurrent.futures.Future, status: AckStatus) -> None:
+        if not future.done():
+            future.set_result(status)
+
+    def _run_ticker(self) -> None:
+        while not self._closed.wait(self._wheel.tick_duration):
+            self.expire()
+            with self._lock:
+                if not self._pending:
+                    self._ticker = None
+                    return
+
+
+class AsyncPendingRequestTable(_PendingRequestTableBase):
+    """
+    A table of requests waiting for an acknowledgement, returning `asyncio.Future` objects. It must be used from the
+    event loop thread. Timeouts for all requests are handled by a single timing wheel, advanced by one loop callback
+    that is only scheduled while there are requests pending.
+
+    :param sender: a function that writes the command to the connection.
+    :param timeout: (optional) The default time in seconds to wait for an acknowledgement.
+    :param tick_duration: (optional) The timing wheel resolution in seconds.
+    :param wheel_size: (optional) The number of slots in the timing wheel.
+    :param loop: (optional) The event loop, by default the running loop is used.
+    """
+
+    def __init__(
+        self,
+        sender: Callable[[MenuCommand], None],
+        timeout: float = Defaults.ACKNOWLEDGEMENT_TIMEOUT,
+        tick_duration: float = 0.1,
+        wheel_size: int = 512,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+    ):
+        super().__init__(sender, timeout, tick_duration, wheel_size)
+        self._loop = loop
+        self._tick_handle: Optional[asyncio.TimerHandle] = None
+        self._closed = False
+
+    def track(self, correlation_id: CorrelationId, timeout: Optional[float] = None) -> asyncio.Future:
+        """
+        Registers a correlation without sending anything, raises RuntimeError once the table is closed.
+        :param correlation_id: the correlation to wait for.
+        :param timeout: optional; overrides the default timeout for this request.
+        :return: a future resolving to the AckStatus.
+        """
+        if self._closed:
+            raise RuntimeError("AsyncPendingRequestTable is closed")
+        loop = self._get_loop()
+        future = loop.create_future()
+        self._register(correlation_id.correlation, future, timeout)
+        if self._tick_handle is None:
+            self._tick_handle = loop.call_later(self._wheel.tick_duration, self._on_tick)
+        return future
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """
+        Fails every request whose timeout passed with an asyncio.TimeoutError.
+        :param now: optional; the current time.
+        :return: the number of requests that timed out.
+        """
+        expired = self._take_expired(now)
+        for correlation, future in expired:
+            self.logger.debug(f"Request {correlation:08x} timed out")
+            if not future.done():
+                future.set_exception(asyncio.TimeoutError(f"No acknowledgement for {correlation:08x}"))
+        return len(expired)
+
+    def close(self) -> None:
+        """
+        Stops the timeout callback and cancels all outstanding requests.
+        """
+        self._closed = True
+        if self._tick_handle is not None:
+            self._tick_handle.cancel()
+            self._tick_handle = None
+
+        futures = list(self._pending.values())
+        self._pending.clear()
+        self._wheel.clear()
+        for future in futures:
+            future.cancel()
+
+    def _complete(self, future: asyncio.Future, status: AckStatus) -> None:
+        if not future.done():
+            future.set_result(status)
+
+    def _on_tick(self) -> None:
+        self.expire()
+        if self._pending:
+            self._tick_handle = self._get_loop().call_later(self._wheel.tick_duration, self._on_tick)
+        else:
+            self._tick_handle = None
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+        return self._loop
@@ -0,0 +1,18 @@
+from tcmenu._lazy import lazy_submodules
+
+__getattr__, __dir__ = lazy_submodules(
+    __name__,
+    (
+        "api_platform",
+        "command_protocol",
+        "configurable_protocol_converter",
+        "correlation_id",
+        "message_field",
+        "protocol_util",
+        "tag_val_menu_command_processors",
+        "tag_val_menu_fields",
+        "tag_val_text_parser",
+        "tag_val_writer_template",
+        "tc_protocol_exception",
+    ),
+)
@@ -1,15 +1,15 @@
 import io
 import logging
-from typing import Type, Callable, Dict, Union, TypeVar, Generic
+import time
+from typing import Type, Callable, Dict, Optional, Union, TypeVar, Generic
 
 from tcmenu.remote.commands.menu_command import MenuCommand
 from tcmenu.remote.menu_command_protocol import MenuCommandProtocol
 from tcmenu.remote.protocol.command_protocol import CommandProtocol
 from tcmenu.remote.protocol.message_field import MessageField
-
-from tcmenu.remote.protocol.tag_val_menu_command_processors import TagValMenuCommandProcessors
 from tcmenu.remote.protocol.tag_val_text_parser import TagValTextParser
 from tcmenu.remote.protocol.tc_protocol_exception import TcProtocolException
+from tcmenu.remote.protocol_stats import ProtocolStats
 
 
 T = TypeVar("T", bound=MenuCommand)
@@ -28,8 +28,16 @@ class ConfigurableProtocolConverter(MenuCommandProtocol):
         self._tag_val_output_writers: Dict[MessageField, Callable[[io.StringIO, Generic[T]], None]] = {}
         self._raw_incoming_parsers: Dict[MessageField, Callable[[io.BytesIO, int], Generic[T]]] = {}
         self._raw_output_writers: Dict[MessageField, Callable[[io.BytesIO, Generic[T]], None]] = {}
+        # TagVal writer and header bytes by command class and message type, filled as commands are written.
+        self._tag_val_output_cache: Dict[tuple[type, int], tuple[Callable[[io.StringIO, Generic[T]], None], bytes]] = {}
+        # Only measured when stats are set, otherwise the channel methods just check for them.
+        self._stats: Optional[ProtocolStats] = None
 
         if include_default_processors:
+            # Imported here as the default processors pull in every command class, which is only needed once a
+            # converter that uses them is created.
+            from tcmenu.remote.protocol.tag_val_menu_command_processors import TagValMenuCommandProcessors
+
             tag_val_processors = TagValMenuCommandProcessors()
             tag_val_processors.add_handlers_to_protocol(self)
 
@@ -58,6 +66,7 @@ class ConfigurableProtocolConverter(MenuCommandProtocol):
         :param clazz: the specific message class.
         """
         self._tag_val_output_writers[field] = self._output_msg_converter_with_type(processor, clazz)
+        self._tag_val_output_cache.clear()
 
     def add_raw_in_processor(self, field, processor):
         """
@@ -82,16 +91,24 @@ class ConfigurableProtocolConverter(MenuCommandProtocol):
         :param clazz: the specific message class.
         """
         self._raw_output_writers[field] = self._output_msg_converter_with_type(processor, clazz)
+        self._tag_val_output_cache.clear()
 
-    def from_channel(self, buffer: io.BytesIO) -> Generic[T]:
-        proto_id = buffer.read(1)[0]
-        protocol = CommandProtocol.from_protocol_id(proto_id)
+    @property
+    def stats(self) -> Optional[ProtocolStats]:
+        return self._stats
 
-        msg_type = self._get_msg_type_from_buffer(buffer)
-        cmd_type = MessageField.from_id(msg_type)
+    def set_stats(self, stats: Optional[ProtocolStats]) -> None:
+        """
+        Starts counting and timing every message converted in either direction, including those of custom processors.
+        :param stats: the stats to record to, or None to stop recording.
+        """
+        self._stats = stats
 
-        if not cmd_type:
-            raise TcProtocolException(f"Received unexpected message: {msg_type}")
+    def from_channel(self, buffer: io.BytesIO) -> Generic[T]:
+        if self._stats is not None:
+            return self._from_channel_measured(buffer, self._stats)
+
+        protocol, cmd_type = self._read_header(buffer)
 
         if protocol == CommandProtocol.TAG_VAL_PROTOCOL and cmd_type in self._tag_val_incoming_parsers:
             parser = TagValTextParser(buffer)
@@ -104,20 +121,122 @@ class ConfigurableProtocolConverter(MenuCommandProtocol):
             raise TcProtocolException(f"Unknown protocol used in message: {protocol.name}")
 
     def to_channel(self, buffer: io.BytesIO, command: Generic[T]) -> None:
-        raw_processor = self._raw_output_writers.get(command.command_type)
+        if self._stats is not None:
+            self._to_channel_measured(buffer, command, self._stats)
+            return
+
+        command_type = command.command_type
+        # Message fields are never released, so their identity is a cheap key that avoids hashing the dataclass.
+        cache_key = (command.__class__, id(command_type))
+        cached = self._tag_val_output_cache.get(cache_key)
+        if cached is not None:
+            tag_writer, header = cached
+            string_buffer = io.StringIO()
+            tag_writer(string_buffer, command)
+            buffer.write(header + string_buffer.getvalue().encode("utf-8") + b"\x02")
+            return
+
+        raw_processor = self._raw_output_writers.get(command_type)
 
         if raw_processor:
             self._write_standard_header(buffer, command, CommandProtocol.RAW_BIN_PROTOCOL)
             raw_processor(buffer, command)
-        elif command.command_type in self._tag_val_output_writers:
-            tag_writer = self._tag_val_output_writers.get(command.command_type)
-            self._write_standard_header(buffer, command, CommandProtocol.TAG_VAL_PROTOCOL)
+        elif command_type in self._tag_val_output_writers:
+            tag_writer = self._tag_val_output_writers.get(command_type)
+            header_buffer = io.BytesIO()
+            self._write_standard_header(header_buffer, command, CommandProtocol.TAG_VAL_PROTOCOL)
             string_buffer = io.StringIO()
             tag_writer(string_buffer, command)
-            buffer.write(string_buffer.getvalue().encode("utf-8"))
-            buffer.write(b"\x02")
+            buffer.write(header_buffer.getvalue() + string_buffer.getvalue().encode("utf-8") + b"\x02")
+            # Only cached once the writer has accepted the command class.
+            self._tag_val_output_cache[cache_key] = (tag_writer, header_buffer.getvalue())
         else:
-            raise TcProtocolException(f"Message not processed: {command.command_type}")
+            raise TcProtocolException(f"Message not processed: {command_type}")
+
+    def _from_channel_measured(self, buffer: io.BytesIO, stats: ProtocolStats) -> Generic[T]:
+        clock = time.perf_counter_ns
+        direction = ProtocolStats.Direction.RECEIVED
+        start_position = buffer.tell()
+        started = clock()
+        protocol, cmd_type = self._read_header(buffer)
+        framed = clock()
+
+        try:
+            with stats.receiving():
+                if protocol == CommandProtocol.TAG_VAL_PROTOCOL and cmd_type in self._tag_val_incoming_parsers:
+                    parser = TagValTextParser(buffer)
+                    parsed = clock()
+                    command = self._tag_val_incoming_parsers[cmd_type](parser)
+                elif (
+                    protocol.value == CommandProtocol.RAW_BIN_PROTOCOL.value and cmd_type in self._raw_incoming_parsers
+                ):
+                    length = int.from_bytes(buffer.read(4), byteorder="big")
+                    parsed = clock()
+                    command = self._raw_incoming_parsers[cmd_type](buffer, length)
+                else:
+                    raise TcProtocolException(f"Unknown protocol used in message: {protocol.name}")
+            processed = clock()
+        except Exception:
+            stats.record_message(direction, cmd_type.id, 0, error=True)
+            raise
+
+        # The start of message marker was read by the caller, it is counted so that both directions give whole frames.
+        size = len(MenuCommandProtocol.PROTO_START_OF_MSG) + buffer.tell() - start_position
+        stats.record_message(direction, cmd_type.id, size)
+        stats.record_stage(direction, cmd_type.id, ProtocolStats.Stage.FRAMING, framed - started)
+        if protocol == CommandProtocol.TAG_VAL_PROTOCOL:
+            stats.record_stage(direction, cmd_type.id, ProtocolStats.Stage.PARSING, parsed - framed)
+        stats.record_stage(direction, cmd_type.id, ProtocolStats.Stage.PROCESSING, processed - parsed)
+        return command
+
+    def _to_channel_measured(self, buffer: io.BytesIO, command: Generic[T], stats: ProtocolStats) -> None:
+        clock = time.perf_counter_ns
+        direction = ProtocolStats.Direction.SENT
+        command_type = command.command_type
+        started = clock()
+
+        try:
+            cache_key = (command.__class__, id(command_type))
+            cached = self._tag_val_output_cache.get(cache_key)
+            raw_processor = self._raw_output_writers.get(command_type) if cached is None else None
+            if raw_processor:
+                header_buffer = io.BytesIO()
+                self._write_standard_header(header_buffer, command, CommandProtocol.RAW_BIN_PROTOCOL)
+                body = io.BytesIO()
+                processing_started = clock()
+                raw_processor(body, command)
+                processed = clock()
+                frame = header_buffer.getvalue() + body.getvalue()
+            elif cached is not None or command_type in self._tag_val_output_writers:
+                if cached is not None:
+                    tag_writer, header = cached
+                else:
+                    tag_writer = self._tag_val_output_writers.get(command_type)
+                    header_buffer = io.BytesIO()
+                    self._write_standard_header(header_buffer, command, CommandProtocol.TAG_VAL_PROTOCOL)
+                    header = header_buffer.getvalue()
+                string_buffer = io.StringIO()
+                processing_started = clock()
+                tag_writer(string_buffer, command)
+                processed = clock()
+                frame = header + string_buffer.getvalue().encode("utf-8") + b"\x02"
+                self._tag_val_output_cache[cache_key] = (tag_writer, header)
+            else:
+                raise TcProtocolException(f"Message not processed: {command_type}")
+            buffer.write(frame)
+        except Exception:
+            stats.record_message(direction, command_type.id, 0, error=True)
+            raise
+
+        finished = clock()
+        stats.record_message(direction, command_type.id, len(frame))
+        stats.record_stage(
+            direction,
+            command_type.id,
+            ProtocolStats.Stage.FRAMING,
+            (processing_started - started) + (finished - processed),
+        )
+        stats.record_stage(direction, command_type.id, ProtocolStats.Stage.PROCESSING, processed - processing_started)
 
     def get_protocol_for_cmd(self, command: Generic[T]) -> CommandProtocol:
         return (
@@ -133,6 +252,18 @@ class ConfigurableProtocolConverter(MenuCommandProtocol):
         buffer.write(command.command_type.high[0].encode("utf-8"))
         buffer.write(command.command_type.low[0].encode("utf-8"))
 
+    @staticmethod
+    def _read_header(buffer: io.BytesIO) -> tuple[CommandProtocol, MessageField]:
+        proto_id = buffer.read(1)[0]
+        protocol = CommandProtocol.from_protocol_id(proto_id)
+
+        msg_type = ConfigurableProtocolConverter._get_msg_type_from_buffer(buffer)
+        cmd_type = MessageField.from_id(msg_type)
+
+        if not cmd_type:
+            raise TcProtocolException(f"Received unexpected message: {msg_type}")
+        return protocol, cmd_type
+
     @staticmethod
     def _get_msg_type_from_buffer(buffer: io.BytesIO) -> str:
         char1 = buffer.read(1).decode()
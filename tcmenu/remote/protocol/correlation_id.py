@@ -1,6 +1,64 @@
+import itertools
+import threading
 import time
 from dataclasses import dataclass
-from typing import ClassVar
+from typing import ClassVar, Optional
+
+
+class CorrelationIdGenerator:
+    """
+    Generates correlation values that fit the 32-bit wire width and never collide within a configurable window of
+    allocations. The shared sequence is an `itertools.count`, which advances atomically, so no lock is taken. Each
+    thread reserves a block of values from it at a time, so the shared sequence is touched once per block rather than
+    once per ID. Coroutines on one event loop share the block of the loop thread, which is safe as allocation never
+    awaits.
+
+    The wall clock is only read once, to seed the sequence, so that IDs from a restarted process are unlikely to
+    repeat those of the previous run.
+    """
+
+    MAX_WINDOW: ClassVar[int] = 0xFFFFFFFF
+
+    class _ThreadBlock(threading.local):
+        def __init__(self):
+            self.ids = iter(())
+
+    def __init__(self, window: int = MAX_WINDOW, block_size: int = 256, seed: Optional[int] = None):
+        """
+        Creates a generator.
+        :param window: the number of consecutive allocations that are guaranteed to be unique. Values are always in
+        the range 1..window, zero is reserved for the empty correlation.
+        :param block_size: the number of values each thread reserves at a time. Unused values in a block still count
+        towards the window.
+        :param seed: optional; the starting point of the sequence, by default derived from the current time.
+        """
+        if not 1 <= window <= CorrelationIdGenerator.MAX_WINDOW:
+            raise ValueError(f"Window must be between 1 and {CorrelationIdGenerator.MAX_WINDOW}")
+        if block_size < 1:
+            raise ValueError("Block size must be at least 1")
+
+        self._window = window
+        self._block_size = block_size
+        self._seed = (int(time.time() * 1000) if seed is None else seed) % window
+        self._blocks = itertools.count()
+        self._local = CorrelationIdGenerator._ThreadBlock()
+
+    @property
+    def window(self) -> int:
+        return self._window
+
+    def next_id(self) -> int:
+        """
+        :return: the next correlation value, between 1 and the window size inclusive.
+        """
+        local = self._local
+        value = next(local.ids, None)
+        if value is None:
+            start = next(self._blocks) * self._block_size
+            local.ids = iter(range(start + 1, start + self._block_size))
+            value = start
+
+        return (self._seed + value) % self._window + 1
 
 
 @dataclass(frozen=True)
@@ -12,8 +70,8 @@ class CorrelationId:
     purpose requiring persistence that could extend beyond that.
     """
 
-    COUNTER_MODULO: ClassVar[int] = 1000000
-    counter: ClassVar[int] = 0
+    """The generator used by new_correlation, replace it to change the uniqueness window."""
+    generator: ClassVar[CorrelationIdGenerator] = CorrelationIdGenerator()
     correlation: int
 
     @staticmethod
@@ -27,13 +85,10 @@ class CorrelationId:
     @staticmethod
     def new_correlation() -> "CorrelationId":
         """
-        Creates a new correlation ID that is relatively unique.
+        Creates a new correlation ID that is unique within the window of the generator. Safe to call from
+        any thread or coroutine.
         """
-        CorrelationId.counter += 1
-        time_part: int = int(time.time() * 1000)
-        counter_modulo = CorrelationId.counter % CorrelationId.COUNTER_MODULO
-
-        return CorrelationId(correlation=time_part + counter_modulo)
+        return CorrelationId(correlation=CorrelationId.generator.next_id())
 
     def __str__(self) -> str:
         """
@@ -1,6 +1,7 @@
 import io
+import string
 import uuid
-from typing import Any
+from typing import Any, Callable
 
 from tcmenu.domain.edit_item_type import EditItemType
 from tcmenu.domain.menu_items import (
@@ -15,10 +16,13 @@ from tcmenu.domain.menu_items import (
     ScrollChoiceMenuItem,
     ActionMenuItem,
     BooleanMenuItem,
+    MenuItem,
 )
 from tcmenu.domain.state.current_scroll_position import CurrentScrollPosition
 from tcmenu.domain.state.list_response import ListResponse
+from tcmenu.domain.state.list_row_change import ListRowChange
 from tcmenu.domain.state.portable_color import PortableColor
+from tcmenu.domain.util.menu_item_interner import MenuItemInterner
 from tcmenu.remote.commands.ack_status import AckStatus
 from tcmenu.remote.commands.command_factory import CommandFactory
 from tcmenu.remote.commands.dialog_mode import DialogMode
@@ -44,14 +48,28 @@ from tcmenu.remote.commands.menu_command_type import MenuCommandType
 from tcmenu.remote.commands.menu_dialog_command import MenuDialogCommand
 from tcmenu.remote.commands.menu_heartbeat_command import MenuHeartbeatCommand
 from tcmenu.remote.commands.menu_join_command import MenuJoinCommand
+from tcmenu.remote.commands.menu_list_commands import (
+    MAX_LIST_ROWS_PER_COMMAND,
+    MenuListDeltaCommand,
+    MenuListFetchCommand,
+    MenuListRowsCommand,
+)
 from tcmenu.remote.commands.menu_pairing_command import MenuPairingCommand
 from tcmenu.remote.protocol.correlation_id import CorrelationId
 from tcmenu.remote.protocol.protocol_util import ProtocolUtil
 from tcmenu.remote.protocol.tag_val_menu_fields import TagValMenuFields
 from tcmenu.remote.protocol.tag_val_text_parser import TagValTextParser
+from tcmenu.remote.protocol.tag_val_writer_template import TagValWriterTemplate, flag, tag_val_field
+from tcmenu.remote.protocol.tc_protocol_exception import TcProtocolException
+
+# Boot items decoded from every connection share one instance for each definition.
+_INTERNER = MenuItemInterner.shared()
 
 
 class TagValMenuCommandProcessors:
+    # Second characters of the row fields of the paged list commands, one for each of MAX_LIST_ROWS_PER_COMMAND.
+    _LIST_KEY_CHARS: str = string.ascii_uppercase + string.ascii_lowercase
+
     # noinspection PyUnresolvedReferences
     @staticmethod
     def add_handlers_to_protocol(proto: "ConfigurableProtocolConverter"):
@@ -108,6 +126,15 @@ class TagValMenuCommandProcessors:
         proto.add_tag_val_in_processor(
             MenuCommandType.DIALOG_UPDATE.message_field, TagValMenuCommandProcessors._process_dialog_update
         )
+        proto.add_tag_val_in_processor(
+            MenuCommandType.LIST_FETCH.message_field, TagValMenuCommandProcessors._process_list_fetch
+        )
+        proto.add_tag_val_in_processor(
+            MenuCommandType.LIST_ROWS.message_field, TagValMenuCommandProcessors._process_list_rows
+        )
+        proto.add_tag_val_in_processor(
+            MenuCommandType.LIST_DELTA.message_field, TagValMenuCommandProcessors._process_list_delta
+        )
 
         # Output processors
         proto.add_tag_val_out_processor(
@@ -194,6 +221,21 @@ class TagValMenuCommandProcessors:
             TagValMenuCommandProcessors._write_dialog_update,
             MenuDialogCommand,
         )
+        proto.add_tag_val_out_processor(
+            MenuCommandType.LIST_FETCH.message_field,
+            TagValMenuCommandProcessors._write_list_fetch,
+            MenuListFetchCommand,
+        )
+        proto.add_tag_val_out_processor(
+            MenuCommandType.LIST_ROWS.message_field,
+            TagValMenuCommandProcessors._write_list_rows,
+            MenuListRowsCommand,
+        )
+        proto.add_tag_val_out_processor(
+            MenuCommandType.LIST_DELTA.message_field,
+            TagValMenuCommandProcessors._write_list_delta,
+            MenuListDeltaCommand,
+        )
 
     @staticmethod
     def _process_join(parser: TagValTextParser) -> MenuJoinCommand:
@@ -240,7 +282,9 @@ class TagValMenuCommandProcessors:
         parent_id: int = parser.get_value_as_int(TagValMenuFields.KEY_PARENT_ID_FIELD.value)
         current_val: int = parser.get_value_as_int(TagValMenuFields.KEY_CURRENT_VAL.value)
 
-        return CommandFactory.new_analog_boot_command(parent_id=parent_id, item=item, current_value=current_val)
+        return CommandFactory.new_analog_boot_command(
+            parent_id=parent_id, item=_INTERNER.intern(item), current_value=current_val
+        )
 
     @staticmethod
     def _process_sub_menu_boot_item(parser: TagValTextParser) -> MenuSubBootCommand:
@@ -252,7 +296,7 @@ class TagValMenuCommandProcessors:
 
         parent_id: int = parser.get_value_as_int(TagValMenuFields.KEY_PARENT_ID_FIELD.value)
 
-        return CommandFactory.new_sub_menu_boot_command(parent_id=parent_id, item=item)
+        return CommandFactory.new_sub_menu_boot_command(parent_id=parent_id, item=_INTERNER.intern(item))
 
     @staticmethod
     def _process_enum_boot_item(parser: TagValTextParser) -> MenuEnumBootCommand:
@@ -269,7 +313,9 @@ class TagValMenuCommandProcessors:
         parent_id: int = parser.get_value_as_int(TagValMenuFields.KEY_PARENT_ID_FIELD.value)
         current_val: int = parser.get_value_as_int(TagValMenuFields.KEY_CURRENT_VAL.value)
 
-        return CommandFactory.new_menu_enum_boot_command(parent_id=parent_id, item=item, current_value=current_val)
+        return CommandFactory.new_menu_enum_boot_command(
+            parent_id=parent_id, item=_INTERNER.intern(item), current_value=current_val
+        )
 
     @staticmethod
     def _process_boolean_boot_item(parser: TagValTextParser) -> MenuBooleanBootCommand:
@@ -288,7 +334,7 @@ class TagValMenuCommandProcessors:
         current_val: int = parser.get_value_as_int(TagValMenuFields.KEY_CURRENT_VAL.value)
 
         return CommandFactory.new_menu_boolean_boot_command(
-            parent_id=parent_id, item=item, current_value=current_val != 0
+            parent_id=parent_id, item=_INTERNER.intern(item), current_value=current_val != 0
         )
 
     @staticmethod
@@ -308,7 +354,7 @@ class TagValMenuCommandProcessors:
         current_val: str = parser.get_value(TagValMenuFields.KEY_CURRENT_VAL.value).replace("[", "").replace("]", "")
 
         return CommandFactory.new_menu_large_item_boot_command(
-            parent_id=parent_id, item=item, current_value=float(current_val)
+            parent_id=parent_id, item=_INTERNER.intern(item), current_value=float(current_val)
         )
 
     @staticmethod
@@ -370,7 +416,9 @@ class TagValMenuCommandProcessors:
         parent_id: int = parser.get_value_as_int(TagValMenuFields.KEY_PARENT_ID_FIELD.value)
         current_val: str = parser.get_value(TagValMenuFields.KEY_CURRENT_VAL.value)
 
-        return CommandFactory.new_menu_text_boot_command(parent_id=parent_id, item=item, current_value=current_val)
+        return CommandFactory.new_menu_text_boot_command(
+            parent_id=parent_id, item=_INTERNER.intern(item), current_value=current_val
+        )
 
     @staticmethod
     def _process_float_boot_item(parser: TagValTextParser) -> MenuFloatBootCommand:
@@ -387,7 +435,7 @@ class TagValMenuCommandProcessors:
         current_val: str = parser.get_value(TagValMenuFields.KEY_CURRENT_VAL.value)
 
         return CommandFactory.new_menu_float_boot_command(
-            parent_id=parent_id, item=item, current_value=float(current_val)
+            parent_id=parent_id, item=_INTERNER.intern(item), current_value=float(current_val)
         )
 
     @staticmethod
@@ -400,7 +448,7 @@ class TagValMenuCommandProcessors:
 
         parent_id: int = parser.get_value_as_int(TagValMenuFields.KEY_PARENT_ID_FIELD.value)
 
-        return MenuActionBootCommand(sub_menu_id=parent_id, menu_item=item, current_value=False)
+        return MenuActionBootCommand(sub_menu_id=parent_id, menu_item=_INTERNER.intern(item), current_value=False)
 
     @staticmethod
     def _process_runtime_list_boot_item(parser: TagValTextParser) -> MenuRuntimeListBootCommand:
@@ -416,7 +464,9 @@ class TagValMenuCommandProcessors:
         parent_id: int = parser.get_value_as_int(TagValMenuFields.KEY_PARENT_ID_FIELD.value)
         choices: tuple[str, ...] = TagValMenuCommandProcessors._choices_from_msg(parser)
 
-        return CommandFactory.new_runtime_list_boot_command(parent_id=parent_id, item=item, current_value=choices)
+        return CommandFactory.new_runtime_list_boot_command(
+            parent_id=parent_id, item=_INTERNER.intern(item), current_value=choices
+        )
 
     @staticmethod
     def _choices_from_msg(parser: TagValTextParser) -> tuple[str, ...]:
@@ -451,7 +501,7 @@ class TagValMenuCommandProcessors:
         current_val: str = parser.get_value(TagValMenuFields.KEY_CURRENT_VAL.value)
 
         return CommandFactory.new_menu_rgb32_boot_command(
-            parent_id=parent_id, item=item, current_value=PortableColor.from_html(current_val)
+            parent_id=parent_id, item=_INTERNER.intern(item), current_value=PortableColor.from_html(current_val)
         )
 
     @staticmethod
@@ -470,7 +520,7 @@ class TagValMenuCommandProcessors:
         current_val: str = parser.get_value(TagValMenuFields.KEY_CURRENT_VAL.value)
 
         return CommandFactory.new_menu_scroll_choice_boot_command(
-            parent_id=parent_id, item=item, current_value=CurrentScrollPosition.from_text(current_val)
+            parent_id=parent_id, item=_INTERNER.intern(item), current_value=CurrentScrollPosition.from_text(current_val)
         )
 
     @staticmethod
@@ -508,216 +558,335 @@ class TagValMenuCommandProcessors:
             correlation_id=correlation_id,
         )
 
+    @staticmethod
+    def _process_list_fetch(parser: TagValTextParser) -> MenuListFetchCommand:
+        return CommandFactory.new_list_fetch_command(
+            correlation_id=TagValMenuCommandProcessors._correlation_from_msg(parser),
+            item=parser.get_value_as_int(TagValMenuFields.KEY_ID_FIELD.value),
+            start_row=parser.get_value_as_int(TagValMenuFields.KEY_LIST_START.value),
+            row_count=parser.get_value_as_int(TagValMenuFields.KEY_LIST_COUNT.value),
+        )
+
+    @staticmethod
+    def _process_list_rows(parser: TagValTextParser) -> MenuListRowsCommand:
+        prefix: str = TagValMenuFields.KEY_PREPEND_LIST_ROW.value
+        rows: tuple[str, ...] = tuple(
+            parser.get_value(prefix + key_char, "")
+            for key_char in TagValMenuCommandProcessors._list_keys(
+                parser.get_value_as_int(TagValMenuFields.KEY_LIST_COUNT.value)
+            )
+        )
+
+        return MenuListRowsCommand(
+            menu_item_id=parser.get_value_as_int(TagValMenuFields.KEY_ID_FIELD.value),
+            correlation_id=TagValMenuCommandProcessors._correlation_from_msg(parser),
+            start_row=parser.get_value_as_int(TagValMenuFields.KEY_LIST_START.value),
+            total_rows=parser.get_value_as_int(TagValMenuFields.KEY_LIST_TOTAL.value),
+            rows=rows,
+        )
+
+    @staticmethod
+    def _process_list_delta(parser: TagValTextParser) -> MenuListDeltaCommand:
+        prefix: str = TagValMenuFields.KEY_PREPEND_LIST_CHANGE.value
+        changes: list[ListRowChange] = []
+        for key_char in TagValMenuCommandProcessors._list_keys(
+            parser.get_value_as_int(TagValMenuFields.KEY_LIST_COUNT.value)
+        ):
+            change = ListRowChange.from_string(parser.get_value(prefix + key_char))
+            if change is None:
+                raise TcProtocolException(f"Invalid list row change in field {prefix + key_char}")
+            changes.append(change)
+
+        return MenuListDeltaCommand(
+            menu_item_id=parser.get_value_as_int(TagValMenuFields.KEY_ID_FIELD.value),
+            correlation_id=TagValMenuCommandProcessors._correlation_from_msg(parser),
+            total_rows=parser.get_value_as_int(TagValMenuFields.KEY_LIST_TOTAL.value),
+            changes=tuple(changes),
+        )
+
+    @staticmethod
+    def _correlation_from_msg(parser: TagValTextParser) -> CorrelationId:
+        correlation_str: str = parser.get_value(TagValMenuFields.KEY_CORRELATION_FIELD.value, "")
+        # noinspection PyUnresolvedReferences
+        return (
+            CorrelationId.from_string(correlation_str) if len(correlation_str) != 0 else CorrelationId.EMPTY_CORRELATION
+        )
+
     @staticmethod
     def _write_join(buffer: io.StringIO, command: MenuJoinCommand) -> None:
-        TagValMenuCommandProcessors._append_field(buffer, TagValMenuFields.KEY_NAME_FIELD.value, command.my_name)
-        TagValMenuCommandProcessors._append_field(buffer, TagValMenuFields.KEY_UUID_FIELD.value, command.app_uuid)
-        TagValMenuCommandProcessors._append_field(buffer, TagValMenuFields.KEY_VER_FIELD.value, command.api_version)
-        TagValMenuCommandProcessors._append_field(buffer, TagValMenuFields.KEY_PLATFORM_ID.value, command.platform.key)
-        TagValMenuCommandProcessors._append_field(buffer, TagValMenuFields.KEY_SERIAL_NO.value, command.serial_number)
+        buffer.write(_JOIN.render(command))
 
     @staticmethod
     def _write_heartbeat(buffer: io.StringIO, command: MenuHeartbeatCommand) -> None:
-        TagValMenuCommandProcessors._append_field(
-            buffer, TagValMenuFields.HB_FREQUENCY_FIELD.value, command.heartbeat_interval
-        )
-        TagValMenuCommandProcessors._append_field(buffer, TagValMenuFields.HB_MODE_FIELD.value, command.mode.value)
+        buffer.write(_HEARTBEAT.render(command))
 
     @staticmethod
     def _write_bootstrap(buffer: io.StringIO, command: MenuBootstrapCommand) -> None:
-        TagValMenuCommandProcessors._append_field(
-            buffer, TagValMenuFields.KEY_BOOT_TYPE_FIELD.value, command.boot_type.name
-        )
+        buffer.write(_BOOTSTRAP.render(command))
 
     @staticmethod
     def _write_analog_boot_item(buffer: io.StringIO, command: MenuAnalogBootCommand) -> None:
-        TagValMenuCommandProcessors._write_common_boot_fields(buffer, command)
-        TagValMenuCommandProcessors._append_field(
-            buffer, TagValMenuFields.KEY_ANALOG_OFFSET_FIELD.value, command.menu_item.offset
-        )
-        TagValMenuCommandProcessors._append_field(
-            buffer, TagValMenuFields.KEY_ANALOG_DIVISOR_FIELD.value, command.menu_item.divisor
-        )
-        TagValMenuCommandProcessors._append_field(
-            buffer, TagValMenuFields.KEY_ANALOG_MAX_FIELD.value, command.menu_item.max_value
-        )
-        TagValMenuCommandProcessors._append_field(
-            buffer, TagValMenuFields.KEY_ANALOG_STEP_FIELD.value, command.menu_item.step
-        )
-        TagValMenuCommandProcessors._append_field(
-            buffer, TagValMenuFields.KEY_ANALOG_UNIT_FIELD.value, command.menu_item.unit_name
-        )
-        TagValMenuCommandProcessors._append_field(buffer, TagValMenuFields.KEY_CURRENT_VAL.value, command.current_value)
+        buffer.write("".join(TagValMenuCommandProcessors.boot_item_parts(command)))
 
     @staticmethod
     def _write_sub_menu_boot_item(buffer: io.StringIO, command: MenuSubBootCommand) -> None:
-        TagValMenuCommandProcessors._write_common_boot_fields(buffer, command)
-        TagValMenuCommandProcessors._append_field(buffer, TagValMenuFields.KEY_CURRENT_VAL.value, 0)
+        buffer.write("".join(TagValMenuCommandProcessors.boot_item_parts(command)))
 
     @staticmethod
     def _write_enum_boot_item(buffer: io.StringIO, command: MenuEnumBootCommand) -> None:
-        TagValMenuCommandProcessors._write_common_boot_fields(buffer, command)
-        TagValMenuCommandProcessors._append_field(buffer, TagValMenuFields.KEY_CURRENT_VAL.value, command.current_value)
-        entries: tuple[str, ...] = command.menu_item.enum_entries
-        TagValMenuCommandProcessors._append_choices(buffer=buffer, entries=entries)
+        buffer.write("".join(TagValMenuCommandProcessors.boot_item_parts(command)))
 
     @staticmethod
     def _write_boolean_boot_item(buffer: io.StringIO, command: MenuBooleanBootCommand) -> None:
-        TagValMenuCommandProcessors._write_common_boot_fields(buffer, command)
-        TagValMenuCommandProcessors._append_field(
-            buffer, TagValMenuFields.KEY_BOOLEAN_NAMING.value, command.menu_item.naming.value
-        )
-        TagValMenuCommandProcessors._append_field(
-            buffer, TagValMenuFields.KEY_CURRENT_VAL.value, 1 if command.current_value is True else 0
-        )
+        buffer.write("".join(TagValMenuCommandProcessors.boot_item_parts(command)))
 
     @staticmethod
     def _write_large_num_boot_item(buffer: io.StringIO, command: MenuLargeNumBootCommand) -> None:
-        TagValMenuCommandProcessors._write_common_boot_fields(buffer, command)
-        decimal_places = command.menu_item.decimal_places
-        TagValMenuCommandProcessors._append_field(
-            buffer, TagValMenuFields.KEY_FLOAT_DECIMAL_PLACES.value, decimal_places
-        )
-        TagValMenuCommandProcessors._append_field(
-            buffer, TagValMenuFields.KEY_NEGATIVE_ALLOWED.value, 1 if command.menu_item.negative_allowed else 0
-        )
-        TagValMenuCommandProcessors._append_field(
-            buffer, TagValMenuFields.KEY_MAX_LENGTH.value, command.menu_item.digits_allowed
-        )
-
-        # Formatting the current value
-        current_val = "{:,.{prec}f}".format(command.current_value, prec=decimal_places).replace(",", "")
-        TagValMenuCommandProcessors._append_field(buffer, TagValMenuFields.KEY_CURRENT_VAL.value, current_val)
+        buffer.write("".join(TagValMenuCommandProcessors.boot_item_parts(command)))
 
     @staticmethod
     def _write_item_change(buffer: io.StringIO, command: MenuChangeCommand) -> None:
-        TagValMenuCommandProcessors._append_field(
-            buffer, TagValMenuFields.KEY_CORRELATION_FIELD.value, command.correlation_id
-        )
-        TagValMenuCommandProcessors._append_field(buffer, TagValMenuFields.KEY_ID_FIELD.value, command.menu_item_id)
-        TagValMenuCommandProcessors._append_field(
-            buffer, TagValMenuFields.KEY_CHANGE_TYPE.value, command.change_type.value
-        )
+        buffer.write(_ITEM_CHANGE.render(command))
         if command.change_type == MenuChangeCommand.ChangeType.ABSOLUTE_LIST:
             TagValMenuCommandProcessors._append_choices(buffer=buffer, entries=command.value)
         else:
-            TagValMenuCommandProcessors._append_field(buffer, TagValMenuFields.KEY_CURRENT_VAL.value, command.value)
+            buffer.write(tag_val_field(TagValMenuFields.KEY_CURRENT_VAL.value, command.value))
 
     @staticmethod
     def _write_text_boot_item(buffer: io.StringIO, command: MenuTextBootCommand) -> None:
-        TagValMenuCommandProcessors._write_common_boot_fields(buffer, command)
-        TagValMenuCommandProcessors._append_field(
-            buffer, TagValMenuFields.KEY_MAX_LENGTH.value, command.menu_item.text_length
-        )
-        TagValMenuCommandProcessors._append_field(
-            buffer, TagValMenuFields.KEY_EDIT_TYPE.value, command.menu_item.item_type.message_id
-        )
-        TagValMenuCommandProcessors._append_field(buffer, TagValMenuFields.KEY_CURRENT_VAL.value, command.current_value)
+        buffer.write("".join(TagValMenuCommandProcessors.boot_item_parts(command)))
 
     @staticmethod
     def _write_float_boot_item(buffer: io.StringIO, command: MenuFloatBootCommand) -> None:
-        TagValMenuCommandProcessors._write_common_boot_fields(buffer, command)
-        TagValMenuCommandProcessors._append_field(
-            buffer, TagValMenuFields.KEY_FLOAT_DECIMAL_PLACES.value, command.menu_item.num_decimal_places
-        )
-        TagValMenuCommandProcessors._append_field(buffer, TagValMenuFields.KEY_CURRENT_VAL.value, command.current_value)
+        buffer.write("".join(TagValMenuCommandProcessors.boot_item_parts(command)))
 
     @staticmethod
     def _write_action_boot_item(buffer: io.StringIO, command: MenuActionBootCommand) -> None:
-        TagValMenuCommandProcessors._write_common_boot_fields(buffer, command)
-        TagValMenuCommandProcessors._append_field(buffer, TagValMenuFields.KEY_CURRENT_VAL.value, "")
+        buffer.write("".join(TagValMenuCommandProcessors.boot_item_parts(command)))
 
     @staticmethod
     def _write_runtime_list_boot_item(buffer: io.StringIO, command: MenuRuntimeListBootCommand) -> None:
-        TagValMenuCommandProcessors._write_common_boot_fields(buffer, command)
-        TagValMenuCommandProcessors._append_choices(buffer=buffer, entries=command.current_value)
+        buffer.write("".join(TagValMenuCommandProcessors.boot_item_parts(command)))
 
     @staticmethod
     def _write_runtime_rgb_color_item(buffer: io.StringIO, command: MenuRgb32BootCommand) -> None:
-        TagValMenuCommandProcessors._write_common_boot_fields(buffer, command)
-        TagValMenuCommandProcessors._append_field(
-            buffer, TagValMenuFields.KEY_ALPHA_FIELD.value, 1 if command.menu_item.include_alpha_channel else 0
-        )
-        TagValMenuCommandProcessors._append_field(buffer, TagValMenuFields.KEY_CURRENT_VAL.value, command.current_value)
+        buffer.write("".join(TagValMenuCommandProcessors.boot_item_parts(command)))
 
     @staticmethod
     def _write_runtime_scroll_choice(buffer: io.StringIO, command: MenuScrollChoiceBootCommand) -> None:
-        TagValMenuCommandProcessors._write_common_boot_fields(buffer, command)
-        TagValMenuCommandProcessors._append_field(
-            buffer, TagValMenuFields.KEY_WIDTH_FIELD.value, command.menu_item.item_width
-        )
-        TagValMenuCommandProcessors._append_field(
-            buffer, TagValMenuFields.KEY_NO_OF_CHOICES.value, command.menu_item.num_entries
-        )
-        TagValMenuCommandProcessors._append_field(buffer, TagValMenuFields.KEY_CURRENT_VAL.value, command.current_value)
+        buffer.write("".join(TagValMenuCommandProcessors.boot_item_parts(command)))
 
     @staticmethod
     def _write_acknowledgement(buffer: io.StringIO, command: MenuAcknowledgementCommand) -> None:
-        TagValMenuCommandProcessors._append_field(
-            buffer, TagValMenuFields.KEY_CORRELATION_FIELD.value, command.correlation_id
-        )
-        TagValMenuCommandProcessors._append_field(
-            buffer, TagValMenuFields.KEY_ACK_STATUS.value, command.ack_status.status_code
-        )
+        buffer.write(_ACKNOWLEDGEMENT.render(command))
 
     @staticmethod
     def _write_pairing_request(buffer: io.StringIO, command: MenuPairingCommand) -> None:
-        TagValMenuCommandProcessors._append_field(buffer, TagValMenuFields.KEY_NAME_FIELD.value, command.name)
-        TagValMenuCommandProcessors._append_field(buffer, TagValMenuFields.KEY_UUID_FIELD.value, command.uuid)
+        buffer.write(_PAIRING_REQUEST.render(command))
 
     @staticmethod
     def _write_dialog_update(buffer: io.StringIO, command: MenuDialogCommand) -> None:
-        TagValMenuCommandProcessors._append_field(
-            buffer, TagValMenuFields.KEY_MODE_FIELD.value, command.dialog_mode.value
-        )
+        buffer.write(tag_val_field(TagValMenuFields.KEY_MODE_FIELD.value, command.dialog_mode.value))
         if command.header is not None:
-            TagValMenuCommandProcessors._append_field(buffer, TagValMenuFields.KEY_HEADER_FIELD.value, command.header)
+            buffer.write(tag_val_field(TagValMenuFields.KEY_HEADER_FIELD.value, command.header))
         if command.buffer is not None:
-            TagValMenuCommandProcessors._append_field(buffer, TagValMenuFields.KEY_BUFFER_FIELD.value, command.buffer)
-        TagValMenuCommandProcessors._append_field(
-            buffer, TagValMenuFields.KEY_BUTTON1_FIELD.value, command.button1.type_value
-        )
-        TagValMenuCommandProcessors._append_field(
-            buffer, TagValMenuFields.KEY_BUTTON2_FIELD.value, command.button2.type_value
-        )
-        TagValMenuCommandProcessors._append_field(
-            buffer, TagValMenuFields.KEY_CORRELATION_FIELD.value, command.correlation_id
-        )
+            buffer.write(tag_val_field(TagValMenuFields.KEY_BUFFER_FIELD.value, command.buffer))
+        buffer.write(_DIALOG_BUTTONS.render(command))
 
     @staticmethod
-    def _write_common_boot_fields(buffer: io.StringIO, command: BootItemMenuCommand):
-        TagValMenuCommandProcessors._append_field(
-            buffer, TagValMenuFields.KEY_PARENT_ID_FIELD.value, command.sub_menu_id
-        )
-        TagValMenuCommandProcessors._append_field(buffer, TagValMenuFields.KEY_ID_FIELD.value, command.menu_item.id)
-        TagValMenuCommandProcessors._append_field(
-            buffer, TagValMenuFields.KEY_EEPROM_FIELD.value, command.menu_item.eeprom_address
-        )
-        TagValMenuCommandProcessors._append_field(buffer, TagValMenuFields.KEY_NAME_FIELD.value, command.menu_item.name)
-        TagValMenuCommandProcessors._append_field(
-            buffer, TagValMenuFields.KEY_READONLY_FIELD.value, 1 if command.menu_item.read_only else 0
-        )
-        TagValMenuCommandProcessors._append_field(
-            buffer, TagValMenuFields.KEY_VISIBLE_FIELD.value, 1 if command.menu_item.visible else 0
+    def _write_list_fetch(buffer: io.StringIO, command: MenuListFetchCommand) -> None:
+        buffer.write(_LIST_FETCH.render(command))
+
+    @staticmethod
+    def _write_list_rows(buffer: io.StringIO, command: MenuListRowsCommand) -> None:
+        keys = TagValMenuCommandProcessors._list_keys(len(command.rows))
+        buffer.write(_LIST_ROWS.render(command))
+        prefix: str = TagValMenuFields.KEY_PREPEND_LIST_ROW.value
+        buffer.write("".join(tag_val_field(prefix + key_char, row) for key_char, row in zip(keys, command.rows)))
+
+    @staticmethod
+    def _write_list_delta(buffer: io.StringIO, command: MenuListDeltaCommand) -> None:
+        keys = TagValMenuCommandProcessors._list_keys(len(command.changes))
+        buffer.write(_LIST_DELTA.render(command))
+        prefix: str = TagValMenuFields.KEY_PREPEND_LIST_CHANGE.value
+        buffer.write(
+            "".join(tag_val_field(prefix + key_char, str(change)) for key_char, change in zip(keys, command.changes))
         )
 
     @staticmethod
-    def _append_choices(buffer: io.StringIO, entries: tuple[str, ...]):
-        if entries is None:
-            TagValMenuCommandProcessors._append_field(buffer, TagValMenuFields.KEY_NO_OF_CHOICES.value, 0)
-        else:
-            TagValMenuCommandProcessors._append_field(buffer, TagValMenuFields.KEY_NO_OF_CHOICES.value, len(entries))
-            for i, entry in enumerate(entries):
-                TagValMenuCommandProcessors._append_field(
-                    buffer, TagValMenuFields.KEY_PREPEND_CHOICE.value + chr(65 + i), entry
-                )
+    def _list_keys(count: int) -> str:
+        """The second characters of the row fields of a list command, unlike choices they never run past letters."""
+        if not 0 <= count <= MAX_LIST_ROWS_PER_COMMAND:
+            raise TcProtocolException(
+                f"A list command carries 0 to {MAX_LIST_ROWS_PER_COMMAND} rows, not {count}, split it with CommandFactory"
+            )
+        return TagValMenuCommandProcessors._LIST_KEY_CHARS[:count]
+
+    @staticmethod
+    def boot_item_parts(command: BootItemMenuCommand) -> tuple[str, str, str]:
+        """
+        Writes the payload of a boot item in three parts, the definition fields before the current value, the fields
+        that carry the current value, and the definition fields after it. Joined, the parts are the payload written
+        for the command, so a sender can keep the definition parts and only rewrite the value when it changes.
+        :param command: a boot item command of one of the standard boot item types.
+        :return: the definition before the value, the value fields, and the definition after the value.
+        :raises TcProtocolException: if the command is not one of the standard boot item types.
+        """
+        layout = _BOOT_ITEM_LAYOUTS.get(command.__class__)
+        if layout is None:
+            raise TcProtocolException(f"No boot item layout for {command.__class__.__name__}")
+        before, value_fields, after = layout
+        item = command.menu_item
+        return before.render(command), value_fields(item, command.current_value), after(item)
+
+    @staticmethod
+    def boot_item_value_fields(command_class: type, item: MenuItem, value: Any) -> str:
+        """
+        Writes the fields that carry the current value of a boot item, exactly as boot_item_parts writes them for a
+        command of the given class holding the item and value.
+        :param command_class: the class of boot item command.
+        :param item: the menu item.
+        :param value: the current value of the item.
+        :return: the value fields.
+        :raises TcProtocolException: if the class is not one of the standard boot item types.
+        """
+        layout = _BOOT_ITEM_LAYOUTS.get(command_class)
+        if layout is None:
+            raise TcProtocolException(f"No boot item layout for {command_class.__name__}")
+        return layout[1](item, value)
 
     @staticmethod
-    def _append_field(buffer: io.StringIO, key: str, value: Any):
-        if isinstance(value, str):
-            if "|" in value:
-                value = value.replace("|", "\\|")
-            if "=" in value:
-                value = value.replace("=", "\\=")
+    def _append_choices(buffer: io.StringIO, entries: tuple[str, ...]):
+        buffer.write(_choice_fields(entries))
+
+
+# Writer templates for the fixed fields of each command class, compiled once when the module is loaded.
+_COMMON_BOOT = TagValWriterTemplate(
+    (TagValMenuFields.KEY_PARENT_ID_FIELD, "sub_menu_id"),
+    (TagValMenuFields.KEY_ID_FIELD, "menu_item.id"),
+    (TagValMenuFields.KEY_EEPROM_FIELD, "menu_item.eeprom_address"),
+    (TagValMenuFields.KEY_NAME_FIELD, "menu_item.name"),
+    (TagValMenuFields.KEY_READONLY_FIELD, "menu_item.read_only", flag),
+    (TagValMenuFields.KEY_VISIBLE_FIELD, "menu_item.visible", flag),
+)
+_ANALOG_BOOT = _COMMON_BOOT.extend(
+    (TagValMenuFields.KEY_ANALOG_OFFSET_FIELD, "menu_item.offset"),
+    (TagValMenuFields.KEY_ANALOG_DIVISOR_FIELD, "menu_item.divisor"),
+    (TagValMenuFields.KEY_ANALOG_MAX_FIELD, "menu_item.max_value"),
+    (TagValMenuFields.KEY_ANALOG_STEP_FIELD, "menu_item.step"),
+    (TagValMenuFields.KEY_ANALOG_UNIT_FIELD, "menu_item.unit_name"),
+)
+_BOOLEAN_BOOT = _COMMON_BOOT.extend((TagValMenuFields.KEY_BOOLEAN_NAMING, "menu_item.naming.value"))
+_LARGE_NUM_BOOT = _COMMON_BOOT.extend(
+    (TagValMenuFields.KEY_FLOAT_DECIMAL_PLACES, "menu_item.decimal_places"),
+    (TagValMenuFields.KEY_NEGATIVE_ALLOWED, "menu_item.negative_allowed", flag),
+    (TagValMenuFields.KEY_MAX_LENGTH, "menu_item.digits_allowed"),
+)
+_TEXT_BOOT = _COMMON_BOOT.extend(
+    (TagValMenuFields.KEY_MAX_LENGTH, "menu_item.text_length"),
+    (TagValMenuFields.KEY_EDIT_TYPE, "menu_item.item_type.message_id"),
+)
+_FLOAT_BOOT = _COMMON_BOOT.extend((TagValMenuFields.KEY_FLOAT_DECIMAL_PLACES, "menu_item.num_decimal_places"))
+_RGB32_BOOT = _COMMON_BOOT.extend((TagValMenuFields.KEY_ALPHA_FIELD, "menu_item.include_alpha_channel", flag))
+_SCROLL_CHOICE_BOOT = _COMMON_BOOT.extend(
+    (TagValMenuFields.KEY_WIDTH_FIELD, "menu_item.item_width"),
+    (TagValMenuFields.KEY_NO_OF_CHOICES, "menu_item.num_entries"),
+)
+
+
+def _choice_fields(entries: tuple[str, ...]) -> str:
+    if entries is None:
+        return tag_val_field(TagValMenuFields.KEY_NO_OF_CHOICES.value, 0)
+    prefix: str = TagValMenuFields.KEY_PREPEND_CHOICE.value
+    return tag_val_field(TagValMenuFields.KEY_NO_OF_CHOICES.value, len(entries)) + "".join(
+        tag_val_field(prefix + chr(65 + i), entry) for i, entry in enumerate(entries)
+    )
+
+
+def _current_value_field(_item: MenuItem, value: Any) -> str:
+    return tag_val_field(TagValMenuFields.KEY_CURRENT_VAL.value, value)
+
+
+def _boolean_value_field(_item: MenuItem, value: Any) -> str:
+    return tag_val_field(TagValMenuFields.KEY_CURRENT_VAL.value, 1 if value is True else 0)
+
+
+def _large_num_value_field(item: EditableLargeNumberMenuItem, value: Any) -> str:
+    current_val = "{:,.{prec}f}".format(value, prec=item.decimal_places).replace(",", "")
+    return tag_val_field(TagValMenuFields.KEY_CURRENT_VAL.value, current_val)
+
 
-        buffer.write(f"{key}={value}|")
+def _no_fields(_item: MenuItem) -> str:
+    return ""
+
+
+_SUB_MENU_CURRENT_VALUE = tag_val_field(TagValMenuFields.KEY_CURRENT_VAL.value, 0)
+_ACTION_CURRENT_VALUE = tag_val_field(TagValMenuFields.KEY_CURRENT_VAL.value, "")
+
+# For each boot item command class, the template of the definition fields before the current value, the writer of the
+# value fields from the item and value, and the writer of any definition fields that follow the value.
+_BOOT_ITEM_LAYOUTS: dict[
+    type, tuple[TagValWriterTemplate, Callable[[MenuItem, Any], str], Callable[[MenuItem], str]]
+] = {
+    MenuAnalogBootCommand: (_ANALOG_BOOT, _current_value_field, _no_fields),
+    MenuSubBootCommand: (_COMMON_BOOT, lambda item, value: _SUB_MENU_CURRENT_VALUE, _no_fields),
+    MenuEnumBootCommand: (_COMMON_BOOT, _current_value_field, lambda item: _choice_fields(item.enum_entries)),
+    MenuBooleanBootCommand: (_BOOLEAN_BOOT, _boolean_value_field, _no_fields),
+    MenuLargeNumBootCommand: (_LARGE_NUM_BOOT, _large_num_value_field, _no_fields),
+    MenuTextBootCommand: (_TEXT_BOOT, _current_value_field, _no_fields),
+    MenuFloatBootCommand: (_FLOAT_BOOT, _current_value_field, _no_fields),
+    MenuActionBootCommand: (_COMMON_BOOT, lambda item, value: _ACTION_CURRENT_VALUE, _no_fields),
+    MenuRuntimeListBootCommand: (_COMMON_BOOT, lambda item, value: _choice_fields(value), _no_fields),
+    MenuRgb32BootCommand: (_RGB32_BOOT, _current_value_field, _no_fields),
+    MenuScrollChoiceBootCommand: (_SCROLL_CHOICE_BOOT, _current_value_field, _no_fields),
+}
+
+_JOIN = TagValWriterTemplate(
+    (TagValMenuFields.KEY_NAME_FIELD, "my_name"),
+    (TagValMenuFields.KEY_UUID_FIELD, "app_uuid"),
+    (TagValMenuFields.KEY_VER_FIELD, "api_version"),
+    (TagValMenuFields.KEY_PLATFORM_ID, "platform.key"),
+    (TagValMenuFields.KEY_SERIAL_NO, "serial_number"),
+)
+_HEARTBEAT = TagValWriterTemplate(
+    (TagValMenuFields.HB_FREQUENCY_FIELD, "heartbeat_interval"),
+    (TagValMenuFields.HB_MODE_FIELD, "mode.value"),
+)
+_BOOTSTRAP = TagValWriterTemplate((TagValMenuFields.KEY_BOOT_TYPE_FIELD, "boot_type.name"))
+_ITEM_CHANGE = TagValWriterTemplate(
+    (TagValMenuFields.KEY_CORRELATION_FIELD, "correlation_id"),
+    (TagValMenuFields.KEY_ID_FIELD, "menu_item_id"),
+    (TagValMenuFields.KEY_CHANGE_TYPE, "change_type.value"),
+)
+_ACKNOWLEDGEMENT = TagValWriterTemplate(
+    (TagValMenuFields.KEY_CORRELATION_FIELD, "correlation_id"),
+    (TagValMenuFields.KEY_ACK_STATUS, "ack_status.status_code"),
+)
+_PAIRING_REQUEST = TagValWriterTemplate(
+    (TagValMenuFields.KEY_NAME_FIELD, "name"),
+    (TagValMenuFields.KEY_UUID_FIELD, "uuid"),
+)
+_DIALOG_BUTTONS = TagValWriterTemplate(
+    (TagValMenuFields.KEY_BUTTON1_FIELD, "button1.type_value"),
+    (TagValMenuFields.KEY_BUTTON2_FIELD, "button2.type_value"),
+    (TagValMenuFields.KEY_CORRELATION_FIELD, "correlation_id"),
+)
+_LIST_FETCH = TagValWriterTemplate(
+    (TagValMenuFields.KEY_CORRELATION_FIELD, "correlation_id"),
+    (TagValMenuFields.KEY_ID_FIELD, "menu_item_id"),
+    (TagValMenuFields.KEY_LIST_START, "start_row"),
+    (TagValMenuFields.KEY_LIST_COUNT, "row_count"),
+)
+_LIST_ROWS = TagValWriterTemplate(
+    (TagValMenuFields.KEY_CORRELATION_FIELD, "correlation_id"),
+    (TagValMenuFields.KEY_ID_FIELD, "menu_item_id"),
+    (TagValMenuFields.KEY_LIST_START, "start_row"),
+    (TagValMenuFields.KEY_LIST_TOTAL, "total_rows"),
+    (TagValMenuFields.KEY_LIST_COUNT, "rows", len),
+)
+_LIST_DELTA = TagValWriterTemplate(
+    (TagValMenuFields.KEY_CORRELATION_FIELD, "correlation_id"),
+    (TagValMenuFields.KEY_ID_FIELD, "menu_item_id"),
+    (TagValMenuFields.KEY_LIST_TOTAL, "total_rows"),
+    (TagValMenuFields.KEY_LIST_COUNT, "changes", len),
+)
@@ -40,6 +40,11 @@ class TagValMenuFields(Enum):
     KEY_PREPEND_CHOICE: str = "C"  # second char from A onwards.
     KEY_PREPEND_NAMECHOICE: str = "c"  # second char from A onwards.
     KEY_CHANGE_TYPE: str = "TC"
+    KEY_LIST_START: str = "LS"
+    KEY_LIST_COUNT: str = "LN"
+    KEY_LIST_TOTAL: str = "LT"
+    KEY_PREPEND_LIST_ROW: str = "r"  # second char from A to Z then a to z.
+    KEY_PREPEND_LIST_CHANGE: str = "d"  # second char from A to Z then a to z.
     KEY_ACK_STATUS: str = "ST"
     KEY_MODE_FIELD: str = "MO"
     KEY_BUFFER_FIELD: str = "BU"
@@ -0,0 +1,95 @@
+from operator import attrgetter
+from typing import Any, Callable, Sequence, Union
+
+from tcmenu.remote.protocol.tag_val_menu_fields import TagValMenuFields
+
+_ESCAPES = str.maketrans({"|": "\\|", "=": "\\="})
+
+"""A field of a template, the TagVal field, a dotted attribute path from the command and an optional converter."""
+TemplateField = Union[tuple[TagValMenuFields, str], tuple[TagValMenuFields, str, Callable[[Any], Any]]]
+
+
+def escape_value(value: Any) -> Any:
+    """
+    Escapes the field terminator and separator in a string value with a single translate pass, other values are
+    returned unchanged.
+    :param value: the value of a field.
+    :return: the value ready to be written.
+    """
+    if isinstance(value, str) and ("|" in value or "=" in value):
+        return value.translate(_ESCAPES)
+    return value
+
+
+def tag_val_field(key: str, value: Any) -> str:
+    """
+    Formats one field as it is written on the wire, for fields that are not known until the message is written.
+    :param key: the two letter key.
+    :param value: the value, strings are escaped.
+    :return: the field text including its terminator.
+    """
+    return f"{key}={escape_value(value)}|"
+
+
+def flag(value: Any) -> int:
+    """Converter that writes a boolean as 1 or 0."""
+    return 1 if value else 0
+
+
+class TagValWriterTemplate:
+    """
+    A writer for the fixed fields of a TagVal message, compiled once for each command class. The keys are baked into
+    a format string up front, and the values are read from the command with a single attrgetter, so writing a message
+    costs one call per message rather than an enum lookup, type check and string format per field. The output is the
+    same as writing each field with `tag_val_field`.
+
+    <pre>
+        template = TagValWriterTemplate(
+            (TagValMenuFields.KEY_ID_FIELD, "menu_item.id"),
+            (TagValMenuFields.KEY_READONLY_FIELD, "menu_item.read_only", flag),
+        )
+        buffer.write(template.render(command))
+    </pre>
+
+    :param fields: (field, attribute[, converter]) for each field in the order they are written, the attribute is a
+                   dotted path from the command and the converter is applied to the value read.
+    """
+
+    def __init__(self, *fields: TemplateField):
+        self._fields: tuple[TemplateField, ...] = fields
+        # Braces can not appear in keys, but are escaped so that the format string always holds only the placeholders.
+        self._format: str = "".join(field[0].value.replace("{", "{{").replace("}", "}}") + "={}|" for field in fields)
+        self._converters: tuple[tuple[int, Callable[[Any], Any]], ...] = tuple(
+            (index, field[2]) for index, field in enumerate(fields) if len(field) > 2 and field[2] is not None
+        )
+        paths = [field[1] for field in fields]
+        if len(paths) == 1:
+            single = attrgetter(paths[0])
+            self._getter: Callable[[Any], Sequence[Any]] = lambda command: (single(command),)
+        elif paths:
+            self._getter = attrgetter(*paths)
+        else:
+            self._getter = lambda command: ()
+
+    def extend(self, *fields: TemplateField) -> "TagValWriterTemplate":
+        """
+        Creates a template with more fields written after the fields of this one, for example the fields of one boot
+        item type after the common boot fields.
+        :param fields: the extra fields.
+        :return: a new template.
+        """
+        return TagValWriterTemplate(*self._fields, *fields)
+
+    def render(self, command: Any) -> str:
+        """
+        Writes the fields of the command.
+        :param command: the command to write.
+        :return: the fields as they appear in the message.
+        """
+        values = self._getter(command)
+        if self._converters:
+            values = list(values)
+            for index, converter in self._converters:
+                values[index] = converter(values[index])
+
+        return self._format.format(*map(escape_value, values))
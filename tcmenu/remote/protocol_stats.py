@@ -0,0 +1,370 @@
+import bisect
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Callable, Iterator, Optional
+
+from tcmenu.remote.commands.menu_command_type import MenuCommandType
+
+"""
+The upper bounds of the latency histogram buckets in nanoseconds, from one microsecond to a quarter of a second, the
+last bucket holds everything slower.
+"""
+LATENCY_BUCKETS_NS: tuple[int, ...] = (
+    1_000,
+    2_500,
+    5_000,
+    10_000,
+    25_000,
+    50_000,
+    100_000,
+    250_000,
+    500_000,
+    1_000_000,
+    2_500_000,
+    5_000_000,
+    10_000_000,
+    25_000_000,
+    50_000_000,
+    100_000_000,
+    250_000_000,
+)
+
+
+class LatencyHistogram:
+    """The count of timings in each of the LATENCY_BUCKETS_NS buckets, with their total and maximum."""
+
+    __slots__ = ("buckets", "count", "total_ns", "max_ns")
+
+    def __init__(self):
+        """The count of timings in each bucket, the last is for timings above the largest bound."""
+        self.buckets: list[int] = [0] * (len(LATENCY_BUCKETS_NS) + 1)
+
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def record(self, nanoseconds: int) -> None:
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS_NS, nanoseconds)] += 1
+        self.count += 1
+        self.total_ns += nanoseconds
+        if nanoseconds > self.max_ns:
+            self.max_ns = nanoseconds
+
+    @property
+    def mean_ns(self) -> float:
+        return self.total_ns / self.count if self.count else 0.0
+
+    def percentile_ns(self, percentile: float) -> int:
+        """
+        Estimates a percentile as the upper bound of the bucket that holds it, or the maximum for the last bucket.
+        :param percentile: the percentile between 0 and 100.
+        :return: the estimate in nanoseconds, 0 when nothing has been recorded.
+        """
+        if self.count == 0:
+            return 0
+        wanted = percentile / 100 * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.buckets):
+            seen += bucket_count
+            if seen >= wanted and bucket_count:
+                return LATENCY_BUCKETS_NS[index] if index < len(LATENCY_BUCKETS_NS) else self.max_ns
+        return self.max_ns
+
+    def copy(self) -> "LatencyHistogram":
+        histogram = LatencyHistogram()
+        histogram.buckets = list(self.buckets)
+        histogram.count = self.count
+        histogram.total_ns = self.total_ns
+        histogram.max_ns = self.max_ns
+        return histogram
+
+
+@dataclass
+class MessageStats:
+    """The figures for one message type in one direction, as held by ProtocolStats."""
+
+    """Messages converted, including those that failed."""
+    count: int = 0
+
+    """Bytes of the messages converted without error."""
+    bytes: int = 0
+
+    """Messages that raised an error while being converted."""
+    errors: int = 0
+
+    stages: dict["ProtocolStats.Stage", LatencyHistogram] = field(default_factory=dict)
+
+
+class ProtocolStats:
+    """
+    Opt-in counters and latency histograms for the protocol path, so that the time taken to handle each type of
+    message can be split into its stages. Figures are kept by direction and message type, which includes the types of
+    custom processors. Nothing is measured until the stats are given to a converter with
+    `ConfigurableProtocolConverter.set_stats`, or to a `MenuTreeUpdater`, and without stats those only check that
+    none are set.
+
+    Received messages are timed reading the header (FRAMING), splitting the TagVal fields (PARSING) and running the
+    processor registered for the type (PROCESSING). Sent messages are timed running the processor (PROCESSING) and
+    building and writing the frame (FRAMING). Commands applied to a tree by a MenuTreeUpdater are timed as TREE_UPDATE.
+    Creating commands with CommandFactory happens inside processors, it can be timed on its own as COMMAND_FACTORY
+    with `instrument_command_factory`.
+
+    <pre>
+        stats = ProtocolStats()
+        protocol.set_stats(stats)
+        ...
+        print(stats.report())
+        stats.write_prometheus_textfile("/var/lib/node_exporter/tcmenu.prom")
+    </pre>
+    """
+
+    # noinspection PyArgumentList
+    class Direction(Enum):
+        RECEIVED = "received"
+        SENT = "sent"
+
+    # noinspection PyArgumentList
+    class Stage(Enum):
+        FRAMING = "framing"
+        PARSING = "parsing"
+        PROCESSING = "processing"
+        COMMAND_FACTORY = "command_factory"
+        TREE_UPDATE = "tree_update"
+
+    _factory_lock = threading.Lock()
+
+    """The stats that CommandFactory reports to, and the original methods, while it is instrumented."""
+    _factory_owner: Optional["ProtocolStats"] = None
+    _factory_originals: dict[str, staticmethod] = {}
+
+    def __init__(self):
+        self._messages: dict[tuple[ProtocolStats.Direction, str], MessageStats] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def record_message(self, direction: Direction, message_type: str, size: int, error: bool = False) -> None:
+        """
+        Counts a message that has been converted.
+        :param direction: whether the message was received or sent.
+        :param message_type: the two character message type.
+        :param size: the size of the whole frame in bytes, from its start of message marker, not counted for errors.
+        :param error: True if converting the message raised an error.
+        """
+        with self._lock:
+            stats = self._stats_for(direction, message_type)
+            stats.count += 1
+            if error:
+                stats.errors += 1
+            else:
+                stats.bytes += size
+
+    def record_stage(self, direction: Direction, message_type: str, stage: Stage, nanoseconds: int) -> None:
+        """
+        Adds the time one stage took to the histogram of the message type.
+        :param direction: whether the message was received or sent.
+        :param message_type: the two character message type.
+        :param stage: the stage.
+        :param nanoseconds: the time taken.
+        """
+        with self._lock:
+            stages = self._stats_for(direction, message_type).stages
+            histogram = stages.get(stage)
+            if histogram is None:
+                histogram = stages[stage] = LatencyHistogram()
+            histogram.record(nanoseconds)
+
+    def get(self, direction: Direction, message_type: str) -> Optional[MessageStats]:
+        """
+        :param direction: whether the messages were received or sent.
+        :param message_type: the two character message type.
+        :return: a copy of the figures for the message type, or None if none have been recorded.
+        """
+        with self._lock:
+            stats = self._messages.get((direction, message_type))
+            return self._copy(stats) if stats is not None else None
+
+    def messages(self) -> dict[tuple[Direction, str], MessageStats]:
+        """
+        :return: a copy of the figures of every message type, by direction and message type.
+        """
+        with self._lock:
+            return {key: self._copy(stats) for key, stats in sorted(self._messages.items(), key=_sort_key)}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._messages.clear()
+
+    @contextmanager
+    def receiving(self) -> Iterator[None]:
+        """Marks the current thread as decoding a received message, so that CommandFactory calls count as received."""
+        previous = getattr(self._local, "receiving", False)
+        self._local.receiving = True
+        try:
+            yield
+        finally:
+            self._local.receiving = previous
+
+    def instrument_command_factory(self) -> None:
+        """
+        Times every CommandFactory method as the COMMAND_FACTORY stage of the type of command it creates. Calls made
+        while a received message is decoded count as received, all others as sent. This replaces the methods of the
+        CommandFactory class, so it applies to the whole process and only one ProtocolStats can instrument it at a
+        time, call `close` to restore it.
+        :raises RuntimeError: if CommandFactory is already instrumented by other stats.
+        """
+        from tcmenu.remote.commands.command_factory import CommandFactory
+
+        with ProtocolStats._factory_lock:
+            if ProtocolStats._factory_owner is self:
+                return
+            if ProtocolStats._factory_owner is not None:
+                raise RuntimeError("CommandFactory is already instrumented by other stats")
+
+            originals = {
+                name: method
+                for name, method in vars(CommandFactory).items()
+                if name.startswith("new_") and isinstance(method, staticmethod)
+            }
+            for name, method in originals.items():
+                setattr(CommandFactory, name, staticmethod(self._timed_factory(method.__func__)))
+            ProtocolStats._factory_originals = originals
+            ProtocolStats._factory_owner = self
+
+    def close(self) -> None:
+        """Restores CommandFactory if these stats instrumented it, the figures are kept."""
+        from tcmenu.remote.commands.command_factory import CommandFactory
+
+        with ProtocolStats._factory_lock:
+            if ProtocolStats._factory_owner is not self:
+                return
+            for name, method in ProtocolStats._factory_originals.items():
+                setattr(CommandFactory, name, method)
+            ProtocolStats._factory_originals = {}
+            ProtocolStats._factory_owner = None
+
+    def report(self) -> str:
+        """
+        :return: a table of the count, bytes, errors and the mean, 50th and 99th percentile of each stage in
+        microseconds, for every message type.
+        """
+        lines = [
+            f"{'direction':<10}{'type':<6}{'command':<20}{'count':>8}{'bytes':>10}{'errors':>7}  "
+            f"{'stage':<16}{'mean us':>9}{'p50 us':>9}{'p99 us':>9}"
+        ]
+        for (direction, message_type), stats in self.messages().items():
+            prefix = (
+                f"{direction.value:<10}{message_type:<6}{_command_name(message_type):<20}"
+                f"{stats.count:>8}{stats.bytes:>10}{stats.errors:>7}  "
+            )
+            if not stats.stages:
+                lines.append(prefix.rstrip())
+            for stage, histogram in sorted(stats.stages.items(), key=lambda entry: _STAGE_ORDER[entry[0]]):
+                lines.append(
+                    f"{prefix}{stage.value:<16}{histogram.mean_ns / 1000:>9.1f}"
+                    f"{histogram.percentile_ns(50) / 1000:>9.1f}{histogram.percentile_ns(99) / 1000:>9.1f}"
+                )
+                prefix = " " * len(prefix)
+        return "\n".join(lines)
+
+    def to_prometheus_text(self, prefix: str = "tcmenu_protocol") -> str:
+        """
+        Formats the figures in the Prometheus text exposition format, as counters of messages, bytes and errors and a
+        histogram of the seconds taken by each stage, labelled by direction, message type and command name.
+        :param prefix: (optional) The prefix of every metric name.
+        :return: the metrics text.
+        """
+        messages = self.messages()
+        counters = (
+            ("messages_total", "Messages converted.", lambda stats: stats.count),
+            ("bytes_total", "Bytes of messages converted.", lambda stats: stats.bytes),
+            ("errors_total", "Messages that could not be converted.", lambda stats: stats.errors),
+        )
+        lines = []
+        for name, description, value in counters:
+            lines.append(f"# HELP {prefix}_{name} {description}")
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            for key, stats in messages.items():
+                lines.append(f"{prefix}_{name}{{{_labels(*key)}}} {value(stats)}")
+
+        name = f"{prefix}_stage_seconds"
+        lines.append(f"# HELP {name} Time taken by each stage of converting a message.")
+        lines.append(f"# TYPE {name} histogram")
+        for key, stats in messages.items():
+            for stage, histogram in sorted(stats.stages.items(), key=lambda entry: _STAGE_ORDER[entry[0]]):
+                labels = f'{_labels(*key)},stage="{stage.value}"'
+                cumulative = 0
+                for bound, bucket_count in zip(LATENCY_BUCKETS_NS, histogram.buckets):
+                    cumulative += bucket_count
+                    lines.append(f'{name}_bucket{{{labels},le="{bound / 1e9:g}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                lines.append(f"{name}_sum{{{labels}}} {histogram.total_ns / 1e9:.9f}")
+                lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus_textfile(self, path: str, prefix: str = "tcmenu_protocol") -> None:
+        """
+        Writes the Prometheus text to a file, replacing it in one step, for example for the textfile collector of the
+        node exporter.
+        :param path: the file to write.
+        :param prefix: (optional) The prefix of every metric name.
+        """
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            file.write(self.to_prometheus_text(prefix))
+        os.replace(temp_path, path)
+
+    def _stats_for(self, direction: Direction, message_type: str) -> MessageStats:
+        stats = self._messages.get((direction, message_type))
+        if stats is None:
+            stats = self._messages[(direction, message_type)] = MessageStats()
+        return stats
+
+    def _timed_factory(self, method: Callable) -> Callable:
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            started = time.perf_counter_ns()
+            command = method(*args, **kwargs)
+            elapsed = time.perf_counter_ns() - started
+            direction = (
+                ProtocolStats.Direction.RECEIVED
+                if getattr(self._local, "receiving", False)
+                else ProtocolStats.Direction.SENT
+            )
+            self.record_stage(direction, command.command_type.id, ProtocolStats.Stage.COMMAND_FACTORY, elapsed)
+            return command
+
+        return timed
+
+    @staticmethod
+    def _copy(stats: MessageStats) -> MessageStats:
+        return MessageStats(
+            stats.count,
+            stats.bytes,
+            stats.errors,
+            {stage: histogram.copy() for stage, histogram in stats.stages.items()},
+        )
+
+
+_STAGE_ORDER: dict[ProtocolStats.Stage, int] = {stage: index for index, stage in enumerate(ProtocolStats.Stage)}
+
+_COMMAND_NAMES: dict[str, str] = {command_type.message_field.id: command_type.name for command_type in MenuCommandType}
+
+
+def _command_name(message_type: str) -> str:
+    """The name of the built-in command type, or CUSTOM for the types of custom processors."""
+    return _COMMAND_NAMES.get(message_type, "CUSTOM")
+
+
+def _sort_key(entry: tuple[tuple[ProtocolStats.Direction, str], MessageStats]) -> tuple[str, str]:
+    (direction, message_type), _ = entry
+    return direction.value, message_type
+
+
+def _labels(direction: ProtocolStats.Direction, message_type: str) -> str:
+    escaped = message_type.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return f'direction="{direction.value}",message_type="{escaped}",command="{_command_name(message_type)}"'
@@ -0,0 +1,317 @@
+"""
+Recording and replay of wire sessions.
+
+A capture file is an append-only sequence of frames, each stored with the time it was seen and its direction. The
+file starts with an 8 byte header (magic and format version) followed by records of:
+
+    timestamp (uint64, microseconds since the epoch) | direction (uint8) | length (uint32) | frame bytes
+
+all little endian. Each frame is one complete message as it appeared on the wire, starting with
+PROTO_START_OF_MSG. Captures can be replayed into a MenuTree or onto a socket at real time, scaled or maximum speed,
+which makes them usable both for reproducing issues and as an end-to-end decode benchmark:
+
+    python -m tcmenu.remote.session_capture capture.tcc --speed 0
+"""
+
+import argparse
+import io
+import logging
+import socket
+import struct
+import time
+from dataclasses import dataclass
+from enum import Enum
+from typing import BinaryIO, Callable, Iterator, Optional, Union
+
+from tcmenu.domain.state.menu_tree import MenuTree
+from tcmenu.remote.menu_command_protocol import MenuCommandProtocol
+from tcmenu.remote.menu_tree_updater import MenuTreeUpdater
+from tcmenu.remote.protocol.configurable_protocol_converter import ConfigurableProtocolConverter
+
+CAPTURE_MAGIC = b"TCMCAP"
+CAPTURE_VERSION = 1
+_HEADER = struct.Struct("<6sH")
+_RECORD = struct.Struct("<QBI")
+
+
+class CaptureDirection(Enum):
+    """The direction of a captured frame, relative to the side that recorded it."""
+
+    RECEIVED = 0
+    SENT = 1
+
+
+@dataclass(frozen=True)
+class CaptureRecord:
+    """One captured frame."""
+
+    """Time the frame was seen, in seconds since the epoch."""
+    timestamp: float
+
+    direction: CaptureDirection
+
+    frame: bytes
+
+
+class SessionRecorder:
+    """
+    Appends frames to a capture file. When the file is empty a header is written first, otherwise new records are
+    appended to the existing capture. Writes are buffered, call flush or close to make sure they reach the file.
+
+    :param file: a binary file opened for appending or writing.
+    :param clock: (optional) Wall clock in seconds since the epoch, mainly for testing.
+    """
+
+    def __init__(self, file: BinaryIO, clock: Callable[[], float] = time.time):
+        self._file = file
+        self._clock = clock
+        self.frames = 0
+        self.bytes = 0
+
+        if file.tell() == 0:
+            file.write(_HEADER.pack(CAPTURE_MAGIC, CAPTURE_VERSION))
+
+    @staticmethod
+    def open(path: str) -> "SessionRecorder":
+        """
+        Opens a capture file for appending, creating it if needed.
+        :param path: the capture file path.
+        :return: a recorder that owns the file.
+        """
+        return SessionRecorder(open(path, "ab"))
+
+    def record(
+        self, frame: bytes, direction: CaptureDirection = CaptureDirection.RECEIVED, timestamp: Optional[float] = None
+    ) -> None:
+        """
+        Appends a frame to the capture.
+        :param frame: one complete frame as seen on the wire.
+        :param direction: whether the frame was received or sent.
+        :param timestamp: optional; the time the frame was seen, by default now.
+        """
+        if timestamp is None:
+            timestamp = self._clock()
+
+        self._file.write(_RECORD.pack(int(timestamp * 1_000_000), direction.value, len(frame)))
+        self._file.write(frame)
+        self.frames += 1
+        self.bytes += len(frame)
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "SessionRecorder":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+
+def read_capture(source: Union[str, bytes, BinaryIO]) -> Iterator[CaptureRecord]:
+    """
+    Reads the records of a capture.
+    :param source: a path, the capture contents, or a binary file positioned at the start of the capture.
+    :return: an iterator of the records in the order they were written.
+    :raises ValueError: if the data is not a capture or uses an unsupported version.
+    """
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            data = f.read()
+    elif isinstance(source, (bytes, bytearray, memoryview)):
+        data = source
+    else:
+        data = source.read()
+
+    for timestamp, direction, frame_start, frame_end in iterate_record_offsets(data):
+        yield CaptureRecord(timestamp / 1_000_000, CaptureDirection(direction), bytes(data[frame_start:frame_end]))
+
+
+def iterate_record_offsets(
+    data, start: Optional[int] = None, end: Optional[int] = None
+) -> Iterator[tuple[int, int, int, int]]:
+    """
+    Walks the records of a capture without copying their frames, for readers that work on the capture in place, such
+    as a memory mapped file split into chunks.
+    :param data: the capture contents, any buffer such as bytes or an mmap.
+    :param start: (optional) The offset of a record to start from, by default the header is checked and the first
+    record is used.
+    :param end: (optional) The offset to stop at, by default the end of the data.
+    :return: an iterator of the timestamp in microseconds, the CaptureDirection value and the start and end offset of
+    the frame of each record. A truncated record at the end is logged and ends the iteration.
+    :raises ValueError: if no start is given and the data is not a capture or uses an unsupported version.
+    """
+    if start is None:
+        start = check_capture_header(data)
+    if end is None:
+        end = len(data)
+
+    offset = start
+    while offset + _RECORD.size <= end:
+        timestamp, direction, length = _RECORD.unpack_from(data, offset)
+        offset += _RECORD.size
+        if offset + length > end:
+            logging.getLogger("SessionCapture").warning("Capture ends with a truncated record")
+            return
+        yield timestamp, direction, offset, offset + length
+        offset += length
+
+
+def check_capture_header(data) -> int:
+    """
+    Checks that data starts with the header of a capture this version can read.
+    :param data: the capture contents, any buffer such as bytes or an mmap.
+    :return: the offset of the first record.
+    :raises ValueError: if the data is not a capture or uses an unsupported version.
+    """
+    if len(data) < _HEADER.size:
+        raise ValueError("Capture is too short to contain a header")
+    magic, version = _HEADER.unpack_from(data, 0)
+    if magic != CAPTURE_MAGIC:
+        raise ValueError("Not a TcMenu capture")
+    if version != CAPTURE_VERSION:
+        raise ValueError(f"Unsupported capture version {version}")
+    return _HEADER.size
+
+
+@dataclass
+class ReplayStats:
+    """Throughput figures for a replay."""
+
+    frames: int = 0
+    bytes: int = 0
+    commands: int = 0
+    errors: int = 0
+
+    """Wall clock seconds the replay took, including any pacing delay."""
+    elapsed: float = 0.0
+
+    """Seconds spent decoding frames and applying them, excluding pacing delay."""
+    decode_time: float = 0.0
+
+    @property
+    def frames_per_second(self) -> float:
+        return self.frames / self.decode_time if self.decode_time else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes / self.decode_time if self.decode_time else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.frames} frames, {self.bytes} bytes, {self.commands} commands, {self.errors} errors in "
+            f"{self.elapsed:.3f}s; decode {self.frames_per_second:,.0f} frames/s, {self.bytes_per_second:,.0f} bytes/s"
+        )
+
+
+class SessionReplayer:
+    """
+    Replays a capture, either decoding each frame through the protocol into a menu tree, or writing the raw frames
+    to a socket. The speed is a multiplier of the recorded timing, 1.0 is real time and MAX_SPEED replays without any
+    delay between frames.
+
+    :param source: a path, the capture contents, or a binary file with the capture.
+    :param protocol: (optional) The protocol used to decode frames, by default the standard TagVal protocol.
+    :param direction: (optional) Only frames in this direction are replayed.
+    """
+
+    MAX_SPEED: float = 0.0
+
+    logger = logging.getLogger("SessionReplayer")
+
+    def __init__(
+        self,
+        source: Union[str, bytes, BinaryIO],
+        protocol: Optional[MenuCommandProtocol] = None,
+        direction: CaptureDirection = CaptureDirection.RECEIVED,
+    ):
+        self._records = [record for record in read_capture(source) if record.direction == direction]
+        self._protocol = protocol or ConfigurableProtocolConverter(include_default_processors=True)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def replay_to_tree(self, tree: MenuTree, speed: float = 1.0) -> ReplayStats:
+        """
+        Decodes every frame and applies the resulting commands to the tree.
+        :param tree: the tree to update.
+        :param speed: the replay speed multiplier, or MAX_SPEED.
+        :return: the replay statistics.
+        """
+        updater = MenuTreeUpdater(tree)
+        protocol = self._protocol
+        stats = ReplayStats()
+
+        def handle(frame: bytes):
+            buffer = io.BytesIO(frame)
+            if buffer.read(1) != MenuCommandProtocol.PROTO_START_OF_MSG:
+                raise ValueError("Frame does not start with the start of message marker")
+            updater.apply(protocol.from_channel(buffer))
+            stats.commands += 1
+
+        return self._replay(handle, speed, stats)
+
+    def replay_to_socket(self, sock: socket.socket, speed: float = 1.0) -> ReplayStats:
+        """
+        Writes every frame to the socket, for example to drive a client under test.
+        :param sock: a connected socket.
+        :param speed: the replay speed multiplier, or MAX_SPEED.
+        :return: the replay statistics.
+        """
+        return self._replay(sock.sendall, speed, ReplayStats())
+
+    def _replay(self, handle: Callable[[bytes], None], speed: float, stats: ReplayStats) -> ReplayStats:
+        if speed < 0:
+            raise ValueError("Speed must not be negative")
+
+        records = self._records
+        first_timestamp = records[0].timestamp if records else 0.0
+        started = time.perf_counter()
+
+        for record in records:
+            if speed != SessionReplayer.MAX_SPEED:
+                delay = (record.timestamp - first_timestamp) / speed - (time.perf_counter() - started)
+                if delay > 0:
+                    time.sleep(delay)
+
+            handle_started = time.perf_counter()
+            try:
+                handle(record.frame)
+            except Exception as e:
+                stats.errors += 1
+                self.logger.error(f"Replay of frame {stats.frames} failed: {e}")
+            stats.decode_time += time.perf_counter() - handle_started
+            stats.frames += 1
+            stats.bytes += len(record.frame)
+
+        stats.elapsed = time.perf_counter() - started
+        return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a TcMenu capture file.")
+    parser.add_argument("capture", help="the capture file")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed, 1 is real time and 0 is maximum")
+    parser.add_argument("--sent", action="store_true", help="replay the sent frames instead of the received ones")
+    parser.add_argument("--socket", metavar="HOST:PORT", help="write the frames to a socket instead of decoding them")
+    args = parser.parse_args()
+
+    direction = CaptureDirection.SENT if args.sent else CaptureDirection.RECEIVED
+    replayer = SessionReplayer(args.capture, direction=direction)
+
+    if args.socket:
+        host, port = args.socket.rsplit(":", 1)
+        with socket.create_connection((host, int(port))) as sock:
+            stats = replayer.replay_to_socket(sock, args.speed)
+    else:
+        tree = MenuTree()
+        stats = replayer.replay_to_tree(tree, args.speed)
+        print(f"Tree holds {len(tree.get_all_menu_items())} items")
+
+    print(stats)
+
+
+if __name__ == "__main__":
+    main()
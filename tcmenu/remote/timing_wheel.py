@@ -0,0 +1,139 @@
+import math
+import time
+from typing import Callable, Generic, Hashable, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+
+# Absorbs floating point error when converting times to ticks, so 0.3s is always tick 3 at 0.1s resolution.
+_TICK_EPSILON = 1e-9
+
+
+class TimingWheel(Generic[K]):
+    """
+    A hashed timing wheel that tracks deadlines for a large number of keys without needing a timer per key. Time is
+    split into ticks of `tick_duration` seconds, and each key is placed into the slot for the tick in which it expires.
+    Scheduling and cancelling a key are O(1), and advancing the wheel only visits the slots for the ticks that passed.
+
+    The wheel does not run on its own, the owner calls `advance` periodically (usually once per tick) and handles the
+    keys that expired. Keys are unique, scheduling an existing key again moves it to the new deadline.
+    """
+
+    def __init__(
+        self,
+        tick_duration: float = 0.1,
+        wheel_size: int = 512,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Creates an empty wheel.
+        :param tick_duration: the resolution of the wheel in seconds, deadlines are rounded up to the next tick.
+        :param wheel_size: the number of slots, deadlines further away than one revolution are still supported.
+        :param clock: monotonic time source in seconds, mainly for testing.
+        """
+        if tick_duration <= 0:
+            raise ValueError("Tick duration must be positive")
+        if wheel_size < 1:
+            raise ValueError("Wheel size must be at least one slot")
+
+        self._tick_duration = tick_duration
+        self._wheel_size = wheel_size
+        self._clock = clock
+        self._start = clock()
+        self._current_tick = 0
+
+        """Each slot maps a key to its absolute deadline tick."""
+        self._slots: list[dict[K, int]] = [{} for _ in range(wheel_size)]
+
+        """Reverse index from key to the slot holding it, used for O(1) cancellation."""
+        self._key_slot: dict[K, int] = {}
+
+    @property
+    def tick_duration(self) -> float:
+        return self._tick_duration
+
+    def now(self) -> float:
+        """
+        :return: the current time according to the clock of this wheel.
+        """
+        return self._clock()
+
+    def schedule(self, key: K, delay: float, now: Optional[float] = None) -> None:
+        """
+        Schedule the key to expire after the delay, replacing any existing deadline for that key.
+        :param key: the key to schedule.
+        :param delay: the delay in seconds from now.
+        :param now: optional; the current time, if already known by the caller.
+        """
+        if now is None:
+            now = self._clock()
+
+        self.cancel(key)
+        deadline_tick = max(math.ceil(self._ticks_at(now + delay) - _TICK_EPSILON), self._current_tick + 1)
+        slot = deadline_tick % self._wheel_size
+        self._slots[slot][key] = deadline_tick
+        self._key_slot[key] = slot
+
+    def cancel(self, key: K) -> bool:
+        """
+        Remove the key from the wheel.
+        :param key: the key to remove.
+        :return: True if the key was scheduled, otherwise False.
+        """
+        slot = self._key_slot.pop(key, None)
+        if slot is None:
+            return False
+        del self._slots[slot][key]
+        return True
+
+    def advance(self, now: Optional[float] = None) -> list[K]:
+        """
+        Moves the wheel forward to the current time, removing and returning every key whose deadline has passed.
+        :param now: optional; the current time, if already known by the caller.
+        :return: the expired keys.
+        """
+        if now is None:
+            now = self._clock()
+
+        target_tick = math.floor(self._ticks_at(now) + _TICK_EPSILON)
+        if target_tick <= self._current_tick:
+            return []
+
+        expired: list[K] = []
+        if target_tick - self._current_tick >= self._wheel_size:
+            # More than a full revolution passed, every slot needs visiting exactly once.
+            for slot in range(self._wheel_size):
+                self._expire_slot(slot, target_tick, expired)
+        else:
+            for tick in range(self._current_tick + 1, target_tick + 1):
+                self._expire_slot(tick % self._wheel_size, tick, expired)
+
+        self._current_tick = target_tick
+        return expired
+
+    def _ticks_at(self, when: float) -> float:
+        return (when - self._start) / self._tick_duration
+
+    def _expire_slot(self, slot: int, tick: int, expired: list[K]) -> None:
+        entries = self._slots[slot]
+        if not entries:
+            return
+
+        due = [key for key, deadline in entries.items() if deadline <= tick]
+        for key in due:
+            del entries[key]
+            del self._key_slot[key]
+        expired.extend(due)
+
+    def clear(self) -> None:
+        """
+        Remove all keys from the wheel.
+        """
+        for slot in self._slots:
+            slot.clear()
+        self._key_slot.clear()
+
+    def __len__(self) -> int:
+        return len(self._key_slot)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._key_slot
@@ -0,0 +1,185 @@
+import io
+import logging
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Iterator, Optional
+
+from tcmenu.domain.menu_items import MenuItem, SubMenuItem
+from tcmenu.domain.state.menu_tree import MenuTree
+from tcmenu.domain.state.paged_string_list import PagedStringList
+from tcmenu.domain.util.menu_item_helper import MenuItemHelper
+from tcmenu.remote.commands.command_factory import CommandFactory
+from tcmenu.remote.commands.menu_boot_commands import BootItemMenuCommand
+from tcmenu.remote.commands.menu_bootstrap_command import MenuBootstrapCommand
+from tcmenu.remote.protocol.configurable_protocol_converter import ConfigurableProtocolConverter
+from tcmenu.remote.protocol.tag_val_menu_command_processors import TagValMenuCommandProcessors
+from tcmenu.remote.protocol.tc_protocol_exception import TcProtocolException
+
+
+"""Value types that can not change in place, the last frame written for such a value is reused while it is equal."""
+_IMMUTABLE_VALUE_TYPES = frozenset((int, float, bool, str, Decimal))
+
+
+@dataclass(frozen=True)
+class _BootFrame:
+    """The encoded boot frame of one item, split around the fields that carry its current value."""
+
+    item: MenuItem
+
+    command_class: type
+
+    """The frame up to the value fields, including the message header."""
+    before_value: bytes
+
+    """The frame after the value fields, including the end of message byte."""
+    after_value: bytes
+
+
+class BootstrapFrameCache:
+    """
+    Keeps the boot frame of every item in a served menu tree encoded, so that a bootstrap sent when a remote joins
+    copies bytes rather than building and encoding a boot command for each item. Only the fields that carry the current
+    value are written at send time, taken from the state in the tree, and the rest of each frame is kept until the
+    item is replaced or removed. While a simple value is unchanged the whole frame is reused. The cache listens for
+    structural changes to the tree, changes of state need no invalidation.
+
+    Frames are encoded with the protocol given, when it writes a boot item differently from the standard TagVal
+    writers, for example after a custom processor is registered, that item is encoded in full each time instead.
+
+    <pre>
+        cache = BootstrapFrameCache(tree, protocol)
+        cache.write_bootstrap(buffer)
+    </pre>
+
+    :param tree: the tree being served.
+    :param protocol: the protocol that frames are encoded with.
+    """
+
+    logger = logging.getLogger("BootstrapFrameCache")
+
+    def __init__(self, tree: MenuTree, protocol: ConfigurableProtocolConverter):
+        self._tree = tree
+        self._protocol = protocol
+
+        """The split frame for each item by ID, or None for items that are encoded in full each time."""
+        self._frames: dict[int, Optional[_BootFrame]] = {}
+
+        """The last value written for each item along with the whole frame, for values that can not change in place."""
+        self._last_frames: dict[int, tuple[Any, bytes]] = {}
+
+        """Each item along with its parent in bootstrap order, rebuilt after any structural change."""
+        self._order: Optional[tuple[tuple[SubMenuItem, MenuItem], ...]] = None
+
+        self._start_frame = self._encode(CommandFactory.new_bootstrap_command(MenuBootstrapCommand.BootType.START))
+        self._end_frame = self._encode(CommandFactory.new_bootstrap_command(MenuBootstrapCommand.BootType.END))
+
+        tree.add_structure_listener(self._structure_changed)
+
+    @property
+    def tree(self) -> MenuTree:
+        return self._tree
+
+    def close(self):
+        """Stops listening for changes to the tree, the cache should not be used afterwards."""
+        self._tree.remove_structure_listener(self._structure_changed)
+        self.invalidate()
+
+    def invalidate(self):
+        """Drops every cached frame, for example after the processors of the protocol have changed."""
+        self._frames.clear()
+        self._last_frames.clear()
+        self._order = None
+
+    def write_bootstrap(self, buffer: io.BytesIO) -> int:
+        """
+        Writes a complete bootstrap, the start message, a boot item for every item in the tree in order, and the end
+        message.
+        :param buffer: the buffer to write the frames to.
+        :return: the number of boot items written.
+        """
+        frames = [self._start_frame]
+        frames.extend(self.boot_frames())
+        frames.append(self._end_frame)
+        buffer.write(b"".join(frames))
+        return len(frames) - 2
+
+    def boot_frames(self) -> Iterator[bytes]:
+        """
+        The boot frame of each item in the tree in bootstrap order, each with the current value of the item.
+        :return: the encoded frames.
+        """
+        if self._order is None:
+            self._order = tuple(self._walk(MenuTree.ROOT))
+
+        for parent, item in self._order:
+            frame = self._frame_for(parent, item)
+            if frame is not None:
+                yield frame
+
+    def _frame_for(self, parent: SubMenuItem, item: MenuItem) -> Optional[bytes]:
+        if item.id in self._frames:
+            cached = self._frames[item.id]
+        else:
+            cached = self._split_frame(parent, item)
+            self._frames[item.id] = cached
+
+        if cached is None:
+            command = MenuItemHelper.get_boot_msg_for_item(item, parent, self._tree)
+            return self._encode(command) if command is not None else None
+
+        tree = self._tree
+        state = tree.get_menu_state(cached.item)
+        value = state.value if state is not None else MenuItemHelper.get_value_for(cached.item, tree)
+        value = PagedStringList.loaded_values_of(value)
+        last = self._last_frames.get(item.id)
+        if last is not None and type(last[0]) is type(value) and last[0] == value:
+            return last[1]
+
+        value_fields = TagValMenuCommandProcessors.boot_item_value_fields(cached.command_class, cached.item, value)
+        frame = cached.before_value + value_fields.encode("utf-8") + cached.after_value
+        if type(value) in _IMMUTABLE_VALUE_TYPES:
+            self._last_frames[item.id] = (value, frame)
+        return frame
+
+    def _split_frame(self, parent: SubMenuItem, item: MenuItem) -> Optional[_BootFrame]:
+        command: Optional[BootItemMenuCommand] = MenuItemHelper.get_boot_msg_for_item(item, parent, self._tree)
+        if command is None:
+            return None
+
+        try:
+            before, value_fields, after = (
+                part.encode("utf-8") for part in TagValMenuCommandProcessors.boot_item_parts(command)
+            )
+        except TcProtocolException:
+            self.logger.debug(f"Item {item.id} has no standard boot layout, it is encoded in full each time")
+            return None
+
+        frame = self._encode(command)
+        payload_end = len(frame) - 1
+        header_length = payload_end - len(before) - len(value_fields) - len(after)
+        if header_length < 0 or frame[header_length:payload_end] != before + value_fields + after:
+            self.logger.debug(f"Item {item.id} is written by a custom processor, it is encoded in full each time")
+            return None
+
+        return _BootFrame(
+            item=item,
+            command_class=command.__class__,
+            before_value=frame[: header_length + len(before)],
+            after_value=frame[payload_end - len(after) :],
+        )
+
+    def _encode(self, command) -> bytes:
+        buffer = io.BytesIO()
+        self._protocol.to_channel(buffer, command)
+        return buffer.getvalue()
+
+    def _walk(self, sub_menu: SubMenuItem) -> Iterator[tuple[SubMenuItem, MenuItem]]:
+        for item in self._tree.get_menu_items(sub_menu) or ():
+            yield sub_menu, item
+            if item.has_children():
+                yield from self._walk(MenuItemHelper.as_sub_menu(item))
+
+    def _structure_changed(self, item: MenuItem):
+        self._frames.pop(item.id, None)
+        self._last_frames.pop(item.id, None)
+        self._order = None
@@ -0,0 +1,16 @@
+from tcmenu.domain.state.list_row_change import ListRowChange
+
+
+def test_list_row_change():
+    update = ListRowChange(ListRowChange.Operation.UPDATE, 12, "new: text")
+    assert str(update) == "U12:new: text"
+    assert ListRowChange.from_string(str(update)) == update
+
+    delete = ListRowChange(ListRowChange.Operation.DELETE, 3)
+    assert str(delete) == "D3"
+    assert ListRowChange.from_string("D3") == delete
+
+    assert ListRowChange.from_string("I0:") == ListRowChange(ListRowChange.Operation.INSERT, 0, "")
+    assert ListRowChange.from_string("X1:abc") is None
+    assert ListRowChange.from_string("U-1:abc") is None
+    assert ListRowChange.from_string("U") is None
@@ -1,3 +1,5 @@
+import pytest
+
 from tcmenu.domain.menu_items import AnalogMenuItem
 from tcmenu.domain.state.menu_state import IntegerMenuState
 from tcmenu.domain.state.menu_tree import MenuTree
@@ -39,6 +41,30 @@ def test_that_removing_menu_item_removes_state():
     assert menu_tree.get_menu_state(item1) is None
 
 
+def test_that_removing_a_sub_menu_removes_the_state_of_its_items():
+    menu_tree = MenuTree()
+    nested = DomainFixtures.a_sub_menu(name="Nested", item_id=5)
+    menu_tree.add_menu_item(parent=MenuTree.ROOT, item=sub_menu)
+    menu_tree.add_menu_item(parent=sub_menu, item=item1)
+    menu_tree.add_menu_item(parent=sub_menu, item=nested)
+    menu_tree.add_menu_item(parent=nested, item=item3)
+    menu_tree.change_item(item1, MenuItemHelper.state_for_menu_item(item1, 1, True, False))
+    menu_tree.change_item(item3, MenuItemHelper.state_for_menu_item(item3, 1, True, False))
+    changes = []
+    menu_tree.add_state_listener(lambda item, state: changes.append(item))
+
+    menu_tree.remove_menu_item(parent=MenuTree.ROOT, item=sub_menu)
+    assert menu_tree.get_menu_state(item1) is None
+    assert menu_tree.get_menu_state(item3) is None
+    assert menu_tree.get_all_sub_menus() == {MenuTree.ROOT}
+
+    menu_tree.change_item(item1, MenuItemHelper.state_for_menu_item(item1, 2, True, False))
+    menu_tree.change_item(item3, MenuItemHelper.state_for_menu_item(item3, 2, True, False))
+    assert menu_tree.get_menu_state(item1) is None
+    assert menu_tree.get_menu_state(item3) is None
+    assert changes == []
+
+
 def test_that_removing_works_by_id_only_as_per_docs():
     menu_tree = MenuTree()
     menu_tree.add_menu_item(parent=MenuTree.ROOT, item=item1)
@@ -242,3 +268,85 @@ def test_initialize_state_for_each_item():
     assert menu_tree.get_menu_state(item2)
     assert menu_tree.get_menu_state(item3)
     assert menu_tree.get_menu_state(sub_menu)
+
+
+def test_add_items_in_order():
+    menu_tree = MenuTree()
+    state = MenuItemHelper.state_for_menu_item(item3, 12, False, False)
+
+    menu_tree.add_items_in_order([(item1, 0, None), (sub_menu, 0, None), (item3, sub_menu.id, state)])
+
+    assert menu_tree.get_menu_items(MenuTree.ROOT) == (item1, sub_menu)
+    assert menu_tree.get_menu_items(sub_menu) == (item3,)
+    assert menu_tree.get_menu_state(item3) == state
+    assert menu_tree.get_menu_state(item1) is None
+
+    with pytest.raises(ValueError):
+        menu_tree.add_items_in_order([(item2, 99, None)])
+
+
+def test_state_listeners_are_notified_of_changes():
+    menu_tree = MenuTree()
+    menu_tree.add_menu_item(item3)
+    changes = []
+    listener = lambda item, state: changes.append((item.id, state.value))  # noqa: E731
+    menu_tree.add_state_listener(listener)
+
+    MenuItemHelper.set_menu_state(item3, 10, menu_tree)
+    MenuItemHelper.set_menu_state(item1, 1, menu_tree)
+    menu_tree.remove_state_listener(listener)
+    MenuItemHelper.set_menu_state(item3, 11, menu_tree)
+
+    assert changes == [(3, 10)]
+
+
+def test_structure_listeners_are_notified_of_structural_changes():
+    menu_tree = MenuTree()
+    changed = []
+    menu_tree.add_structure_listener(lambda item: changed.append(item.id))
+
+    menu_tree.add_menu_item(item1)
+    menu_tree.add_menu_item(item2)
+    menu_tree.replace_menu_by_id(DomainFixtures.an_enum_item(name="Renamed", item_id=1))
+    menu_tree.move_item(MenuTree.ROOT, item2, MenuTree.MoveType.MOVE_UP)
+    menu_tree.remove_menu_item(item2)
+    menu_tree.add_items_in_order([(sub_menu, 0, None), (item3, sub_menu.id, None)])
+    MenuItemHelper.set_menu_state(item3, 10, menu_tree)
+
+    assert changed == [1, 2, 1, 2, 2, 4, 3]
+
+
+def test_structure_listeners_can_be_removed():
+    menu_tree = MenuTree()
+    changed = []
+    listener = lambda item: changed.append(item.id)  # noqa: E731
+    menu_tree.add_structure_listener(listener)
+    menu_tree.remove_structure_listener(listener)
+    menu_tree.remove_structure_listener(listener)
+
+    menu_tree.add_menu_item(item1)
+
+    assert changed == []
+
+
+def test_structure_fingerprint_ignores_values_but_not_structure():
+    def build(*entries) -> MenuTree:
+        tree = MenuTree()
+        tree.add_items_in_order(entries)
+        return tree
+
+    original = build((sub_menu, 0, None), (item1, 4, None), (item3, 4, None))
+    fingerprint = original.structure_fingerprint()
+    assert len(fingerprint) == 32
+
+    MenuItemHelper.set_menu_state(item3, 10, original)
+    assert original.structure_fingerprint() == fingerprint
+    assert build((sub_menu, 0, None), (item1, 4, None), (item3, 4, None)).structure_fingerprint() == fingerprint
+
+    assert build((sub_menu, 0, None), (item3, 4, None), (item1, 4, None)).structure_fingerprint() != fingerprint
+    assert build((sub_menu, 0, None), (item1, 4, None), (item3, 0, None)).structure_fingerprint() != fingerprint
+    renamed = DomainFixtures.an_analog_item(name="Renamed", item_id=3)
+    assert build((sub_menu, 0, None), (item1, 4, None), (renamed, 4, None)).structure_fingerprint() != fingerprint
+
+    original.remove_menu_item(item1)
+    assert original.structure_fingerprint() != fingerprint
@@ -0,0 +1,86 @@
+import dataclasses
+
+from test.domain.domain_fixtures import DomainFixtures
+from tcmenu.domain.state.menu_tree import MenuTree
+from tcmenu.domain.state.menu_tree_template import MenuTreeTemplate
+from tcmenu.domain.util.menu_item_helper import MenuItemHelper
+
+
+def by_name(tree: MenuTree, name: str):
+    return next(item for item in tree.get_all_menu_items() if item.name == name)
+
+
+def test_overlay_has_the_structure_of_the_template():
+    source = DomainFixtures.full_esp_amplifier_test_tree()
+    template = MenuTreeTemplate(source)
+    tree = template.new_tree()
+
+    assert tree.shares_template
+    assert len(template) == len(source.get_all_menu_items())
+    assert tree.get_all_menu_items_from(MenuTree.ROOT) == source.get_all_menu_items_from(MenuTree.ROOT)
+    assert tree.get_all_menu_items() == source.get_all_menu_items()
+    assert tree.get_all_sub_menus() == source.get_all_sub_menus()
+    for item in source.get_all_menu_items():
+        assert tree.get_menu_by_id(item.id) == item
+        assert tree.find_parent(item) == source.find_parent(item)
+        assert tree.get_menu_items(item) == source.get_menu_items(item)
+        if item.has_children():
+            assert tree.get_sub_menu_by_id(item.id) == item
+    assert tree.get_menu_by_id(9999) is None
+    assert tree.get_sub_menu_by_id(9999) is None
+
+
+def test_overlays_hold_their_own_states():
+    template = MenuTreeTemplate(DomainFixtures.full_esp_amplifier_test_tree())
+    first = template.new_tree()
+    second = template.new_tree()
+    volume = by_name(first, "Volume")
+
+    MenuItemHelper.set_menu_state(volume, 10, first)
+    MenuItemHelper.set_menu_state(volume, 20, second)
+    MenuItemHelper.set_menu_state(DomainFixtures.an_analog_item("Unknown", 9999), 5, first)
+
+    assert first.get_menu_state(volume).value == 10
+    assert second.get_menu_state(volume).value == 20
+    assert first.get_menu_state(DomainFixtures.an_analog_item("Unknown", 9999)) is None
+    assert first.shares_template and second.shares_template
+
+
+def test_identical_boot_items_do_not_change_the_structure():
+    source = DomainFixtures.full_esp_amplifier_test_tree()
+    tree = MenuTreeTemplate(source).new_tree()
+    changes = []
+    tree.add_structure_listener(changes.append)
+
+    for item in source.get_all_menu_items_from(MenuTree.ROOT)[1:]:
+        tree.add_or_update_item(item, source.find_parent(item).id)
+
+    assert tree.shares_template
+    assert changes == []
+
+
+def test_structural_changes_give_the_overlay_its_own_structure():
+    source = DomainFixtures.full_esp_amplifier_test_tree()
+    template = MenuTreeTemplate(source)
+    changed = template.new_tree()
+    untouched = template.new_tree()
+    volume = by_name(changed, "Volume")
+    parent = changed.find_parent(volume)
+
+    renamed = dataclasses.replace(volume, name="Master")
+    changed.add_or_update_item(renamed, parent.id)
+    extra = DomainFixtures.an_analog_item("Extra", 9999)
+    changed.add_menu_item(extra, parent)
+
+    assert not changed.shares_template
+    assert changed.get_menu_by_id(volume.id).name == "Master"
+    assert changed.find_parent(extra) == parent
+    assert untouched.shares_template
+    assert untouched.get_menu_by_id(volume.id).name == "Volume"
+    assert untouched.get_menu_by_id(extra.id) is None
+    assert template.get_menu_by_id(volume.id) == volume
+    assert source.get_menu_by_id(volume.id) == volume
+
+    changed.remove_menu_item(extra)
+    assert changed.get_menu_by_id(extra.id) is None
+    assert len(untouched.get_menu_items(parent)) == len(source.get_menu_items(parent))
@@ -0,0 +1,75 @@
+from tcmenu.domain.state.list_row_change import ListRowChange
+from tcmenu.domain.state.paged_string_list import PagedStringList
+
+Operation = ListRowChange.Operation
+
+
+def test_rows_to_fetch_only_requests_missing_rows_once():
+    cache = PagedStringList(1000)
+
+    assert cache.rows_to_fetch(10, 20) == [(10, 20)]
+    assert cache.rows_to_fetch(10, 20) == []
+    assert cache.rows_to_fetch(20, 20) == [(30, 10)]
+
+    cache.apply_rows(10, [f"row {i}" for i in range(10, 30)], 1000)
+    assert cache.loaded_rows == 20
+    assert cache[10] == "row 10" and cache[9] is None
+    assert cache.rows_to_fetch(0, 40) == [(0, 10)]
+
+
+def test_rows_to_fetch_limits_window_and_range_size():
+    cache = PagedStringList(100)
+
+    assert cache.rows_to_fetch(90, 20, max_rows=4) == [(90, 4), (94, 4), (98, 2)]
+    assert cache.rows_to_fetch(200, 10) == []
+
+
+def test_apply_rows_resizes_the_list():
+    cache = PagedStringList.from_rows(["a", "b", "c"])
+
+    cache.apply_rows(4, ["e"], 5)
+    assert list(cache) == ["a", "b", "c", None, "e"]
+
+    cache.apply_rows(0, ["x", "y", "z"], 2)
+    assert list(cache) == ["x", "y"]
+
+
+def test_apply_changes_moves_cached_rows():
+    cache = PagedStringList.from_rows(["a", "b", "c", "d"])
+
+    changes = [
+        ListRowChange(Operation.INSERT, 0, "first"),
+        ListRowChange(Operation.DELETE, 3),
+        ListRowChange(Operation.UPDATE, 3, "D"),
+        ListRowChange(Operation.INSERT, 4, "last"),
+    ]
+    assert cache.apply_changes(changes, 5)
+    assert list(cache) == ["first", "a", "b", "D", "last"]
+
+
+def test_inconsistent_changes_clear_the_cache():
+    cache = PagedStringList.from_rows(["a", "b"])
+    assert not cache.apply_changes([ListRowChange(Operation.UPDATE, 5, "x")], 2)
+    assert list(cache) == [None, None]
+
+    cache = PagedStringList.from_rows(["a", "b"])
+    assert not cache.apply_changes([ListRowChange(Operation.INSERT, 0, "x")], 10)
+    assert len(cache) == 10 and cache.loaded_rows == 0
+    assert cache.rows_to_fetch(0, 5) == [(0, 5)]
+
+
+def test_pages_requested_before_a_change_are_dropped():
+    cache = PagedStringList(10)
+    assert cache.rows_to_fetch(0, 5) == [(0, 5)]
+    assert cache.apply_rows(0, [f"r{i}" for i in range(5)], 10)
+
+    assert cache.rows_to_fetch(5, 5) == [(5, 5)]
+    assert cache.apply_changes([ListRowChange(Operation.INSERT, 0, "new")], 11)
+    assert cache.generation == 1
+
+    assert not cache.apply_rows(5, [f"r{i}" for i in range(5, 10)], 10)
+    assert list(cache) == ["new", "r0", "r1", "r2", "r3", "r4"] + [None] * 5
+
+    assert cache.rows_to_fetch(6, 5) == [(6, 5)]
+    assert cache.apply_rows(6, [f"r{i}" for i in range(5, 10)], 11)
+    assert list(cache) == ["new"] + [f"r{i}" for i in range(10)]
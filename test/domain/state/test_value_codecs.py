@@ -0,0 +1,99 @@
+import pytest
+
+from tcmenu.domain.state.value_codecs import (
+    format_html_color,
+    format_list_response,
+    format_list_row_change,
+    format_scroll_position,
+    parse_html_color,
+    parse_list_response,
+    parse_list_row_change,
+    parse_scroll_position,
+)
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("202:1", (202, True)),
+        ("0:0", (0, False)),
+        ("7:2", (7, False)),
+        ("7:1\n", (7, True)),
+        ("7:12", None),
+        ("-1:1", None),
+        (":1", None),
+        ("sldkfghkjd:2", None),
+        ("", None),
+    ],
+)
+def test_parse_list_response(text, expected):
+    assert parse_list_response(text) == expected
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("20-Another Super-Duper", (20, "Another Super-Duper")),
+        ("252-", (252, "")),
+        ("ABC", (0, "Unknown")),
+        ("a-ABC", (0, "ABC")),
+        ("-5-ABC", (0, "5-ABC")),
+        (" 12 -ABC", (12, "ABC")),
+        ("+3-ABC", (3, "ABC")),
+        ("", (0, "Unknown")),
+    ],
+)
+def test_parse_scroll_position(text, expected):
+    assert parse_scroll_position(text) == expected
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("#365498aa", (0x36, 0x54, 0x98, 0xAA)),
+        ("#365498AA", (0x36, 0x54, 0x98, 0xAA)),
+        ("#aB0fFe", (0xAB, 0x0F, 0xFE, 255)),
+        ("#f3b", (0xF0, 0x30, 0xB0, 255)),
+        ("#23f50311", (0x23, 0xF5, 0x03, 0x11)),
+        ("#23f5031", (0x23, 0xF5, 0x03, 255)),
+        ("#23f503112", (0x23, 0xF5, 0x03, 255)),
+        ("# 3f503", (0x03, 0xF5, 0x03, 255)),
+        ("red", (0, 0, 0, 255)),
+        ("#12", (0, 0, 0, 255)),
+    ],
+)
+def test_parse_html_color(text, expected):
+    assert parse_html_color(text) == expected
+
+
+def test_invalid_html_colors_raise_as_before():
+    with pytest.raises(ValueError):
+        parse_html_color("#zz0000")
+    with pytest.raises(IndexError):
+        parse_html_color("")
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("I3:New row", ("I", 3, "New row")),
+        ("U0:a:b", ("U", 0, "a:b")),
+        ("D12", ("D", 12, "")),
+        ("X1:a", None),
+        ("I", None),
+        ("Ia:b", None),
+    ],
+)
+def test_parse_list_row_change(text, expected):
+    assert parse_list_row_change(text) == expected
+
+
+def test_formatters():
+    assert format_list_response(202, True) == "202:1"
+    assert format_list_response(3, False) == "3:0"
+    assert format_scroll_position(10, "ABC") == "10-ABC"
+    assert format_html_color(128, 255, 127, 32) == "#80FF7F20"
+    assert format_html_color(0, 1, 2, 3) == "#00010203"
+    assert format_html_color(256, -1, 0, 0) == "#100-10000"
+    assert format_list_row_change("U", 4, "text") == "U4:text"
+    assert format_list_row_change("D", 4, "ignored") == "D4"
@@ -0,0 +1,128 @@
+import io
+
+import pytest
+
+from test.domain.domain_fixtures import DomainFixtures
+from tcmenu.domain.menu_items import BooleanMenuItem
+from tcmenu.domain.state.menu_tree import MenuTree
+from tcmenu.domain.state.value_history import HistoryBucket, ValueHistoryRecorder, ValueRingBuffer
+from tcmenu.domain.util.menu_item_helper import MenuItemHelper
+
+
+def filled_buffer(capacity: int, count: int) -> ValueRingBuffer:
+    buffer = ValueRingBuffer(capacity, "q")
+    for i in range(count):
+        buffer.append(float(i), i * 10)
+    return buffer
+
+
+def test_ring_buffer_keeps_the_newest_values():
+    buffer = filled_buffer(4, 6)
+
+    timestamps, values = buffer.between()
+    assert list(timestamps) == [2.0, 3.0, 4.0, 5.0]
+    assert list(values) == [20, 30, 40, 50]
+    assert len(buffer) == 4
+    assert buffer.overwritten == 2
+    assert buffer.latest() == (5.0, 50)
+    assert ValueRingBuffer(2, "d").latest() is None
+
+
+@pytest.mark.parametrize("count", [3, 5, 8, 11])
+def test_range_queries_across_the_wrap(count):
+    buffer = filled_buffer(5, count)
+    held = list(range(max(0, count - 5), count))
+
+    for start in range(-1, count + 1):
+        for end in range(start, count + 2):
+            timestamps, values = buffer.between(start, end)
+            expected = [i for i in held if start <= i < end]
+            assert list(timestamps) == [float(i) for i in expected]
+            assert list(values) == [i * 10 for i in expected]
+
+    assert list(buffer.between(start=count - 2)[1]) == [(count - 2) * 10, (count - 1) * 10]
+    assert list(buffer.between(end=held[0] + 1)[1]) == [held[0] * 10]
+
+
+def test_downsample_buckets():
+    buffer = ValueRingBuffer(100, "d")
+    for timestamp, value in [(0.5, 1.0), (1.0, 5.0), (9.9, 3.0), (25.0, -2.0), (29.0, 4.0)]:
+        buffer.append(timestamp, value)
+
+    assert buffer.downsample(10) == [
+        HistoryBucket(start=0, count=3, minimum=1.0, maximum=5.0, mean=3.0),
+        HistoryBucket(start=20, count=2, minimum=-2.0, maximum=4.0, mean=1.0),
+    ]
+    assert buffer.downsample(10, start=20) == [HistoryBucket(20, 2, -2.0, 4.0, 1.0)]
+    assert ValueRingBuffer(2, "d").downsample(10) == []
+    with pytest.raises(ValueError):
+        buffer.downsample(0)
+
+
+def test_recorder_records_numeric_items_of_an_attached_tree():
+    tree = DomainFixtures.full_esp_amplifier_test_tree()
+    clock = iter(range(100)).__next__
+    recorder = ValueHistoryRecorder(capacity=3, clock=lambda: float(clock()))
+    recorder.attach(tree)
+
+    volume = next(item for item in tree.get_all_menu_items() if item.name == "Volume")
+    name = next(item for item in tree.get_all_menu_items() if item.name == "Name")
+    for value in (10, 20, 30, 40):
+        MenuItemHelper.set_menu_state(volume, value, tree)
+    MenuItemHelper.set_menu_state(name, "text", tree)
+    recorder.detach()
+    MenuItemHelper.set_menu_state(volume, 50, tree)
+
+    assert recorder.item_ids == (volume.id,)
+    assert recorder.history(name.id) is None
+    timestamps, values = recorder.history(volume.id).between()
+    assert list(timestamps) == [1.0, 2.0, 3.0]
+    assert list(values) == [20, 30, 40]
+
+
+def test_recorder_only_records_selected_items():
+    tree = MenuTree()
+    analog = DomainFixtures.an_analog_item("Volume", 1)
+    boolean = DomainFixtures.a_boolean_menu("Mute", 2, BooleanMenuItem.BooleanNaming.TRUE_FALSE)
+    tree.add_menu_item(analog)
+    tree.add_menu_item(boolean)
+    recorder = ValueHistoryRecorder(item_ids=[2], clock=lambda: 1.0)
+    recorder.attach(tree)
+
+    MenuItemHelper.set_menu_state(analog, 5, tree)
+    MenuItemHelper.set_menu_state(boolean, True, tree)
+
+    assert recorder.item_ids == (2,)
+    assert recorder.history(2).type_code == "B"
+    assert list(recorder.history(2).between()[1]) == [1]
+
+
+def test_csv_export():
+    recorder = ValueHistoryRecorder()
+    tree = MenuTree()
+    analog = DomainFixtures.an_analog_item("Volume", 1)
+    tree.add_menu_item(analog)
+    for timestamp, value in ((1.0, 3), (2.0, 4), (3.0, 5)):
+        recorder.record(analog, MenuItemHelper.state_for_menu_item(analog, value, False, False), timestamp)
+
+    out = io.StringIO(newline="")
+    assert recorder.to_csv(out, start=2.0) == 2
+    assert out.getvalue().splitlines() == ["timestamp,item_id,value", "2.0,1,4", "3.0,1,5"]
+
+
+def test_numpy_export():
+    np = pytest.importorskip("numpy")
+    buffer = filled_buffer(4, 6)
+
+    timestamps, values = buffer.to_numpy(start=3)
+
+    assert timestamps.dtype == np.float64
+    assert values.dtype == np.int64
+    assert values.tolist() == [30, 40, 50]
+
+
+def test_invalid_capacity():
+    with pytest.raises(ValueError):
+        ValueRingBuffer(0, "d")
+    with pytest.raises(ValueError):
+        ValueHistoryRecorder(capacity=0)
@@ -0,0 +1,67 @@
+import pytest
+
+from tcmenu.domain.menu_items import AnalogMenuItem, BooleanMenuItem
+from tcmenu.domain.util.analog_batch import AnalogBatchScaler
+from tcmenu.domain.util.menu_item_formatter import MenuItemFormatter
+
+np = pytest.importorskip("numpy")
+
+tenths = AnalogMenuItem(id=1, divisor=10, offset=-500, max_value=1000, unit_name="V", name="volts")
+thousandths = AnalogMenuItem(id=2, divisor=1000, offset=0, max_value=5000, unit_name="A", name="amps")
+quarters = AnalogMenuItem(id=3, divisor=4, offset=-50, max_value=100, unit_name="", name="quarters")
+percent = AnalogMenuItem(id=4, divisor=1, offset=0, max_value=100, unit_name="%", name="percent")
+items = [tenths, thousandths, quarters, percent]
+
+
+def test_to_display_single_item():
+    scaler = AnalogBatchScaler(tenths)
+
+    assert scaler.to_display([0, 500, 523, 1000]).tolist() == pytest.approx([-50.0, 0.0, 2.3, 50.0])
+    assert scaler.to_display(np.zeros((2, 3), dtype=np.int32)).shape == (2, 3)
+
+
+def test_to_display_table():
+    scaler = AnalogBatchScaler(items)
+    display = scaler.to_display([[523, 1005, 7, 42], [0, 5000, 100, 100]])
+
+    assert display.tolist() == [pytest.approx([2.3, 1.005, -10.75, 42.0]), pytest.approx([-50.0, 5.0, 12.5, 100.0])]
+
+
+def test_to_raw_reverses_to_display():
+    scaler = AnalogBatchScaler(items)
+    raw = np.array([[0, 0, 0, 0], [523, 1005, 7, 42], [1000, 5000, 100, 100]])
+
+    assert np.array_equal(scaler.to_raw(scaler.to_display(raw)), raw)
+
+
+def test_to_raw_clamps_to_item_range():
+    scaler = AnalogBatchScaler(tenths)
+
+    assert scaler.to_raw([-60.0, 2.34, 60.0]).tolist() == [0, 523, 1000]
+    assert scaler.to_raw([-60.0, 60.0], clamp=False).tolist() == [-100, 1100]
+
+
+def test_format_matches_formatter():
+    scaler = AnalogBatchScaler(items)
+    raw = np.stack([np.arange(0, 1001), np.arange(0, 5005, 5), np.arange(0, 1001) % 101, np.arange(0, 1001) % 101], 1)
+
+    text = scaler.format(raw)
+
+    assert text.shape == raw.shape
+    for row in range(raw.shape[0]):
+        for column, item in enumerate(items):
+            assert text[row, column] == MenuItemFormatter.format_for_display(item, int(raw[row, column]))
+
+
+def test_format_single_item_without_unit():
+    scaler = AnalogBatchScaler(tenths)
+
+    assert scaler.format([523, 495], include_unit=False).tolist() == ["2.3", "0.5"]
+
+
+def test_rejects_bad_input():
+    with pytest.raises(ValueError):
+        AnalogBatchScaler([tenths, BooleanMenuItem(id=5, name="bool")])
+
+    with pytest.raises(ValueError):
+        AnalogBatchScaler(items).to_display([1, 2, 3])
@@ -111,3 +111,48 @@ def test_integer_percentage_case():
 
     assert MenuItemFormatter.format_for_display(item, 0) == "0%"
     assert MenuItemFormatter.format_for_display(item, 100) == "100%"
+
+
+def test_analog_divisor_formatting():
+    tenths = AnalogMenuItem(divisor=10, offset=-500, max_value=1000, unit_name="V", name="volts")
+    thousandths = AnalogMenuItem(divisor=1000, offset=0, max_value=5000, unit_name="A", name="amps")
+    quarters = AnalogMenuItem(divisor=4, offset=0, max_value=100, unit_name="", name="quarters")
+
+    assert MenuItemFormatter.format_for_display(tenths, 523) == "2.3V"
+    assert MenuItemFormatter.format_for_display(tenths, 495) == "0.5V"
+    assert MenuItemFormatter.format_for_display(thousandths, 1005) == "1.005A"
+    assert MenuItemFormatter.format_for_display(quarters, 7) == "1.7"
+
+
+def test_format_many():
+    tree: MenuTree = DomainFixtures.full_esp_amplifier_test_tree()
+    items = [tree.get_menu_by_id(1), tree.get_menu_by_id(3), tree.get_menu_by_id(14), tree.get_menu_by_id(5)]
+
+    assert MenuItemFormatter.format_many(items, [101, True, 1, None]) == ["-39.5dB", "True", "Warm Valves", ""]
+
+    with pytest.raises(ValueError):
+        MenuItemFormatter.format_many(items, [101])
+
+
+def test_display_formatters_are_cached_per_item():
+    item = AnalogMenuItem(divisor=2, offset=0, max_value=10, unit_name="dB", name="cached")
+    formatter = MenuItemFormatter.display_formatter(item)
+
+    assert MenuItemFormatter.display_formatter(item) is formatter
+    assert (
+        MenuItemFormatter.display_formatter(MenuItemHelper.create_from_existing(item, unit_name="%")) is not formatter
+    )
+
+    MenuItemFormatter.clear_display_cache()
+    assert MenuItemFormatter.display_formatter(item) is not formatter
+    assert formatter(3) == "1.5dB"
+
+
+@pytest.mark.parametrize(
+    "divisor, decimal_divisor, digits",
+    [(2, 10, 1), (10, 10, 1), (11, 100, 2), (100, 100, 2), (1000, 1000, 3), (1001, 10000, 4)],
+)
+def test_fraction_precision_for_divisor(divisor: int, decimal_divisor: int, digits: int):
+    assert MenuItemFormatter.get_actual_decimal_divisor(divisor) == decimal_divisor
+    assert MenuItemFormatter.calculate_required_digits(divisor) == digits
+    assert MenuItemFormatter.get_actual_decimal_divisor(1) == 1
@@ -1,3 +1,4 @@
+from dataclasses import dataclass
 from typing import Any, Optional
 from unittest import TestCase
 
@@ -15,10 +16,10 @@ from tcmenu.domain.menu_items import (
     MenuItem,
 )
 from tcmenu.domain.state.current_scroll_position import CurrentScrollPosition
-from tcmenu.domain.state.menu_state import MenuState
+from tcmenu.domain.state.menu_state import IntegerMenuState, MenuState
 from tcmenu.domain.state.menu_tree import MenuTree
 from tcmenu.domain.state.portable_color import PortableColor
-from tcmenu.domain.util.menu_item_helper import MenuItemHelper
+from tcmenu.domain.util.menu_item_helper import MenuItemHelper, MenuItemTypeHandler
 from tcmenu.remote.commands.menu_boot_commands import (
     MenuAnalogBootCommand,
     MenuEnumBootCommand,
@@ -272,3 +273,47 @@ def check_state(
         TestCase().assertAlmostEqual(float(state.value), float(actual), delta=0.00001)
     else:
         assert state.value == actual
+
+
+def test_unregistered_subclass_uses_base_type_handler():
+    @dataclass(frozen=True)
+    class PercentItem(AnalogMenuItem):
+        pass
+
+    item = PercentItem(name="Pct", id=90, max_value=100)
+    tree = MenuTree()
+    tree.add_menu_item(item)
+
+    assert MenuItemHelper.eeprom_size_for_item(item) == 2
+    assert MenuItemHelper.state_for_menu_item(item, 150, False, False).value == 100
+    assert isinstance(MenuItemHelper.get_boot_msg_for_item(item, MenuTree.ROOT, tree), MenuAnalogBootCommand)
+
+
+def test_register_item_type(monkeypatch):
+    # the handler tables are shared by the whole process, so the test registers into copies of them
+    monkeypatch.setattr(MenuItemHelper, "_registered_handlers", dict(MenuItemHelper._registered_handlers))
+    monkeypatch.setattr(MenuItemHelper, "_resolved_handlers", dict(MenuItemHelper._resolved_handlers))
+
+    @dataclass(frozen=True)
+    class CounterItem(MenuItem):
+        pass
+
+    item = CounterItem(name="Counter", id=91)
+    assert MenuItemHelper.get_default_for(item) is False
+
+    MenuItemHelper.register_item_type(
+        CounterItem,
+        MenuItemTypeHandler(
+            default_value=lambda: 0,
+            create_state=lambda menu_item, value, changed, active: IntegerMenuState(
+                item=menu_item, changed=changed, active=active, value=int(value)
+            ),
+            eeprom_size=lambda menu_item: 4,
+        ),
+    )
+
+    assert MenuItemHelper.get_default_for(item) == 0
+    assert MenuItemHelper.state_for_menu_item(item, "7", False, False).value == 7
+    assert MenuItemHelper.eeprom_size_for_item(item) == 4
+    assert not MenuItemHelper.is_runtime_structure_needed(item)
+    assert MenuItemHelper.get_boot_msg_for_item(item, MenuTree.ROOT, MenuTree()) is None
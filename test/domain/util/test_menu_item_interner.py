@@ -0,0 +1,77 @@
+import gc
+import io
+
+from test.domain.domain_fixtures import DomainFixtures
+from tcmenu.domain.menu_items import AnalogMenuItem, EnumMenuItem
+from tcmenu.domain.util.menu_item_interner import MenuItemInterner
+from tcmenu.remote.commands.command_factory import CommandFactory
+from tcmenu.remote.protocol.configurable_protocol_converter import ConfigurableProtocolConverter
+
+
+def test_equal_items_share_one_instance():
+    interner = MenuItemInterner()
+    first = interner.intern(AnalogMenuItem(id=1, name="Volume", unit_name="dB", max_value=255))
+    second = interner.intern(AnalogMenuItem(id=1, name="Volume", unit_name="dB", max_value=255))
+
+    assert second is first
+    assert interner.hits == 1
+    assert interner.misses == 1
+    assert len(interner) == 1
+
+
+def test_different_items_are_not_shared():
+    interner = MenuItemInterner()
+    analog = interner.intern(AnalogMenuItem(id=1, name="Volume"))
+
+    other_id = interner.intern(AnalogMenuItem(id=2, name="Volume"))
+    # Equal fields but another class is a different definition.
+    other_class = interner.intern(EnumMenuItem(id=1, name="Volume"))
+
+    assert other_id is not analog
+    assert other_class is not analog
+    assert len(interner) == 3
+
+
+def test_strings_are_interned_on_first_use():
+    interner = MenuItemInterner()
+    name = "".join(["Vol", "ume"])
+    choices = ("".join(["Lo", "w"]), "".join(["Hi", "gh"]))
+
+    item = interner.intern(EnumMenuItem(id=1, name=name, enum_entries=choices))
+    other = interner.intern(EnumMenuItem(id=2, name="".join(["Vol", "ume"]), enum_entries=("Low", "High")))
+
+    assert item.name is other.name
+    assert item.enum_entries[0] is other.enum_entries[0]
+
+
+def test_items_are_held_weakly():
+    interner = MenuItemInterner()
+    interner.intern(AnalogMenuItem(id=1, name="Volume"))
+    gc.collect()
+
+    assert len(interner) == 0
+
+
+def test_disabled_interner_and_unhashable_items_return_the_item():
+    interner = MenuItemInterner()
+    listed = EnumMenuItem(id=1, name="Enum", enum_entries=["a", "b"])
+    assert interner.intern(listed) is listed
+
+    interner.enabled = False
+    item = AnalogMenuItem(id=1, name="Volume")
+    assert interner.intern(item) is item
+    assert len(interner) == 0
+
+
+def test_boot_items_decoded_by_the_protocol_are_shared():
+    protocol = ConfigurableProtocolConverter(include_default_processors=True)
+    analog = DomainFixtures.an_analog_item("Volume", 7)
+    buffer = io.BytesIO()
+    protocol.to_channel(buffer, CommandFactory.new_analog_boot_command(0, analog, 1))
+    frame = buffer.getvalue()
+
+    first = protocol.from_channel(io.BytesIO(frame[1:])).menu_item
+    second = protocol.from_channel(io.BytesIO(frame[1:])).menu_item
+
+    assert first is second
+    assert first is MenuItemInterner.shared().intern(first)
@@ -1,5 +1,9 @@
+import io
 import json
 
+import humps
+import pytest
+
 from tcmenu.domain.menu_items import BooleanMenuItem, SubMenuItem
 from tcmenu.domain.state.menu_tree import MenuTree
 from tcmenu.domain.util.menu_item_helper import MenuItemHelper
@@ -250,6 +254,120 @@ def test_serializer():
         assert item.item == items[idx].item
 
 
+def test_from_json_without_orjson_matches(mocker):
+    output_json: str = JsonMenuItemSerializer.to_json(get_persisted_menus())
+    with_orjson = JsonMenuItemSerializer.from_json(output_json)
+
+    mocker.patch("tcmenu.persist.json_menu_item_serializer.orjson", None)
+    without_orjson = JsonMenuItemSerializer.from_json(output_json)
+
+    assert [item.item for item in without_orjson] == [item.item for item in with_orjson]
+    assert [item.default_value for item in without_orjson] == [item.default_value for item in with_orjson]
+
+
+def test_from_json_matches_humps_key_conversion():
+    output_json: str = JsonMenuItemSerializer.to_json(get_persisted_menus())
+    legacy = tuple(map(JsonMenuItemSerializer.deserialize, json.loads(output_json, object_hook=humps.decamelize)))
+
+    decoded = JsonMenuItemSerializer.from_json(output_json)
+
+    assert [item.item for item in decoded] == [item.item for item in legacy]
+    assert [item.parent_id for item in decoded] == [item.parent_id for item in legacy]
+
+
+def test_key_conversion_matches_humps_inside_lists():
+    data = {"parentId": 1, "someList": [{"innerKey": [{"deepKey": 1}]}, "textValue", 2], "item": {"unknownKey": {}}}
+    expected = json.loads(json.dumps(data), object_hook=humps.decamelize)
+    known_keys = len(JsonMenuItemSerializer._key_map())
+
+    assert JsonMenuItemSerializer._to_snake_case(data) == expected
+    assert len(JsonMenuItemSerializer._key_map()) == known_keys
+
+
+def test_write_json_stream_matches_to_json():
+    items: tuple[PersistedMenu] = get_persisted_menus()
+    stream = io.StringIO()
+
+    assert JsonMenuItemSerializer.write_json_stream(iter(items), stream) == len(items)
+    assert stream.getvalue() == JsonMenuItemSerializer.to_json(items)
+
+    empty = io.StringIO()
+    JsonMenuItemSerializer.write_json_stream((), empty)
+    assert empty.getvalue() == JsonMenuItemSerializer.to_json(())
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64 * 1024])
+def test_read_json_stream_across_chunk_boundaries(chunk_size: int):
+    items: tuple[PersistedMenu] = get_persisted_menus()
+    text = PersistedMenu.ItemTypes.TCMENU_COPY_PREFIX + JsonMenuItemSerializer.to_json(items)
+
+    decoded = list(JsonMenuItemSerializer.read_json_stream(io.StringIO(text), chunk_size=chunk_size))
+
+    assert [item.item for item in decoded] == [item.item for item in items]
+    assert [item.default_value for item in decoded] == [item.default_value for item in items]
+
+
+def test_read_json_stream_from_binary_utf8():
+    items = (PersistedMenu(DomainFixtures.an_analog_item("Lautstärke µ", 1), default_value="5"),)
+    data = JsonMenuItemSerializer.to_json(items).encode("utf-8")
+
+    decoded = list(JsonMenuItemSerializer.read_json_stream(io.BytesIO(data), chunk_size=3))
+
+    assert decoded[0].item.name == "Lautstärke µ"
+
+
+@pytest.mark.parametrize("text", ["{}", "[", '[{"parentId": 0', "tcMenuCopy"])
+def test_read_json_stream_rejects_invalid_documents(text: str):
+    with pytest.raises(ValueError):
+        list(JsonMenuItemSerializer.read_json_stream(io.StringIO(text)))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 64 * 1024])
+@pytest.mark.parametrize("template", ["[{0}{0}]", "[{0},]", "[,{0}]", "[{0} {0}]", "[{0}:]"])
+def test_read_json_stream_rejects_what_from_json_rejects(template: str, chunk_size: int):
+    item = JsonMenuItemSerializer.to_json(get_persisted_menus()[:1])[1:-1].strip()
+    text = template.format(item)
+    with pytest.raises(json.JSONDecodeError):
+        json.loads(text)
+    with pytest.raises(ValueError):
+        list(JsonMenuItemSerializer.read_json_stream(io.StringIO(text), chunk_size=chunk_size))
+
+
+def test_read_json_stream_fails_on_a_malformed_item_without_reading_on():
+    item = JsonMenuItemSerializer.to_json(get_persisted_menus()[:1])[1:-1]
+    stream = io.StringIO("[" + item + ', {"parentId": 0 0}, ' + ", ".join([item] * 1000) + "]")
+
+    with pytest.raises(json.JSONDecodeError):
+        list(JsonMenuItemSerializer.read_json_stream(stream, chunk_size=256))
+    assert stream.tell() < 1024
+
+
+def test_new_menu_tree_from_stream():
+    items: tuple[PersistedMenu] = get_persisted_menus()
+    stream = io.StringIO()
+    JsonMenuItemSerializer.write_json_stream(items, stream)
+    stream.seek(0)
+
+    tree = JsonMenuItemSerializer.new_menu_tree_from_stream(stream)
+
+    assert tree.find_parent(tree.get_menu_by_id(9)).id == 3
+    assert MenuItemHelper.get_value_for(tree.get_menu_by_id(5), tree, 0) == 100
+    assert [item.item for item in JsonMenuItemSerializer.iterate_in_order(MenuTree.ROOT, tree)] == [
+        item.item for item in items
+    ]
+
+
+def test_new_menu_tree_with_items_places_orphans_at_root():
+    items: tuple[PersistedMenu] = get_persisted_menus()[3:]
+    copy_text = PersistedMenu.ItemTypes.TCMENU_COPY_PREFIX + JsonMenuItemSerializer.to_json(items)
+
+    tree = JsonMenuItemSerializer.new_menu_tree_with_items(copy_text)
+
+    assert [item.id for item in tree.get_menu_items(MenuTree.ROOT)] == [4, 5, 6, 7, 8, 9]
+    assert MenuItemHelper.get_value_for(tree.get_menu_by_id(5), tree, 0) == 100
+    assert not tree.get_menu_state(tree.get_menu_by_id(5)).changed
+
+
 def test_copy_operations():
     items: tuple[PersistedMenu] = get_persisted_menus()
     tree: MenuTree = MenuTree()
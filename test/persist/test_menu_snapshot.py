@@ -0,0 +1,159 @@
+import io
+import json
+
+import pytest
+
+from tcmenu.domain.edit_item_type import EditItemType
+from tcmenu.domain.menu_items import (
+    BooleanMenuItem,
+    CustomBuilderMenuItem,
+    EditableLargeNumberMenuItem,
+    EditableTextMenuItem,
+    Rgb32MenuItem,
+    ScrollChoiceMenuItem,
+)
+from tcmenu.domain.state.current_scroll_position import CurrentScrollPosition
+from tcmenu.domain.state.menu_state import StringListMenuState
+from tcmenu.domain.state.menu_tree import MenuTree
+from tcmenu.domain.state.paged_string_list import PagedStringList
+from tcmenu.domain.state.portable_color import PortableColor
+from tcmenu.domain.util.menu_item_helper import MenuItemHelper
+from tcmenu.persist.json_menu_item_serializer import JsonMenuItemSerializer
+from tcmenu.persist.menu_snapshot import MenuSnapshot
+from test.domain.domain_fixtures import DomainFixtures
+
+
+def snapshot_of(tree: MenuTree) -> MenuSnapshot:
+    stream = io.BytesIO()
+    size = MenuSnapshot.write(tree, stream)
+    assert size == len(stream.getvalue())
+    return MenuSnapshot(stream.getvalue())
+
+
+def every_type_tree() -> MenuTree:
+    tree = MenuTree()
+    sub = DomainFixtures.a_sub_menu("Sub", 1)
+    tree.add_menu_item(sub)
+    items = [
+        (DomainFixtures.an_analog_item("Analog", 2), 100),
+        (DomainFixtures.an_enum_item("Enum", 3), 1),
+        (DomainFixtures.a_boolean_menu("Bool", 4, BooleanMenuItem.BooleanNaming.YES_NO), True),
+        (DomainFixtures.a_float_menu("Float", 5), 1.25),
+        (DomainFixtures.a_text_menu("Text", 6), "hello"),
+        (DomainFixtures.an_ip_address_menu("Ip", 7), "192.168.0.1"),
+        (DomainFixtures.a_large_number("Large", 8, 4, True), -12.5),
+        (DomainFixtures.a_runtime_list_menu("List", 9, 2), ["a", "b"]),
+        (ScrollChoiceMenuItem(name="Scroll", id=10, item_width=8, num_entries=3, variable="choices"), None),
+        (Rgb32MenuItem(name="Color", id=11, include_alpha_channel=True), None),
+        (DomainFixtures.an_action_menu("Action", 12), None),
+        (
+            CustomBuilderMenuItem(
+                name="Custom", id=13, menu_type=CustomBuilderMenuItem.CustomMenuType.REMOTE_IOT_MONITOR
+            ),
+            None,
+        ),
+        (EditableTextMenuItem(name="Ünïcode", id=14, text_length=5, item_type=EditItemType.TIME_24H), None),
+    ]
+    for item, value in items:
+        tree.add_menu_item(item, sub)
+        if value is not None:
+            MenuItemHelper.set_menu_state(item, value, tree)
+
+    scroll = tree.get_menu_by_id(10)
+    tree.change_item(scroll, MenuItemHelper.state_for_menu_item(scroll, CurrentScrollPosition(2, "Pizza"), True, True))
+    color = tree.get_menu_by_id(11)
+    tree.change_item(color, MenuItemHelper.state_for_menu_item(color, PortableColor(1, 2, 3, 4), False, True))
+    return tree
+
+
+def assert_same_trees(expected: MenuTree, actual: MenuTree):
+    for item in expected.get_all_menu_items_from(MenuTree.ROOT)[1:]:
+        assert actual.get_menu_by_id(item.id) == item
+        assert actual.find_parent(item).id == expected.find_parent(item).id
+        assert actual.get_menu_state(item) == expected.get_menu_state(item)
+    assert len(actual.get_all_menu_items()) == len(expected.get_all_menu_items())
+
+
+def test_round_trip_matches_json_serializer():
+    tree = DomainFixtures.full_esp_amplifier_test_tree()
+
+    restored = snapshot_of(tree).to_menu_tree()
+
+    assert_same_trees(tree, restored)
+    assert json.loads(JsonMenuItemSerializer.items_to_copy_text(MenuTree.ROOT, restored)[11:]) == json.loads(
+        JsonMenuItemSerializer.items_to_copy_text(MenuTree.ROOT, tree)[11:]
+    )
+
+
+def test_persisted_menus_convert_to_json():
+    tree = DomainFixtures.full_esp_amplifier_test_tree()
+
+    from_snapshot = JsonMenuItemSerializer.from_json(
+        JsonMenuItemSerializer.to_json(tuple(snapshot_of(tree).persisted_menus()))
+    )
+    from_tree = JsonMenuItemSerializer.populate_list_in_order(MenuTree.ROOT, tree)
+
+    assert {menu.item for menu in from_snapshot} == {menu.item for menu in from_tree}
+    by_id = {menu.item.id: menu for menu in from_tree}
+    for menu in from_snapshot:
+        assert menu.parent_id == by_id[menu.item.id].parent_id
+
+
+def test_every_item_and_state_type_round_trips():
+    tree = every_type_tree()
+
+    assert_same_trees(tree, snapshot_of(tree).to_menu_tree())
+
+
+def test_items_are_decoded_lazily_from_a_mapped_file(tmp_path):
+    tree = every_type_tree()
+    path = str(tmp_path / "menu.snapshot")
+    MenuSnapshot.save(tree, path)
+
+    with MenuSnapshot.open(path) as snapshot:
+        assert len(snapshot) == 14
+        assert 6 in snapshot and 99 not in snapshot
+        assert snapshot.item_ids()[0] == 1
+        assert snapshot.get_item(6) == tree.get_menu_by_id(6)
+        assert snapshot.get_item(6) is snapshot.get_item(6)
+        assert snapshot.get_state(6).value == "hello"
+        assert snapshot.get_parent_id(6) == 1
+        assert snapshot.get_state(12) is None
+        assert snapshot.get_item(99) is None and snapshot.get_parent_id(99) is None
+
+
+def test_large_number_state_is_a_float():
+    tree = every_type_tree()
+    state = snapshot_of(tree).get_state(8)
+
+    assert isinstance(state.item, EditableLargeNumberMenuItem)
+    assert state.value == -12.5
+
+
+def test_partly_fetched_list_writes_only_its_loaded_rows():
+    def list_tree(value) -> MenuTree:
+        tree = MenuTree()
+        item = DomainFixtures.a_runtime_list_menu("List", 9, 3)
+        tree.add_menu_item(item)
+        tree.change_item(item, StringListMenuState(item=item, changed=True, active=False, value=value))
+        return tree
+
+    cache = PagedStringList(3)
+    cache.apply_rows(0, ["r0"], 3)
+    cache.apply_rows(2, ["r2"], 3)
+    paged = list_tree(cache)
+    plain = list_tree(["r0", "r2"])
+
+    restored = snapshot_of(paged).to_menu_tree()
+    assert restored.get_menu_state(restored.get_menu_by_id(9)).value == ["r0", "r2"]
+    assert_same_trees(plain, restored)
+
+    copy_text = JsonMenuItemSerializer.items_to_copy_text(MenuTree.ROOT, paged)
+    assert copy_text == JsonMenuItemSerializer.items_to_copy_text(MenuTree.ROOT, plain)
+    assert "None" not in copy_text and "PagedStringList" not in copy_text
+
+
+@pytest.mark.parametrize("data", [b"", b"NOTASNAPSHOT" * 4, b"TCMSNAP\x00\x02\x00" + bytes(14)])
+def test_invalid_snapshots_are_rejected(data: bytes):
+    with pytest.raises(ValueError):
+        MenuSnapshot(data)
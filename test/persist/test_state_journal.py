@@ -0,0 +1,136 @@
+import os
+
+import pytest
+
+from tcmenu.domain.menu_items import ScrollChoiceMenuItem
+from tcmenu.domain.state.current_scroll_position import CurrentScrollPosition
+from tcmenu.domain.state.menu_tree import MenuTree
+from tcmenu.domain.util.menu_item_helper import MenuItemHelper
+from tcmenu.persist.state_journal import SnapshotFormat, StateJournal
+from test.domain.domain_fixtures import DomainFixtures
+
+
+def a_tree() -> MenuTree:
+    tree = MenuTree()
+    tree.add_menu_item(DomainFixtures.an_analog_item("Volume", 1))
+    tree.add_menu_item(DomainFixtures.a_text_menu("Name", 2))
+    tree.add_menu_item(DomainFixtures.a_runtime_list_menu("List", 3, 2))
+    tree.add_menu_item(ScrollChoiceMenuItem(name="Scroll", id=4, num_entries=5))
+    tree.initialize_state_for_each_item()
+    return tree
+
+
+def paths(tmp_path) -> tuple[str, str]:
+    return str(tmp_path / "menu.journal"), str(tmp_path / "menu.snapshot")
+
+
+@pytest.mark.parametrize("snapshot_format", [SnapshotFormat.BINARY, SnapshotFormat.JSON])
+def test_recover_replays_journal_over_snapshot(tmp_path, snapshot_format: SnapshotFormat):
+    journal_path, snapshot_path = paths(tmp_path)
+    tree = a_tree()
+    journal = StateJournal(journal_path, snapshot_path, snapshot_format)
+    journal.attach(tree)
+
+    for value in range(10):
+        MenuItemHelper.set_menu_state(tree.get_menu_by_id(1), value, tree)
+    MenuItemHelper.set_menu_state(tree.get_menu_by_id(2), "hello", tree)
+    MenuItemHelper.set_menu_state(tree.get_menu_by_id(3), ["x", "y"], tree)
+    MenuItemHelper.set_menu_state(tree.get_menu_by_id(4), CurrentScrollPosition(3, "Three"), tree)
+    journal.close()
+
+    assert journal.records_written == 13
+    recovered = StateJournal.recover(journal_path, snapshot_path, snapshot_format)
+
+    assert MenuItemHelper.get_value_for(recovered.get_menu_by_id(1), recovered) == 9
+    assert MenuItemHelper.get_value_for(recovered.get_menu_by_id(2), recovered) == "hello"
+    assert MenuItemHelper.get_value_for(recovered.get_menu_by_id(3), recovered) == ["x", "y"]
+    assert MenuItemHelper.get_value_for(recovered.get_menu_by_id(4), recovered) == CurrentScrollPosition(3, "Three")
+
+
+def test_save_cost_is_proportional_to_changes(tmp_path):
+    journal_path, snapshot_path = paths(tmp_path)
+    tree = a_tree()
+    journal = StateJournal(journal_path, snapshot_path)
+    journal.attach(tree)
+    snapshot_size = os.path.getsize(snapshot_path)
+
+    MenuItemHelper.set_menu_state(tree.get_menu_by_id(1), 5, tree)
+    journal.flush()
+    one_change = os.path.getsize(journal_path)
+    MenuItemHelper.set_menu_state(tree.get_menu_by_id(1), 6, tree)
+    journal.flush()
+
+    assert os.path.getsize(snapshot_path) == snapshot_size
+    assert os.path.getsize(journal_path) - one_change < 32
+    journal.close()
+
+
+def test_compaction_folds_journal_into_snapshot(tmp_path):
+    journal_path, snapshot_path = paths(tmp_path)
+    tree = a_tree()
+    journal = StateJournal(journal_path, snapshot_path, compact_after=200)
+    journal.attach(tree)
+
+    for value in range(50):
+        MenuItemHelper.set_menu_state(tree.get_menu_by_id(1), value, tree)
+    journal.close()
+
+    assert journal.compactions > 1
+    assert len(list(StateJournal.read_records(journal_path))) < 50
+    recovered = StateJournal.recover(journal_path, snapshot_path)
+    assert MenuItemHelper.get_value_for(recovered.get_menu_by_id(1), recovered) == 49
+
+
+def test_torn_record_is_ignored(tmp_path):
+    journal_path, snapshot_path = paths(tmp_path)
+    tree = a_tree()
+    journal = StateJournal(journal_path, snapshot_path, sync=True)
+    journal.attach(tree)
+    MenuItemHelper.set_menu_state(tree.get_menu_by_id(1), 7, tree)
+    MenuItemHelper.set_menu_state(tree.get_menu_by_id(1), 8, tree)
+    journal.close()
+
+    with open(journal_path, "r+b") as file:
+        file.truncate(os.path.getsize(journal_path) - 1)
+
+    recovered = StateJournal.recover(journal_path, snapshot_path)
+    assert MenuItemHelper.get_value_for(recovered.get_menu_by_id(1), recovered) == 7
+
+
+def test_records_written_after_a_torn_record_are_recovered(tmp_path):
+    journal_path, snapshot_path = paths(tmp_path)
+    tree = a_tree()
+    journal = StateJournal(journal_path, snapshot_path, sync=True)
+    journal.attach(tree)
+    MenuItemHelper.set_menu_state(tree.get_menu_by_id(1), 6, tree)
+    MenuItemHelper.set_menu_state(tree.get_menu_by_id(1), 7, tree)
+    journal.close()
+
+    with open(journal_path, "r+b") as file:
+        file.truncate(os.path.getsize(journal_path) - 1)
+
+    tree = StateJournal.recover(journal_path, snapshot_path)
+    assert MenuItemHelper.get_value_for(tree.get_menu_by_id(1), tree) == 6
+    journal.attach(tree)
+    MenuItemHelper.set_menu_state(tree.get_menu_by_id(1), 99, tree)
+    journal.close()
+
+    recovered = StateJournal.recover(journal_path, snapshot_path)
+    assert MenuItemHelper.get_value_for(recovered.get_menu_by_id(1), recovered) == 99
+
+
+def test_reattaching_appends_to_existing_journal(tmp_path):
+    journal_path, snapshot_path = paths(tmp_path)
+    tree = a_tree()
+    journal = StateJournal(journal_path, snapshot_path)
+    journal.attach(tree)
+    MenuItemHelper.set_menu_state(tree.get_menu_by_id(1), 1, tree)
+    journal.close()
+
+    tree = StateJournal.recover(journal_path, snapshot_path)
+    journal.attach(tree)
+    MenuItemHelper.set_menu_state(tree.get_menu_by_id(2), "again", tree)
+    journal.close()
+    MenuItemHelper.set_menu_state(tree.get_menu_by_id(1), 100, tree)
+
+    assert [record.item_id for record in StateJournal.read_records(journal_path)] == [1, 2]
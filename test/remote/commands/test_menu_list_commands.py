@@ -0,0 +1,38 @@
+from tcmenu.domain.state.list_row_change import ListRowChange
+from tcmenu.remote.commands.command_factory import CommandFactory
+from tcmenu.remote.commands.menu_list_commands import MAX_LIST_ROWS_PER_COMMAND
+from tcmenu.remote.protocol.correlation_id import CorrelationId
+
+correlation = CorrelationId.from_string("1234")
+
+
+def test_list_fetch_command():
+    command = CommandFactory.new_list_fetch_command(correlation, 5, start_row=100, row_count=20)
+
+    assert command.menu_item_id == 5
+    assert (command.start_row, command.row_count) == (100, 20)
+    assert command.command_type.id == "LF"
+
+
+def test_list_rows_command_copies_the_requested_window():
+    rows = [f"row {i}" for i in range(200)]
+
+    command = CommandFactory.new_list_rows_command(correlation, 5, rows, start_row=190, row_count=20)
+    assert (command.start_row, command.total_rows) == (190, 200)
+    assert command.rows == tuple(rows[190:])
+    assert command.command_type.id == "LW"
+
+    command = CommandFactory.new_list_rows_command(correlation, 5, rows, start_row=0, row_count=1000)
+    assert len(command.rows) == MAX_LIST_ROWS_PER_COMMAND
+
+
+def test_list_delta_commands_are_split_with_running_totals():
+    changes = [ListRowChange(ListRowChange.Operation.INSERT, i, f"new {i}") for i in range(60)]
+    changes.append(ListRowChange(ListRowChange.Operation.DELETE, 0))
+
+    commands = CommandFactory.new_list_delta_commands(correlation, 5, changes, total_rows=109)
+
+    assert [len(command.changes) for command in commands] == [MAX_LIST_ROWS_PER_COMMAND, 9]
+    assert [command.total_rows for command in commands] == [102, 109]
+    assert commands[0].command_type.id == "LD"
+    assert sum((command.changes for command in commands), ()) == tuple(changes)
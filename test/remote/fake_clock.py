@@ -0,0 +1,8 @@
+class FakeClock:
+    """A clock for the timing tests that only moves when `now` is set."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
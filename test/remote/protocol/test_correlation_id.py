@@ -1,4 +1,8 @@
-from tcmenu.remote.protocol.correlation_id import CorrelationId
+import threading
+
+import pytest
+
+from tcmenu.remote.protocol.correlation_id import CorrelationId, CorrelationIdGenerator
 
 
 def test_correlation_id_from_string():
@@ -26,15 +30,62 @@ def test_correlation_id_repr():
 
 
 def test_correlation_id_unique():
-    CorrelationId.counter = 0
     correlation_id1 = CorrelationId.new_correlation()
     correlation_id2 = CorrelationId.new_correlation()
 
     # Make sure correlations are unique
     assert not correlation_id1 == correlation_id2
 
-    # Make sure the counter increments
-    assert CorrelationId.counter == 2
+    # Make sure correlations fit the wire width
+    assert len(str(correlation_id1)) == 8
+    assert len(str(correlation_id2)) == 8
+
+
+def test_generator_stays_within_window():
+    generator = CorrelationIdGenerator(window=1000, block_size=16, seed=990)
+    values = [generator.next_id() for _ in range(1000)]
+
+    assert len(set(values)) == 1000
+    assert min(values) == 1
+    assert max(values) == 1000
+
+    # the window wraps around after all values are used.
+    assert generator.next_id() == values[0]
+
+
+def test_generator_never_returns_empty_correlation():
+    generator = CorrelationIdGenerator(seed=CorrelationIdGenerator.MAX_WINDOW - 5)
+    values = [generator.next_id() for _ in range(20)]
+
+    assert 0 not in values
+    assert all(0 < value <= 0xFFFFFFFF for value in values)
+
+
+def test_generator_unique_across_threads():
+    generator = CorrelationIdGenerator(block_size=8)
+    results: list[list[int]] = [[] for _ in range(8)]
+
+    def allocate(target: list[int]):
+        for _ in range(5000):
+            target.append(generator.next_id())
+
+    threads = [threading.Thread(target=allocate, args=(result,)) for result in results]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    all_values = [value for result in results for value in result]
+    assert len(set(all_values)) == len(all_values)
+
+
+def test_generator_invalid_configuration():
+    with pytest.raises(ValueError):
+        CorrelationIdGenerator(window=0)
+    with pytest.raises(ValueError):
+        CorrelationIdGenerator(window=CorrelationIdGenerator.MAX_WINDOW + 1)
+    with pytest.raises(ValueError):
+        CorrelationIdGenerator(block_size=0)
 
 
 def test_correlation_id_and_its_copy_are_equal():
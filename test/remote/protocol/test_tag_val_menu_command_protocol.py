@@ -10,6 +10,7 @@ from tcmenu.domain.edit_item_type import EditItemType
 from tcmenu.domain.menu_items import BooleanMenuItem, FloatMenuItem, Rgb32MenuItem, ScrollChoiceMenuItem
 from tcmenu.domain.state.current_scroll_position import CurrentScrollPosition
 from tcmenu.domain.state.list_response import ListResponse
+from tcmenu.domain.state.list_row_change import ListRowChange
 from tcmenu.domain.state.portable_color import PortableColor
 from tcmenu.remote.commands.ack_status import AckStatus
 from tcmenu.remote.commands.command_factory import CommandFactory
@@ -36,6 +37,7 @@ from tcmenu.remote.commands.menu_command_type import MenuCommandType
 from tcmenu.remote.commands.menu_dialog_command import MenuDialogCommand
 from tcmenu.remote.commands.menu_heartbeat_command import MenuHeartbeatCommand
 from tcmenu.remote.commands.menu_join_command import MenuJoinCommand
+from tcmenu.remote.commands.menu_list_commands import MenuListRowsCommand
 from tcmenu.remote.commands.menu_pairing_command import MenuPairingCommand
 from tcmenu.remote.menu_command_protocol import MenuCommandProtocol
 from tcmenu.remote.protocol.api_platform import ApiPlatform
@@ -43,8 +45,9 @@ from tcmenu.remote.protocol.command_protocol import CommandProtocol
 from tcmenu.remote.protocol.configurable_protocol_converter import ConfigurableProtocolConverter
 from tcmenu.remote.protocol.correlation_id import CorrelationId
 from tcmenu.remote.protocol.message_field import MessageField
-from tcmenu.remote.protocol.tag_val_menu_command_processors import TagValMenuCommandProcessors
 from tcmenu.remote.protocol.tag_val_text_parser import TagValTextParser
+from tcmenu.remote.protocol.tag_val_writer_template import tag_val_field
+from tcmenu.remote.protocol.tc_protocol_exception import TcProtocolException
 from test.domain.domain_fixtures import DomainFixtures
 
 protocol = ConfigurableProtocolConverter(include_default_processors=True)
@@ -68,10 +71,9 @@ def process_spanner_command(parser: TagValTextParser) -> MenuSpannerCommand:
     return MenuSpannerCommand(metric_size=parser.get_value_as_int("ZA"), make=parser.get_value("ZB"))
 
 
-# noinspection PyProtectedMember
 def write_spanner_command(buffer: io.StringIO, command: MenuSpannerCommand) -> None:
-    TagValMenuCommandProcessors._append_field(buffer, "ZA", command.metric_size)
-    TagValMenuCommandProcessors._append_field(buffer, "ZB", command.make)
+    buffer.write(tag_val_field("ZA", command.metric_size))
+    buffer.write(tag_val_field("ZB", command.make))
 
 
 protocol.add_tag_val_in_processor(field=MenuSpannerCommand.SPANNER_MSG_TYPE, processor=process_spanner_command)
@@ -1111,3 +1113,64 @@ def compare_buffer_against_expected(out_buffer: io.BytesIO, expected_msg: Messag
 
     # Check the actual data is right.
     assert expected_data == out_buffer.getvalue().decode("utf-8")
+
+
+def test_write_and_receive_list_fetch():
+    out_buffer = io.BytesIO()
+    protocol.to_channel(
+        buffer=out_buffer,
+        command=CommandFactory.new_list_fetch_command(CorrelationId.from_string("C04239"), 7, 1000, 25),
+    )
+    compare_buffer_against_expected(
+        out_buffer, MenuCommandType.LIST_FETCH.value, "IC=00c04239|ID=7|LS=1000|LN=25|\u0002"
+    )
+
+    out_buffer.seek(1)
+    command = protocol.from_channel(out_buffer)
+    assert command == CommandFactory.new_list_fetch_command(CorrelationId.from_string("C04239"), 7, 1000, 25)
+
+
+def test_write_and_receive_list_rows():
+    out_buffer = io.BytesIO()
+    rows = ["alpha", "be|ta", "tab\tbed"] + [f"row {i}" for i in range(3, 1000)]
+    sent = CommandFactory.new_list_rows_command(CorrelationId.from_string("C04239"), 7, rows, 0, 60)
+    protocol.to_channel(buffer=out_buffer, command=sent)
+
+    assert out_buffer.getvalue().startswith(
+        b"\x01\x01LWIC=00c04239|ID=7|LS=0|LT=1000|LN=52|rA=alpha|rB=be\\|ta|rC=tab\tbed|rD=row 3|"
+    )
+    assert b"|rZ=row 25|ra=row 26|" in out_buffer.getvalue()
+
+    out_buffer.seek(1)
+    received = protocol.from_channel(out_buffer)
+    assert type(received) is MenuListRowsCommand
+    assert received == sent
+
+
+def test_write_and_receive_list_delta():
+    out_buffer = io.BytesIO()
+    changes = (
+        ListRowChange(ListRowChange.Operation.INSERT, 0, "a=b"),
+        ListRowChange(ListRowChange.Operation.UPDATE, 10, "changed"),
+        ListRowChange(ListRowChange.Operation.DELETE, 999),
+    )
+    (sent,) = CommandFactory.new_list_delta_commands(CorrelationId.from_string("C04239"), 7, changes, 1000)
+    protocol.to_channel(buffer=out_buffer, command=sent)
+    compare_buffer_against_expected(
+        out_buffer,
+        MenuCommandType.LIST_DELTA.value,
+        "IC=00c04239|ID=7|LT=1000|LN=3|dA=I0:a\\=b|dB=U10:changed|dC=D999|\u0002",
+    )
+
+    out_buffer.seek(1)
+    assert protocol.from_channel(out_buffer) == sent
+
+
+def test_list_commands_reject_too_many_rows():
+    command = MenuListRowsCommand(7, CorrelationId.EMPTY_CORRELATION, 0, 100, tuple(["x"] * 53))
+
+    with pytest.raises(TcProtocolException):
+        protocol.to_channel(buffer=io.BytesIO(), command=command)
+
+    with pytest.raises(TcProtocolException):
+        protocol.from_channel(to_buffer(MenuCommandType.LIST_DELTA.value, "ID=7|LT=1|LN=1|dA=Q1|\u0002"))
@@ -0,0 +1,48 @@
+from tcmenu.domain.menu_items import AnalogMenuItem
+from tcmenu.remote.commands.command_factory import CommandFactory
+from tcmenu.remote.protocol.tag_val_menu_fields import TagValMenuFields
+from tcmenu.remote.protocol.tag_val_writer_template import TagValWriterTemplate, escape_value, flag, tag_val_field
+
+
+def test_escape_value():
+    assert escape_value("a|b=c") == "a\\|b\\=c"
+    assert escape_value("plain") == "plain"
+    assert escape_value(42) == 42
+
+
+def test_tag_val_field():
+    assert tag_val_field("NM", "x=y") == "NM=x\\=y|"
+    assert tag_val_field("ID", 10) == "ID=10|"
+
+
+def test_render_matches_field_by_field():
+    item = AnalogMenuItem(id=3, name="Vol|ume", read_only=True, unit_name="dB")
+    command = CommandFactory.new_analog_boot_command(1, item, 22)
+    template = TagValWriterTemplate(
+        (TagValMenuFields.KEY_ID_FIELD, "menu_item.id"),
+        (TagValMenuFields.KEY_NAME_FIELD, "menu_item.name"),
+        (TagValMenuFields.KEY_READONLY_FIELD, "menu_item.read_only", flag),
+        (TagValMenuFields.KEY_CURRENT_VAL, "current_value"),
+    )
+
+    expected = (
+        tag_val_field(TagValMenuFields.KEY_ID_FIELD.value, 3)
+        + tag_val_field(TagValMenuFields.KEY_NAME_FIELD.value, "Vol|ume")
+        + tag_val_field(TagValMenuFields.KEY_READONLY_FIELD.value, 1)
+        + tag_val_field(TagValMenuFields.KEY_CURRENT_VAL.value, 22)
+    )
+    assert template.render(command) == expected
+
+
+def test_extend_appends_fields():
+    item = AnalogMenuItem(id=3, name="Volume", unit_name="dB")
+    command = CommandFactory.new_analog_boot_command(1, item, 22)
+    base = TagValWriterTemplate((TagValMenuFields.KEY_ID_FIELD, "menu_item.id"))
+    extended = base.extend((TagValMenuFields.KEY_ANALOG_UNIT_FIELD, "menu_item.unit_name"))
+
+    assert base.render(command) == "ID=3|"
+    assert extended.render(command) == "ID=3|AU=dB|"
+
+
+def test_empty_template():
+    assert TagValWriterTemplate().render(object()) == ""
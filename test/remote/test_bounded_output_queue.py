@@ -0,0 +1,120 @@
+import threading
+
+from test.remote.fake_clock import FakeClock
+from tcmenu.remote.bounded_output_queue import BoundedOutputQueue, OverflowPolicy
+from tcmenu.remote.commands.command_factory import CommandFactory
+from tcmenu.remote.commands.menu_change_command import MenuChangeCommand
+from tcmenu.remote.menu_command_protocol import MenuCommandProtocol
+from tcmenu.remote.protocol.configurable_protocol_converter import ConfigurableProtocolConverter
+from tcmenu.remote.protocol.correlation_id import CorrelationId
+
+protocol = ConfigurableProtocolConverter(include_default_processors=True)
+
+
+def change(item_id: int, value: int) -> MenuChangeCommand:
+    return CommandFactory.new_absolute_menu_change_command(CorrelationId.new_correlation(), item_id, value)
+
+
+def test_frames_are_encoded_in_order():
+    queue = BoundedOutputQueue(protocol, capacity=4)
+    queue.put(change(1, 10))
+    queue.put(change(2, 20))
+
+    frame = queue.next_frame(timeout=0)
+    assert frame.startswith(MenuCommandProtocol.PROTO_START_OF_MSG)
+    assert b"ID=1|" in frame
+    assert b"ID=2|" in queue.next_frame(timeout=0)
+    assert queue.next_frame(timeout=0) is None
+    assert queue.metrics.written == 2
+
+
+def test_watermarks_pause_and_resume_producers():
+    clock = FakeClock()
+    events = []
+    queue = BoundedOutputQueue(
+        protocol,
+        capacity=10,
+        high_watermark=4,
+        low_watermark=1,
+        on_pause=lambda: events.append("pause"),
+        on_resume=lambda: events.append("resume"),
+        clock=clock,
+    )
+
+    for i in range(4):
+        queue.put(change(i, i))
+    assert queue.paused
+    assert events == ["pause"]
+
+    clock.now = 2.0
+    assert queue.metrics.stall_time == 2.0
+
+    queue.get(timeout=0)
+    queue.get(timeout=0)
+    assert queue.paused
+    clock.now = 3.0
+    queue.get(timeout=0)
+    assert not queue.paused
+    assert events == ["pause", "resume"]
+
+    metrics = queue.metrics
+    assert metrics.pauses == 1
+    assert metrics.stall_time == 3.0
+    assert metrics.depth == 1
+    assert metrics.max_depth == 4
+
+
+def test_drop_oldest_policy():
+    queue = BoundedOutputQueue(protocol, capacity=3, policy=OverflowPolicy.DROP_OLDEST)
+    for i in range(5):
+        assert queue.put(change(i, i))
+
+    assert [queue.get(timeout=0).menu_item_id for _ in range(3)] == [2, 3, 4]
+    assert queue.metrics.dropped == 2
+
+
+def test_block_policy_times_out_when_full():
+    queue = BoundedOutputQueue(protocol, capacity=2)
+    assert queue.put(change(1, 1))
+    assert queue.put(change(2, 1))
+    assert not queue.put(change(3, 1), timeout=0.01)
+    assert queue.metrics.dropped == 1
+    assert len(queue) == 2
+
+
+def test_block_policy_waits_for_consumer():
+    queue = BoundedOutputQueue(protocol, capacity=1)
+    queue.put(change(1, 1))
+
+    consumer = threading.Timer(0.05, lambda: queue.get(timeout=1))
+    consumer.start()
+    assert queue.put(change(2, 1), timeout=2)
+    consumer.join()
+
+    assert queue.get(timeout=0).menu_item_id == 2
+    assert queue.metrics.blocked_time > 0
+
+
+def test_coalesce_policy_merges_then_drops_oldest():
+    queue = BoundedOutputQueue(protocol, capacity=2, policy=OverflowPolicy.COALESCE)
+    queue.put(change(1, 1))
+    queue.put(change(1, 2))
+    queue.put(change(2, 1))
+    queue.put(change(3, 1))
+
+    metrics = queue.metrics
+    assert metrics.coalesced == 1
+    assert metrics.dropped == 1
+    assert [queue.get(timeout=0).menu_item_id for _ in range(2)] == [2, 3]
+
+
+def test_close_wakes_consumer_and_rejects_producers():
+    queue = BoundedOutputQueue(protocol, capacity=2)
+    result = []
+    consumer = threading.Thread(target=lambda: result.append(queue.get()))
+    consumer.start()
+    queue.close()
+    consumer.join(timeout=2)
+
+    assert result == [None]
+    assert not queue.put(change(1, 1))
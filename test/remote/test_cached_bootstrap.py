@@ -0,0 +1,131 @@
+from test.domain.domain_fixtures import DomainFixtures
+from tcmenu.domain.state.menu_tree import MenuTree
+from tcmenu.domain.util.menu_item_helper import MenuItemHelper
+from tcmenu.remote.cached_bootstrap import BootstrapCache, CachedBootstrapUpdater
+from tcmenu.remote.commands.command_factory import CommandFactory
+from tcmenu.remote.commands.menu_bootstrap_command import MenuBootstrapCommand
+
+JOIN = CommandFactory.new_join_command("device", serial_number="12345")
+SETTINGS = DomainFixtures.a_sub_menu("Settings", 1)
+VOLUME = DomainFixtures.an_analog_item("Volume", 2)
+SOURCE = DomainFixtures.an_enum_item("Source", 3)
+
+
+def bootstrap(updater: CachedBootstrapUpdater, volume: int = 10, source: int = 1, moved: bool = False) -> list[bool]:
+    commands = [
+        JOIN,
+        CommandFactory.new_bootstrap_command(MenuBootstrapCommand.BootType.START),
+        CommandFactory.new_sub_menu_boot_command(0, SETTINGS),
+        CommandFactory.new_menu_enum_boot_command(0 if moved else 1, SOURCE, source),
+        CommandFactory.new_analog_boot_command(1, VOLUME, volume),
+        CommandFactory.new_bootstrap_command(MenuBootstrapCommand.BootType.END),
+    ]
+    return [updater.apply(command) for command in commands]
+
+
+def test_first_bootstrap_is_cached(tmp_path):
+    cache = BootstrapCache(str(tmp_path / "cache"))
+    tree = MenuTree()
+    updater = CachedBootstrapUpdater(tree, cache)
+
+    results = bootstrap(updater)
+
+    assert not results[0] and not updater.loaded_from_cache
+    assert updater.ready
+    assert cache.fingerprint(JOIN) == tree.structure_fingerprint()
+
+    cached = MenuTree()
+    assert cache.load(JOIN, cached) == tree.structure_fingerprint()
+    assert cached.get_all_menu_items_from(MenuTree.ROOT) == tree.get_all_menu_items_from(MenuTree.ROOT)
+    assert MenuItemHelper.get_value_for(VOLUME, cached) == 10
+
+
+def test_known_device_is_ready_on_join_and_only_values_change(tmp_path, mocker):
+    cache = BootstrapCache(str(tmp_path))
+    bootstrap(CachedBootstrapUpdater(MenuTree(), cache))
+
+    tree = MenuTree()
+    updater = CachedBootstrapUpdater(tree, cache)
+    assert updater.apply(JOIN)
+    assert updater.ready and updater.loaded_from_cache
+    assert MenuItemHelper.get_value_for(VOLUME, tree) == 10
+
+    structure_changes = []
+    tree.add_structure_listener(structure_changes.append)
+    save = mocker.spy(cache, "save")
+    bootstrap(updater, volume=50)
+
+    assert MenuItemHelper.get_value_for(VOLUME, tree) == 50
+    assert structure_changes == []
+    save.assert_called_once()
+
+    # The values of the latest bootstrap are shown on the next join, and are only saved again when they change.
+    tree = MenuTree()
+    updater = CachedBootstrapUpdater(tree, cache)
+    assert updater.apply(JOIN)
+    assert MenuItemHelper.get_value_for(VOLUME, tree) == 50
+
+    save.reset_mock()
+    bootstrap(updater, volume=50)
+    save.assert_not_called()
+
+
+def test_changed_device_structure_rebuilds_the_tree_and_cache(tmp_path):
+    cache = BootstrapCache(str(tmp_path))
+    bootstrap(CachedBootstrapUpdater(MenuTree(), cache))
+    old_fingerprint = cache.fingerprint(JOIN)
+
+    tree = MenuTree()
+    updater = CachedBootstrapUpdater(tree, cache)
+    results = bootstrap(updater, source=2, moved=True)
+
+    assert results[-1]
+    assert tree.get_menu_items(MenuTree.ROOT) == (SETTINGS, SOURCE)
+    assert tree.get_menu_items(SETTINGS) == (VOLUME,)
+    assert MenuItemHelper.get_value_for(SOURCE, tree) == 2
+    assert cache.fingerprint(JOIN) == tree.structure_fingerprint() != old_fingerprint
+
+
+def test_removed_items_are_dropped_at_the_end_of_bootstrap(tmp_path):
+    cache = BootstrapCache(str(tmp_path))
+    bootstrap(CachedBootstrapUpdater(MenuTree(), cache))
+
+    tree = MenuTree()
+    updater = CachedBootstrapUpdater(tree, cache)
+    updater.apply(JOIN)
+    updater.apply(CommandFactory.new_bootstrap_command(MenuBootstrapCommand.BootType.START))
+    updater.apply(CommandFactory.new_sub_menu_boot_command(0, SETTINGS))
+    updater.apply(CommandFactory.new_analog_boot_command(1, VOLUME, 5))
+    updater.apply(CommandFactory.new_bootstrap_command(MenuBootstrapCommand.BootType.END))
+
+    assert tree.get_menu_by_id(SOURCE.id) is None
+    assert tree.get_menu_state(SOURCE) is None
+    assert MenuItemHelper.get_value_for(VOLUME, tree) == 5
+
+
+def test_invalid_or_missing_cache_is_ignored(tmp_path):
+    cache = BootstrapCache(str(tmp_path))
+    tree = MenuTree()
+    assert cache.load(JOIN, tree) is None
+    assert cache.fingerprint(JOIN) is None
+
+    with open(cache.path_for(JOIN), "wb") as file:
+        file.write(b"TCMBOOT\x00\x01\x00" + bytes(16) + b"not a snapshot")
+    assert cache.load(JOIN, tree) is None
+    assert tree.get_menu_items(MenuTree.ROOT) is None
+
+    cache.remove(JOIN)
+    cache.remove(JOIN)
+    assert cache.fingerprint(JOIN) is None
+
+
+def test_cache_is_not_loaded_into_a_tree_that_has_items(tmp_path):
+    cache = BootstrapCache(str(tmp_path))
+    bootstrap(CachedBootstrapUpdater(MenuTree(), cache))
+
+    tree = MenuTree()
+    tree.add_menu_item(DomainFixtures.an_analog_item("Other", 9))
+    updater = CachedBootstrapUpdater(tree, cache)
+
+    assert not updater.apply(JOIN)
+    assert not updater.ready
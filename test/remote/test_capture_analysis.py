@@ -0,0 +1,127 @@
+import io
+
+import pytest
+
+from test.domain.domain_fixtures import DomainFixtures
+from tcmenu.remote.capture_analysis import CaptureAnalyser, chunk_capture
+from tcmenu.remote.commands.command_factory import CommandFactory
+from tcmenu.remote.commands.menu_heartbeat_command import MenuHeartbeatCommand
+from tcmenu.remote.protocol.configurable_protocol_converter import ConfigurableProtocolConverter
+from tcmenu.remote.protocol.correlation_id import CorrelationId
+from tcmenu.remote.session_capture import CaptureDirection, SessionRecorder
+
+protocol = ConfigurableProtocolConverter(include_default_processors=True)
+
+
+def encode(command) -> bytes:
+    buffer = io.BytesIO()
+    protocol.to_channel(buffer, command)
+    return buffer.getvalue()
+
+
+def write_capture(path, changes: int = 200):
+    correlation = CorrelationId.new_correlation()
+    with SessionRecorder.open(str(path)) as recorder:
+        recorder.record(
+            encode(CommandFactory.new_analog_boot_command(0, DomainFixtures.an_analog_item("Volume", 2), 10)),
+            timestamp=100.0,
+        )
+        recorder.record(
+            encode(CommandFactory.new_menu_text_boot_command(0, DomainFixtures.a_text_menu("Name", 3), "a")),
+            timestamp=100.0,
+        )
+        for i in range(changes):
+            timestamp = 101.0 + i
+            if i % 3 == 0:
+                recorder.record(
+                    encode(CommandFactory.new_delta_menu_change_command(correlation, 2, 1)), timestamp=timestamp
+                )
+            else:
+                recorder.record(
+                    encode(CommandFactory.new_absolute_menu_change_command(correlation, 2, i)), timestamp=timestamp
+                )
+            recorder.record(
+                encode(CommandFactory.new_heartbeat_command(1000, MenuHeartbeatCommand.HeartbeatMode.NORMAL)),
+                CaptureDirection.SENT,
+                timestamp=timestamp,
+            )
+        recorder.record(b"\x01\x01ZZbroken", timestamp=1000.0)
+
+
+def test_sequential_analysis_builds_series(tmp_path):
+    path = tmp_path / "capture.tcc"
+    write_capture(path, changes=6)
+
+    result = CaptureAnalyser(workers=1).analyse(str(path))
+
+    assert result.frames == 9
+    assert result.commands == 8
+    assert result.errors == 1
+    volume = result.values_for(2)
+    # Deltas at 0 and 3 are added to the value before them.
+    assert volume.values == [10, 11, 1, 2, 3, 4, 5]
+    assert volume.timestamps == [100.0, 101.0, 102.0, 103.0, 104.0, 105.0, 106.0]
+    assert result.values_for(3).values == ["a"]
+    assert len(result.values_for(99)) == 0
+
+
+def test_parallel_analysis_matches_sequential(tmp_path):
+    path = tmp_path / "capture.tcc"
+    write_capture(path)
+
+    sequential = CaptureAnalyser(workers=1, chunk_bytes=256).analyse(str(path))
+    parallel = CaptureAnalyser(workers=2, chunk_bytes=256).analyse(str(path))
+
+    assert parallel == sequential
+    assert len(parallel.values_for(2)) == 201
+
+
+def test_sent_direction(tmp_path):
+    path = tmp_path / "capture.tcc"
+    write_capture(path, changes=4)
+
+    result = CaptureAnalyser(workers=1, direction=CaptureDirection.SENT).analyse(str(path))
+
+    assert result.frames == 4
+    assert result.commands == 4
+    assert result.series == {}
+
+
+def test_deltas_without_a_value_are_not_resolved(tmp_path):
+    path = tmp_path / "capture.tcc"
+    with SessionRecorder.open(str(path)) as recorder:
+        recorder.record(encode(CommandFactory.new_delta_menu_change_command(CorrelationId.new_correlation(), 2, 1)))
+
+    result = CaptureAnalyser(workers=1).analyse(str(path))
+
+    assert result.unresolved_deltas == 1
+    assert result.series == {}
+
+
+def test_chunks_hold_whole_records(tmp_path):
+    path = tmp_path / "capture.tcc"
+    write_capture(path, changes=20)
+    data = path.read_bytes()
+
+    spans = list(chunk_capture(data, 100))
+
+    assert spans[0][0] == 8
+    assert spans[-1][1] == len(data)
+    assert all(end == next_start for (_, end), (next_start, _) in zip(spans, spans[1:]))
+    assert list(chunk_capture(data, len(data))) == [(8, len(data))]
+
+
+def test_invalid_captures_and_arguments(tmp_path):
+    path = tmp_path / "empty.tcc"
+    path.write_bytes(b"")
+    with pytest.raises(ValueError):
+        CaptureAnalyser(workers=1).analyse(str(path))
+
+    path.write_bytes(b"NOTCAPTURE")
+    with pytest.raises(ValueError):
+        CaptureAnalyser(workers=1).analyse(str(path))
+
+    with pytest.raises(ValueError):
+        CaptureAnalyser(workers=0)
+    with pytest.raises(ValueError):
+        CaptureAnalyser(chunk_bytes=0)
@@ -0,0 +1,125 @@
+from tcmenu.domain.state.list_response import ListResponse
+from tcmenu.remote.change_coalescing_queue import ChangeCoalescingQueue
+from tcmenu.remote.commands.command_factory import CommandFactory
+from tcmenu.remote.commands.menu_change_command import MenuChangeCommand
+from tcmenu.remote.commands.menu_heartbeat_command import MenuHeartbeatCommand
+from tcmenu.remote.protocol.correlation_id import CorrelationId
+
+
+def absolute(item_id: int, value: int) -> MenuChangeCommand:
+    return CommandFactory.new_absolute_menu_change_command(CorrelationId.new_correlation(), item_id, value)
+
+
+def delta(item_id: int, value: int) -> MenuChangeCommand:
+    return CommandFactory.new_delta_menu_change_command(CorrelationId.new_correlation(), item_id, value)
+
+
+def test_last_absolute_value_wins():
+    queue = ChangeCoalescingQueue(flush_interval=0.1, clock=lambda: 0.0)
+    for value in range(20):
+        queue.put(absolute(1, value))
+    last = absolute(1, 99)
+    queue.put(last)
+
+    assert len(queue) == 1
+    assert queue.poll(0.0) == [last]
+    assert queue.stats.dropped == 20
+    assert queue.stats.enqueued == 21
+    assert queue.stats.sent == 1
+
+
+def test_deltas_are_summed():
+    queue = ChangeCoalescingQueue(clock=lambda: 0.0)
+    queue.put(delta(2, 1))
+    queue.put(delta(2, 3))
+    queue.put(delta(2, -1))
+
+    commands = queue.drain()
+    assert len(commands) == 1
+    assert commands[0].change_type == MenuChangeCommand.ChangeType.DELTA
+    assert commands[0].value == "3"
+    assert queue.stats.merged == 2
+
+
+def test_absolute_replaces_pending_delta_but_delta_after_absolute_is_kept():
+    queue = ChangeCoalescingQueue(clock=lambda: 0.0)
+    queue.put(delta(2, 1))
+    queue.put(absolute(2, 10))
+    queue.put(delta(2, 1))
+
+    commands = queue.drain()
+    assert [(cmd.change_type, cmd.value) for cmd in commands] == [
+        (MenuChangeCommand.ChangeType.ABSOLUTE, "10"),
+        (MenuChangeCommand.ChangeType.DELTA, "1"),
+    ]
+
+
+def test_items_keep_their_position_in_the_queue():
+    queue = ChangeCoalescingQueue(clock=lambda: 0.0)
+    queue.put(absolute(1, 1))
+    queue.put(absolute(2, 1))
+    queue.put(absolute(1, 2))
+
+    assert [(cmd.menu_item_id, cmd.value) for cmd in queue.drain()] == [(1, "2"), (2, "1")]
+
+
+def test_ordered_items_and_list_changes_are_never_coalesced():
+    queue = ChangeCoalescingQueue(ordered_item_ids=[5], clock=lambda: 0.0)
+    queue.put(absolute(5, 1))
+    queue.put(absolute(5, 2))
+    queue.put(
+        CommandFactory.new_list_response_menu_change_command(CorrelationId.new_correlation(), 6, ListResponse.EMPTY)
+    )
+    queue.put(
+        CommandFactory.new_list_response_menu_change_command(CorrelationId.new_correlation(), 6, ListResponse.EMPTY)
+    )
+
+    assert len(queue.drain()) == 4
+    assert queue.stats.dropped == 0
+
+
+def test_no_merge_across_unmergeable_command_for_same_item():
+    queue = ChangeCoalescingQueue(clock=lambda: 0.0)
+    queue.put(absolute(7, 1))
+    queue.put(CommandFactory.new_absolute_list_menu_change_command(CorrelationId.new_correlation(), 7, ("a",)))
+    queue.put(absolute(7, 2))
+
+    assert [cmd.change_type for cmd in queue.drain()] == [
+        MenuChangeCommand.ChangeType.ABSOLUTE,
+        MenuChangeCommand.ChangeType.ABSOLUTE_LIST,
+        MenuChangeCommand.ChangeType.ABSOLUTE,
+    ]
+
+
+def test_sent_change_is_not_merged_into():
+    queue = ChangeCoalescingQueue(clock=lambda: 0.0)
+    queue.put(absolute(1, 1))
+    assert len(queue.drain()) == 1
+
+    queue.put(absolute(1, 2))
+    assert [cmd.value for cmd in queue.drain()] == ["2"]
+
+
+def test_flush_rate_and_batch_size():
+    queue = ChangeCoalescingQueue(flush_interval=0.1, max_per_flush=2, clock=lambda: 0.0)
+    for item_id in range(5):
+        queue.put(absolute(item_id, 1))
+    queue.put(MenuHeartbeatCommand(1000, MenuHeartbeatCommand.HeartbeatMode.NORMAL))
+
+    assert len(queue.poll(0.0)) == 2
+    assert queue.poll(0.05) == []
+    assert len(queue.poll(0.1)) == 2
+    assert len(queue.poll(0.2)) == 2
+    assert queue.poll(0.3) == []
+    assert queue.stats.sent == 6
+
+
+def test_pop_ignores_flush_rate():
+    queue = ChangeCoalescingQueue(flush_interval=10.0, clock=lambda: 0.0)
+    queue.put(absolute(1, 1))
+    assert queue.poll(0.0)[0].menu_item_id == 1
+
+    queue.put(absolute(2, 1))
+    assert queue.poll(1.0) == []
+    assert queue.pop().menu_item_id == 2
+    assert queue.pop() is None
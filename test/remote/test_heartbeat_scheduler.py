@@ -0,0 +1,116 @@
+from test.remote.fake_clock import FakeClock
+from tcmenu.remote.commands.menu_heartbeat_command import MenuHeartbeatCommand
+from tcmenu.remote.heartbeat_scheduler import HeartbeatScheduler
+
+
+def new_scheduler(clock: FakeClock) -> HeartbeatScheduler:
+    return HeartbeatScheduler(interval=1.0, tick_duration=0.1, wheel_size=64, clock=clock)
+
+
+def test_heartbeat_sent_on_idle_link():
+    clock = FakeClock()
+    scheduler = new_scheduler(clock)
+    sent = []
+    scheduler.add_session("dev1", sent.append)
+
+    assert scheduler.tick(0.5) == 0
+    clock.now = 1.0
+    scheduler.on_received("dev1")
+    assert scheduler.tick(1.0) == 1
+
+    heartbeat: MenuHeartbeatCommand = sent[0]
+    assert heartbeat.heartbeat_interval == 1000
+    assert heartbeat.mode == MenuHeartbeatCommand.HeartbeatMode.NORMAL
+
+
+def test_heartbeat_suppressed_while_traffic_flows():
+    clock = FakeClock()
+    scheduler = new_scheduler(clock)
+    sent = []
+    scheduler.add_session("dev1", sent.append)
+
+    for step in range(1, 50):
+        now = step * 0.1
+        scheduler.on_sent("dev1", now)
+        scheduler.on_received("dev1", now)
+        scheduler.tick(now)
+
+    assert sent == []
+    assert scheduler.heartbeats_suppressed > 0
+
+    # once the link goes quiet, the heartbeat resumes
+    scheduler.on_received("dev1", 5.5)
+    assert scheduler.tick(5.9) == 1
+
+
+def test_send_now_starts_immediately():
+    clock = FakeClock()
+    scheduler = new_scheduler(clock)
+    sent = []
+    scheduler.add_session("dev1", sent.append, send_now=True)
+
+    assert scheduler.tick(0.1) == 1
+
+
+def test_dead_peer_detected_and_removed():
+    clock = FakeClock()
+    scheduler = new_scheduler(clock)
+    dead = []
+    scheduler.add_session("dev1", lambda cmd: None, on_dead=dead.append)
+    scheduler.add_session("dev2", lambda cmd: None, on_dead=dead.append)
+
+    for step in range(1, 31):
+        now = step * 0.1
+        scheduler.on_received("dev2", now)
+        scheduler.tick(now)
+
+    assert dead == ["dev1"]
+    assert "dev1" not in scheduler
+    assert "dev2" in scheduler
+
+
+def test_failing_dead_peer_callback_does_not_lose_other_sessions():
+    clock = FakeClock()
+    scheduler = new_scheduler(clock)
+    dead = []
+
+    def fail(key):
+        dead.append(key)
+        raise RuntimeError("callback failed")
+
+    scheduler.add_session("dev1", lambda cmd: None, on_dead=fail)
+    scheduler.add_session("dev2", lambda cmd: None, on_dead=fail)
+    scheduler.add_session("dev3", lambda cmd: None)
+
+    for step in range(1, 31):
+        scheduler.tick(step * 0.1)
+
+    assert sorted(dead) == ["dev1", "dev2"]
+    assert len(scheduler) == 0
+
+
+def test_removed_session_gets_no_heartbeats():
+    clock = FakeClock()
+    scheduler = new_scheduler(clock)
+    sent = []
+    scheduler.add_session("dev1", sent.append)
+    scheduler.remove_session("dev1")
+
+    assert scheduler.tick(10.0) == 0
+    assert len(scheduler) == 0
+
+
+def test_many_sessions_share_one_wheel():
+    clock = FakeClock()
+    scheduler = new_scheduler(clock)
+    sent = []
+    for i in range(5000):
+        scheduler.add_session(i, sent.append)
+
+    for i in range(0, 5000, 2):
+        scheduler.on_sent(i, 0.5)
+        scheduler.on_received(i, 0.5)
+    for i in range(1, 5000, 2):
+        scheduler.on_received(i, 0.5)
+
+    assert scheduler.tick(1.0) == 2500
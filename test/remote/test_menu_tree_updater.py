@@ -0,0 +1,83 @@
+from test.domain.domain_fixtures import DomainFixtures
+from tcmenu.domain.state.list_row_change import ListRowChange
+from tcmenu.domain.state.menu_tree import MenuTree
+from tcmenu.domain.state.paged_string_list import PagedStringList
+from tcmenu.domain.util.menu_item_helper import MenuItemHelper
+from tcmenu.remote.commands.command_factory import CommandFactory
+from tcmenu.remote.commands.menu_heartbeat_command import MenuHeartbeatCommand
+from tcmenu.remote.menu_tree_updater import MenuTreeUpdater
+from tcmenu.remote.protocol.correlation_id import CorrelationId
+
+
+def test_boot_commands_build_the_tree():
+    tree = MenuTree()
+    updater = MenuTreeUpdater(tree)
+    sub = DomainFixtures.a_sub_menu("Settings", 1)
+    analog = DomainFixtures.an_analog_item("Volume", 2)
+
+    assert updater.apply(CommandFactory.new_sub_menu_boot_command(0, sub))
+    assert updater.apply(CommandFactory.new_analog_boot_command(1, analog, 42))
+
+    assert tree.get_menu_by_id(2) == analog
+    assert tree.find_parent(analog) == sub
+    assert MenuItemHelper.get_value_for(analog, tree) == 42
+
+
+def test_changes_update_the_state():
+    tree = MenuTree()
+    updater = MenuTreeUpdater(tree)
+    analog = DomainFixtures.an_analog_item("Volume", 2)
+    updater.apply(CommandFactory.new_analog_boot_command(0, analog, 10))
+
+    assert updater.apply(CommandFactory.new_delta_menu_change_command(CorrelationId.new_correlation(), 2, 5))
+    assert MenuItemHelper.get_value_for(analog, tree) == 15
+
+    assert updater.apply(CommandFactory.new_absolute_menu_change_command(CorrelationId.new_correlation(), 2, 100))
+    assert int(MenuItemHelper.get_value_for(analog, tree)) == 100
+
+
+def test_unknown_items_and_other_commands_are_ignored():
+    updater = MenuTreeUpdater(MenuTree())
+
+    assert not updater.apply(CommandFactory.new_absolute_menu_change_command(CorrelationId.new_correlation(), 99, 1))
+    assert not updater.apply(CommandFactory.new_heartbeat_command(1500, MenuHeartbeatCommand.HeartbeatMode.NORMAL))
+
+
+def test_second_bootstrap_replaces_existing_items():
+    tree = MenuTree()
+    updater = MenuTreeUpdater(tree)
+    updater.apply(CommandFactory.new_sub_menu_boot_command(0, DomainFixtures.a_sub_menu("Settings", 1)))
+    updater.apply(CommandFactory.new_analog_boot_command(1, DomainFixtures.an_analog_item("Volume", 2), 1))
+
+    renamed = DomainFixtures.a_sub_menu("Options", 1)
+    updater.apply(CommandFactory.new_sub_menu_boot_command(0, renamed))
+
+    assert tree.get_menu_by_id(1).name == "Options"
+    assert [item.id for item in tree.get_menu_items(renamed)] == [2]
+
+
+def test_paged_list_rows_and_deltas_update_the_cache():
+    tree = MenuTree()
+    updater = MenuTreeUpdater(tree)
+    item = DomainFixtures.a_runtime_list_menu("Files", 5, 0)
+    updater.apply(CommandFactory.new_runtime_list_boot_command(0, item, ()))
+    rows = [f"file {i}" for i in range(5000)]
+    correlation = CorrelationId.new_correlation()
+
+    assert updater.apply(CommandFactory.new_list_rows_command(correlation, item, rows, 100, 10))
+    cache = tree.get_menu_state(item).value
+    assert isinstance(cache, PagedStringList)
+    assert len(cache) == 5000 and cache.loaded_rows == 10
+    assert cache[100] == "file 100"
+
+    changes = [
+        ListRowChange(ListRowChange.Operation.DELETE, 0),
+        ListRowChange(ListRowChange.Operation.UPDATE, 99, "renamed"),
+    ]
+    for command in CommandFactory.new_list_delta_commands(correlation, item, changes, 4999):
+        assert updater.apply(command)
+    cache = tree.get_menu_state(item).value
+    assert len(cache) == 4999
+    assert cache[99] == "renamed" and cache[100] == "file 101"
+
+    assert not updater.apply(CommandFactory.new_list_rows_command(correlation, 99, rows, 0, 10))
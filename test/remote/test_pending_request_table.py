@@ -0,0 +1,145 @@
+import asyncio
+import concurrent.futures
+
+import pytest
+
+from tcmenu.remote.commands.ack_status import AckStatus
+from tcmenu.remote.commands.command_factory import CommandFactory
+from tcmenu.remote.commands.menu_change_command import MenuChangeCommand
+from tcmenu.remote.pending_request_table import PendingRequestTable, AsyncPendingRequestTable
+from tcmenu.remote.protocol.correlation_id import CorrelationId
+
+
+def test_send_change_resolves_with_ack_status():
+    sent = []
+    table = PendingRequestTable(sender=sent.append)
+    try:
+        future = table.send_change(item=10, value=5)
+
+        assert len(sent) == 1
+        command: MenuChangeCommand = sent[0]
+        assert command.menu_item_id == 10
+        assert command.change_type == MenuChangeCommand.ChangeType.ABSOLUTE
+        assert command.correlation_id in table
+
+        ack = CommandFactory.new_acknowledgement_command(command.correlation_id, AckStatus.VALUE_RANGE_WARNING)
+        assert table.on_acknowledgement(ack)
+        assert future.result(timeout=1) == AckStatus.VALUE_RANGE_WARNING
+        assert len(table) == 0
+
+        # a second acknowledgement for the same correlation is ignored
+        assert not table.on_acknowledgement(ack)
+    finally:
+        table.close()
+
+
+def test_send_change_builds_requested_change_type():
+    sent = []
+    table = PendingRequestTable(sender=sent.append)
+    try:
+        table.send_change(item=1, value=-2, change_type=MenuChangeCommand.ChangeType.DELTA)
+        table.send_change(item=2, value=("a", "b"), change_type=MenuChangeCommand.ChangeType.ABSOLUTE_LIST)
+
+        assert sent[0].change_type == MenuChangeCommand.ChangeType.DELTA
+        assert sent[0].value == "-2"
+        assert sent[1].change_type == MenuChangeCommand.ChangeType.ABSOLUTE_LIST
+        assert sent[1].value == ("a", "b")
+        assert len(table) == 2
+    finally:
+        table.close()
+
+
+def test_request_times_out():
+    table = PendingRequestTable(sender=lambda cmd: None, timeout=0.05, tick_duration=0.01)
+    try:
+        future = table.send_change(item=1, value=1)
+        with pytest.raises(concurrent.futures.TimeoutError):
+            future.result(timeout=2)
+        assert len(table) == 0
+    finally:
+        table.close()
+
+
+def test_failed_send_is_not_left_pending():
+    def failing_sender(cmd):
+        raise IOError("Link down")
+
+    table = PendingRequestTable(sender=failing_sender)
+    try:
+        with pytest.raises(IOError):
+            table.send_change(item=1, value=1)
+        assert len(table) == 0
+    finally:
+        table.close()
+
+
+def test_many_outstanding_requests():
+    table = PendingRequestTable(sender=lambda cmd: None)
+    try:
+        correlations = [CorrelationId(i) for i in range(1, 5001)]
+        futures = [table.track(correlation) for correlation in correlations]
+        assert len(table) == 5000
+
+        for correlation in correlations:
+            table.on_acknowledgement(CommandFactory.new_acknowledgement_command(correlation, AckStatus.SUCCESS))
+
+        assert all(future.result(timeout=1) == AckStatus.SUCCESS for future in futures)
+        assert len(table) == 0
+    finally:
+        table.close()
+
+
+def test_close_cancels_outstanding_requests():
+    table = PendingRequestTable(sender=lambda cmd: None)
+    future = table.send_change(item=1, value=1)
+    table.close()
+
+    assert future.cancelled()
+
+
+def test_closed_table_does_not_accept_requests():
+    sent = []
+    table = PendingRequestTable(sender=sent.append)
+    table.close()
+
+    with pytest.raises(RuntimeError):
+        table.send_change(item=1, value=1)
+    assert sent == [] and len(table) == 0
+
+
+@pytest.mark.asyncio
+async def test_async_send_change_resolves_with_ack_status():
+    sent = []
+    table = AsyncPendingRequestTable(sender=sent.append)
+    future = table.send_change(item=3, value=1)
+
+    ack = CommandFactory.new_acknowledgement_command(sent[0].correlation_id, AckStatus.SUCCESS)
+    asyncio.get_running_loop().call_soon(table.on_acknowledgement, ack)
+
+    assert await asyncio.wait_for(future, 1) == AckStatus.SUCCESS
+    assert len(table) == 0
+    table.close()
+
+
+@pytest.mark.asyncio
+async def test_async_request_times_out():
+    table = AsyncPendingRequestTable(sender=lambda cmd: None, timeout=0.05, tick_duration=0.01)
+    future = table.send_change(item=3, value=1)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(future, 2)
+    assert len(table) == 0
+    table.close()
+
+
+@pytest.mark.asyncio
+async def test_async_closed_table_does_not_accept_requests():
+    sent = []
+    table = AsyncPendingRequestTable(sender=sent.append)
+    table.close()
+
+    with pytest.raises(RuntimeError):
+        table.track(CorrelationId.new_correlation())
+    with pytest.raises(RuntimeError):
+        table.send_change(item=3, value=1)
+    assert sent == [] and len(table) == 0
@@ -0,0 +1,222 @@
+import io
+import struct
+from dataclasses import dataclass
+from typing import ClassVar
+
+import pytest
+
+from test.domain.domain_fixtures import DomainFixtures
+from tcmenu.domain.state.menu_tree import MenuTree
+from tcmenu.remote.commands.command_factory import CommandFactory
+from tcmenu.remote.commands.menu_command import MenuCommand
+from tcmenu.remote.menu_tree_updater import MenuTreeUpdater
+from tcmenu.remote.protocol.configurable_protocol_converter import ConfigurableProtocolConverter
+from tcmenu.remote.protocol.correlation_id import CorrelationId
+from tcmenu.remote.protocol.message_field import MessageField
+from tcmenu.remote.protocol.tc_protocol_exception import TcProtocolException
+from tcmenu.remote.protocol_stats import LATENCY_BUCKETS_NS, LatencyHistogram, ProtocolStats
+
+RECEIVED = ProtocolStats.Direction.RECEIVED
+SENT = ProtocolStats.Direction.SENT
+Stage = ProtocolStats.Stage
+
+
+@dataclass(frozen=True)
+class QuotaCommand(MenuCommand):
+    QUOTA_MSG_TYPE: ClassVar[MessageField] = MessageField("Q", "T")
+
+    quota: int
+
+    @property
+    def command_type(self) -> MessageField:
+        return QuotaCommand.QUOTA_MSG_TYPE
+
+
+@dataclass(frozen=True)
+class RawQuotaCommand(MenuCommand):
+    RAW_QUOTA_MSG_TYPE: ClassVar[MessageField] = MessageField("Q", "R")
+
+    data: bytes
+
+    @property
+    def command_type(self) -> MessageField:
+        return RawQuotaCommand.RAW_QUOTA_MSG_TYPE
+
+
+def write_raw_quota(buffer: io.BytesIO, command: RawQuotaCommand) -> None:
+    buffer.write(struct.pack(">I", len(command.data)))
+    buffer.write(command.data)
+
+
+def new_protocol() -> ConfigurableProtocolConverter:
+    protocol = ConfigurableProtocolConverter(include_default_processors=True)
+    protocol.add_tag_val_in_processor(
+        QuotaCommand.QUOTA_MSG_TYPE, lambda parser: QuotaCommand(parser.get_value_as_int("QA"))
+    )
+    protocol.add_tag_val_out_processor(
+        QuotaCommand.QUOTA_MSG_TYPE, lambda buffer, command: buffer.write(f"QA={command.quota}|"), QuotaCommand
+    )
+    protocol.add_raw_in_processor(
+        RawQuotaCommand.RAW_QUOTA_MSG_TYPE, lambda buffer, length: RawQuotaCommand(buffer.read(length))
+    )
+    protocol.add_raw_out_processor(RawQuotaCommand.RAW_QUOTA_MSG_TYPE, write_raw_quota, RawQuotaCommand)
+    return protocol
+
+
+def encode(protocol: ConfigurableProtocolConverter, command: MenuCommand) -> bytes:
+    buffer = io.BytesIO()
+    protocol.to_channel(buffer, command)
+    return buffer.getvalue()
+
+
+COMMANDS = [
+    CommandFactory.new_analog_boot_command(0, DomainFixtures.an_analog_item("Volume", 1), 10),
+    CommandFactory.new_absolute_menu_change_command(CorrelationId.from_string("1234"), 1, 20),
+    QuotaCommand(12),
+    RawQuotaCommand(b"\x01\x02\x03"),
+]
+
+
+def test_measured_frames_are_the_same_as_unmeasured():
+    plain = new_protocol()
+    measured = new_protocol()
+    measured.set_stats(ProtocolStats())
+
+    for command in COMMANDS:
+        frame = encode(plain, command)
+        assert encode(measured, command) == frame
+        assert encode(measured, command) == frame
+        assert measured.from_channel(io.BytesIO(frame[1:])) == plain.from_channel(io.BytesIO(frame[1:]))
+
+
+def test_messages_are_counted_and_timed_by_type():
+    protocol = new_protocol()
+    stats = ProtocolStats()
+    protocol.set_stats(stats)
+    assert protocol.stats is stats
+
+    frames = [encode(protocol, command) for command in COMMANDS]
+    for frame in frames:
+        protocol.from_channel(io.BytesIO(frame[1:]))
+
+    sent_quota = stats.get(SENT, "QT")
+    assert (sent_quota.count, sent_quota.bytes, sent_quota.errors) == (1, len(frames[2]), 0)
+    assert set(sent_quota.stages) == {Stage.FRAMING, Stage.PROCESSING}
+
+    received_quota = stats.get(RECEIVED, "QT")
+    assert (received_quota.count, received_quota.bytes) == (1, len(frames[2]))
+    assert set(received_quota.stages) == {Stage.FRAMING, Stage.PARSING, Stage.PROCESSING}
+    assert received_quota.stages[Stage.PROCESSING].count == 1
+
+    received_raw = stats.get(RECEIVED, "QR")
+    assert received_raw.bytes == len(frames[3]) == stats.get(SENT, "QR").bytes
+    assert set(received_raw.stages) == {Stage.FRAMING, Stage.PROCESSING}
+
+    assert [key for key in stats.messages()] == [
+        (RECEIVED, "BA"),
+        (RECEIVED, "QR"),
+        (RECEIVED, "QT"),
+        (RECEIVED, "VC"),
+        (SENT, "BA"),
+        (SENT, "QR"),
+        (SENT, "QT"),
+        (SENT, "VC"),
+    ]
+
+    protocol.set_stats(None)
+    encode(protocol, COMMANDS[0])
+    assert stats.get(SENT, "BA").count == 1
+
+    stats.reset()
+    assert stats.messages() == {}
+
+
+def test_errors_are_counted():
+    protocol = new_protocol()
+    protocol.add_tag_val_in_processor(QuotaCommand.QUOTA_MSG_TYPE, lambda parser: parser.get_value("XX"))
+    stats = ProtocolStats()
+    protocol.set_stats(stats)
+
+    with pytest.raises(TcProtocolException):
+        protocol.from_channel(io.BytesIO(b"\x01QTQA=1|\x02"))
+
+    assert stats.get(RECEIVED, "QT").errors == 1
+    assert stats.get(RECEIVED, "QT").bytes == 0
+
+
+def test_tree_updates_are_timed():
+    stats = ProtocolStats()
+    updater = MenuTreeUpdater(MenuTree(), stats)
+
+    updater.apply(COMMANDS[0])
+    updater.apply(COMMANDS[1])
+
+    assert stats.get(RECEIVED, "BA").stages[Stage.TREE_UPDATE].count == 1
+    assert stats.get(RECEIVED, "VC").stages[Stage.TREE_UPDATE].count == 1
+    assert stats.get(RECEIVED, "VC").count == 0
+
+
+def test_command_factory_can_be_instrumented():
+    protocol = new_protocol()
+    stats = ProtocolStats()
+    protocol.set_stats(stats)
+    original = CommandFactory.new_heartbeat_command
+
+    stats.instrument_command_factory()
+    try:
+        with pytest.raises(RuntimeError):
+            ProtocolStats().instrument_command_factory()
+
+        frame = encode(protocol, CommandFactory.new_analog_boot_command(0, DomainFixtures.an_analog_item("A", 1), 1))
+        protocol.from_channel(io.BytesIO(frame[1:]))
+    finally:
+        stats.close()
+
+    assert CommandFactory.new_heartbeat_command is original
+    assert stats.get(SENT, "BA").stages[Stage.COMMAND_FACTORY].count == 1
+    assert stats.get(RECEIVED, "BA").stages[Stage.COMMAND_FACTORY].count == 1
+
+
+def test_histogram_percentiles():
+    histogram = LatencyHistogram()
+    assert histogram.percentile_ns(50) == 0
+
+    for nanoseconds in [500] * 90 + [20_000] * 9 + [10**9]:
+        histogram.record(nanoseconds)
+
+    assert histogram.count == 100
+    assert histogram.buckets[0] == 90
+    assert histogram.buckets[-1] == 1
+    assert histogram.percentile_ns(50) == LATENCY_BUCKETS_NS[0]
+    assert histogram.percentile_ns(99) == 25_000
+    assert histogram.percentile_ns(100) == 10**9
+    assert histogram.mean_ns == pytest.approx((500 * 90 + 20_000 * 9 + 10**9) / 100)
+
+
+def test_prometheus_text_and_report(tmp_path):
+    stats = ProtocolStats()
+    stats.record_message(SENT, "QT", 20)
+    stats.record_stage(SENT, "QT", Stage.PROCESSING, 3_000)
+    stats.record_stage(SENT, "QT", Stage.PROCESSING, 7_000)
+    stats.record_message(RECEIVED, "VC", 0, error=True)
+
+    text = stats.to_prometheus_text()
+    lines = text.splitlines()
+    assert 'tcmenu_protocol_messages_total{direction="sent",message_type="QT",command="CUSTOM"} 1' in lines
+    assert 'tcmenu_protocol_bytes_total{direction="sent",message_type="QT",command="CUSTOM"} 20' in lines
+    assert 'tcmenu_protocol_errors_total{direction="received",message_type="VC",command="CHANGE_INT_FIELD"} 1' in lines
+    labels = 'direction="sent",message_type="QT",command="CUSTOM",stage="processing"'
+    assert f'tcmenu_protocol_stage_seconds_bucket{{{labels},le="2.5e-06"}} 0' in lines
+    assert f'tcmenu_protocol_stage_seconds_bucket{{{labels},le="5e-06"}} 1' in lines
+    assert f'tcmenu_protocol_stage_seconds_bucket{{{labels},le="1e-05"}} 2' in lines
+    assert f'tcmenu_protocol_stage_seconds_bucket{{{labels},le="+Inf"}} 2' in lines
+    assert f"tcmenu_protocol_stage_seconds_sum{{{labels}}} 0.000010000" in lines
+    assert f"tcmenu_protocol_stage_seconds_count{{{labels}}} 2" in lines
+
+    path = tmp_path / "tcmenu.prom"
+    stats.write_prometheus_textfile(str(path))
+    assert path.read_text() == text
+
+    report = stats.report().splitlines()
+    assert len(report) == 3
+    assert report[2].split()[:7] == ["sent", "QT", "CUSTOM", "1", "20", "0", "processing"]
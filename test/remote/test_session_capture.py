@@ -0,0 +1,128 @@
+import io
+import socket
+
+import pytest
+
+from test.domain.domain_fixtures import DomainFixtures
+from tcmenu.domain.state.menu_tree import MenuTree
+from tcmenu.domain.util.menu_item_helper import MenuItemHelper
+from tcmenu.remote.commands.command_factory import CommandFactory
+from tcmenu.remote.protocol.configurable_protocol_converter import ConfigurableProtocolConverter
+from tcmenu.remote.protocol.correlation_id import CorrelationId
+from tcmenu.remote.session_capture import (
+    CaptureDirection,
+    SessionRecorder,
+    SessionReplayer,
+    check_capture_header,
+    iterate_record_offsets,
+    read_capture,
+)
+
+protocol = ConfigurableProtocolConverter(include_default_processors=True)
+
+
+def encode(command) -> bytes:
+    buffer = io.BytesIO()
+    protocol.to_channel(buffer, command)
+    return buffer.getvalue()
+
+
+def a_capture() -> bytes:
+    analog = DomainFixtures.an_analog_item("Volume", 2)
+    buffer = io.BytesIO()
+    recorder = SessionRecorder(buffer)
+    recorder.record(encode(CommandFactory.new_analog_boot_command(0, analog, 10)), timestamp=100.0)
+    recorder.record(
+        encode(CommandFactory.new_delta_menu_change_command(CorrelationId.new_correlation(), 2, 3)),
+        CaptureDirection.SENT,
+        timestamp=100.01,
+    )
+    recorder.record(
+        encode(CommandFactory.new_absolute_menu_change_command(CorrelationId.new_correlation(), 2, 50)),
+        timestamp=100.02,
+    )
+    return buffer.getvalue()
+
+
+def test_records_round_trip():
+    records = list(read_capture(a_capture()))
+
+    assert len(records) == 3
+    assert records[0].timestamp == pytest.approx(100.0)
+    assert records[1].direction == CaptureDirection.SENT
+    assert records[2].frame.startswith(b"\x01")
+
+
+def test_record_offsets_locate_frames_in_place():
+    data = a_capture()
+    offsets = list(iterate_record_offsets(data))
+
+    assert [data[start:end] for _, _, start, end in offsets] == [record.frame for record in read_capture(data)]
+    assert offsets[1][:2] == (100_010_000, CaptureDirection.SENT.value)
+
+    # Records can be walked between any record boundaries, each record ends where the next starts.
+    assert check_capture_header(data) < offsets[0][2]
+    assert list(iterate_record_offsets(data, offsets[0][3], offsets[1][3])) == offsets[1:2]
+
+
+def test_recorder_appends_without_a_second_header(tmp_path):
+    path = str(tmp_path / "session.tcc")
+    with SessionRecorder.open(path) as recorder:
+        recorder.record(b"\x01first", timestamp=1.0)
+    with SessionRecorder.open(path) as recorder:
+        recorder.record(b"\x01second", timestamp=2.0)
+
+    assert [record.frame for record in read_capture(path)] == [b"\x01first", b"\x01second"]
+
+
+def test_invalid_capture_is_rejected():
+    with pytest.raises(ValueError):
+        list(read_capture(b"NOTACAPTURE"))
+
+
+def test_truncated_record_is_skipped():
+    assert len(list(read_capture(a_capture()[:-3]))) == 2
+
+
+def test_replay_to_tree_at_max_speed():
+    tree = MenuTree()
+    replayer = SessionReplayer(a_capture())
+
+    stats = replayer.replay_to_tree(tree, SessionReplayer.MAX_SPEED)
+
+    assert len(replayer) == 2
+    assert stats.frames == 2
+    assert stats.commands == 2
+    assert stats.errors == 0
+    analog = tree.get_menu_by_id(2)
+    assert int(MenuItemHelper.get_value_for(analog, tree)) == 50
+
+
+def test_replay_counts_undecodable_frames_as_errors():
+    buffer = io.BytesIO()
+    SessionRecorder(buffer).record(b"garbage", timestamp=0.0)
+
+    stats = SessionReplayer(buffer.getvalue()).replay_to_tree(MenuTree(), SessionReplayer.MAX_SPEED)
+
+    assert stats.frames == 1
+    assert stats.errors == 1
+
+
+def test_replay_is_paced_by_speed():
+    stats = SessionReplayer(a_capture()).replay_to_tree(MenuTree(), speed=2.0)
+
+    assert stats.elapsed >= 0.01
+
+
+def test_replay_sent_frames_to_socket():
+    replayer = SessionReplayer(a_capture(), direction=CaptureDirection.SENT)
+    left, right = socket.socketpair()
+    try:
+        stats = replayer.replay_to_socket(left, SessionReplayer.MAX_SPEED)
+        received = right.recv(4096)
+    finally:
+        left.close()
+        right.close()
+
+    assert stats.frames == 1
+    assert received.startswith(b"\x01") and b"ID=2|" in received
@@ -0,0 +1,67 @@
+import pytest
+
+from test.remote.fake_clock import FakeClock
+from tcmenu.remote.timing_wheel import TimingWheel
+
+
+def test_keys_expire_after_their_deadline():
+    clock = FakeClock()
+    wheel = TimingWheel(tick_duration=0.1, wheel_size=8, clock=clock)
+    wheel.schedule("a", 0.25)
+    wheel.schedule("b", 0.5)
+
+    assert len(wheel) == 2
+    assert wheel.advance(0.2) == []
+    assert wheel.advance(0.3) == ["a"]
+    assert "a" not in wheel
+    assert wheel.advance(0.5) == ["b"]
+    assert len(wheel) == 0
+
+
+def test_cancel_removes_key():
+    clock = FakeClock()
+    wheel = TimingWheel(tick_duration=0.1, wheel_size=8, clock=clock)
+    wheel.schedule(1, 0.1)
+
+    assert wheel.cancel(1)
+    assert not wheel.cancel(1)
+    assert wheel.advance(1.0) == []
+
+
+def test_reschedule_moves_deadline():
+    clock = FakeClock()
+    wheel = TimingWheel(tick_duration=0.1, wheel_size=8, clock=clock)
+    wheel.schedule(1, 0.1)
+    wheel.schedule(1, 0.5)
+
+    assert wheel.advance(0.3) == []
+    assert wheel.advance(0.5) == [1]
+
+
+def test_deadlines_beyond_one_revolution():
+    clock = FakeClock()
+    wheel = TimingWheel(tick_duration=0.1, wheel_size=4, clock=clock)
+    wheel.schedule("far", 1.0)
+    wheel.schedule("near", 0.1)
+
+    assert wheel.advance(0.4) == ["near"]
+    assert wheel.advance(0.9) == []
+    assert wheel.advance(1.0) == ["far"]
+
+
+def test_large_jump_expires_everything_due():
+    clock = FakeClock()
+    wheel = TimingWheel(tick_duration=0.1, wheel_size=4, clock=clock)
+    for i in range(10):
+        wheel.schedule(i, 0.1 * (i + 1))
+    wheel.schedule("later", 100.0)
+
+    assert sorted(wheel.advance(5.0)) == list(range(10))
+    assert "later" in wheel
+
+
+def test_invalid_configuration():
+    with pytest.raises(ValueError):
+        TimingWheel(tick_duration=0)
+    with pytest.raises(ValueError):
+        TimingWheel(wheel_size=0)
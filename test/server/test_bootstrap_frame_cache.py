@@ -0,0 +1,101 @@
+import io
+
+from test.domain.domain_fixtures import DomainFixtures
+from tcmenu.domain.menu_items import MenuItem
+from tcmenu.domain.state.menu_tree import MenuTree
+from tcmenu.domain.util.menu_item_helper import MenuItemHelper
+from tcmenu.remote.commands.command_factory import CommandFactory
+from tcmenu.remote.commands.menu_bootstrap_command import MenuBootstrapCommand
+from tcmenu.remote.commands.menu_command_type import MenuCommandType
+from tcmenu.remote.commands.menu_boot_commands import MenuAnalogBootCommand
+from tcmenu.remote.protocol.configurable_protocol_converter import ConfigurableProtocolConverter
+from tcmenu.server.bootstrap_frame_cache import BootstrapFrameCache
+
+
+def encode_bootstrap(tree: MenuTree, protocol: ConfigurableProtocolConverter) -> bytes:
+    buffer = io.BytesIO()
+    protocol.to_channel(buffer, CommandFactory.new_bootstrap_command(MenuBootstrapCommand.BootType.START))
+    for item in tree.get_all_menu_items_from(MenuTree.ROOT)[1:]:
+        command = MenuItemHelper.get_boot_msg_for_item(item, tree.find_parent(item), tree)
+        if command is not None:
+            protocol.to_channel(buffer, command)
+    protocol.to_channel(buffer, CommandFactory.new_bootstrap_command(MenuBootstrapCommand.BootType.END))
+    return buffer.getvalue()
+
+
+def cached_bootstrap(cache: BootstrapFrameCache) -> bytes:
+    buffer = io.BytesIO()
+    cache.write_bootstrap(buffer)
+    return buffer.getvalue()
+
+
+def item_by_name(tree: MenuTree, name: str) -> MenuItem:
+    return next(item for item in tree.get_all_menu_items() if item.name == name)
+
+
+def test_bootstrap_matches_encoding_each_item():
+    tree = DomainFixtures.full_esp_amplifier_test_tree()
+    protocol = ConfigurableProtocolConverter(include_default_processors=True)
+    cache = BootstrapFrameCache(tree, protocol)
+
+    assert cached_bootstrap(cache) == encode_bootstrap(tree, protocol)
+    # The second bootstrap comes from the cache.
+    assert cached_bootstrap(cache) == encode_bootstrap(tree, protocol)
+
+
+def test_current_values_are_spliced_in():
+    tree = DomainFixtures.full_esp_amplifier_test_tree()
+    protocol = ConfigurableProtocolConverter(include_default_processors=True)
+    cache = BootstrapFrameCache(tree, protocol)
+    cached_bootstrap(cache)
+
+    volume = item_by_name(tree, "Volume")
+    MenuItemHelper.set_menu_state(volume, 77, tree)
+
+    assert b"VC=77|" in cached_bootstrap(cache)
+    assert cached_bootstrap(cache) == encode_bootstrap(tree, protocol)
+
+
+def test_structural_changes_invalidate_frames():
+    tree = DomainFixtures.full_esp_amplifier_test_tree()
+    protocol = ConfigurableProtocolConverter(include_default_processors=True)
+    cache = BootstrapFrameCache(tree, protocol)
+    cached_bootstrap(cache)
+
+    volume = item_by_name(tree, "Volume")
+    tree.replace_menu_by_id(DomainFixtures.an_analog_item("Loudness", volume.id))
+    tree.add_menu_item(DomainFixtures.a_text_menu("Added", 500))
+    tree.remove_menu_item(item_by_name(tree, "Status"))
+
+    frames = cached_bootstrap(cache)
+    assert b"NM=Loudness|" in frames
+    assert b"NM=Added|" in frames
+    assert frames == encode_bootstrap(tree, protocol)
+
+    cache.close()
+    tree.add_menu_item(DomainFixtures.a_text_menu("Ignored", 501))
+    assert b"NM=Ignored|" in cached_bootstrap(BootstrapFrameCache(tree, protocol))
+
+
+def test_items_with_a_custom_writer_are_encoded_in_full():
+    tree = DomainFixtures.full_esp_amplifier_test_tree()
+    protocol = ConfigurableProtocolConverter(include_default_processors=True)
+    protocol.add_tag_val_out_processor(
+        MenuCommandType.ANALOG_BOOT_ITEM.message_field,
+        lambda buffer, command: buffer.write(f"ID={command.menu_item.id}|VC={command.current_value}|"),
+        MenuAnalogBootCommand,
+    )
+    cache = BootstrapFrameCache(tree, protocol)
+
+    assert cached_bootstrap(cache) == encode_bootstrap(tree, protocol)
+    MenuItemHelper.set_menu_state(item_by_name(tree, "Volume"), 12, tree)
+    assert cached_bootstrap(cache) == encode_bootstrap(tree, protocol)
+
+
+def test_write_bootstrap_returns_item_count():
+    tree = MenuTree()
+    tree.add_menu_item(DomainFixtures.an_analog_item("Volume", 1))
+    tree.add_menu_item(DomainFixtures.a_sub_menu("Settings", 2))
+    cache = BootstrapFrameCache(tree, ConfigurableProtocolConverter(include_default_processors=True))
+
+    assert cache.write_bootstrap(io.BytesIO()) == 2
@@ -0,0 +1,70 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import tcmenu
+
+"""
+Budget in microseconds for the time spent in tcmenu modules when importing the protocol converter, as reported by
+python -X importtime. It measured around 30ms when set, the margin allows for slower machines.
+"""
+CONVERTER_IMPORT_BUDGET_US = 150_000
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_times(code: str) -> dict[str, tuple[int, int]]:
+    """Runs the code in a new interpreter and returns module name to (self, cumulative) import time in microseconds."""
+    env = dict(os.environ, PYTHONPATH=ROOT, PYTHONDONTWRITEBYTECODE="1")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def test_package_import_loads_no_submodules():
+    modules = import_times("import tcmenu")
+
+    assert {name for name in modules if name.startswith("tcmenu")} == {"tcmenu", "tcmenu._lazy"}
+
+
+def test_submodules_load_on_attribute_access():
+    assert tcmenu.domain.state.menu_tree.MenuTree.ROOT.id == 0
+    assert "persist" in dir(tcmenu)
+
+    with pytest.raises(AttributeError):
+        getattr(tcmenu.domain, "no_such_module")
+
+
+def test_converter_import_defers_command_processors():
+    modules = import_times("import tcmenu.remote.protocol.configurable_protocol_converter")
+
+    assert "tcmenu.remote.protocol.tag_val_menu_command_processors" not in modules
+    assert "tcmenu.remote.commands.menu_boot_commands" not in modules
+    assert "humps" not in modules
+
+
+def test_converter_import_within_budget():
+    modules = import_times("import tcmenu.remote.protocol.configurable_protocol_converter")
+
+    spent = sum(self_us for name, (self_us, _) in modules.items() if name.startswith("tcmenu"))
+    assert spent < CONVERTER_IMPORT_BUDGET_US, f"tcmenu import took {spent}us"
+
+
+def test_humps_only_imported_when_json_is_loaded():
+    assert "humps" not in import_times("import tcmenu.persist.json_menu_item_serializer")
+
+    modules = import_times(
+        "from tcmenu.persist.json_menu_item_serializer import JsonMenuItemSerializer\n"
+        "JsonMenuItemSerializer.from_json("
+        '\'[{"parentId": 0, "type": "actionMenu", "item": {"id": 1, "name": "Go"}}]\')'
+    )
+    assert "humps" in modules